@@ -0,0 +1,56 @@
+# Imports
+from argparse import ArgumentParser
+import sys
+import great_expectations as ge
+
+from supporting_functions import (
+    bake_store_snapshot,
+    check_store_snapshot,
+    setup_logging,
+)
+
+# Logger
+logger = setup_logging()
+
+
+def initialize_parser() -> ArgumentParser:
+    """Function to initialize the command line parser for baking a read-only snapshot
+    of the expectation suites and checkpoints of the project, which is placed in the
+    Docker image if store_snapshot is enabled in project_config.yml
+
+    Returns
+    -------
+    ArgumentParser
+        An initialized argument parser
+    """
+    parser = ArgumentParser(description="Bake a snapshot of suites and checkpoints")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="check whether the snapshot is stale instead of baking it, exiting with "
+        "status 1 if it is",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="store_snapshot",
+        metavar="",
+        help="directory to bake the snapshot into",
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = initialize_parser().parse_args()
+    ge_context = ge.data_context.DataContext()
+
+    if args.check:
+        dict_checks = check_store_snapshot(ge_context, args.output)
+        logger.info(dict_checks)
+        sys.exit(int(any(any(check.values()) for check in dict_checks.values())))
+
+    dict_counts = bake_store_snapshot(ge_context, args.output)
+    if not dict_counts:
+        logger.info("store_snapshot is not enabled, no snapshot was baked")
@@ -4,8 +4,26 @@ from great_expectations.core.batch import RuntimeBatchRequest
 
 from supporting_functions import (
     TestingConfiguration,
+    commit_key_index_updates,
+    enable_digest_uniqueness,
+    enable_key_index,
+    enable_reference_sets,
     evaluate_ge_results,
+    flush_store_writes,
+    get_asset_checkpoint_names,
+    get_cost_profile_store,
+    get_dynamic_evaluation_parameters,
+    get_grater_store_backend,
+    get_incremental_asset_config,
+    get_initial_result_format,
+    get_validation_plan_store,
+    notify_docs_rebuild_scheduler,
+    run_checkpoints_on_batch,
+    run_incremental_checkpoint,
+    run_tiered_checkpoint,
     setup_logging,
+    store_column_statistics,
+    store_validation_summaries,
 )
 import boto3
 
@@ -19,13 +37,19 @@ def lambda_handler(event, context):
 
     0. Load project parameters for the tutorial from project_config.yml and parse the
        event passed at runtime
-    1. Initialize S3 client object, S3 bucket object and GE DataContext object
+    1. Initialize S3 client object, S3 bucket object and GE DataContext object, and
+       register the digest engine for uniqueness checks, the store of the key index
+       and the reference sets for referential integrity if enabled in
+       project_config.yml
     2. Load data (LOGIC TO BE WRITTEN BY DEVELOPER)
     3. Generate a RuntimeBatchRequest to run against the checkpoint generated in
        expectation_suite.ipynb
     4. Run expectations against current batch of data by calling the checkpoint with
        the RuntimeBatchRequest from step 3
-    5. Evaluate expectation results and return status code 200 if successfull
+    5. Notify the Data Docs rebuild scheduler of the stored validation results, write
+       summaries of them to the summary index, store statistics of each column of
+       the batch and add its keys to the key index, if enabled in project_config.yml
+    6. Evaluate expectation results and return status code 200 if successfull
 
     Parameters
     ----------
@@ -45,6 +69,9 @@ def lambda_handler(event, context):
     s3_client = boto3.client("s3")
     bucket = boto3.resource("s3").Bucket(test_config.data_bucket)
     context = ge.data_context.DataContext()
+    enable_digest_uniqueness(test_config)
+    enable_key_index(test_config, context)
+    enable_reference_sets(test_config, context)
 
     # -- 2. Load data
     ### PUT YOUR DATA LOADING LOGIC HERE
@@ -55,6 +82,15 @@ def lambda_handler(event, context):
     # validations, asset_name and batch_identifier are required
     # NOTE: in order for this to properly run, an expectation suite must have been
     # previously generated!
+    # If data arrives as many small files under a prefix, group them into micro-batches
+    # instead of validating each file: list them with list_objects_with_metadata, group
+    # them with group_micro_batches (using micro_batching in project_config.yml), load
+    # each micro-batch concurrently with load_csvs_from_s3 and concatenate_micro_batch,
+    # and run it with run_micro_batch_checkpoint in step 4
+    # If the asset is listed under partitioned_assets in project_config.yml, validate
+    # all its partitions with validate_partitioned_s3_asset instead of steps 2 to 4,
+    # which skips partitions that were already validated against the current expectation
+    # suite
     df_batch = load_data()  # Needs to be defined!
     asset_name = "ASSET NAME OR LOGIC TO GENERATE IT GOES HERE"
     batch_identifier = "BATCH IDENTIFIER OR LOGIC TO GENERATE IT GOES HERE"
@@ -69,13 +105,111 @@ def lambda_handler(event, context):
     )
 
     # -- 4. Run validations
-    results = context.run_checkpoint(
-        checkpoint_name=f"{test_config.checkpoint_name}",
-        validations=[{"batch_request": batch_request}],
+    #       Expectations are validated in order of the priority tier assigned to them
+    #       in expectation_suite.ipynb (blocking, critical, informational). If an
+    #       expectation in the blocking tier fails, the remaining tiers are skipped.
+    #       If cost_profiles is enabled in project_config.yml, the runtime of each
+    #       blocking expectation is recorded in a cost profile, so that cheap ones in
+    #       the blocking tier are validated first in later runs
+    #       NOTE: if the Lambda has multiple vCPUs (i.e. is configured with more
+    #       memory), pass n_workers to spread the expectations of each tier over the
+    #       available CPU cores. For large batches with few columns, also pass
+    #       partition_by="rows" to divide the rows of the batch over the CPU cores
+    #       instead
+    #       If asset_checkpoints in project_config.yml lists several checkpoints for
+    #       this asset, the batch is loaded once and the expectation suites of all
+    #       checkpoints are validated together, sharing the metrics they have in common
+    #       Expectations are first validated with a minimal result format (set by
+    #       initial_result_format in project_config.yml), after which only failed
+    #       expectations are validated again with the result format of the checkpoint
+    #       If validation_plans is enabled in project_config.yml, the metrics each
+    #       expectation depends on are taken from a plan compiled once per version of
+    #       the expectation suite, instead of being resolved again
+    #       If column_statistics_store is enabled in project_config.yml, values for
+    #       dynamic evaluation parameters are derived from the statistics of earlier
+    #       batches of this asset, as set by evaluation_parameter_rules
+    #       If this asset is listed under incremental_assets in project_config.yml, only
+    #       the rows appended since the previous run are validated, according to the
+    #       watermark of the asset. For mode "objects", only load the objects returned
+    #       by get_new_object_keys in step 2 and pass their keys as object_keys. Such
+    #       assets are validated with a single checkpoint, without priority tiers and
+    #       the initial result format
+    #       Validation results that were buffered by the checkpoint (if
+    #       buffered_store_writes is enabled in project_config.yml) are written to the
+    #       stores concurrently afterwards, also if validation raised an error, so
+    #       that no validation results are lost
+    try:
+        checkpoint_names = get_asset_checkpoint_names(test_config, asset_name)
+        initial_result_format = get_initial_result_format(test_config)
+        validation_plan_store = get_validation_plan_store(test_config, context)
+        dict_evaluation_parameters = get_dynamic_evaluation_parameters(
+            test_config, context, asset_name, batch_identifier
+        )
+        incremental_config = get_incremental_asset_config(test_config, asset_name)
+        if incremental_config is not None:
+            list_results = [
+                run_incremental_checkpoint(
+                    context,
+                    checkpoint_names[0],
+                    batch_request,
+                    get_grater_store_backend(test_config, "watermarks"),
+                    evaluation_parameters=dict_evaluation_parameters,
+                    **incremental_config,
+                )
+            ]
+        elif len(checkpoint_names) > 1:
+            list_results = list(
+                run_checkpoints_on_batch(
+                    context,
+                    checkpoint_names,
+                    batch_request,
+                    evaluation_parameters=dict_evaluation_parameters,
+                    initial_result_format=initial_result_format,
+                    validation_plan_store=validation_plan_store,
+                ).values()
+            )
+        else:
+            cost_profile_store = get_cost_profile_store(test_config, context)
+            list_results = [
+                run_tiered_checkpoint(
+                    context,
+                    checkpoint_names[0],
+                    batch_request,
+                    evaluation_parameters=dict_evaluation_parameters,
+                    cost_profile_store=cost_profile_store,
+                    initial_result_format=initial_result_format,
+                    validation_plan_store=validation_plan_store,
+                )
+            ]
+    finally:
+        flush_store_writes()
+
+    # -- 5. Notify the Data Docs rebuild scheduler of the stored validation results
+    #       This is only done if docs_rebuild_scheduler is enabled in
+    #       project_config.yml, in which case the checkpoint should not update Data
+    #       Docs itself (see checkpoint_without_datadocs_update)
+    notify_docs_rebuild_scheduler(test_config, context, list_results)
+
+    #       If validation_summary_index is enabled in project_config.yml, a summary
+    #       with one row per expectation is stored as well, which can be queried with
+    #       query_validations.py
+    store_validation_summaries(test_config, context, list_results)
+
+    #       If column_statistics_store is enabled in project_config.yml, statistics of
+    #       each column of the batch are stored, from which evaluation parameters for
+    #       later batches are derived
+    store_column_statistics(
+        test_config, context, df_batch, asset_name, batch_identifier, list_results
     )
 
-    # -- 5. Evaluate results, return input if successfull
-    success = evaluate_ge_results(results)
+    #       If key_index is enabled in project_config.yml, the keys checked by
+    #       expect_column_values_to_be_unique_across_batches are added to the key
+    #       index, so that later batches cannot repeat them. This is only done if all
+    #       validations succeeded
+    commit_key_index_updates(list_results)
+
+    # -- 6. Evaluate results, return input if successfull
+    success = all([evaluate_ge_results(results) for results in list_results])
 
     if success:
         return {"statuscode": 200}
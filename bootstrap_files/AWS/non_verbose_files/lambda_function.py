@@ -4,8 +4,26 @@ from great_expectations.core.batch import RuntimeBatchRequest
 
 from supporting_functions import (
     TestingConfiguration,
+    commit_key_index_updates,
+    enable_digest_uniqueness,
+    enable_key_index,
+    enable_reference_sets,
     evaluate_ge_results,
+    flush_store_writes,
+    get_asset_checkpoint_names,
+    get_cost_profile_store,
+    get_dynamic_evaluation_parameters,
+    get_grater_store_backend,
+    get_incremental_asset_config,
+    get_initial_result_format,
+    get_validation_plan_store,
+    notify_docs_rebuild_scheduler,
+    run_checkpoints_on_batch,
+    run_incremental_checkpoint,
+    run_tiered_checkpoint,
     setup_logging,
+    store_column_statistics,
+    store_validation_summaries,
 )
 import boto3
 
@@ -23,6 +41,9 @@ def lambda_handler(event, context):
     s3_client = boto3.client("s3")
     bucket = boto3.resource("s3").Bucket(test_config.data_bucket)
     context = ge.data_context.DataContext()
+    enable_digest_uniqueness(test_config)
+    enable_key_index(test_config, context)
+    enable_reference_sets(test_config, context)
 
     # -- 2. Load data
     df_batch = load_data()  # Needs to be defined!
@@ -39,13 +60,63 @@ def lambda_handler(event, context):
     )
 
     # -- 4. Run validations
-    results = context.run_checkpoint(
-        checkpoint_name=f"{test_config.checkpoint_name}",
-        validations=[{"batch_request": batch_request}],
+    try:
+        checkpoint_names = get_asset_checkpoint_names(test_config, asset_name)
+        initial_result_format = get_initial_result_format(test_config)
+        validation_plan_store = get_validation_plan_store(test_config, context)
+        dict_evaluation_parameters = get_dynamic_evaluation_parameters(
+            test_config, context, asset_name, batch_identifier
+        )
+        incremental_config = get_incremental_asset_config(test_config, asset_name)
+        if incremental_config is not None:
+            list_results = [
+                run_incremental_checkpoint(
+                    context,
+                    checkpoint_names[0],
+                    batch_request,
+                    get_grater_store_backend(test_config, "watermarks"),
+                    evaluation_parameters=dict_evaluation_parameters,
+                    **incremental_config,
+                )
+            ]
+        elif len(checkpoint_names) > 1:
+            list_results = list(
+                run_checkpoints_on_batch(
+                    context,
+                    checkpoint_names,
+                    batch_request,
+                    evaluation_parameters=dict_evaluation_parameters,
+                    initial_result_format=initial_result_format,
+                    validation_plan_store=validation_plan_store,
+                ).values()
+            )
+        else:
+            cost_profile_store = get_cost_profile_store(test_config, context)
+            list_results = [
+                run_tiered_checkpoint(
+                    context,
+                    checkpoint_names[0],
+                    batch_request,
+                    evaluation_parameters=dict_evaluation_parameters,
+                    cost_profile_store=cost_profile_store,
+                    initial_result_format=initial_result_format,
+                    validation_plan_store=validation_plan_store,
+                )
+            ]
+    finally:
+        flush_store_writes()
+
+    # -- 5. Notify Data Docs rebuild scheduler, store summaries and column statistics,
+    #       and add the keys of the batch to the key index
+    notify_docs_rebuild_scheduler(test_config, context, list_results)
+    store_validation_summaries(test_config, context, list_results)
+    store_column_statistics(
+        test_config, context, df_batch, asset_name, batch_identifier, list_results
     )
+    commit_key_index_updates(list_results)
 
-    # -- 5. Evaluate results, return input if successfull
-    success = evaluate_ge_results(results)
+    # -- 6. Evaluate results, return input if successfull
+    success = all([evaluate_ge_results(results) for results in list_results])
 
     if success:
         return {"statuscode": 200}
@@ -0,0 +1,152 @@
+# Imports
+from argparse import ArgumentParser
+import great_expectations as ge
+
+from supporting_functions import (
+    TestingConfiguration,
+    check_store_snapshot,
+    compact_validation_summary_store,
+    compact_validations_store,
+    get_docs_rebuild_scheduler,
+    setup_logging,
+)
+
+# Logger
+logger = setup_logging()
+
+
+def lambda_handler(event, context):
+    """Lambda function for rebuilding the Data Docs website of Grater Expectations.
+    It is deployed from the same Docker image as the validation Lambda (overriding
+    the command with rebuild_data_docs.lambda_handler) and triggered on a schedule.
+    The validation Lambda notifies it of stored validation results if
+    docs_rebuild_scheduler is enabled in project_config.yml. This function runs
+    through the following steps:
+
+    0. Load project parameters from project_config.yml and parse the event passed at
+       runtime
+    1. Initialize GE DataContext object and the Data Docs rebuild scheduler
+    2. Rebuild the Data Docs website incrementally if enough validation results are
+       pending, or if the oldest pending result has waited long enough. Only the
+       pending results are rendered then. Pass {"force": true} as event to rebuild
+       regardless, finding all new and removed validation results by listing the
+       validations store, or {"rebuild_all": true} to render all pages again in
+       parallel (uploading only pages that changed).
+       Pass {"compact": true} to compact the validations store instead, if it uses
+       a CompressedValidationsStoreBackend, and the summaries of validation results,
+       if validation_summary_index is enabled (triggered daily). Pass
+       {"check_snapshot": true} to check whether the snapshot of expectation suites
+       and checkpoints in the image is stale, if store_snapshot is enabled
+
+    Parameters
+    ----------
+    event : dict
+        Event passed to the Lambda at runtime
+    context
+        An object with methods and properties that provide information about the
+        invocation, function and execution environment. Does not need to be passed
+        upon invocation
+    """
+    # -- 0. Load parameters from configuration file and event
+    test_config = TestingConfiguration("project_config.yml")
+    test_config.load_config()
+    params = event or {}
+
+    # -- 1. Initialize GE and scheduler objects
+    ge_context = ge.data_context.DataContext()
+    scheduler = get_docs_rebuild_scheduler(test_config, ge_context)
+
+    # -- 2. Compact the validations store or check the store snapshot if requested,
+    #       else rebuild Data Docs if due
+    if params.get("check_snapshot"):
+        return {"statuscode": 200, **check_store_snapshot(ge_context)}
+
+    if params.get("compact"):
+        return {
+            "statuscode": 200,
+            **compact_validations_store(ge_context),
+            **compact_validation_summary_store(test_config, ge_context),
+        }
+
+    output = scheduler.run(
+        force=bool(params.get("force")), rebuild_all=bool(params.get("rebuild_all"))
+    )
+
+    return {"statuscode": 200, **output}
+
+
+def initialize_parser() -> ArgumentParser:
+    """Function to initialize the command line parser for running the Data Docs
+    rebuild scheduler locally
+
+    Returns
+    -------
+    ArgumentParser
+        An initialized argument parser
+    """
+    parser = ArgumentParser(description="Data Docs rebuild scheduler")
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="rebuild regardless of pending results, finding all new and removed "
+        "validation results",
+    )
+    parser.add_argument(
+        "-a",
+        "--all",
+        action="store_true",
+        help="render all pages again in parallel, uploading only changed pages",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="compact the validations store and validation summaries instead of "
+        "rebuilding Data Docs",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        type=float,
+        metavar="",
+        help="keep running, checking pending results every given number of seconds",
+    )
+    parser.add_argument(
+        "-l",
+        "--local",
+        type=str,
+        metavar="",
+        help="local directory to keep notifications and the site manifest in",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        default="project_config.yml",
+        metavar="",
+        help="path to the project configuration",
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = initialize_parser().parse_args()
+    test_config = TestingConfiguration(args.config)
+    test_config.load_config()
+    ge_context = ge.data_context.DataContext()
+    scheduler = get_docs_rebuild_scheduler(
+        test_config, ge_context, base_directory=args.local
+    )
+
+    if args.compact:
+        logger.info(compact_validations_store(ge_context))
+        logger.info(
+            compact_validation_summary_store(
+                test_config, ge_context, base_directory=args.local
+            )
+        )
+    elif args.watch:
+        scheduler.watch(poll_seconds=args.watch)
+    else:
+        logger.info(scheduler.run(force=args.force, rebuild_all=args.all))
@@ -0,0 +1,335 @@
+"""Functions for reading and writing the objects of Great Expectations store backends
+on AWS, as used by the features of Grater Expectations in grater_functions. Objects are
+stored in S3 buckets, or on the local filesystem (e.g. for testing)"""
+
+# -- Imports
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from great_expectations.data_context.store import TupleS3StoreBackend
+from great_expectations.exceptions import InvalidKeyError
+
+
+def get_s3_client(store_backend: TupleS3StoreBackend, n_threads: int = 8):
+    """Helper function to create an S3 client with the boto3 options of a store
+    backend, which can be shared between n_threads threads"""
+    boto3_options = dict(store_backend.config.get("boto3_options", {}))
+    return boto3.client(
+        "s3",
+        config=Config(
+            signature_version=boto3_options.pop("signature_version", None),
+            max_pool_connections=n_threads,
+        ),
+        **boto3_options,
+    )
+
+
+class S3SiteUploader:
+    """Uploader for the files of a Data Docs site hosted in an S3 bucket, which shares
+    a single S3 client (and thereby its pool of connections) between upload threads.
+    The MD5 hashes of the files on the site are taken from the ETags of their objects,
+    which are listed without downloading them
+
+    Parameters
+    ----------
+    store_backend : TupleS3StoreBackend
+        Store backend of the site
+    n_threads : int, optional
+        Number of threads that upload files, used as size of the connection pool, by
+        default 8
+    """
+
+    def __init__(self, store_backend: TupleS3StoreBackend, n_threads: int = 8):
+        self.bucket = store_backend.bucket
+        self.prefix = (
+            f"{store_backend.prefix.strip('/')}/" if store_backend.prefix else ""
+        )
+        self.s3_put_options = store_backend.s3_put_options
+        self.s3_client = get_s3_client(store_backend, n_threads)
+
+    def list_hashes(self) -> dict:
+        """Function to list the MD5 hashes of the files on the site, by their path
+        relative to the root of the site. The ETags of objects that were uploaded in
+        multiple parts or encrypted with KMS are not MD5 hashes, so these files are
+        always uploaded again"""
+        dict_hashes = {}
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for s3_object in page.get("Contents", []):
+                site_path = s3_object["Key"][len(self.prefix) :]
+                dict_hashes[site_path] = s3_object["ETag"].strip('"')
+
+        return dict_hashes
+
+    def upload(self, path: str, content: bytes, content_type: str):
+        """Function to upload a file to the site"""
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=f"{self.prefix}{path}",
+            Body=content,
+            ContentType=content_type,
+            **self.s3_put_options,
+        )
+
+
+class FilesystemSiteUploader:
+    """Uploader for the files of a Data Docs site on the local filesystem, with the
+    same interface as the uploaders returned by get_site_uploader
+
+    Parameters
+    ----------
+    base_directory : str
+        Directory of the root of the site
+    """
+
+    def __init__(self, base_directory: str):
+        self.base_directory = base_directory
+
+    def list_hashes(self) -> dict:
+        """Function to list the MD5 hashes of the files on the site, by their path
+        relative to the root of the site"""
+        dict_hashes = {}
+        for directory, _, filenames in os.walk(self.base_directory):
+            for filename in filenames:
+                file_path = os.path.join(directory, filename)
+                site_path = os.path.relpath(file_path, self.base_directory)
+                with open(file_path, "rb") as f:
+                    dict_hashes[site_path.replace(os.sep, "/")] = hashlib.md5(
+                        f.read()
+                    ).hexdigest()
+
+        return dict_hashes
+
+    def upload(self, path: str, content: bytes, content_type: str):
+        """Function to write a file to the site"""
+        file_path = os.path.join(self.base_directory, *path.split("/"))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(content)
+
+
+def get_site_uploader(site_builder, n_threads: int = 8):
+    """Function to get an uploader for the files of a Data Docs site, as used by
+    build_data_docs_in_parallel. On AWS, sites are hosted in an S3 bucket, or on the
+    local filesystem (e.g. for testing)
+
+    Parameters
+    ----------
+    site_builder : SiteBuilder
+        SiteBuilder of the Data Docs site, as returned by get_site_builder
+    n_threads : int, optional
+        Number of threads that upload files, by default 8
+
+    Returns
+    -------
+    S3SiteUploader or FilesystemSiteUploader
+        Uploader for the files of the site
+    """
+    store_backend = site_builder.target_store.store_backends["static_assets"]
+    if isinstance(store_backend, TupleS3StoreBackend):
+        return S3SiteUploader(store_backend, n_threads)
+
+    return FilesystemSiteUploader(store_backend.full_base_directory)
+
+
+def read_store_backend_bytes(
+    store_backend, key: tuple, offset: int = None, length: int = None
+) -> bytes:
+    """Function to read the raw bytes of an object in a store backend, optionally only
+    a byte range of it. Great Expectations store backends decode objects as text, which
+    does not work for compressed records (see CompressedValidationsStoreBackend). On
+    AWS, objects are stored in an S3 bucket, or on the local filesystem (e.g. for
+    testing)
+
+    Parameters
+    ----------
+    store_backend : TupleS3StoreBackend or TupleFilesystemStoreBackend
+        Store backend to read the object from
+    key : tuple
+        Key of the object in the store backend
+    offset : int, optional
+        Offset in bytes to start reading from, by default None
+    length : int, optional
+        Number of bytes to read from offset, by default None
+
+    Returns
+    -------
+    bytes
+        The bytes that were read
+
+    Raises
+    ------
+    InvalidKeyError
+        An InvalidKeyError is raised if the object does not exist
+    """
+    if isinstance(store_backend, TupleS3StoreBackend):
+        s3_client = store_backend._create_client()
+        range_kwargs = (
+            {"Range": f"bytes={offset}-{offset + length - 1}"} if length else {}
+        )
+        try:
+            s3_object = s3_client.get_object(
+                Bucket=store_backend.bucket,
+                Key=store_backend._build_s3_object_key(key),
+                **range_kwargs,
+            )
+        except s3_client.exceptions.NoSuchKey:
+            raise InvalidKeyError(f"Unable to read object with key {key} from S3")
+        return s3_object["Body"].read()
+
+    filepath = os.path.join(
+        store_backend.full_base_directory, store_backend._convert_key_to_filepath(key)
+    )
+    try:
+        with open(filepath, "rb") as f:
+            f.seek(offset or 0)
+            return f.read(length) if length else f.read()
+    except FileNotFoundError:
+        raise InvalidKeyError(f"Unable to read object with key {key} from {filepath}")
+
+
+def write_store_backend_values(
+    store_backend, dict_values: dict, n_threads: int = 8
+) -> int:
+    """Function to write several objects to a store backend concurrently, as used by
+    StoreWriteBuffer. On AWS, objects in an S3 bucket are written with a single S3
+    client shared between threads. Objects for other store backends (e.g. on the local
+    filesystem) are written one by one
+
+    Parameters
+    ----------
+    store_backend : StoreBackend
+        Store backend to write the objects to
+    dict_values : dict
+        A dictionary with the key of each object in the store backend as key and its
+        serialized value as value
+    n_threads : int, optional
+        Number of threads that write objects, by default 8
+
+    Returns
+    -------
+    int
+        The number of objects that were written
+    """
+    if not isinstance(store_backend, TupleS3StoreBackend):
+        for key, value in dict_values.items():
+            store_backend.set(key, value)
+        return len(dict_values)
+
+    s3_client = get_s3_client(store_backend, n_threads)
+
+    def put_object(key, value):
+        encoding_kwargs = (
+            {"Body": value.encode("utf-8"), "ContentEncoding": "utf-8"}
+            if isinstance(value, str)
+            else {"Body": value}
+        )
+        s3_client.put_object(
+            Bucket=store_backend.bucket,
+            Key=store_backend._build_s3_object_key(key),
+            ContentType=(
+                "application/json"
+                if isinstance(value, str)
+                else "application/octet-stream"
+            ),
+            **encoding_kwargs,
+            **store_backend.s3_put_options,
+        )
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        list(executor.map(put_object, dict_values.keys(), dict_values.values()))
+
+    return len(dict_values)
+
+
+def read_store_backend_versioned(store_backend, key: tuple) -> tuple:
+    """Function to read an object in a store backend together with its version, which
+    can be passed to write_store_backend_conditionally to replace the object only if
+    it did not change in the meantime. On AWS, the version is the ETag of an object in
+    an S3 bucket, or the MD5 hash of a file on the local filesystem (e.g. for testing)
+
+    Parameters
+    ----------
+    store_backend : TupleS3StoreBackend or TupleFilesystemStoreBackend
+        Store backend to read the object from
+    key : tuple
+        Key of the object in the store backend
+
+    Returns
+    -------
+    tuple
+        The bytes of the object and its version, or (None, None) if the object does
+        not exist
+    """
+    if isinstance(store_backend, TupleS3StoreBackend):
+        s3_client = store_backend._create_client()
+        try:
+            s3_object = s3_client.get_object(
+                Bucket=store_backend.bucket,
+                Key=store_backend._build_s3_object_key(key),
+            )
+        except s3_client.exceptions.NoSuchKey:
+            return None, None
+        return s3_object["Body"].read(), s3_object["ETag"]
+
+    try:
+        content = read_store_backend_bytes(store_backend, key)
+    except InvalidKeyError:
+        return None, None
+    return content, hashlib.md5(content).hexdigest()
+
+
+def write_store_backend_conditionally(
+    store_backend, key: tuple, value: str, version: str = None
+) -> bool:
+    """Function to write an object to a store backend only if its version (see
+    read_store_backend_versioned) did not change, or only if it does not exist yet if
+    no version is passed. On AWS, objects in an S3 bucket are written with a
+    conditional request, so that of two concurrent writers only one succeeds. On the
+    local filesystem (e.g. for testing), the check and the write are not atomic
+
+    Parameters
+    ----------
+    store_backend : TupleS3StoreBackend or TupleFilesystemStoreBackend
+        Store backend to write the object to
+    key : tuple
+        Key of the object in the store backend
+    value : str
+        Serialized value of the object
+    version : str, optional
+        Version of the object that is replaced, by default None for a new object
+
+    Returns
+    -------
+    bool
+        True if the object was written, False if it was changed in the meantime
+    """
+    if isinstance(store_backend, TupleS3StoreBackend):
+        s3_client = store_backend._create_client()
+        condition_kwargs = {"IfMatch": version} if version else {"IfNoneMatch": "*"}
+        try:
+            s3_client.put_object(
+                Bucket=store_backend.bucket,
+                Key=store_backend._build_s3_object_key(key),
+                Body=value.encode("utf-8"),
+                ContentEncoding="utf-8",
+                ContentType="application/json",
+                **condition_kwargs,
+                **store_backend.s3_put_options,
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] in (
+                "PreconditionFailed",
+                "ConditionalRequestConflict",
+            ):
+                return False
+            raise
+        return True
+
+    if read_store_backend_versioned(store_backend, key)[1] != version:
+        return False
+    store_backend.set(key, value)
+    return True
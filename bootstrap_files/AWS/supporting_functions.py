@@ -8,6 +8,93 @@ import great_expectations as ge
 import sys
 from IPython.display import display, HTML
 import os
+import io
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from great_expectations.data_context.store import (
+    TupleFilesystemStoreBackend,
+    TupleS3StoreBackend,
+)
+from grater_functions.backfill import backfill_validations
+from grater_functions.column_statistics import (
+    build_column_statistics_record,
+    derive_evaluation_parameters,
+    load_recent_column_statistics,
+    write_column_statistics,
+)
+from grater_functions.compressed_store import (
+    CompressedValidationsStoreBackend,
+    compact_validations_store,
+)
+from grater_functions.cost_profiles import (
+    get_cost_profile_report,
+    load_cost_profile,
+    save_cost_profile,
+)
+from grater_functions.data_docs import build_data_docs_incrementally
+from grater_functions.deferred import DeferredValidator
+from grater_functions.digest_uniqueness import enable_digest_uniqueness
+from grater_functions.docs_rebuild_scheduler import DataDocsRebuildScheduler
+from grater_functions.incremental import (
+    get_incremental_asset_config,
+    get_new_object_keys,
+    run_incremental_checkpoint,
+)
+from grater_functions.key_index import (
+    commit_key_index_updates,
+    compact_key_index,
+    register_key_index_store,
+)
+from grater_functions.micro_batches import (
+    concatenate_micro_batch,
+    group_micro_batches,
+    run_micro_batch_checkpoint,
+)
+from grater_functions.multiple_suites import (
+    get_asset_checkpoint_names,
+    run_checkpoints_on_batch,
+)
+from grater_functions.parallel import (
+    benchmark_parallel_validation,
+    run_checkpoint_in_parallel,
+)
+from grater_functions.partitions import (
+    discover_partitions,
+    get_partitioned_asset_config,
+    validate_partitioned_asset,
+)
+from grater_functions.reference_sets import (
+    REFERENCE_SET_TTL_SECONDS,
+    get_file_fetcher,
+    register_reference_set,
+)
+from grater_functions.result_format import get_initial_result_format
+from grater_functions.sketches import (
+    HyperLogLog,
+    validate_approximate_expectations_on_chunks,
+)
+from grater_functions.store_snapshot import (
+    SnapshotStoreBackend,
+    bake_store_snapshot,
+    check_store_snapshot,
+)
+from grater_functions.store_writes import flush_store_writes
+from grater_functions.summary_index import (
+    ValidationSummaryIndex,
+    compact_validation_summaries,
+    write_validation_summaries,
+)
+from grater_functions.tiers import (
+    TieredValidator,
+    register_skipped_status_icon_renderer,
+    run_tiered_checkpoint,
+)
+from grater_functions.validation_plans import (
+    benchmark_validation_plan,
+    get_plan_result_formats,
+    get_validation_plan,
+)
 
 # Logger initialization and function for lambda
 logger = logging.getLogger(__name__)
@@ -96,6 +183,111 @@ def load_csv_from_s3(
     return df
 
 
+def list_objects_with_metadata(
+    s3_client: boto3.client, bucket: str, prefix: str = ""
+) -> list:
+    """Function to list all objects in a bucket under a given prefix, with their size
+    and the time they were last modified, e.g. to group small files into micro-batches
+    (see group_micro_batches)
+
+    Parameters
+    ----------
+    s3_client : boto3.client
+        Instantiated s3 client using boto3
+    bucket : str
+        Name of bucket to query
+    prefix : str, optional
+        Prefix to query
+
+    Returns
+    -------
+    list
+        Dictionaries with the key, size and last_modified of each object
+    """
+    logger.info(f"Listing objects in {bucket} at {prefix}")
+    paginator = s3_client.get_paginator("list_objects_v2")
+    objects = [
+        {
+            "key": s3_object["Key"],
+            "size": s3_object["Size"],
+            "last_modified": s3_object["LastModified"],
+        }
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+        for s3_object in page.get("Contents", [])
+        if not s3_object["Key"].endswith("/")
+    ]
+
+    return objects
+
+
+def load_csvs_from_s3(
+    s3_client: boto3.client, bucket: str, keys: list, n_threads: int = 16
+) -> dict:
+    """Function to download many (small) csv objects from S3 concurrently and load
+    each into a pandas DataFrame
+
+    Parameters
+    ----------
+    s3_client : boto3.client
+        Instantiated s3 client using boto3. Its max_pool_connections should be at least
+        n_threads (see get_s3_client)
+    bucket : str
+        Name of the bucket of the objects
+    keys : list
+        Keys of the csv objects to load
+    n_threads : int, optional
+        Number of objects to download concurrently, by default 16
+
+    Returns
+    -------
+    dict
+        DataFrame of each object, by its key, in the order of keys
+    """
+
+    def load_csv(key: str) -> pd.DataFrame:
+        s3_object = s3_client.get_object(Bucket=bucket, Key=key)
+        return pd.read_csv(io.BytesIO(s3_object["Body"].read()))
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        dict_frames = dict(zip(keys, executor.map(load_csv, keys)))
+
+    return dict_frames
+
+
+def get_s3_object_fetcher(s3_client: boto3.client, bucket: str, key: str):
+    """Function to get a fetcher for a reference set in an S3 bucket (see
+    ReferenceSetCache), which only downloads the object if its ETag changed, using a
+    conditional request
+
+    Parameters
+    ----------
+    s3_client : boto3.client
+        Instantiated s3 client using boto3
+    bucket : str
+        Name of the bucket of the object
+    key : str
+        Key of the object
+
+    Returns
+    -------
+    function
+        Fetcher that takes the ETag of the cached object and returns a tuple with the
+        content and ETag of the object, or None if the object did not change
+    """
+
+    def fetch(etag: str = None):
+        kwargs = {"IfNoneMatch": etag} if etag else {}
+        try:
+            s3_object = s3_client.get_object(Bucket=bucket, Key=key, **kwargs)
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("304", "NotModified"):
+                return None
+            raise
+        return s3_object["Body"].read(), s3_object["ETag"]
+
+    return fetch
+
+
 def get_common_prefixes(
     s3: boto3.client, bucket_name: str, prefix: str = "", delimiter: str = "/"
 ) -> list:
@@ -211,6 +403,11 @@ def checkpoint_without_datadocs_update(test_config: TestingConfiguration) -> str
     use this checkpoint to run and store just the validations, to generate the Data
     Docs website at a later stage.
 
+    If buffered_store_writes is enabled in the testing configuration, validation
+    results and evaluation parameters are buffered and written concurrently (see
+    StoreWriteBuffer), which requires calling flush_store_writes after running the
+    checkpoint.
+
     Parameters
     ----------
     test_config : TestingConfiguration
@@ -224,6 +421,13 @@ def checkpoint_without_datadocs_update(test_config: TestingConfiguration) -> str
     str
         A string containing the YAML configuration for a checkpoint
     """
+    if getattr(test_config, "buffered_store_writes", False):
+        module_name = "module_name: grater_functions.store_writes\n      "
+        action_prefix = "Buffered"
+    else:
+        module_name = ""
+        action_prefix = ""
+
     checkpoint_yml = f"""
 name: {test_config.checkpoint_name}
 config_version: 1.0
@@ -236,10 +440,10 @@ batch_request: {{}}
 action_list:
   - name: store_validation_result
     action:
-      class_name: StoreValidationResultAction
+      {module_name}class_name: {action_prefix}StoreValidationResultAction
   - name: store_evaluation_params
     action:
-      class_name: StoreEvaluationParametersAction
+      {module_name}class_name: {action_prefix}StoreEvaluationParametersAction
 evaluation_parameters: {{}}
 runtime_configuration: {{}}
 ge_cloud_id:
@@ -247,6 +451,533 @@ expectation_suite_ge_cloud_id:"""
     return yaml.load(checkpoint_yml)
 
 
+# Store for Grater Expectations artefacts
+def get_grater_store_backend(
+    test_config: TestingConfiguration,
+    name: str,
+    base_directory: str = None,
+    filepath_suffix: str = ".json",
+):
+    """Function to get a store backend for persisting artefacts of Grater Expectations
+    (e.g. cost profiles of expectation suites) as JSON files. On AWS, these are stored
+    in the store bucket next to the outputs of Great Expectations, under
+    {store_bucket_prefix}/{name}/
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    name : str
+        Name of the type of artefact to store, used as prefix for its files
+    base_directory : str, optional
+        Local directory to store the artefacts in instead, e.g. for testing, by default
+        None
+    filepath_suffix : str, optional
+        Suffix of the files of the artefacts, by default ".json". Set to None for
+        artefacts with their own extension (e.g. binary files)
+
+    Returns
+    -------
+    TupleStoreBackend
+        A store backend that stores values by tuple keys
+    """
+    if base_directory:
+        return TupleFilesystemStoreBackend(
+            base_directory=os.path.join(os.path.abspath(base_directory), name),
+            filepath_suffix=filepath_suffix,
+            suppress_store_backend_id=True,
+        )
+
+    return TupleS3StoreBackend(
+        bucket=test_config.store_bucket,
+        prefix=f"{test_config.store_bucket_prefix}/{name}/",
+        filepath_suffix=filepath_suffix,
+        suppress_store_backend_id=True,
+    )
+
+
+def get_docs_rebuild_scheduler(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to get the scheduler for coalescing rebuilds of the Data Docs site of
+    the project (see DataDocsRebuildScheduler). The number of pending validation
+    results and the number of seconds that trigger a rebuild can be set with
+    docs_rebuild_max_pending and docs_rebuild_max_wait_seconds in the project
+    configuration, and sharding of its index with docs_index_page_size
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to keep notifications and the manifest of the site in instead,
+        e.g. for testing, by default None
+
+    Returns
+    -------
+    DataDocsRebuildScheduler
+        The scheduler for rebuilding the Data Docs site
+    """
+    return DataDocsRebuildScheduler(
+        context,
+        get_grater_store_backend(
+            test_config, "data_docs_notifications", base_directory
+        ),
+        get_grater_store_backend(test_config, "data_docs_manifests", base_directory),
+        max_pending=getattr(test_config, "docs_rebuild_max_pending", 100),
+        max_wait_seconds=getattr(test_config, "docs_rebuild_max_wait_seconds", 900),
+        index_page_size=getattr(test_config, "docs_index_page_size", None),
+    )
+
+
+def notify_docs_rebuild_scheduler(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    list_results: list,
+):
+    """Function to notify the Data Docs rebuild scheduler of the validation results
+    stored by running checkpoints, if docs_rebuild_scheduler is enabled in the project
+    configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    list_results : list
+        List of CheckpointResult objects returned by running checkpoints
+    """
+    if not getattr(test_config, "docs_rebuild_scheduler", False):
+        return
+
+    scheduler = get_docs_rebuild_scheduler(test_config, context)
+    n_notifications = sum(scheduler.notify(results) for results in list_results)
+    logger.info(
+        f"Notified Data Docs rebuild scheduler of {n_notifications} validation results"
+    )
+
+
+def get_validation_summary_index(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    database_path: str = "validation_summaries.sqlite",
+    base_directory: str = None,
+):
+    """Function to get a queryable index of the summaries of validation results
+    written when validation_summary_index is enabled in the project configuration (see
+    ValidationSummaryIndex). Call sync on the index to load new summaries
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    database_path : str, optional
+        Path of the local SQLite database, by default "validation_summaries.sqlite"
+    base_directory : str, optional
+        Local directory the summaries are stored in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    ValidationSummaryIndex
+        The index of summaries of validation results
+    """
+    return ValidationSummaryIndex(
+        get_grater_store_backend(test_config, "validation_summaries", base_directory),
+        database_path,
+    )
+
+
+def store_validation_summaries(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    list_results: list,
+    base_directory: str = None,
+):
+    """Function to write summaries of the validation results stored by running
+    checkpoints (see write_validation_summaries), if validation_summary_index is
+    enabled in the project configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    list_results : list
+        List of CheckpointResult objects returned by running checkpoints
+    base_directory : str, optional
+        Local directory to store the summaries in instead, e.g. for testing, by
+        default None
+    """
+    if not getattr(test_config, "validation_summary_index", False):
+        return
+
+    store_backend = get_grater_store_backend(
+        test_config, "validation_summaries", base_directory
+    )
+    n_rows = sum(
+        write_validation_summaries(store_backend, results) for results in list_results
+    )
+    logger.info(f"Stored summaries of {n_rows} expectation results")
+
+
+def compact_validation_summary_store(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+) -> dict:
+    """Function to compact the summaries of validation results into a single file per
+    date (see compact_validation_summaries), if validation_summary_index is enabled in
+    the project configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory the summaries are stored in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    dict
+        A dictionary with the number of summary files that were compacted and the
+        number of compacted files that were written
+    """
+    if not getattr(test_config, "validation_summary_index", False):
+        return {"summaries_compacted": 0, "summary_files": 0}
+
+    return compact_validation_summaries(
+        get_grater_store_backend(test_config, "validation_summaries", base_directory)
+    )
+
+
+def get_validation_plan_store(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to get the store backend for validation plans of expectation suites
+    (see get_validation_plan), if validation_plans is enabled in the project
+    configuration. Otherwise, None is returned
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to store the validation plans in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    TupleStoreBackend
+        A store backend for validation plans, or None if they are not enabled
+    """
+    if not getattr(test_config, "validation_plans", False):
+        return None
+
+    return get_grater_store_backend(test_config, "validation_plans", base_directory)
+
+
+def get_cost_profile_store(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to get the store backend for cost profiles of expectation suites (see
+    load_cost_profile), if cost_profiles is enabled in the project configuration.
+    Otherwise, None is returned
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to store the cost profiles in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    TupleStoreBackend
+        A store backend for cost profiles, or None if they are not enabled
+    """
+    if not getattr(test_config, "cost_profiles", False):
+        return None
+
+    return get_grater_store_backend(test_config, "cost_profiles", base_directory)
+
+
+def store_column_statistics(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    df_batch: pd.DataFrame,
+    dataset_name: str,
+    batch_identifier: str,
+    list_results: list = None,
+    base_directory: str = None,
+):
+    """Function to store statistics of each column of a validated batch of data (see
+    build_column_statistics_record), if column_statistics_store is enabled in the
+    project configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    df_batch : pd.DataFrame
+        Batch of data that was validated
+    dataset_name : str
+        Name of the dataset the batch belongs to, which should be the same for all
+        batches of the dataset
+    batch_identifier : str
+        Identifier of the batch within the dataset, e.g. 2021-12
+    list_results : list, optional
+        List of CheckpointResult objects returned by validating the batch, to record
+        whether it passed validation, by default None
+    base_directory : str, optional
+        Local directory to store the statistics in instead, e.g. for testing, by
+        default None
+    """
+    if not getattr(test_config, "column_statistics_store", False):
+        return
+
+    success = None
+    if list_results is not None:
+        success = all(results.success for results in list_results)
+    write_column_statistics(
+        get_grater_store_backend(test_config, "column_statistics", base_directory),
+        build_column_statistics_record(
+            df_batch, dataset_name, batch_identifier, success
+        ),
+    )
+    logger.info(f"Stored column statistics of {dataset_name} {batch_identifier}")
+
+
+def get_dynamic_evaluation_parameters(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    dataset_name: str,
+    batch_identifier: str,
+    base_directory: str = None,
+) -> dict:
+    """Function to derive values for dynamic evaluation parameters from the column
+    statistics of the batches of a dataset before the current one, using the rules
+    set by evaluation_parameter_rules in the project configuration (see
+    derive_evaluation_parameters). Returns an empty dictionary if
+    column_statistics_store is not enabled
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    dataset_name : str
+        Name of the dataset the batch belongs to
+    batch_identifier : str
+        Identifier of the batch that is about to be validated
+    base_directory : str, optional
+        Local directory the statistics are stored in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    dict
+        A dictionary with values for the evaluation parameters that could be derived
+    """
+    if not getattr(test_config, "column_statistics_store", False):
+        return {}
+
+    records = load_recent_column_statistics(
+        get_grater_store_backend(test_config, "column_statistics", base_directory),
+        dataset_name,
+        before=batch_identifier,
+    )
+    return derive_evaluation_parameters(
+        records, getattr(test_config, "evaluation_parameter_rules", None) or {}
+    )
+
+
+def enable_key_index(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to register the store of the key index that
+    expect_column_values_to_be_unique_across_batches checks keys against (see
+    register_key_index_store), if key_index is enabled in the project configuration.
+    Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to store the key index in instead, e.g. for testing, by default
+        None
+    """
+    if not getattr(test_config, "key_index", False):
+        return
+
+    register_key_index_store(
+        get_grater_store_backend(
+            test_config, "key_index", base_directory, filepath_suffix=None
+        )
+    )
+
+
+def enable_reference_sets(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to register the reference sets that
+    expect_column_values_to_be_in_reference_set checks values against (see
+    ReferenceSetCache), as set by reference_sets in the project configuration. Each
+    reference set is given by the key of its file, and optionally the column of a CSV
+    file, a bucket (default data_bucket) and ttl_seconds (default 300). Reference sets
+    are only loaded when they are first used
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to read the files of reference sets from instead, e.g. for
+        testing, by default None
+    """
+    reference_sets = getattr(test_config, "reference_sets", None) or {}
+    if not reference_sets:
+        return
+
+    s3_client = boto3.client("s3") if not base_directory else None
+    for name, spec in reference_sets.items():
+        location = spec.get("bucket", getattr(test_config, "data_bucket", None))
+        if base_directory:
+            fetch = get_file_fetcher(os.path.join(base_directory, spec["key"]))
+        else:
+            fetch = get_s3_object_fetcher(s3_client, location, spec["key"])
+        register_reference_set(
+            name,
+            fetch,
+            spec["key"],
+            column=spec.get("column"),
+            ttl_seconds=spec.get("ttl_seconds", REFERENCE_SET_TTL_SECONDS),
+            location=location,
+        )
+
+
+def validate_partitioned_s3_asset(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    asset_name: str,
+    evaluation_parameters: dict = None,
+    force: bool = False,
+) -> dict:
+    """Function to validate a data asset that is laid out in Hive-style partitions in
+    the data bucket (e.g. prefix_data/year=2024/month=01/day=15/), one batch per
+    partition, as set by partitioned_assets in the project configuration. Partitions
+    are discovered using get_common_prefixes, and the CSV objects of each partition
+    are downloaded concurrently (see validate_partitioned_asset)
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run against each partition
+    asset_name : str
+        Name of the data asset, as listed under partitioned_assets
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    force : bool, optional
+        Whether to validate partitions that were already validated against the current
+        version of the expectation suite as well, by default False
+
+    Returns
+    -------
+    dict
+        The result of the data asset, with the results of its partitions (see
+        aggregate_partition_results)
+    """
+    asset_config = get_partitioned_asset_config(test_config, asset_name) or {
+        "prefix": test_config.prefix_data,
+        "partition_keys": None,
+        "n_workers": 4,
+    }
+    n_workers = asset_config["n_workers"]
+    s3_client = boto3.client(
+        "s3", config=Config(max_pool_connections=max(16, 4 * n_workers))
+    )
+    bucket = test_config.data_bucket
+
+    def load_partition(partition_prefix: str) -> pd.DataFrame:
+        keys = [
+            s3_object["key"]
+            for s3_object in list_objects_with_metadata(
+                s3_client, bucket, partition_prefix
+            )
+        ]
+        dict_frames = load_csvs_from_s3(s3_client, bucket, keys, n_threads=4)
+        return pd.concat(dict_frames.values(), ignore_index=True)
+
+    partition_prefixes = discover_partitions(
+        lambda prefix: get_common_prefixes(s3_client, bucket, prefix),
+        asset_config["prefix"],
+        asset_config["partition_keys"],
+    )
+    return validate_partitioned_asset(
+        context,
+        checkpoint_name,
+        asset_name,
+        partition_prefixes,
+        load_partition,
+        get_grater_store_backend(test_config, "partitions"),
+        prefix=asset_config["prefix"],
+        n_workers=n_workers,
+        evaluation_parameters=evaluation_parameters,
+        force=force,
+    )
+
+
 # Helper functions for Jupyter
 def make_clickable(url):
     """Helper function to make HTML tags around a url"""
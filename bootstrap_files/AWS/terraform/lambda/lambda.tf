@@ -19,6 +19,67 @@ resource "aws_lambda_function" "validation_lambda" {
   }
 }
 
+# Lambda to rebuild Data Docs from pending validation results (see
+# rebuild_data_docs.py), using the same image with another handler. Reserved
+# concurrency of 1 ensures that rebuilds never overlap
+resource "aws_lambda_function" "docs_rebuild_lambda" {
+  function_name                  = "grater_expectations_docs_rebuild"
+  role                           = aws_iam_role.validation_lambda_role.arn
+  image_uri                      = var.image_uri
+  package_type                   = "Image"
+  memory_size                    = 1024
+  timeout                        = 900
+  reserved_concurrent_executions = 1
+  source_code_hash               = base64sha256(random_uuid.force_refresh.result)
+
+  image_config {
+    command = ["rebuild_data_docs.lambda_handler"]
+  }
+
+  tags = {
+    Name = "Grater Expectations Data Docs rebuild lambda"
+  }
+}
+
+resource "aws_cloudwatch_event_rule" "docs_rebuild_schedule" {
+  name                = "grater_expectations_docs_rebuild"
+  description         = "Check for pending validation results to rebuild Data Docs with"
+  schedule_expression = "rate(5 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "docs_rebuild_schedule" {
+  rule = aws_cloudwatch_event_rule.docs_rebuild_schedule.name
+  arn  = aws_lambda_function.docs_rebuild_lambda.arn
+}
+
+resource "aws_lambda_permission" "docs_rebuild_schedule" {
+  statement_id  = "AllowExecutionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.docs_rebuild_lambda.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.docs_rebuild_schedule.arn
+}
+
+resource "aws_cloudwatch_event_rule" "store_compaction_schedule" {
+  name                = "grater_expectations_store_compaction"
+  description         = "Compact compressed validation results into partitioned segments"
+  schedule_expression = "rate(1 day)"
+}
+
+resource "aws_cloudwatch_event_target" "store_compaction_schedule" {
+  rule  = aws_cloudwatch_event_rule.store_compaction_schedule.name
+  arn   = aws_lambda_function.docs_rebuild_lambda.arn
+  input = jsonencode({ compact = true })
+}
+
+resource "aws_lambda_permission" "store_compaction_schedule" {
+  statement_id  = "AllowCompactionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.docs_rebuild_lambda.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.store_compaction_schedule.arn
+}
+
 # -------------------------------------------------------------
 # Lambda policies
 # -------------------------------------------------------------
@@ -88,6 +149,14 @@ resource "aws_cloudwatch_log_group" "lambda_log_group" {
   }
 }
 
+resource "aws_cloudwatch_log_group" "docs_rebuild_lambda_log_group" {
+  name              = "/aws/lambda/${aws_lambda_function.docs_rebuild_lambda.function_name}"
+  retention_in_days = 7
+  lifecycle {
+    prevent_destroy = false
+  }
+}
+
 resource "aws_iam_policy" "function_logging_policy" {
   name   = "function-logging-policy"
   policy = jsonencode({
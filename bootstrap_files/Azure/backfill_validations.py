@@ -0,0 +1,179 @@
+# Imports
+from argparse import ArgumentParser
+import json
+import great_expectations as ge
+from great_expectations.core.expectation_suite import ExpectationSuite
+import pandas as pd
+
+from azure.storage.blob import BlobServiceClient
+from supporting_functions import (
+    TestingConfiguration,
+    backfill_validations,
+    get_partitioned_asset_config,
+    list_blobs_with_metadata,
+    load_csvs_from_container,
+    setup_logging,
+)
+
+# Logger
+logger = setup_logging()
+
+
+def load_batch(
+    test_config: TestingConfiguration,
+    blob_service_client: BlobServiceClient,
+    asset_name: str,
+    batch_identifier: str,
+) -> pd.DataFrame:
+    """Function to load a historical batch of data again, given the name of its data
+    asset and its batch identifier. By default, the batch identifier of an asset that
+    is listed under partitioned_assets is the path of its partition, and that of any
+    other asset the path (or prefix of the CSV files) of the batch in the data
+    container
+
+    NOTE: adjust this function if the batch identifiers of your assets are generated
+    differently (see step 2 of function.py)
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config
+    blob_service_client : BlobServiceClient
+        BlobServiceClient for the storage account of the data container
+    asset_name : str
+        Name of the data asset of the batch
+    batch_identifier : str
+        Batch identifier of the batch
+
+    Returns
+    -------
+    pd.DataFrame
+        The data of the batch
+    """
+    asset_config = get_partitioned_asset_config(test_config, asset_name)
+    if asset_config is not None:
+        prefix = f"{asset_config['prefix']}{batch_identifier}/"
+    else:
+        prefix = batch_identifier
+
+    paths_csv = [
+        blob["key"]
+        for blob in list_blobs_with_metadata(
+            blob_service_client, test_config.data_container_name, prefix
+        )
+    ]
+    dict_frames = load_csvs_from_container(
+        blob_service_client, test_config.data_container_name, paths_csv
+    )
+
+    return pd.concat(dict_frames.values(), ignore_index=True)
+
+
+def initialize_parser() -> ArgumentParser:
+    """Function to initialize the command line parser for backfilling the stored
+    validation results of an expectation suite after it changed
+
+    Returns
+    -------
+    ArgumentParser
+        An initialized argument parser
+    """
+    parser = ArgumentParser(
+        description="Validate only added or modified expectations against historical "
+        "batches and merge their results into the stored validation results"
+    )
+    parser.add_argument(
+        "suite",
+        type=str,
+        help="name of the expectation suite to backfill",
+    )
+    parser.add_argument(
+        "-p",
+        "--previous",
+        type=str,
+        metavar="",
+        help="path to a JSON file with the previous version of the expectation suite "
+        "(e.g. in store_snapshot/expectations), to only validate expectations that "
+        "were added or modified since",
+    )
+    parser.add_argument(
+        "-a",
+        "--asset",
+        type=str,
+        metavar="",
+        help="only backfill validation results of this data asset",
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        metavar="",
+        help="only backfill validation results of runs since this date, e.g. "
+        "2021-12-01",
+    )
+    parser.add_argument(
+        "--all-runs",
+        action="store_true",
+        help="backfill the validation results of all runs of each batch, instead of "
+        "only the latest",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        metavar="",
+        help="number of batches to backfill at the same time",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="only show how many expectations would be validated per batch",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        default="project_config.yml",
+        metavar="",
+        help="path to the project configuration",
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = initialize_parser().parse_args()
+    test_config = TestingConfiguration(args.config)
+    test_config.load_config()
+    ge_context = ge.data_context.DataContext()
+    blob_service_client = BlobServiceClient.from_connection_string(
+        ge_context.stores["validations_store"].store_backend.connection_string
+    )
+
+    # -- 1. Load the previous version of the expectation suite, if given
+    old_suite = None
+    if args.previous:
+        with open(args.previous, "r") as f:
+            old_suite = ExpectationSuite(**json.load(f), data_context=ge_context)
+
+    # -- 2. Backfill the stored validation results
+    output = backfill_validations(
+        ge_context,
+        args.suite,
+        lambda asset_name, batch_identifier: load_batch(
+            test_config, blob_service_client, asset_name, batch_identifier
+        ),
+        old_suite=old_suite,
+        n_workers=args.workers,
+        since=args.since,
+        all_runs=args.all_runs,
+        asset_name=args.asset,
+        dry_run=args.dry_run,
+    )
+
+    # -- 3. Show a summary per validation result
+    df_summary = pd.DataFrame(output["validation_results"])
+    with pd.option_context("display.max_rows", None, "display.width", None):
+        print(df_summary.drop(columns=["key"], errors="ignore"))
+    print(output.get("diff", {}), output["statistics"])
@@ -0,0 +1,39 @@
+# -- Azure imports
+import azure.functions as func
+
+# -- Great Expectations imports
+import great_expectations as ge
+
+# -- Grater expectations imports
+from supporting_functions import (
+    TestingConfiguration,
+    get_docs_rebuild_scheduler,
+    setup_logging,
+)
+
+# -- Set up logger
+logger = setup_logging()
+
+# -- Set constants so function properly works in Docker
+PATH_PROJECT_ROOT = "/home/site/wwwroot/"
+PATH_PROJECT_CONFIG = PATH_PROJECT_ROOT + "grater-expectations/project_config.yml"
+PATH_GE_CONFIG = PATH_PROJECT_ROOT + "great_expectations"
+
+
+# -- Main function
+def main(timer: func.TimerRequest) -> None:
+    """Function for rebuilding the Data Docs website of Grater Expectations, which is
+    triggered every 5 minutes (see function.json). The validation function notifies it
+    of stored validation results if docs_rebuild_scheduler is enabled in
+    project_config.yml. Azure runs timer triggered functions on a single instance at a
+    time, so rebuilds do not overlap"""
+    # -- 0. Load parameters from configuration file, initialize context
+    test_config = TestingConfiguration(PATH_PROJECT_CONFIG)
+    test_config.load_config()
+    context = ge.data_context.DataContext(context_root_dir=PATH_GE_CONFIG)
+
+    # -- 1. Rebuild the Data Docs website incrementally if enough validation results
+    #       are pending, or if the oldest pending result has waited long enough
+    scheduler = get_docs_rebuild_scheduler(test_config, context)
+    output = scheduler.run()
+    logger.info(f"Data Docs rebuild scheduler finished: {output}")
@@ -0,0 +1,42 @@
+# -- Azure imports
+import azure.functions as func
+
+# -- Great Expectations imports
+import great_expectations as ge
+
+# -- Grater expectations imports
+from supporting_functions import (
+    TestingConfiguration,
+    compact_validation_summary_store,
+    compact_validations_store,
+    setup_logging,
+)
+
+# -- Set up logger
+logger = setup_logging()
+
+# -- Set constants so function properly works in Docker
+PATH_PROJECT_ROOT = "/home/site/wwwroot/"
+PATH_PROJECT_CONFIG = PATH_PROJECT_ROOT + "grater-expectations/project_config.yml"
+PATH_GE_CONFIG = PATH_PROJECT_ROOT + "great_expectations"
+
+
+# -- Main function
+def main(timer: func.TimerRequest) -> None:
+    """Function for compacting the validations store of Grater Expectations into
+    partitioned segments, which is triggered daily at 03:00 (see function.json). Only
+    has an effect if validations_store_compression is set in project_config.yml, so
+    that the validations store uses a CompressedValidationsStoreBackend. Summaries of
+    validation results are compacted as well if validation_summary_index is enabled"""
+    # -- 0. Load parameters from configuration file, initialize context
+    test_config = TestingConfiguration(PATH_PROJECT_CONFIG)
+    test_config.load_config()
+    context = ge.data_context.DataContext(context_root_dir=PATH_GE_CONFIG)
+
+    # -- 1. Compact loose validation results into segments
+    output = compact_validations_store(context)
+    logger.info(f"Compaction of the validations store finished: {output}")
+
+    # -- 2. Compact summaries of validation results into a single file per date
+    output = compact_validation_summary_store(test_config, context)
+    logger.info(f"Compaction of validation summaries finished: {output}")
@@ -0,0 +1,125 @@
+# Imports
+from argparse import ArgumentParser
+import great_expectations as ge
+import pandas as pd
+
+from supporting_functions import (
+    TestingConfiguration,
+    get_validation_summary_index,
+    setup_logging,
+)
+
+# Logger
+logger = setup_logging()
+
+
+def initialize_parser() -> ArgumentParser:
+    """Function to initialize the command line parser for querying the summaries of
+    validation results, which are stored if validation_summary_index is enabled in
+    project_config.yml
+
+    Returns
+    -------
+    ArgumentParser
+        An initialized argument parser
+    """
+    parser = ArgumentParser(description="Query summaries of validation results")
+    parser.add_argument(
+        "-q",
+        "--sql",
+        type=str,
+        metavar="",
+        help="SQL query to run against the validation_summaries table",
+    )
+    parser.add_argument(
+        "-e",
+        "--expectation-type",
+        type=str,
+        metavar="",
+        help="only show results of this expectation type",
+    )
+    parser.add_argument(
+        "-a",
+        "--asset",
+        type=str,
+        metavar="",
+        help="only show results of this data asset",
+    )
+    parser.add_argument(
+        "-s",
+        "--since",
+        type=str,
+        metavar="",
+        help="only show results of runs since this date, e.g. 2021-12-01",
+    )
+    parser.add_argument(
+        "-t",
+        "--trend",
+        action="store_true",
+        help="show observed values of the expectation type over time instead of "
+        "failures",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        metavar="",
+        help="path of a CSV file to write the results to instead of printing them",
+    )
+    parser.add_argument(
+        "-d",
+        "--database",
+        type=str,
+        default="validation_summaries.sqlite",
+        metavar="",
+        help="path of the local SQLite database the summaries are loaded into",
+    )
+    parser.add_argument(
+        "-l",
+        "--local",
+        type=str,
+        metavar="",
+        help="local directory the summaries are stored in",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        default="project_config.yml",
+        metavar="",
+        help="path to the project configuration",
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = initialize_parser().parse_args()
+    test_config = TestingConfiguration(args.config)
+    test_config.load_config()
+    ge_context = ge.data_context.DataContext()
+
+    # -- 1. Load new summaries into the local database
+    summary_index = get_validation_summary_index(
+        test_config, ge_context, args.database, base_directory=args.local
+    )
+    n_loaded = summary_index.sync(since=args.since)
+    logger.info(f"Loaded {n_loaded} new summary files")
+
+    # -- 2. Run the query
+    if args.sql:
+        df_results = summary_index.query(args.sql)
+    elif args.trend:
+        if not args.expectation_type:
+            raise ValueError("Pass --expectation-type to show its trend")
+        df_results = summary_index.get_trend(args.expectation_type, args.asset)
+    else:
+        df_results = summary_index.get_failures(
+            args.expectation_type, args.asset, args.since
+        )
+
+    if args.output:
+        df_results.to_csv(args.output, index=False)
+    else:
+        with pd.option_context("display.max_rows", None, "display.width", None):
+            print(df_results)
@@ -0,0 +1,91 @@
+# Imports
+from argparse import ArgumentParser
+import great_expectations as ge
+
+from supporting_functions import (
+    TestingConfiguration,
+    compact_validation_summary_store,
+    compact_validations_store,
+    get_docs_rebuild_scheduler,
+    setup_logging,
+)
+
+# Logger
+logger = setup_logging()
+
+
+def initialize_parser() -> ArgumentParser:
+    """Function to initialize the command line parser for running the Data Docs
+    rebuild scheduler locally
+
+    Returns
+    -------
+    ArgumentParser
+        An initialized argument parser
+    """
+    parser = ArgumentParser(description="Data Docs rebuild scheduler")
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="rebuild regardless of pending results, finding all new and removed "
+        "validation results",
+    )
+    parser.add_argument(
+        "-a",
+        "--all",
+        action="store_true",
+        help="render all pages again in parallel, uploading only changed pages",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="compact the validations store and validation summaries instead of "
+        "rebuilding Data Docs",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        type=float,
+        metavar="",
+        help="keep running, checking pending results every given number of seconds",
+    )
+    parser.add_argument(
+        "-l",
+        "--local",
+        type=str,
+        metavar="",
+        help="local directory to keep notifications and the site manifest in",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        default="project_config.yml",
+        metavar="",
+        help="path to the project configuration",
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = initialize_parser().parse_args()
+    test_config = TestingConfiguration(args.config)
+    test_config.load_config()
+    ge_context = ge.data_context.DataContext()
+    scheduler = get_docs_rebuild_scheduler(
+        test_config, ge_context, base_directory=args.local
+    )
+
+    if args.compact:
+        logger.info(compact_validations_store(ge_context))
+        logger.info(
+            compact_validation_summary_store(
+                test_config, ge_context, base_directory=args.local
+            )
+        )
+    elif args.watch:
+        scheduler.watch(poll_seconds=args.watch)
+    else:
+        logger.info(scheduler.run(force=args.force, rebuild_all=args.all))
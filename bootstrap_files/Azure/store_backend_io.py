@@ -0,0 +1,309 @@
+"""Functions for reading and writing the objects of Great Expectations store backends
+on Azure, as used by the features of Grater Expectations in grater_functions. Objects
+are stored in blob containers, or on the local filesystem (e.g. for testing)"""
+
+# -- Imports
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    ResourceExistsError,
+    ResourceModifiedError,
+    ResourceNotFoundError,
+)
+from azure.storage.blob import ContentSettings
+from great_expectations.data_context.store import TupleAzureBlobStoreBackend
+from great_expectations.exceptions import InvalidKeyError
+
+
+class AzureBlobSiteUploader:
+    """Uploader for the files of a Data Docs site hosted in an Azure blob container,
+    which shares a single container client (and thereby its pool of connections)
+    between upload threads. The MD5 hashes of the files on the site are taken from the
+    Content-MD5 properties of their blobs, which are listed without downloading them
+
+    Parameters
+    ----------
+    store_backend : TupleAzureBlobStoreBackend
+        Store backend of the site
+    """
+
+    def __init__(self, store_backend: TupleAzureBlobStoreBackend):
+        self.prefix = (
+            f"{store_backend.prefix.strip('/')}/" if store_backend.prefix else ""
+        )
+        self.container_client = store_backend._get_container_client()
+
+    def list_hashes(self) -> dict:
+        """Function to list the MD5 hashes of the files on the site, by their path
+        relative to the root of the site. Blobs without a Content-MD5 property are
+        always uploaded again"""
+        dict_hashes = {}
+        for blob in self.container_client.list_blobs(name_starts_with=self.prefix):
+            content_md5 = blob.content_settings.content_md5
+            if content_md5:
+                dict_hashes[blob.name[len(self.prefix) :]] = bytes(content_md5).hex()
+
+        return dict_hashes
+
+    def upload(self, path: str, content: bytes, content_type: str):
+        """Function to upload a file to the site"""
+        self.container_client.upload_blob(
+            name=f"{self.prefix}{path}",
+            data=content,
+            overwrite=True,
+            content_settings=ContentSettings(
+                content_type=content_type,
+                content_md5=bytearray(hashlib.md5(content).digest()),
+            ),
+        )
+
+
+class FilesystemSiteUploader:
+    """Uploader for the files of a Data Docs site on the local filesystem, with the
+    same interface as the uploaders returned by get_site_uploader
+
+    Parameters
+    ----------
+    base_directory : str
+        Directory of the root of the site
+    """
+
+    def __init__(self, base_directory: str):
+        self.base_directory = base_directory
+
+    def list_hashes(self) -> dict:
+        """Function to list the MD5 hashes of the files on the site, by their path
+        relative to the root of the site"""
+        dict_hashes = {}
+        for directory, _, filenames in os.walk(self.base_directory):
+            for filename in filenames:
+                file_path = os.path.join(directory, filename)
+                site_path = os.path.relpath(file_path, self.base_directory)
+                with open(file_path, "rb") as f:
+                    dict_hashes[site_path.replace(os.sep, "/")] = hashlib.md5(
+                        f.read()
+                    ).hexdigest()
+
+        return dict_hashes
+
+    def upload(self, path: str, content: bytes, content_type: str):
+        """Function to write a file to the site"""
+        file_path = os.path.join(self.base_directory, *path.split("/"))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(content)
+
+
+def get_site_uploader(site_builder, n_threads: int = 8):
+    """Function to get an uploader for the files of a Data Docs site, as used by
+    build_data_docs_in_parallel. On Azure, sites are hosted in a blob container, or on
+    the local filesystem (e.g. for testing)
+
+    Parameters
+    ----------
+    site_builder : SiteBuilder
+        SiteBuilder of the Data Docs site, as returned by get_site_builder
+    n_threads : int, optional
+        Number of threads that upload files, by default 8. Not used on Azure, where
+        the container client manages its own pool of connections
+
+    Returns
+    -------
+    AzureBlobSiteUploader or FilesystemSiteUploader
+        Uploader for the files of the site
+    """
+    store_backend = site_builder.target_store.store_backends["static_assets"]
+    if isinstance(store_backend, TupleAzureBlobStoreBackend):
+        return AzureBlobSiteUploader(store_backend)
+
+    return FilesystemSiteUploader(store_backend.full_base_directory)
+
+
+def read_store_backend_bytes(
+    store_backend, key: tuple, offset: int = None, length: int = None
+) -> bytes:
+    """Function to read the raw bytes of an object in a store backend, optionally only
+    a byte range of it. Great Expectations store backends decode objects as text, which
+    does not work for compressed records (see CompressedValidationsStoreBackend). On
+    Azure, objects are stored in a blob container, or on the local filesystem (e.g. for
+    testing)
+
+    Parameters
+    ----------
+    store_backend : TupleAzureBlobStoreBackend or TupleFilesystemStoreBackend
+        Store backend to read the object from
+    key : tuple
+        Key of the object in the store backend
+    offset : int, optional
+        Offset in bytes to start reading from, by default None
+    length : int, optional
+        Number of bytes to read from offset, by default None
+
+    Returns
+    -------
+    bytes
+        The bytes that were read
+
+    Raises
+    ------
+    InvalidKeyError
+        An InvalidKeyError is raised if the object does not exist
+    """
+    if isinstance(store_backend, TupleAzureBlobStoreBackend):
+        blob_name = os.path.join(
+            store_backend.prefix, store_backend._convert_key_to_filepath(key)
+        )
+        try:
+            return (
+                store_backend._get_container_client()
+                .download_blob(blob_name, offset=offset, length=length)
+                .readall()
+            )
+        except ResourceNotFoundError:
+            raise InvalidKeyError(f"Unable to read blob with key {key} from Azure")
+
+    filepath = os.path.join(
+        store_backend.full_base_directory, store_backend._convert_key_to_filepath(key)
+    )
+    try:
+        with open(filepath, "rb") as f:
+            f.seek(offset or 0)
+            return f.read(length) if length else f.read()
+    except FileNotFoundError:
+        raise InvalidKeyError(f"Unable to read object with key {key} from {filepath}")
+
+
+def write_store_backend_values(
+    store_backend, dict_values: dict, n_threads: int = 8
+) -> int:
+    """Function to write several objects to a store backend concurrently, as used by
+    StoreWriteBuffer. On Azure, objects in a blob container are written with a single
+    container client shared between threads. Objects for other store backends (e.g. on
+    the local filesystem) are written one by one
+
+    Parameters
+    ----------
+    store_backend : StoreBackend
+        Store backend to write the objects to
+    dict_values : dict
+        A dictionary with the key of each object in the store backend as key and its
+        serialized value as value
+    n_threads : int, optional
+        Number of threads that write objects, by default 8
+
+    Returns
+    -------
+    int
+        The number of objects that were written
+    """
+    if not isinstance(store_backend, TupleAzureBlobStoreBackend):
+        for key, value in dict_values.items():
+            store_backend.set(key, value)
+        return len(dict_values)
+
+    container_client = store_backend._get_container_client()
+
+    def upload_blob(key, value):
+        container_client.upload_blob(
+            name=os.path.join(
+                store_backend.prefix, store_backend._convert_key_to_filepath(key)
+            ),
+            data=value.encode("utf-8") if isinstance(value, str) else value,
+            overwrite=True,
+        )
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        list(executor.map(upload_blob, dict_values.keys(), dict_values.values()))
+
+    return len(dict_values)
+
+
+def read_store_backend_versioned(store_backend, key: tuple) -> tuple:
+    """Function to read an object in a store backend together with its version, which
+    can be passed to write_store_backend_conditionally to replace the object only if
+    it did not change in the meantime. On Azure, the version is the ETag of a blob in a
+    container, or the MD5 hash of a file on the local filesystem (e.g. for testing)
+
+    Parameters
+    ----------
+    store_backend : TupleAzureBlobStoreBackend or TupleFilesystemStoreBackend
+        Store backend to read the object from
+    key : tuple
+        Key of the object in the store backend
+
+    Returns
+    -------
+    tuple
+        The bytes of the object and its version, or (None, None) if the object does
+        not exist
+    """
+    if isinstance(store_backend, TupleAzureBlobStoreBackend):
+        blob_name = os.path.join(
+            store_backend.prefix, store_backend._convert_key_to_filepath(key)
+        )
+        try:
+            downloader = store_backend._get_container_client().download_blob(blob_name)
+        except ResourceNotFoundError:
+            return None, None
+        return downloader.readall(), downloader.properties.etag
+
+    try:
+        content = read_store_backend_bytes(store_backend, key)
+    except InvalidKeyError:
+        return None, None
+    return content, hashlib.md5(content).hexdigest()
+
+
+def write_store_backend_conditionally(
+    store_backend, key: tuple, value: str, version: str = None
+) -> bool:
+    """Function to write an object to a store backend only if its version (see
+    read_store_backend_versioned) did not change, or only if it does not exist yet if
+    no version is passed. On Azure, blobs in a container are written with a
+    conditional request, so that of two concurrent writers only one succeeds. On the
+    local filesystem (e.g. for testing), the check and the write are not atomic
+
+    Parameters
+    ----------
+    store_backend : TupleAzureBlobStoreBackend or TupleFilesystemStoreBackend
+        Store backend to write the object to
+    key : tuple
+        Key of the object in the store backend
+    value : str
+        Serialized value of the object
+    version : str, optional
+        Version of the object that is replaced, by default None for a new object
+
+    Returns
+    -------
+    bool
+        True if the object was written, False if it was changed in the meantime
+    """
+    if isinstance(store_backend, TupleAzureBlobStoreBackend):
+        condition_kwargs = (
+            {
+                "overwrite": True,
+                "etag": version,
+                "match_condition": MatchConditions.IfNotModified,
+            }
+            if version
+            else {"overwrite": False}
+        )
+        try:
+            store_backend._get_container_client().upload_blob(
+                name=os.path.join(
+                    store_backend.prefix, store_backend._convert_key_to_filepath(key)
+                ),
+                data=value.encode("utf-8"),
+                **condition_kwargs,
+            )
+        except (ResourceExistsError, ResourceModifiedError):
+            return False
+        return True
+
+    if read_store_backend_versioned(store_backend, key)[1] != version:
+        return False
+    store_backend.set(key, value)
+    return True
@@ -7,10 +7,96 @@ import great_expectations as ge
 from IPython.display import display, HTML
 from ruamel.yaml import YAML
 from azure.mgmt.storage import StorageManagementClient
-from azure.storage.blob import BlobServiceClient
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotModifiedError
+from azure.storage.blob import BlobPrefix, BlobServiceClient
 from io import StringIO
+import io
 import pandas as pd
-
+from concurrent.futures import ThreadPoolExecutor
+from great_expectations.data_context.store import (
+    TupleAzureBlobStoreBackend,
+    TupleFilesystemStoreBackend,
+)
+from grater_functions.backfill import backfill_validations
+from grater_functions.column_statistics import (
+    build_column_statistics_record,
+    derive_evaluation_parameters,
+    load_recent_column_statistics,
+    write_column_statistics,
+)
+from grater_functions.compressed_store import (
+    CompressedValidationsStoreBackend,
+    compact_validations_store,
+)
+from grater_functions.cost_profiles import (
+    get_cost_profile_report,
+    load_cost_profile,
+    save_cost_profile,
+)
+from grater_functions.data_docs import build_data_docs_incrementally
+from grater_functions.deferred import DeferredValidator
+from grater_functions.digest_uniqueness import enable_digest_uniqueness
+from grater_functions.docs_rebuild_scheduler import DataDocsRebuildScheduler
+from grater_functions.incremental import (
+    get_incremental_asset_config,
+    get_new_object_keys,
+    run_incremental_checkpoint,
+)
+from grater_functions.key_index import (
+    commit_key_index_updates,
+    compact_key_index,
+    register_key_index_store,
+)
+from grater_functions.micro_batches import (
+    concatenate_micro_batch,
+    group_micro_batches,
+    run_micro_batch_checkpoint,
+)
+from grater_functions.multiple_suites import (
+    get_asset_checkpoint_names,
+    run_checkpoints_on_batch,
+)
+from grater_functions.parallel import (
+    benchmark_parallel_validation,
+    run_checkpoint_in_parallel,
+)
+from grater_functions.partitions import (
+    discover_partitions,
+    get_partitioned_asset_config,
+    validate_partitioned_asset,
+)
+from grater_functions.reference_sets import (
+    REFERENCE_SET_TTL_SECONDS,
+    get_file_fetcher,
+    register_reference_set,
+)
+from grater_functions.result_format import get_initial_result_format
+from grater_functions.sketches import (
+    HyperLogLog,
+    validate_approximate_expectations_on_chunks,
+)
+from grater_functions.store_snapshot import (
+    SnapshotStoreBackend,
+    bake_store_snapshot,
+    check_store_snapshot,
+)
+from grater_functions.store_writes import flush_store_writes
+from grater_functions.summary_index import (
+    ValidationSummaryIndex,
+    compact_validation_summaries,
+    write_validation_summaries,
+)
+from grater_functions.tiers import (
+    TieredValidator,
+    register_skipped_status_icon_renderer,
+    run_tiered_checkpoint,
+)
+from grater_functions.validation_plans import (
+    benchmark_validation_plan,
+    get_plan_result_formats,
+    get_validation_plan,
+)
 
 # Logger initialization and function for lambda
 logger = logging.getLogger(__name__)
@@ -140,6 +226,150 @@ def load_csv_from_container(
     return df
 
 
+def list_blobs_with_metadata(
+    blob_service_client: BlobServiceClient, container_name: str, prefix: str = None
+) -> list:
+    """Function to list all blobs in a container under a given prefix, with their size
+    and the time they were last modified, e.g. to group small files into micro-batches
+    (see group_micro_batches)
+
+    Parameters
+    ----------
+    blob_service_client : BlobServiceClient
+        BlobServiceClient for the storage account to target. Must be authenticated and
+        allowed to access and interact with containers
+    container_name : str
+        Name of the container to list blobs from
+    prefix : str, optional
+        Prefix of the blobs to list, by default None to list all blobs
+
+    Returns
+    -------
+    list
+        Dictionaries with the key, size and last_modified of each blob
+    """
+    container_client = blob_service_client.get_container_client(container_name)
+    objects = [
+        {"key": blob.name, "size": blob.size, "last_modified": blob.last_modified}
+        for blob in container_client.list_blobs(name_starts_with=prefix)
+    ]
+
+    return objects
+
+
+def load_csvs_from_container(
+    blob_service_client: BlobServiceClient,
+    container_name: str,
+    paths_csv: list,
+    n_threads: int = 16,
+) -> dict:
+    """Function that downloads many (small) CSV files from a container concurrently and
+    loads each into a pandas DataFrame
+
+    Parameters
+    ----------
+    blob_service_client : BlobServiceClient
+        BlobServiceClient for the storage account to target. Must be authenticated and
+        allowed to access and interact with containers
+    container_name : str
+        Name of the container of the CSV files
+    paths_csv : list
+        Paths to the CSV files in the container
+    n_threads : int, optional
+        Number of files to download concurrently, by default 16
+
+    Returns
+    -------
+    dict
+        DataFrame of each CSV file, by its path, in the order of paths_csv
+    """
+    container_client = blob_service_client.get_container_client(container_name)
+
+    def load_csv(path_csv: str) -> pd.DataFrame:
+        downloaded_blob = container_client.download_blob(path_csv)
+        return pd.read_csv(io.BytesIO(downloaded_blob.readall()))
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        dict_frames = dict(zip(paths_csv, executor.map(load_csv, paths_csv)))
+
+    return dict_frames
+
+
+def list_blob_prefixes(
+    blob_service_client: BlobServiceClient, container_name: str, prefix: str = ""
+) -> list:
+    """Function to list the prefixes (which function alike directories) directly below
+    a prefix in a container
+
+    Parameters
+    ----------
+    blob_service_client : BlobServiceClient
+        BlobServiceClient for the storage account to target. Must be authenticated and
+        allowed to access and interact with containers
+    container_name : str
+        Name of the container to list prefixes in
+    prefix : str, optional
+        Prefix for which the prefixes below it should be listed, by default "", in
+        other words the root
+
+    Returns
+    -------
+    list
+        A list with the prefixes, each ending with "/"
+    """
+    container_client = blob_service_client.get_container_client(container_name)
+    prefixes = [
+        item.name
+        for item in container_client.walk_blobs(
+            name_starts_with=prefix or None, delimiter="/"
+        )
+        if isinstance(item, BlobPrefix)
+    ]
+
+    return prefixes
+
+
+def get_blob_fetcher(
+    blob_service_client: BlobServiceClient, container_name: str, path_blob: str
+):
+    """Function to get a fetcher for a reference set in a container (see
+    ReferenceSetCache), which only downloads the blob if its ETag changed, using a
+    conditional request
+
+    Parameters
+    ----------
+    blob_service_client : BlobServiceClient
+        BlobServiceClient for the storage account to target
+    container_name : str
+        Name of the container of the blob
+    path_blob : str
+        Path to the blob in the container
+
+    Returns
+    -------
+    function
+        Fetcher that takes the ETag of the cached blob and returns a tuple with the
+        content and ETag of the blob, or None if the blob did not change
+    """
+    blob_client = blob_service_client.get_blob_client(
+        container=container_name, blob=path_blob
+    )
+
+    def fetch(etag: str = None):
+        try:
+            if etag:
+                downloader = blob_client.download_blob(
+                    etag=etag, match_condition=MatchConditions.IfModified
+                )
+            else:
+                downloader = blob_client.download_blob()
+        except ResourceNotModifiedError:
+            return None
+        return downloader.readall(), downloader.properties.etag
+
+    return fetch
+
+
 # Helper functions for Great Expectations config for Azure
 def get_connection_string(
     storage_client: StorageManagementClient, test_config: TestingConfiguration
@@ -212,9 +442,13 @@ def add_connection_string_to_config(
     with open(path_config, "r") as file_in:
         data = local_yaml.load(file_in)
 
-    # -- 2. Add connection strings to stores
+    # -- 2. Add connection strings to stores, or to the store backend wrapped by a
+    #       Grater Expectations store backend (e.g. SnapshotStoreBackend)
     for store in STORES_TO_ADJUST:
-        data["stores"][store]["store_backend"]["connection_string"] = connection_string
+        store_backend = data["stores"][store]["store_backend"]
+        while "store_backend" in store_backend:
+            store_backend = store_backend["store_backend"]
+        store_backend["connection_string"] = connection_string
 
     # -- 3. Add connection string to Data Docs
     data["data_docs_sites"][test_config.site_name]["store_backend"][
@@ -261,6 +495,11 @@ def checkpoint_without_datadocs_update(test_config: TestingConfiguration) -> str
     use this checkpoint to run and store just the validations, to generate the Data
     Docs website at a later stage.
 
+    If buffered_store_writes is enabled in the testing configuration, validation
+    results and evaluation parameters are buffered and written concurrently (see
+    StoreWriteBuffer), which requires calling flush_store_writes after running the
+    checkpoint.
+
     Parameters
     ----------
     test_config : TestingConfiguration
@@ -274,6 +513,13 @@ def checkpoint_without_datadocs_update(test_config: TestingConfiguration) -> str
     str
         A string containing the YAML configuration for a checkpoint
     """
+    if getattr(test_config, "buffered_store_writes", False):
+        module_name = "module_name: grater_functions.store_writes\n      "
+        action_prefix = "Buffered"
+    else:
+        module_name = ""
+        action_prefix = ""
+
     checkpoint_yml = f"""
 name: {test_config.checkpoint_name}
 config_version: 1.0
@@ -286,10 +532,10 @@ batch_request: {{}}
 action_list:
   - name: store_validation_result
     action:
-      class_name: StoreValidationResultAction
+      {module_name}class_name: {action_prefix}StoreValidationResultAction
   - name: store_evaluation_params
     action:
-      class_name: StoreEvaluationParametersAction
+      {module_name}class_name: {action_prefix}StoreEvaluationParametersAction
 evaluation_parameters: {{}}
 runtime_configuration: {{}}
 ge_cloud_id:
@@ -297,6 +543,539 @@ expectation_suite_ge_cloud_id:"""
     return yaml.load(checkpoint_yml)
 
 
+# Store for Grater Expectations artefacts
+def get_grater_store_backend(
+    context: ge.data_context.DataContext,
+    name: str,
+    base_directory: str = None,
+    filepath_suffix: str = ".json",
+):
+    """Function to get a store backend for persisting artefacts of Grater Expectations
+    (e.g. cost profiles of expectation suites) as JSON files. On Azure, these are stored
+    in the grater container of the storage account, under the prefix {name}
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext, from which the connection string of the storage
+        account is taken
+    name : str
+        Name of the type of artefact to store, used as prefix for its files
+    base_directory : str, optional
+        Local directory to store the artefacts in instead, e.g. for testing, by default
+        None
+    filepath_suffix : str, optional
+        Suffix of the files of the artefacts, by default ".json". Set to None for
+        artefacts with their own extension (e.g. binary files)
+
+    Returns
+    -------
+    TupleStoreBackend
+        A store backend that stores values by tuple keys
+    """
+    if base_directory:
+        return TupleFilesystemStoreBackend(
+            base_directory=os.path.join(os.path.abspath(base_directory), name),
+            filepath_suffix=filepath_suffix,
+            suppress_store_backend_id=True,
+        )
+
+    validations_store_backend = context.stores["validations_store"].store_backend
+    return TupleAzureBlobStoreBackend(
+        container="grater",
+        connection_string=validations_store_backend.connection_string,
+        prefix=name,
+        filepath_suffix=filepath_suffix,
+        suppress_store_backend_id=True,
+    )
+
+
+def get_docs_rebuild_scheduler(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to get the scheduler for coalescing rebuilds of the Data Docs site of
+    the project (see DataDocsRebuildScheduler). The number of pending validation
+    results and the number of seconds that trigger a rebuild can be set with
+    docs_rebuild_max_pending and docs_rebuild_max_wait_seconds in the project
+    configuration, and sharding of its index with docs_index_page_size
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to keep notifications and the manifest of the site in instead,
+        e.g. for testing, by default None
+
+    Returns
+    -------
+    DataDocsRebuildScheduler
+        The scheduler for rebuilding the Data Docs site
+    """
+    return DataDocsRebuildScheduler(
+        context,
+        get_grater_store_backend(context, "data_docs_notifications", base_directory),
+        get_grater_store_backend(context, "data_docs_manifests", base_directory),
+        max_pending=getattr(test_config, "docs_rebuild_max_pending", 100),
+        max_wait_seconds=getattr(test_config, "docs_rebuild_max_wait_seconds", 900),
+        index_page_size=getattr(test_config, "docs_index_page_size", None),
+    )
+
+
+def notify_docs_rebuild_scheduler(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    list_results: list,
+):
+    """Function to notify the Data Docs rebuild scheduler of the validation results
+    stored by running checkpoints, if docs_rebuild_scheduler is enabled in the project
+    configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    list_results : list
+        List of CheckpointResult objects returned by running checkpoints
+    """
+    if not getattr(test_config, "docs_rebuild_scheduler", False):
+        return
+
+    scheduler = get_docs_rebuild_scheduler(test_config, context)
+    n_notifications = sum(scheduler.notify(results) for results in list_results)
+    logger.info(
+        f"Notified Data Docs rebuild scheduler of {n_notifications} validation results"
+    )
+
+
+def get_validation_summary_index(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    database_path: str = "validation_summaries.sqlite",
+    base_directory: str = None,
+):
+    """Function to get a queryable index of the summaries of validation results
+    written when validation_summary_index is enabled in the project configuration (see
+    ValidationSummaryIndex). Call sync on the index to load new summaries
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    database_path : str, optional
+        Path of the local SQLite database, by default "validation_summaries.sqlite"
+    base_directory : str, optional
+        Local directory the summaries are stored in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    ValidationSummaryIndex
+        The index of summaries of validation results
+    """
+    return ValidationSummaryIndex(
+        get_grater_store_backend(context, "validation_summaries", base_directory),
+        database_path,
+    )
+
+
+def store_validation_summaries(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    list_results: list,
+    base_directory: str = None,
+):
+    """Function to write summaries of the validation results stored by running
+    checkpoints (see write_validation_summaries), if validation_summary_index is
+    enabled in the project configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    list_results : list
+        List of CheckpointResult objects returned by running checkpoints
+    base_directory : str, optional
+        Local directory to store the summaries in instead, e.g. for testing, by
+        default None
+    """
+    if not getattr(test_config, "validation_summary_index", False):
+        return
+
+    store_backend = get_grater_store_backend(
+        context, "validation_summaries", base_directory
+    )
+    n_rows = sum(
+        write_validation_summaries(store_backend, results) for results in list_results
+    )
+    logger.info(f"Stored summaries of {n_rows} expectation results")
+
+
+def compact_validation_summary_store(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+) -> dict:
+    """Function to compact the summaries of validation results into a single file per
+    date (see compact_validation_summaries), if validation_summary_index is enabled in
+    the project configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory the summaries are stored in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    dict
+        A dictionary with the number of summary files that were compacted and the
+        number of compacted files that were written
+    """
+    if not getattr(test_config, "validation_summary_index", False):
+        return {"summaries_compacted": 0, "summary_files": 0}
+
+    return compact_validation_summaries(
+        get_grater_store_backend(context, "validation_summaries", base_directory)
+    )
+
+
+def get_validation_plan_store(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to get the store backend for validation plans of expectation suites
+    (see get_validation_plan), if validation_plans is enabled in the project
+    configuration. Otherwise, None is returned
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to store the validation plans in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    TupleStoreBackend
+        A store backend for validation plans, or None if they are not enabled
+    """
+    if not getattr(test_config, "validation_plans", False):
+        return None
+
+    return get_grater_store_backend(context, "validation_plans", base_directory)
+
+
+def get_cost_profile_store(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to get the store backend for cost profiles of expectation suites (see
+    load_cost_profile), if cost_profiles is enabled in the project configuration.
+    Otherwise, None is returned
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to store the cost profiles in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    TupleStoreBackend
+        A store backend for cost profiles, or None if they are not enabled
+    """
+    if not getattr(test_config, "cost_profiles", False):
+        return None
+
+    return get_grater_store_backend(context, "cost_profiles", base_directory)
+
+
+def store_column_statistics(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    df_batch: pd.DataFrame,
+    dataset_name: str,
+    batch_identifier: str,
+    list_results: list = None,
+    base_directory: str = None,
+):
+    """Function to store statistics of each column of a validated batch of data (see
+    build_column_statistics_record), if column_statistics_store is enabled in the
+    project configuration. Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    df_batch : pd.DataFrame
+        Batch of data that was validated
+    dataset_name : str
+        Name of the dataset the batch belongs to, which should be the same for all
+        batches of the dataset
+    batch_identifier : str
+        Identifier of the batch within the dataset, e.g. 2021-12
+    list_results : list, optional
+        List of CheckpointResult objects returned by validating the batch, to record
+        whether it passed validation, by default None
+    base_directory : str, optional
+        Local directory to store the statistics in instead, e.g. for testing, by
+        default None
+    """
+    if not getattr(test_config, "column_statistics_store", False):
+        return
+
+    success = None
+    if list_results is not None:
+        success = all(results.success for results in list_results)
+    write_column_statistics(
+        get_grater_store_backend(context, "column_statistics", base_directory),
+        build_column_statistics_record(
+            df_batch, dataset_name, batch_identifier, success
+        ),
+    )
+    logger.info(f"Stored column statistics of {dataset_name} {batch_identifier}")
+
+
+def get_dynamic_evaluation_parameters(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    dataset_name: str,
+    batch_identifier: str,
+    base_directory: str = None,
+) -> dict:
+    """Function to derive values for dynamic evaluation parameters from the column
+    statistics of the batches of a dataset before the current one, using the rules
+    set by evaluation_parameter_rules in the project configuration (see
+    derive_evaluation_parameters). Returns an empty dictionary if
+    column_statistics_store is not enabled
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    dataset_name : str
+        Name of the dataset the batch belongs to
+    batch_identifier : str
+        Identifier of the batch that is about to be validated
+    base_directory : str, optional
+        Local directory the statistics are stored in instead, e.g. for testing, by
+        default None
+
+    Returns
+    -------
+    dict
+        A dictionary with values for the evaluation parameters that could be derived
+    """
+    if not getattr(test_config, "column_statistics_store", False):
+        return {}
+
+    records = load_recent_column_statistics(
+        get_grater_store_backend(context, "column_statistics", base_directory),
+        dataset_name,
+        before=batch_identifier,
+    )
+    return derive_evaluation_parameters(
+        records, getattr(test_config, "evaluation_parameter_rules", None) or {}
+    )
+
+
+def enable_key_index(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to register the store of the key index that
+    expect_column_values_to_be_unique_across_batches checks keys against (see
+    register_key_index_store), if key_index is enabled in the project configuration.
+    Otherwise, nothing is done
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to store the key index in instead, e.g. for testing, by default
+        None
+    """
+    if not getattr(test_config, "key_index", False):
+        return
+
+    register_key_index_store(
+        get_grater_store_backend(
+            context, "key_index", base_directory, filepath_suffix=None
+        )
+    )
+
+
+def enable_reference_sets(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    base_directory: str = None,
+):
+    """Function to register the reference sets that
+    expect_column_values_to_be_in_reference_set checks values against (see
+    ReferenceSetCache), as set by reference_sets in the project configuration. Each
+    reference set is given by the key of its file, and optionally the column of a CSV
+    file, a container (default data_container_name) and ttl_seconds (default 300).
+    Reference sets are only loaded when they are first used
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    base_directory : str, optional
+        Local directory to read the files of reference sets from instead, e.g. for
+        testing, by default None
+    """
+    reference_sets = getattr(test_config, "reference_sets", None) or {}
+    if not reference_sets:
+        return
+
+    blob_service_client = (
+        BlobServiceClient.from_connection_string(
+            context.stores["validations_store"].store_backend.connection_string
+        )
+        if not base_directory
+        else None
+    )
+    for name, spec in reference_sets.items():
+        location = spec.get("container", getattr(test_config, "data_container_name", None))
+        if base_directory:
+            fetch = get_file_fetcher(os.path.join(base_directory, spec["key"]))
+        else:
+            fetch = get_blob_fetcher(blob_service_client, location, spec["key"])
+        register_reference_set(
+            name,
+            fetch,
+            spec["key"],
+            column=spec.get("column"),
+            ttl_seconds=spec.get("ttl_seconds", REFERENCE_SET_TTL_SECONDS),
+            location=location,
+        )
+
+
+def validate_partitioned_container_asset(
+    test_config: TestingConfiguration,
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    asset_name: str,
+    evaluation_parameters: dict = None,
+    force: bool = False,
+) -> dict:
+    """Function to validate a data asset that is laid out in Hive-style partitions in
+    the data container (e.g. year=2024/month=01/day=15/), one batch per partition, as
+    set by partitioned_assets in the project configuration. Partitions are discovered
+    using list_blob_prefixes, and the CSV files of each partition are downloaded
+    concurrently (see validate_partitioned_asset)
+
+    Parameters
+    ----------
+    test_config : TestingConfiguration
+        The testing configurations for the current Grater Expectations config, generally
+        retrieved by initiating TestingConfiguration with project_config.yml
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run against each partition
+    asset_name : str
+        Name of the data asset, as listed under partitioned_assets
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    force : bool, optional
+        Whether to validate partitions that were already validated against the current
+        version of the expectation suite as well, by default False
+
+    Returns
+    -------
+    dict
+        The result of the data asset, with the results of its partitions (see
+        aggregate_partition_results)
+    """
+    asset_config = get_partitioned_asset_config(test_config, asset_name) or {
+        "prefix": "",
+        "partition_keys": None,
+        "n_workers": 4,
+    }
+    blob_service_client = BlobServiceClient.from_connection_string(
+        context.stores["validations_store"].store_backend.connection_string
+    )
+    container_name = test_config.data_container_name
+
+    def load_partition(partition_prefix: str) -> pd.DataFrame:
+        paths_csv = [
+            blob["key"]
+            for blob in list_blobs_with_metadata(
+                blob_service_client, container_name, partition_prefix
+            )
+        ]
+        dict_frames = load_csvs_from_container(
+            blob_service_client, container_name, paths_csv, n_threads=4
+        )
+        return pd.concat(dict_frames.values(), ignore_index=True)
+
+    partition_prefixes = discover_partitions(
+        lambda prefix: list_blob_prefixes(blob_service_client, container_name, prefix),
+        asset_config["prefix"],
+        asset_config["partition_keys"],
+    )
+    return validate_partitioned_asset(
+        context,
+        checkpoint_name,
+        asset_name,
+        partition_prefixes,
+        load_partition,
+        get_grater_store_backend(context, "partitions"),
+        prefix=asset_config["prefix"],
+        n_workers=asset_config["n_workers"],
+        evaluation_parameters=evaluation_parameters,
+        force=force,
+    )
+
+
 # Helper functions for Jupyter
 def make_clickable(url):
     """Helper function to make HTML tags around a url"""
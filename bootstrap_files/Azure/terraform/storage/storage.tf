@@ -24,7 +24,7 @@ resource "azurerm_storage_account" "this" {
 # ------------------------------------------------------------- 
 
 locals {
-  ge_containers = ["expectations", "validations", "checkpoints", "profiler", "evaluations"]
+  ge_containers = ["expectations", "validations", "checkpoints", "profiler", "evaluations", "grater"]
 }
 
 resource "azurerm_storage_container" "this" {
@@ -12,7 +12,9 @@ from great_expectations.core.batch import RuntimeBatchRequest
 from supporting_functions import (
     TestingConfiguration,
     evaluate_ge_results,
+    get_dynamic_evaluation_parameters,
     setup_logging,
+    store_column_statistics,
     get_connection_string,
 )
 from supporting_functions import load_csv_from_container as load_data
@@ -83,11 +85,19 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     #       for simplicity, but note that you could develop your own logic to for
     #       example derive testing values with data from last month to test the data
     #       of this month against. The code below just shows you how this can be done
+    #       If column_statistics_store is enabled in project_config.yml, statistics of
+    #       each validated month are stored, and the hard-coded values are replaced by
+    #       values derived from the statistics of earlier months, as set by
+    #       evaluation_parameter_rules (e.g. the maximum passenger count of last month)
+    dataset_name = re.sub(r"_\d{4}\-\d{2}", "", asset_name)
     MIN_MAX_PASSENGER_COUNT = 5
     MAX_MAX_PASSENGER_COUNT = 8
     dict_evaluation_parameters = {
         "min_max_passenger_count": MIN_MAX_PASSENGER_COUNT,
         "max_max_passenger_count": MAX_MAX_PASSENGER_COUNT,
+        **get_dynamic_evaluation_parameters(
+            test_config, context, dataset_name, batch_identifier
+        ),
     }
 
     # -- 7. Run validations
@@ -101,6 +111,9 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         validations=[{"batch_request": batch_request}],
         evaluation_parameters=dict_evaluation_parameters,
     )
+    store_column_statistics(
+        test_config, context, df_batch, dataset_name, batch_identifier, [results]
+    )
 
     # -- 8. Evaluate results from running the expectations on the current batch of data,
     #       return statuscode 200 if successfull
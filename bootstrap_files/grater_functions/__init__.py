@@ -0,0 +1,4 @@
+"""Features of Grater Expectations that do not depend on the cloud provider, which are
+shared by projects on AWS and Azure. Each module holds a single feature, while reading
+and writing objects in the cloud is left to store_backend_io of the project. The
+features used in notebooks and handlers are imported through supporting_functions"""
@@ -0,0 +1,427 @@
+"""Backfilling validation results after changes to an expectation suite"""
+
+# -- Imports
+import datetime
+import json
+import logging
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import great_expectations as ge
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.evaluation_parameters import build_evaluation_parameters
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.data_context.types.resource_identifiers import (
+    ValidationResultIdentifier,
+)
+from great_expectations.core.util import convert_to_json_serializable
+
+from grater_functions.validation import (
+    get_expectation_column,
+    get_expectation_columns,
+    get_partial_suite,
+    get_result_key,
+    get_validation_statistics,
+    hash_expectation_suite,
+    release_validator_batches,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Backfilling validation results after changes to an expectation suite
+# NOTE: when expectations are added to (or modified in) an expectation suite, the
+# validation results of historical batches can be brought up to date without validating
+# the complete suite again. Expectations of the current suite are compared with those in
+# each stored validation result, after substituting the evaluation parameters of that
+# result (see get_comparable_expectation). Only expectations that are missing from it
+# are validated against the batch, after which their results are merged into the stored
+# validation result, replacing the results of expectations that are no longer part of
+# the suite (see backfill_validation_result). Batches are backfilled concurrently by a
+# bounded pool of worker threads (see backfill_validations)
+def get_comparable_expectation(
+    expectation_config, evaluation_parameters: dict = None
+) -> str:
+    """Helper function to get a key by which an expectation of an expectation suite
+    can be compared with its configuration in a stored validation result, in which
+    evaluation parameters were substituted (given those evaluation parameters), the
+    batch_id was added and the substituted parameters were added to its meta"""
+    kwargs = {
+        key: value
+        for key, value in expectation_config.kwargs.items()
+        if key != "batch_id"
+    }
+    try:
+        kwargs, _ = build_evaluation_parameters(kwargs, evaluation_parameters or {})
+    except Exception:
+        pass
+    meta = {
+        key: value
+        for key, value in (expectation_config.meta or {}).items()
+        if key != "substituted_parameters"
+    }
+    return json.dumps(
+        convert_to_json_serializable(
+            [expectation_config.expectation_type, kwargs, meta]
+        ),
+        sort_keys=True,
+    )
+
+
+def diff_expectation_suites(
+    old_suite: ExpectationSuite, new_suite: ExpectationSuite
+) -> dict:
+    """Function to compare two versions of an expectation suite. Expectations that only
+    appear in the new version are added, or modified if the old version has an
+    expectation of the same type for the same columns that does not appear in the new
+    version
+
+    Parameters
+    ----------
+    old_suite : ExpectationSuite
+        Previous version of the expectation suite
+    new_suite : ExpectationSuite
+        Current version of the expectation suite
+
+    Returns
+    -------
+    dict
+        Lists of the expectations of the new version that were added, modified and
+        unchanged, and of those of the old version that were removed (or modified)
+    """
+    old_keys = {get_result_key(expectation) for expectation in old_suite.expectations}
+    new_keys = {get_result_key(expectation) for expectation in new_suite.expectations}
+    removed = [
+        expectation
+        for expectation in old_suite.expectations
+        if get_result_key(expectation) not in new_keys
+    ]
+    removed_domains = Counter(
+        (expectation.expectation_type, tuple(get_expectation_columns(expectation)))
+        for expectation in removed
+    )
+
+    diff = {"added": [], "modified": [], "unchanged": [], "removed": removed}
+    for expectation in new_suite.expectations:
+        if get_result_key(expectation) in old_keys:
+            diff["unchanged"].append(expectation)
+            continue
+        domain = (
+            expectation.expectation_type,
+            tuple(get_expectation_columns(expectation)),
+        )
+        if removed_domains[domain] > 0:
+            removed_domains[domain] -= 1
+            diff["modified"].append(expectation)
+        else:
+            diff["added"].append(expectation)
+
+    return diff
+
+
+def get_backfill_keys(
+    context: ge.data_context.DataContext,
+    expectation_suite_name: str,
+    since: str = None,
+    all_runs: bool = False,
+) -> list:
+    """Function to list the stored validation results of an expectation suite that
+    should be backfilled: by default only the latest validation result of each batch
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    expectation_suite_name : str
+        Name of the expectation suite
+    since : str, optional
+        Only list validation results of runs since this date, e.g. 2021-12-01, by
+        default None
+    all_runs : bool, optional
+        Whether to list the validation results of all runs of each batch, by default
+        False
+
+    Returns
+    -------
+    list
+        ValidationResultIdentifier objects of the validation results, sorted by the
+        time of their run
+    """
+    since_time = pd.Timestamp(since, tz="UTC") if since else None
+    keys = [
+        key
+        for key in context.validations_store.list_keys()
+        if key.expectation_suite_identifier.expectation_suite_name
+        == expectation_suite_name
+        and (
+            since_time is None
+            or pd.Timestamp(key.run_id.run_time).tz_convert("UTC") >= since_time
+        )
+    ]
+    keys.sort(key=lambda key: pd.Timestamp(key.run_id.run_time))
+    if all_runs:
+        return keys
+
+    latest_keys = {key.batch_identifier: key for key in keys}
+    return sorted(
+        latest_keys.values(), key=lambda key: pd.Timestamp(key.run_id.run_time)
+    )
+
+
+def backfill_validation_result(
+    context: ge.data_context.DataContext,
+    key: ValidationResultIdentifier,
+    expectation_suite: ExpectationSuite,
+    load_batch,
+    candidates: list = None,
+    result_format: dict = None,
+    asset_name: str = None,
+    dry_run: bool = False,
+) -> dict:
+    """Function to bring a stored validation result up to date with the current
+    version of its expectation suite. Only expectations that are missing from the
+    validation result are validated, against the batch as loaded again by load_batch,
+    after which the validation result is stored again (under the same key) with their
+    results merged into it. Results of expectations that are no longer part of the
+    expectation suite are removed
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    key : ValidationResultIdentifier
+        Key of the validation result in the validations store
+    expectation_suite : ExpectationSuite
+        Current version of the expectation suite
+    load_batch : callable
+        Function that takes the name of a data asset and a batch identifier, and returns
+        the data of the batch as a pandas DataFrame
+    candidates : list, optional
+        Expectations that may be validated (e.g. those added or modified according to
+        diff_expectation_suites), by default None for all expectations of the suite
+    result_format : dict, optional
+        Result format to validate the expectations with, by default SUMMARY
+    asset_name : str, optional
+        Only backfill validation results of this data asset, by default None
+    dry_run : bool, optional
+        Whether to only report which expectations would be validated, by default False
+
+    Returns
+    -------
+    dict
+        Summary of the backfill of the validation result, with its status ("merged",
+        "up_to_date", "skipped", "planned" or "error")
+    """
+    # -- 1. Load the stored validation result and the batch it was validated against
+    validation_result = context.validations_store.get(key)
+    batch_definition = validation_result.meta.get("active_batch_definition") or {}
+    batch_asset_name = batch_definition.get("data_asset_name")
+    batch_identifier = (batch_definition.get("batch_identifiers") or {}).get(
+        "batch_identifier"
+    )
+    summary = {
+        "key": key.to_fixed_length_tuple(),
+        "data_asset_name": batch_asset_name,
+        "batch_identifier": batch_identifier,
+    }
+    if asset_name is not None and batch_asset_name != asset_name:
+        return {**summary, "status": "skipped"}
+
+    # -- 2. Compare the expectations of the suite with those of the validation result
+    evaluation_parameters = validation_result.evaluation_parameters or {}
+    stored_keys = {
+        get_comparable_expectation(result.expectation_config): result
+        for result in validation_result.results
+    }
+    suite_keys = [
+        get_comparable_expectation(expectation, evaluation_parameters)
+        for expectation in expectation_suite.expectations
+    ]
+    candidate_keys = (
+        {get_result_key(expectation) for expectation in candidates}
+        if candidates is not None
+        else None
+    )
+    to_validate = [
+        expectation
+        for expectation, suite_key in zip(expectation_suite.expectations, suite_keys)
+        if suite_key not in stored_keys
+        and (candidate_keys is None or get_result_key(expectation) in candidate_keys)
+    ]
+    kept_results = {
+        suite_key: stored_keys[suite_key]
+        for suite_key in suite_keys
+        if suite_key in stored_keys
+    }
+    n_removed = len(stored_keys) - len(kept_results)
+    summary.update(
+        {
+            "validated_expectations": len(to_validate),
+            "removed_results": n_removed,
+        }
+    )
+    if not to_validate and not n_removed:
+        return {**summary, "status": "up_to_date"}
+    if dry_run:
+        return {**summary, "status": "planned"}
+
+    # -- 3. Validate the missing expectations against the batch, after which the batch
+    #       is released
+    new_results = []
+    if to_validate:
+        validator = None
+        try:
+            batch_request = RuntimeBatchRequest(
+                datasource_name="runtime_data",
+                data_connector_name="runtime_data_connector",
+                data_asset_name=batch_asset_name,
+                runtime_parameters={
+                    "batch_data": load_batch(batch_asset_name, batch_identifier)
+                },
+                batch_identifiers={"batch_identifier": batch_identifier},
+            )
+            validator = context.get_validator(
+                batch_request=batch_request,
+                expectation_suite=get_partial_suite(expectation_suite, to_validate),
+            )
+            backfill_result = validator.validate(
+                evaluation_parameters=evaluation_parameters,
+                result_format=result_format or {"result_format": "SUMMARY"},
+                catch_exceptions=True,
+            )
+        except Exception:
+            logger.error(
+                f"Backfilling {batch_asset_name} {batch_identifier} failed:\n"
+                f"{traceback.format_exc()}"
+            )
+            return {**summary, "status": "error"}
+        finally:
+            if validator is not None:
+                release_validator_batches(validator)
+        new_results = backfill_result.results
+        evaluation_parameters = {
+            **evaluation_parameters,
+            **(backfill_result.evaluation_parameters or {}),
+        }
+
+    # -- 4. Merge the new results into the stored validation result, in the order in
+    #       which Validator.validate returns them, and store it under the same key
+    column_order = {}
+    suite_order = {}
+    for position, (expectation, suite_key) in enumerate(
+        zip(expectation_suite.expectations, suite_keys)
+    ):
+        column = get_expectation_column(expectation)
+        column_order.setdefault(column, len(column_order))
+        suite_order[suite_key] = (column_order[column], position)
+    merged_results = list(kept_results.values()) + list(new_results)
+    merged_results.sort(
+        key=lambda result: suite_order.get(
+            get_comparable_expectation(result.expectation_config),
+            (len(column_order), len(suite_order)),
+        )
+    )
+    success, statistics = get_validation_statistics(merged_results)
+    validation_result.results = merged_results
+    validation_result.success = success
+    validation_result.statistics = statistics
+    validation_result.evaluation_parameters = evaluation_parameters
+    validation_result.meta["backfill"] = {
+        "suite_hash": hash_expectation_suite(expectation_suite.to_json_dict()),
+        "backfill_time": datetime.datetime.now(datetime.timezone.utc).strftime(
+            "%Y%m%dT%H%M%S.%fZ"
+        ),
+        "validated_expectations": len(new_results),
+        "removed_results": n_removed,
+    }
+    context.validations_store.set(key, validation_result)
+
+    return {**summary, "status": "merged", "success": success}
+
+
+def backfill_validations(
+    context: ge.data_context.DataContext,
+    expectation_suite_name: str,
+    load_batch,
+    old_suite: ExpectationSuite = None,
+    n_workers: int = 4,
+    since: str = None,
+    all_runs: bool = False,
+    asset_name: str = None,
+    result_format: dict = None,
+    dry_run: bool = False,
+) -> dict:
+    """Function to backfill the stored validation results of an expectation suite
+    after it changed, by validating only the expectations that are missing from each
+    validation result (see backfill_validation_result). Validation results are
+    backfilled concurrently in a bounded pool of worker threads
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    expectation_suite_name : str
+        Name of the expectation suite, of which the current version is used
+    load_batch : callable
+        Function that takes the name of a data asset and a batch identifier, and returns
+        the data of the batch as a pandas DataFrame
+    old_suite : ExpectationSuite, optional
+        Previous version of the expectation suite. If given, only expectations that
+        were added or modified since that version are validated, by default None
+    n_workers : int, optional
+        Maximum number of batches to backfill at the same time, by default 4
+    since : str, optional
+        Only backfill validation results of runs since this date, e.g. 2021-12-01, by
+        default None
+    all_runs : bool, optional
+        Whether to backfill the validation results of all runs of each batch instead of
+        only the latest, by default False
+    asset_name : str, optional
+        Only backfill validation results of this data asset, by default None
+    result_format : dict, optional
+        Result format to validate the expectations with, by default SUMMARY
+    dry_run : bool, optional
+        Whether to only report which expectations would be validated, by default False
+
+    Returns
+    -------
+    dict
+        The diff of the expectation suite (if old_suite was given), the number of
+        validation results per status and a summary of each validation result
+    """
+    # -- 1. Diff the versions of the expectation suite, if the old version is given
+    expectation_suite = context.get_expectation_suite(expectation_suite_name)
+    candidates = None
+    output = {}
+    if old_suite is not None:
+        diff = diff_expectation_suites(old_suite, expectation_suite)
+        candidates = diff["added"] + diff["modified"]
+        output["diff"] = {key: len(value) for key, value in diff.items()}
+        logger.info(f"Changes to {expectation_suite_name}: {output['diff']}")
+
+    # -- 2. Backfill the validation results in a bounded pool of worker threads
+    keys = get_backfill_keys(context, expectation_suite_name, since, all_runs)
+    logger.info(f"Backfilling {len(keys)} validation results with {n_workers} workers")
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        summaries = list(
+            executor.map(
+                lambda key: backfill_validation_result(
+                    context,
+                    key,
+                    expectation_suite,
+                    load_batch,
+                    candidates=candidates,
+                    result_format=result_format,
+                    asset_name=asset_name,
+                    dry_run=dry_run,
+                ),
+                keys,
+            )
+        )
+
+    output["statistics"] = dict(Counter(summary["status"] for summary in summaries))
+    output["validation_results"] = summaries
+    logger.info(f"Backfilled validation results: {output['statistics']}")
+    return output
@@ -0,0 +1,360 @@
+"""Store of per-batch column statistics and evaluation parameters derived from it"""
+
+# -- Imports
+import datetime
+import json
+import logging
+import re
+import pandas as pd
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Store of per-batch column statistics
+# NOTE: after a batch is validated, a compact record with statistics of each column
+# (count, nulls, min, max, mean and a quantile sketch) can be written to a Grater store
+# backend under batches/{dataset_name}/{batch_identifier}. Next to it, a file with the
+# most recent records of the dataset is kept (recent/{dataset_name}), so that evaluation
+# parameters for the next batch (e.g. based on the maximum passenger count of last
+# month) are derived from a single read, without loading historical data (see
+# derive_evaluation_parameters). Batch identifiers are ordered as strings, so they
+# should sort chronologically (e.g. 2021-12)
+QUANTILE_SKETCH_SIZE = 101
+RECENT_STATISTICS_SIZE = 12
+
+
+def compute_column_statistics(df: pd.DataFrame, columns: list = None) -> dict:
+    """Function that computes a compact summary of each column of a batch of data.
+    Numeric columns get their min, max, mean and a quantile sketch, which holds the
+    values at QUANTILE_SKETCH_SIZE evenly spaced ranks (i.e. every percentile by
+    default). Datetime columns get their min and max, other columns only counts
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Batch of data to summarize
+    columns : list, optional
+        Columns to summarize, by default all columns
+
+    Returns
+    -------
+    dict
+        A dictionary with the statistics of each column
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    ranks = [rank / (QUANTILE_SKETCH_SIZE - 1) for rank in range(QUANTILE_SKETCH_SIZE)]
+    counts = df[columns].count()
+
+    dict_statistics = {}
+    for column in columns:
+        series = df[column]
+        statistics = {
+            "count": int(counts[column]),
+            "nulls": int(len(series) - counts[column]),
+        }
+        if statistics["count"] and pd.api.types.is_bool_dtype(series):
+            statistics["mean"] = float(series.mean())
+        elif statistics["count"] and pd.api.types.is_numeric_dtype(series):
+            values = series.dropna().astype(float)
+            statistics.update(
+                {
+                    "min": float(values.min()),
+                    "max": float(values.max()),
+                    "mean": float(values.mean()),
+                    "quantiles": values.quantile(ranks).tolist(),
+                }
+            )
+        elif statistics["count"] and pd.api.types.is_datetime64_any_dtype(series):
+            statistics.update(
+                {
+                    "min": series.min().isoformat(),
+                    "max": series.max().isoformat(),
+                }
+            )
+        dict_statistics[str(column)] = statistics
+
+    return dict_statistics
+
+
+def build_column_statistics_record(
+    df: pd.DataFrame,
+    dataset_name: str,
+    batch_identifier: str,
+    success: bool = None,
+    columns: list = None,
+) -> dict:
+    """Function to build the statistics record of a batch of data (see
+    compute_column_statistics), to store with write_column_statistics
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Batch of data to summarize
+    dataset_name : str
+        Name of the dataset the batch belongs to, which should be the same for all
+        batches (e.g. yellow_tripdata for yellow_tripdata_2021-12.csv)
+    batch_identifier : str
+        Identifier of the batch within the dataset, e.g. 2021-12
+    success : bool, optional
+        Whether the batch passed validation, by default None (unknown)
+    columns : list, optional
+        Columns to summarize, by default all columns
+
+    Returns
+    -------
+    dict
+        The statistics record of the batch
+    """
+    return {
+        "dataset_name": dataset_name,
+        "batch_identifier": batch_identifier,
+        "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "success": success,
+        "n_rows": len(df),
+        "columns": compute_column_statistics(df, columns),
+    }
+
+
+def write_column_statistics(
+    store_backend, record: dict, recent_size: int = RECENT_STATISTICS_SIZE
+):
+    """Function to store the statistics record of a batch, and add it to the most
+    recent records of its dataset. A record for the same batch replaces the earlier
+    one
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for column statistics, generally obtained by calling
+        get_grater_store_backend with name "column_statistics"
+    record : dict
+        Statistics record, as built with build_column_statistics_record
+    recent_size : int, optional
+        Number of most recent records to keep per dataset, by default
+        RECENT_STATISTICS_SIZE
+    """
+    dataset_name = record["dataset_name"]
+    store_backend.set(
+        ("batches", dataset_name, record["batch_identifier"]), json.dumps(record)
+    )
+
+    records = [
+        recent_record
+        for recent_record in load_recent_column_statistics(
+            store_backend, dataset_name, only_successful=False
+        )
+        if recent_record["batch_identifier"] != record["batch_identifier"]
+    ]
+    records.append(record)
+    records.sort(key=lambda recent_record: recent_record["batch_identifier"])
+    store_backend.set(("recent", dataset_name), json.dumps(records[-recent_size:]))
+
+
+def load_recent_column_statistics(
+    store_backend,
+    dataset_name: str,
+    before: str = None,
+    only_successful: bool = True,
+) -> list:
+    """Function to load the most recent statistics records of a dataset
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for column statistics, generally obtained by calling
+        get_grater_store_backend with name "column_statistics"
+    dataset_name : str
+        Name of the dataset to load records for
+    before : str, optional
+        If passed, only records of batches with an identifier before this one are
+        returned, e.g. the batch that is about to be validated. By default None
+    only_successful : bool, optional
+        Whether to leave out records of batches that failed validation, by default
+        True
+
+    Returns
+    -------
+    list
+        A list of statistics records, ordered by batch identifier
+    """
+    key = ("recent", dataset_name)
+    if not store_backend.has_key(key):
+        return []
+
+    return [
+        record
+        for record in json.loads(store_backend.get(key))
+        if (before is None or record["batch_identifier"] < before)
+        and not (only_successful and record.get("success") is False)
+    ]
+
+
+def rebuild_recent_column_statistics(
+    store_backend, dataset_name: str, recent_size: int = RECENT_STATISTICS_SIZE
+) -> int:
+    """Function to rebuild the most recent statistics records of a dataset from the
+    records of all its batches, e.g. when batches were validated concurrently and
+    overwrote each other's update of the recent records
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for column statistics, generally obtained by calling
+        get_grater_store_backend with name "column_statistics"
+    dataset_name : str
+        Name of the dataset to rebuild the recent records for
+    recent_size : int, optional
+        Number of most recent records to keep, by default RECENT_STATISTICS_SIZE
+
+    Returns
+    -------
+    int
+        The number of records that were kept
+    """
+    keys = sorted(
+        key
+        for key in store_backend.list_keys(("batches", dataset_name))
+        if tuple(key[:2]) == ("batches", dataset_name)
+    )[-recent_size:]
+    records = [json.loads(store_backend.get(key)) for key in keys]
+    records.sort(key=lambda record: record["batch_identifier"])
+    store_backend.set(("recent", dataset_name), json.dumps(records))
+
+    return len(records)
+
+
+def get_sketch_quantile(records: list, column: str, quantile: float) -> float:
+    """Function that approximates a quantile of a column over several batches by
+    merging their quantile sketches, weighting the values of each sketch by the number
+    of values in its batch"""
+    weighted_values = []
+    for record in records:
+        statistics = record["columns"].get(column, {})
+        if statistics.get("quantiles"):
+            weight = statistics["count"] / len(statistics["quantiles"])
+            weighted_values.extend((value, weight) for value in statistics["quantiles"])
+    if not weighted_values:
+        raise KeyError(f"No quantile sketches of column {column} were recorded")
+
+    weighted_values.sort()
+    threshold = quantile * sum(weight for _, weight in weighted_values)
+    cumulative_weight = 0.0
+    for value, weight in weighted_values:
+        cumulative_weight += weight
+        if cumulative_weight >= threshold:
+            return value
+
+    return weighted_values[-1][0]
+
+
+def get_column_statistic(records: list, column: str, statistic: str):
+    """Function to get a statistic of a column, combined over the statistics records
+    of one or more batches
+
+    Parameters
+    ----------
+    records : list
+        Statistics records to combine, as loaded with load_recent_column_statistics
+    column : str
+        Name of the column
+    statistic : str
+        One of "min" and "max" (over all batches), "mean" (weighted by count), "count"
+        and "nulls" (averaged per batch), "null_fraction", "median" or a quantile in
+        percent like "q95" (merged from the quantile sketches)
+
+    Returns
+    -------
+    float
+        The combined value of the statistic
+
+    Raises
+    ------
+    KeyError
+        A KeyError is raised if the statistic was not recorded for the column
+    ValueError
+        A ValueError is raised if the statistic is unknown
+    """
+    list_statistics = [
+        record["columns"][column] for record in records if column in record["columns"]
+    ]
+    if not list_statistics:
+        raise KeyError(f"No statistics of column {column} were recorded")
+
+    if statistic in ("count", "nulls"):
+        return sum(statistics[statistic] for statistics in list_statistics) / len(
+            list_statistics
+        )
+    if statistic == "null_fraction":
+        n_values = sum(
+            statistics["count"] + statistics["nulls"] for statistics in list_statistics
+        )
+        return (
+            sum(statistics["nulls"] for statistics in list_statistics) / n_values
+            if n_values
+            else 0.0
+        )
+    if statistic == "median" or re.fullmatch(r"q\d+(\.\d+)?", statistic):
+        quantile = 0.5 if statistic == "median" else float(statistic[1:]) / 100
+        return get_sketch_quantile(records, column, quantile)
+    if statistic not in ("min", "max", "mean"):
+        raise ValueError(f"Unknown column statistic '{statistic}'")
+
+    list_statistics = [
+        statistics for statistics in list_statistics if statistic in statistics
+    ]
+    if not list_statistics:
+        raise KeyError(f"Statistic {statistic} was not recorded for column {column}")
+    if statistic == "min":
+        return min(statistics["min"] for statistics in list_statistics)
+    if statistic == "max":
+        return max(statistics["max"] for statistics in list_statistics)
+
+    total_count = sum(statistics["count"] for statistics in list_statistics)
+    return (
+        sum(statistics["mean"] * statistics["count"] for statistics in list_statistics)
+        / total_count
+    )
+
+
+def derive_evaluation_parameters(
+    records: list, evaluation_parameter_rules: dict
+) -> dict:
+    """Function that derives values for dynamic evaluation parameters from the
+    statistics of previous batches. Each parameter is derived by a rule like
+    {"column": "passenger_count", "statistic": "max", "n_batches": 1, "factor": 1,
+    "offset": 2}, i.e. the statistic of the column over the last n_batches batches
+    (see get_column_statistic), multiplied by factor and increased by offset. Only
+    column and statistic are required. Parameters that cannot be derived (e.g. because
+    no statistics have been recorded yet) are left out with a warning
+
+    Parameters
+    ----------
+    records : list
+        Statistics records of previous batches, ordered by batch identifier, as
+        loaded with load_recent_column_statistics
+    evaluation_parameter_rules : dict
+        Dictionary with the name of each evaluation parameter as key and its rule as
+        value
+
+    Returns
+    -------
+    dict
+        A dictionary with values for the evaluation parameters, to pass as
+        evaluation_parameters when running a checkpoint
+    """
+    dict_evaluation_parameters = {}
+    for name, rule in evaluation_parameter_rules.items():
+        batch_records = records[-int(rule.get("n_batches", 1)) :]
+        try:
+            value = get_column_statistic(
+                batch_records, rule["column"], rule["statistic"]
+            )
+        except KeyError as err:
+            logger.warning(f"Could not derive evaluation parameter {name}: {err}")
+            continue
+        if isinstance(value, (int, float)):
+            value = value * rule.get("factor", 1) + rule.get("offset", 0)
+        dict_evaluation_parameters[name] = value
+
+    return dict_evaluation_parameters
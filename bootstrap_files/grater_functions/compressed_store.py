@@ -0,0 +1,420 @@
+"""Compressed store backend for validation results"""
+
+# -- Imports
+import copy
+import datetime
+import gzip
+import json
+import logging
+import os
+import re
+import uuid
+import great_expectations as ge
+from great_expectations.data_context.store import StoreBackend
+from great_expectations.data_context.util import instantiate_class_from_config
+from great_expectations.exceptions import InvalidKeyError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from store_backend_io import read_store_backend_bytes
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Compressed store backend for validation results
+# NOTE: instead of one pretty-printed JSON object per validation result, validation
+# results are written as compressed records (gzip, or zstd if zstandard is installed).
+# These are periodically compacted into segments that are partitioned by data asset
+# and date (e.g. segments/asset=taxi_data/date=2021-12-01/), with an index of the byte
+# range of each record, so that a single result can still be read with one ranged
+# request. It is configured as store backend of the validations store in
+# great_expectations.yml (see validations_store_compression in testing_config.yml)
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+RECORD_SUFFIXES = {"gzip": ".json.gz", "zstd": ".json.zst"}
+
+
+def compress_store_record(value: str, compression: str = "gzip") -> bytes:
+    """Helper function to compress a serialized object (e.g. a validation result) into
+    a record for CompressedValidationsStoreBackend
+
+    Raises
+    ------
+    ImportError
+        An ImportError is raised if zstd compression is used while zstandard is not
+        installed
+    """
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires zstandard to be installed")
+        return zstandard.ZstdCompressor().compress(value.encode("utf-8"))
+
+    return gzip.compress(value.encode("utf-8"))
+
+
+def decompress_store_record(record: bytes) -> str:
+    """Helper function to decompress a record written by compress_store_record,
+    detecting its compression from its first bytes"""
+    if record[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ImportError("reading zstd records requires zstandard to be installed")
+        return zstandard.ZstdDecompressor().decompress(record).decode("utf-8")
+
+    return gzip.decompress(record).decode("utf-8")
+
+
+def get_validation_asset_name(meta: dict) -> str:
+    """Helper function to get the name of the data asset from the (serialized) meta of
+    a validation result"""
+    return (
+        (meta.get("active_batch_definition") or {}).get("data_asset_name")
+        or (meta.get("batch_spec") or {}).get("data_asset_name")
+        or (meta.get("batch_kwargs") or {}).get("data_asset_name")
+        or "unknown_asset"
+    )
+
+
+def get_validation_partition(validation_result_key: tuple, validation_result: dict):
+    """Helper function to get the partition of a validation result in a compacted
+    store, made up of its data asset and the date it ran on, as directory names"""
+    asset_name = get_validation_asset_name(validation_result.get("meta", {}))
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", asset_name).strip("-")[:50]
+    run_date = validation_result_key[-2][:8]
+
+    return (f"asset={slug}", f"date={run_date[:4]}-{run_date[4:6]}-{run_date[6:8]}")
+
+
+class CompressedValidationsStoreBackend(StoreBackend):
+    """Store backend for the validations store of Great Expectations, which stores
+    validation results as compressed records in another store backend (e.g. a
+    TupleS3StoreBackend). New results are written as separate records under loose/,
+    which are moved into partitioned segments under segments/ by compact. Validation
+    results are read, listed and removed through the standard store backend API,
+    regardless of whether they were compacted. Segments are read through
+    read_store_backend_bytes, so only the byte range of a single record is downloaded
+
+    Parameters
+    ----------
+    store_backend : dict
+        Configuration of the store backend to store the records in, e.g.
+        {"class_name": "TupleS3StoreBackend", "bucket": ..., "prefix": ...}
+    compression : str, optional
+        Compression for new records, either "gzip" or "zstd", by default "gzip"
+    root_directory : str, optional
+        Root directory of the DataContext, used for a TupleFilesystemStoreBackend
+        with a relative base_directory, by default None
+    suppress_store_backend_id : bool, optional
+        Whether to skip construction of a store_backend_id, by default False
+    manually_initialize_store_backend_id : str, optional
+        UUID to use as store_backend_id if none exists yet, by default ""
+    store_name : str, optional
+        Name of the store, passed by Great Expectations, by default None
+
+    Raises
+    ------
+    ValueError
+        A ValueError is raised if compression is not one of RECORD_SUFFIXES
+    """
+
+    def __init__(
+        self,
+        store_backend: dict,
+        compression: str = "gzip",
+        root_directory: str = None,
+        suppress_store_backend_id: bool = False,
+        manually_initialize_store_backend_id: str = "",
+        store_name: str = None,
+    ):
+        super().__init__(
+            suppress_store_backend_id=suppress_store_backend_id,
+            manually_initialize_store_backend_id=manually_initialize_store_backend_id,
+            store_name=store_name,
+        )
+        if compression not in RECORD_SUFFIXES:
+            raise ValueError(
+                f"Unknown compression '{compression}', compression should be one of "
+                f"{list(RECORD_SUFFIXES)}"
+            )
+        self.compression = compression
+        self.root_directory = root_directory
+        self.loose_store_backend = self._build_store_backend(store_backend, "loose")
+        self.segments_store_backend = self._build_store_backend(
+            store_backend, "segments"
+        )
+        self._dict_index_files = {}
+        self._dict_index = None
+        self._config = {
+            "store_backend": store_backend,
+            "compression": compression,
+            "suppress_store_backend_id": suppress_store_backend_id,
+            "manually_initialize_store_backend_id": manually_initialize_store_backend_id,
+            "store_name": store_name,
+            "module_name": self.__class__.__module__,
+            "class_name": self.__class__.__name__,
+        }
+
+    @property
+    def config(self) -> dict:
+        return self._config
+
+    def _build_store_backend(self, config: dict, name: str):
+        """Helper function to instantiate the store backend for either loose records or
+        segments, in a subdirectory (or under a subprefix) of the configured one"""
+        config = copy.deepcopy(config)
+        if "base_directory" in config:
+            config["base_directory"] = os.path.join(config["base_directory"], name)
+        else:
+            config["prefix"] = "/".join(
+                part for part in (config.get("prefix", "").strip("/"), name) if part
+            )
+
+        return instantiate_class_from_config(
+            config=config,
+            runtime_environment={"root_directory": self.root_directory},
+            config_defaults={
+                "module_name": "great_expectations.data_context.store",
+                "suppress_store_backend_id": True,
+            },
+        )
+
+    def _get_loose_keys(self, key: tuple) -> list:
+        """Helper function to get the possible keys of the loose record of a key, for
+        the configured compression first"""
+        suffixes = [RECORD_SUFFIXES[self.compression]] + [
+            suffix
+            for compression, suffix in RECORD_SUFFIXES.items()
+            if compression != self.compression
+        ]
+        return [(*key[:-1], key[-1] + suffix) for suffix in suffixes]
+
+    def _get_key_of_loose_key(self, loose_key: tuple):
+        """Helper function to get the key of a loose record from its own key, or None
+        if it is not a record"""
+        for suffix in RECORD_SUFFIXES.values():
+            if loose_key[-1].endswith(suffix):
+                return (*loose_key[:-1], loose_key[-1][: -len(suffix)])
+
+        return None
+
+    def _read_loose_record(self, loose_key: tuple):
+        """Helper function to read and decompress a loose record, or to return None if
+        it does not exist"""
+        try:
+            record = read_store_backend_bytes(self.loose_store_backend, loose_key)
+        except InvalidKeyError:
+            return None
+
+        return decompress_store_record(record)
+
+    def load_index(self, refresh: bool = False) -> dict:
+        """Function to load the indices of all segments, mapping each compacted key to
+        the segment and byte range of its record. Indices of segments that were loaded
+        before are cached, so refreshing only loads indices of new segments"""
+        if self._dict_index is not None and not refresh:
+            return self._dict_index
+
+        index_keys = [
+            key
+            for key in self.segments_store_backend.list_keys()
+            if key[-1].endswith(".index.json")
+        ]
+        for index_key in index_keys:
+            if index_key not in self._dict_index_files:
+                self._dict_index_files[index_key] = json.loads(
+                    self.segments_store_backend.get(index_key)
+                )
+        for index_key in set(self._dict_index_files) - set(index_keys):
+            del self._dict_index_files[index_key]
+
+        self._dict_index = {}
+        for index_key, index in self._dict_index_files.items():
+            segment_key = (*index_key[:-1], index["segment"])
+            for key, offset, length in index["records"]:
+                self._dict_index[tuple(key)] = (segment_key, offset, length)
+
+        return self._dict_index
+
+    def _find_in_index(self, key: tuple):
+        """Helper function to find the segment and byte range of a compacted key,
+        refreshing the index once if the key is not in it"""
+        location = self.load_index().get(key)
+        if location is None:
+            location = self.load_index(refresh=True).get(key)
+
+        return location
+
+    def _get(self, key):
+        # -- Check loose records with the configured compression first, as the index
+        # is only refreshed for keys that are not found
+        loose_keys = self._get_loose_keys(key)
+        value = self._read_loose_record(loose_keys[0])
+        if value is not None:
+            return value
+
+        location = self._find_in_index(key)
+        if location is not None:
+            segment_key, offset, length = location
+            return decompress_store_record(
+                read_store_backend_bytes(
+                    self.segments_store_backend, segment_key, offset, length
+                )
+            )
+
+        for loose_key in loose_keys[1:]:
+            value = self._read_loose_record(loose_key)
+            if value is not None:
+                return value
+
+        raise InvalidKeyError(
+            f"Unable to retrieve object from CompressedValidationsStoreBackend with "
+            f"the following Key: {key}"
+        )
+
+    def _set(self, key, value, **kwargs):
+        return self.loose_store_backend.set(
+            self._get_loose_keys(key)[0],
+            compress_store_record(value, self.compression),
+            content_type="application/octet-stream",
+        )
+
+    def _move(self, source_key, dest_key, **kwargs):
+        self._set(dest_key, self._get(source_key))
+        self.remove_key(source_key)
+
+        return dest_key
+
+    def _has_key(self, key):
+        return any(
+            self.loose_store_backend.has_key(loose_key)
+            for loose_key in self._get_loose_keys(key)
+        ) or (self._find_in_index(key) is not None)
+
+    def list_keys(self, prefix: tuple = ()) -> list:
+        keys = {
+            self._get_key_of_loose_key(loose_key)
+            for loose_key in self.loose_store_backend.list_keys()
+        }
+        keys.update(self.load_index(refresh=True))
+        keys.discard(None)
+        keys.discard(self.STORE_BACKEND_ID_KEY)
+
+        return [key for key in keys if key[: len(prefix)] == tuple(prefix)]
+
+    def remove_key(self, key):
+        removed = False
+        for loose_key in self._get_loose_keys(key):
+            if self.loose_store_backend.has_key(loose_key):
+                removed = self.loose_store_backend.remove_key(loose_key) or removed
+
+        # -- Segments are immutable, so compacted keys are removed from their index
+        location = self._find_in_index(key)
+        if location is not None:
+            segment_key = location[0]
+            index_key = (*segment_key[:-1], segment_key[-1][:-4] + ".index.json")
+            index = self._dict_index_files[index_key]
+            index["records"] = [
+                record for record in index["records"] if tuple(record[0]) != key
+            ]
+            self.segments_store_backend.set(index_key, json.dumps(index))
+            del self._dict_index[key]
+            removed = True
+
+        return removed
+
+    def compact(self, max_records: int = None) -> dict:
+        """Function to compact loose records into segments, one for each partition of
+        data asset and date (see get_validation_partition), after which the loose
+        records are removed. Records are copied into segments as they are, without
+        compressing them again. Compaction should not run concurrently with itself,
+        but validation results can be stored and read meanwhile
+
+        Parameters
+        ----------
+        max_records : int, optional
+            Maximum number of loose records to compact, e.g. to stay within a time
+            limit, by default None
+
+        Returns
+        -------
+        dict
+            A dictionary with the number of records that were compacted and the number
+            of segments that were written
+        """
+        # -- 1. Read loose records and group them by partition
+        loose_keys = [
+            loose_key
+            for loose_key in self.loose_store_backend.list_keys()
+            if self._get_key_of_loose_key(loose_key)
+            not in (None, self.STORE_BACKEND_ID_KEY)
+        ][:max_records]
+
+        dict_partitions = {}
+        for loose_key in loose_keys:
+            key = self._get_key_of_loose_key(loose_key)
+            record = read_store_backend_bytes(self.loose_store_backend, loose_key)
+            partition = get_validation_partition(
+                key, json.loads(decompress_store_record(record))
+            )
+            dict_partitions.setdefault(partition, []).append((key, loose_key, record))
+
+        # -- 2. Write a segment and its index per partition, then remove loose records
+        for partition, list_records in dict_partitions.items():
+            segment_id = (
+                f"{datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+                f"-{uuid.uuid4().hex[:8]}"
+            )
+            index = {"segment": f"{segment_id}.seg", "records": []}
+            offset = 0
+            for key, _, record in list_records:
+                index["records"].append([list(key), offset, len(record)])
+                offset += len(record)
+
+            self.segments_store_backend.set(
+                (*partition, index["segment"]),
+                b"".join(record for _, _, record in list_records),
+                content_type="application/octet-stream",
+            )
+            self.segments_store_backend.set(
+                (*partition, f"{segment_id}.index.json"), json.dumps(index)
+            )
+            for _, loose_key, _ in list_records:
+                self.loose_store_backend.remove_key(loose_key)
+
+        logger.info(
+            f"Compacted {len(loose_keys)} validation results into "
+            f"{len(dict_partitions)} segments"
+        )
+
+        return {"compacted": len(loose_keys), "segments": len(dict_partitions)}
+
+
+def compact_validations_store(
+    context: ge.data_context.DataContext, max_records: int = None
+) -> dict:
+    """Function to compact the validations store of a DataContext, if it uses a
+    CompressedValidationsStoreBackend (see CompressedValidationsStoreBackend.compact).
+    Otherwise, nothing is done
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    max_records : int, optional
+        Maximum number of validation results to compact, by default None
+
+    Returns
+    -------
+    dict
+        A dictionary with the number of validation results that were compacted and the
+        number of segments that were written
+    """
+    store_backend = context.stores[context.validations_store_name].store_backend
+    if not isinstance(store_backend, CompressedValidationsStoreBackend):
+        logger.info("Validations store is not compressed, skipping compaction")
+        return {"compacted": 0, "segments": 0}
+
+    return store_backend.compact(max_records)
@@ -0,0 +1,148 @@
+"""Functions for recording the cost of expectations and ordering them by it"""
+
+# -- Imports
+import datetime
+import json
+import logging
+import pandas as pd
+
+from grater_functions.validation import get_expectation_id, get_expectation_tier
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for cost-based ordering of expectations
+# NOTE: only expectations in the blocking tier are profiled. They are validated one by
+# one (see TieredValidator), so the time of each call is the cost of a single
+# expectation. Expectations in other tiers are validated together per tier, sharing
+# metrics, so their individual cost is not known and they are not recorded
+PROFILED_TIER = "blocking"
+
+
+def load_cost_profile(store_backend, expectation_suite_name: str) -> dict:
+    """Function to load the cost profile of an expectation suite, which contains the
+    recorded runtime of each of its expectations. If no cost profile has been stored
+    yet, an empty profile is returned
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for cost profiles, generally obtained by calling
+        get_grater_store_backend with name "cost_profiles"
+    expectation_suite_name : str
+        Name of the expectation suite to load the cost profile for
+
+    Returns
+    -------
+    dict
+        The cost profile of the expectation suite
+    """
+    key = (expectation_suite_name,)
+    if store_backend.has_key(key):
+        return json.loads(store_backend.get(key))
+
+    logger.info(f"No cost profile found for {expectation_suite_name}, starting one")
+    return {"expectation_suite_name": expectation_suite_name, "expectations": {}}
+
+
+def save_cost_profile(store_backend, cost_profile: dict):
+    """Function to store the cost profile of an expectation suite
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for cost profiles, generally obtained by calling
+        get_grater_store_backend with name "cost_profiles"
+    cost_profile : dict
+        Cost profile to store, as loaded with load_cost_profile
+    """
+    cost_profile["updated_at"] = datetime.datetime.now(
+        datetime.timezone.utc
+    ).isoformat()
+    store_backend.set(
+        (cost_profile["expectation_suite_name"],), json.dumps(cost_profile, indent=2)
+    )
+
+
+def update_cost_profile(
+    cost_profile: dict, expectation_config, seconds: float, smoothing: float = 0.5
+):
+    """Function to record the runtime of an expectation in the blocking tier in a cost
+    profile. The cost of the expectation is kept as an exponential moving average over
+    runs, so that a single slow run does not immediately reorder the expectation suite
+
+    Parameters
+    ----------
+    cost_profile : dict
+        Cost profile to update in place, as loaded with load_cost_profile
+    expectation_config : ExpectationConfiguration
+        Configuration of the expectation that was validated
+    seconds : float
+        Time it took to validate the expectation
+    smoothing : float, optional
+        Weight of the latest runtime in the moving average, by default 0.5
+    """
+    expectation_id = get_expectation_id(expectation_config)
+    entry = cost_profile["expectations"].get(expectation_id)
+    if entry is None:
+        entry = {
+            "expectation_type": expectation_config.expectation_type,
+            "column": expectation_config.kwargs.get("column"),
+            "tier": get_expectation_tier(expectation_config),
+            "seconds": seconds,
+            "runs": 0,
+        }
+        cost_profile["expectations"][expectation_id] = entry
+
+    entry["seconds"] = smoothing * seconds + (1 - smoothing) * entry["seconds"]
+    entry["last_seconds"] = seconds
+    entry["runs"] += 1
+
+
+def get_expectation_cost(cost_profile: dict, expectation_config) -> float:
+    """Helper function to get the recorded cost of an expectation in seconds. Unknown
+    expectations have a cost of 0, so that they are validated (and timed) first"""
+    entry = cost_profile["expectations"].get(get_expectation_id(expectation_config))
+    return entry["seconds"] if entry else 0.0
+
+
+def get_cost_profile_report(cost_profile: dict) -> pd.DataFrame:
+    """Function to generate a report of a cost profile, showing which expectations
+    dominate the time it takes to validate the blocking tier of the expectation suite.
+    Only the blocking tier is profiled (see PROFILED_TIER), so the report does not
+    cover expectations in other tiers
+
+    Parameters
+    ----------
+    cost_profile : dict
+        Cost profile to report on, as loaded with load_cost_profile
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame with the type, column, tier, average and last runtime in seconds,
+        number of runs and share of the runtime of the blocking tier (in percent) of
+        each expectation, sorted from most to least expensive
+    """
+    df_report = pd.DataFrame(
+        [
+            entry
+            for entry in cost_profile["expectations"].values()
+            if entry.get("tier") == PROFILED_TIER
+        ],
+        columns=[
+            "expectation_type",
+            "column",
+            "tier",
+            "seconds",
+            "last_seconds",
+            "runs",
+        ],
+    )
+    total_seconds = df_report["seconds"].sum()
+    df_report["percent_of_tier"] = (
+        df_report["seconds"] / total_seconds * 100 if total_seconds else 0.0
+    )
+
+    return df_report.sort_values("seconds", ascending=False).reset_index(drop=True)
@@ -0,0 +1,381 @@
+"""Functions for building Data Docs incrementally"""
+
+# -- Imports
+import datetime
+import heapq
+import json
+import logging
+import traceback
+import great_expectations as ge
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.data_context.types.resource_identifiers import (
+    ExpectationSuiteIdentifier,
+    SiteSectionIdentifier,
+    ValidationResultIdentifier,
+)
+from great_expectations.data_context.util import instantiate_class_from_config
+from great_expectations.core.util import convert_to_json_serializable
+from great_expectations.render.util import resource_key_passes_run_name_filter
+
+from grater_functions.data_docs_index import render_sharded_index
+from grater_functions.tiers import register_skipped_status_icon_renderer
+from grater_functions.validation import hash_expectation_suite
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for building Data Docs incrementally
+# NOTE: a manifest of the pages rendered for a Data Docs site is kept in a Grater store
+# backend (see get_grater_store_backend). Each build only renders and uploads pages for
+# validation results that are not in the manifest yet and for expectation suites that
+# changed, after which the index page is rendered from the manifest instead of by
+# loading every stored validation result. A build still lists the keys of the
+# validations store to find new and removed validation results, unless it is given the
+# keys that changed (e.g. by DataDocsRebuildScheduler), and loads every expectation
+# suite to compare its hash. The manifest holds an entry per validation result on the
+# site, so it grows with the validation history
+def get_site_builder(context: ge.data_context.DataContext, site_name: str = None):
+    """Function to instantiate the SiteBuilder of a Data Docs site configured in the
+    DataContext, as done by context.build_data_docs. Defaults to the first site"""
+    sites = context.project_config_with_variables_substituted.data_docs_sites
+    site_name = site_name or list(sites.keys())[0]
+
+    return instantiate_class_from_config(
+        config=sites[site_name],
+        runtime_environment={
+            "data_context": context,
+            "root_directory": context.root_directory,
+            "site_name": site_name,
+        },
+        config_defaults={
+            "module_name": "great_expectations.render.renderer.site_builder"
+        },
+    )
+
+
+def load_data_docs_manifest(store_backend, site_name: str) -> dict:
+    """Function to load the manifest of the pages rendered for a Data Docs site from a
+    store backend, or to create an empty manifest if the site was not built before"""
+    if store_backend.has_key((site_name,)):
+        return json.loads(store_backend.get((site_name,)))
+
+    return new_data_docs_manifest(site_name)
+
+
+def new_data_docs_manifest(site_name: str) -> dict:
+    """Helper function to create an empty manifest for a Data Docs site"""
+    return {
+        "site_name": site_name,
+        "static_assets_version": None,
+        "index_page_size": None,
+        "expectation_suites": {},
+        "validations": {},
+    }
+
+
+def save_data_docs_manifest(store_backend, manifest: dict):
+    """Function to save the manifest of the pages rendered for a Data Docs site to a
+    store backend"""
+    manifest["updated_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    store_backend.set((manifest["site_name"],), json.dumps(manifest, indent=2))
+
+
+def get_validation_link(site_builder, validation_result_key, validation_result) -> dict:
+    """Helper function to generate the entry of a validation result on the index page
+    of a Data Docs site, in the same way as DefaultSiteIndexBuilder"""
+    batch_kwargs = validation_result.meta.get("batch_kwargs", {})
+    batch_spec = validation_result.meta.get("batch_spec", {})
+    index_links_dict = site_builder.site_index_builder.add_resource_info_to_index_links_dict(
+        index_links_dict={},
+        expectation_suite_name=validation_result_key.expectation_suite_identifier.expectation_suite_name,
+        section_name="validations",
+        batch_identifier=validation_result_key.batch_identifier,
+        run_id=validation_result_key.run_id,
+        validation_success=validation_result.success,
+        run_time=validation_result_key.run_id.run_time,
+        run_name=validation_result_key.run_id.run_name,
+        asset_name=batch_kwargs.get("data_asset_name")
+        or batch_spec.get("data_asset_name"),
+        batch_kwargs=batch_kwargs,
+        batch_spec=batch_spec,
+    )
+    link = convert_to_json_serializable(index_links_dict["validations_links"][0])
+    link["resource_key"] = list(validation_result_key.to_tuple())
+
+    return link
+
+
+def render_site_page_content(site_builder, section_name: str, resource) -> str:
+    """Helper function to render the HTML of the page of an expectation suite or
+    validation result, with the renderer and view of its section of the site"""
+    section_builder = site_builder.site_section_builders[section_name]
+    rendered_content = section_builder.renderer_class.render(resource)
+
+    return section_builder.view_class.render(
+        rendered_content,
+        data_context_id=site_builder.data_context_id,
+        show_how_to_buttons=site_builder.show_how_to_buttons,
+    )
+
+
+def render_site_page(site_builder, section_name: str, resource_key, resource) -> bool:
+    """Function to render the page of an expectation suite or validation result and
+    write it to the Data Docs site. Like DefaultSiteSectionBuilder, rendering errors
+    are logged instead of raised
+
+    Parameters
+    ----------
+    site_builder : SiteBuilder
+        SiteBuilder of the Data Docs site, as returned by get_site_builder
+    section_name : str
+        Name of the section of the site to render the page for, i.e. "expectations"
+        or "validations"
+    resource_key : ExpectationSuiteIdentifier or ValidationResultIdentifier
+        Key of the resource in its source store
+    resource : ExpectationSuite or ExpectationSuiteValidationResult
+        The resource to render
+
+    Returns
+    -------
+    bool
+        True if the page was rendered and written to the site, False otherwise
+    """
+    try:
+        site_builder.target_store.set(
+            SiteSectionIdentifier(
+                site_section_name=section_name, resource_identifier=resource_key
+            ),
+            render_site_page_content(site_builder, section_name, resource),
+        )
+    except Exception:
+        logger.error(
+            f"Rendering the Data Docs page for {resource_key.to_tuple()} failed, "
+            f"skipping it: {traceback.format_exc()}"
+        )
+        return False
+
+    return True
+
+
+def render_index_page(site_builder, manifest: dict) -> str:
+    """Function to render the index page of a Data Docs site from its manifest and
+    write it to the site, without loading any validation results
+
+    Parameters
+    ----------
+    site_builder : SiteBuilder
+        SiteBuilder of the Data Docs site, as returned by get_site_builder
+    manifest : dict
+        Manifest of the pages rendered for the site
+
+    Returns
+    -------
+    str
+        Location of the index page that was written
+    """
+    index_builder = site_builder.site_index_builder
+
+    # -- 1. Collect links to expectation suites and validation results
+    index_links_dict = {"site_name": site_builder.site_name}
+    if site_builder.show_how_to_buttons:
+        index_links_dict["cta_object"] = index_builder.get_calls_to_action()
+    for expectation_suite_name in sorted(manifest["expectation_suites"]):
+        index_builder.add_resource_info_to_index_links_dict(
+            index_links_dict=index_links_dict,
+            expectation_suite_name=expectation_suite_name,
+            section_name="expectations",
+        )
+    if index_builder.validation_results_limit:
+        validation_links = heapq.nlargest(
+            index_builder.validation_results_limit,
+            manifest["validations"].values(),
+            key=lambda link: link["run_time"],
+        )
+    else:
+        validation_links = sorted(
+            manifest["validations"].values(),
+            key=lambda link: link["run_time"],
+            reverse=True,
+        )
+    index_links_dict["validations_links"] = validation_links
+
+    # -- 2. Render and write index page
+    rendered_content = index_builder.renderer_class.render(index_links_dict)
+    viewable_content = index_builder.view_class.render(
+        rendered_content,
+        data_context_id=site_builder.data_context_id,
+        show_how_to_buttons=site_builder.show_how_to_buttons,
+    )
+
+    return site_builder.target_store.write_index_page(viewable_content)
+
+
+def build_data_docs_incrementally(
+    context: ge.data_context.DataContext,
+    manifest_store_backend,
+    site_name: str = None,
+    max_new_validations: int = None,
+    index_page_size: int = None,
+    validation_result_keys: list = None,
+) -> dict:
+    """Function to update a Data Docs site with only the validation results and
+    expectation suites that changed since it was last built, instead of rebuilding the
+    whole site like context.build_data_docs. Pages that are already on the site are
+    tracked in a manifest (see load_data_docs_manifest), so that only new pages are
+    rendered and uploaded. Pages of validation results that were removed from the
+    validations store are removed from the site. The index is only rendered again if
+    the site changed, and then from the manifest. Finding the changes still lists the
+    keys of the validations store (unless validation_result_keys is given) and loads
+    every expectation suite, so only rendering and uploading pages is incremental
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    manifest_store_backend : TupleStoreBackend
+        Store backend to keep the manifest of the site in, as returned by
+        get_grater_store_backend
+    site_name : str, optional
+        Name of the Data Docs site to build, by default the first site configured in
+        the DataContext
+    max_new_validations : int, optional
+        Maximum number of new validation results to render, starting with the most
+        recent ones. Can be used to catch up on a large backlog over several builds
+        within a time limit (e.g. of AWS Lambda), by default None
+    index_page_size : int, optional
+        If given, the index is sharded by data asset and month into pages with at most
+        this number of validation results (see render_sharded_index), instead of
+        listing all validation results on index.html, by default None
+    validation_result_keys : list, optional
+        Keys of the validation results that were stored since the last build, as
+        ValidationResultIdentifier or tuple (e.g. from the notifications of
+        DataDocsRebuildScheduler), by default None. If given, these are rendered
+        (again) without listing the validations store, or removed from the site if
+        they are no longer in the store. Other validation results that were removed
+        from the store are only removed from the site by a build without keys
+
+    Returns
+    -------
+    dict
+        A dictionary with the name of the site as key and the URL of its index page as
+        value, like the output of context.build_data_docs
+    """
+    register_skipped_status_icon_renderer()
+    site_builder = get_site_builder(context, site_name)
+    manifest = load_data_docs_manifest(manifest_store_backend, site_builder.site_name)
+    dict_sections = site_builder.site_section_builders
+
+    # -- 1. Copy static assets if the site was not built with this GE version before
+    site_changed = False
+    if manifest["static_assets_version"] != ge.__version__:
+        site_builder.target_store.copy_static_assets()
+        manifest["static_assets_version"] = ge.__version__
+        site_changed = True
+
+    # -- 2. Render pages of expectation suites that are new or changed
+    if "expectations" in dict_sections:
+        expectations_store = dict_sections["expectations"].source_store
+        suite_hashes = {}
+        for suite_key in expectations_store.list_keys():
+            suite_dict = expectations_store.get(suite_key)
+            suite_name = suite_key.expectation_suite_name
+            suite_hash = hash_expectation_suite(suite_dict)
+            if manifest["expectation_suites"].get(suite_name) == suite_hash:
+                suite_hashes[suite_name] = suite_hash
+            elif render_site_page(
+                site_builder,
+                "expectations",
+                suite_key,
+                ExpectationSuite(**suite_dict, data_context=context),
+            ):
+                suite_hashes[suite_name] = suite_hash
+                site_changed = True
+
+        for suite_name in set(manifest["expectation_suites"]) - set(suite_hashes):
+            site_builder.target_store.store_backends[
+                ExpectationSuiteIdentifier
+            ].remove_key(ExpectationSuiteIdentifier(suite_name).to_tuple())
+            site_changed = True
+        manifest["expectation_suites"] = suite_hashes
+
+    # -- 3. Render pages of validation results that are not on the site yet, or of
+    # -- the given validation results
+    if "validations" in dict_sections:
+        validations_section = dict_sections["validations"]
+        if validation_result_keys is None:
+            source_keys = validations_section.source_store.list_keys()
+        else:
+            source_keys = [
+                (
+                    key
+                    if isinstance(key, ValidationResultIdentifier)
+                    else ValidationResultIdentifier.from_tuple(tuple(key))
+                )
+                for key in validation_result_keys
+            ]
+        dict_source_keys = {
+            "/".join(key.to_tuple()): key
+            for key in source_keys
+            if resource_key_passes_run_name_filter(
+                key, validations_section.run_name_filter
+            )
+        }
+
+        if validation_result_keys is None:
+            removed_keys = set(manifest["validations"]) - set(dict_source_keys)
+            changed_keys = set(dict_source_keys) - set(manifest["validations"])
+        else:
+            changed_keys = {
+                key_string
+                for key_string, key in dict_source_keys.items()
+                if validations_section.source_store.has_key(key)
+            }
+            removed_keys = (set(dict_source_keys) - changed_keys) & set(
+                manifest["validations"]
+            )
+        for key_string in removed_keys:
+            resource_key = manifest["validations"].pop(key_string)["resource_key"]
+            site_builder.target_store.store_backends[
+                ValidationResultIdentifier
+            ].remove_key(tuple(resource_key))
+
+        new_keys = sorted(
+            changed_keys,
+            key=lambda key_string: dict_source_keys[key_string].run_id.run_time,
+            reverse=True,
+        )[:max_new_validations]
+        for key_string in new_keys:
+            validation_result_key = dict_source_keys[key_string]
+            validation_result = validations_section.source_store.get(
+                validation_result_key
+            )
+            if render_site_page(
+                site_builder, "validations", validation_result_key, validation_result
+            ):
+                manifest["validations"][key_string] = get_validation_link(
+                    site_builder, validation_result_key, validation_result
+                )
+        site_changed = site_changed or bool(new_keys or removed_keys)
+
+        logger.info(
+            f"Rendered {len(new_keys)} new validation results for Data Docs site "
+            f"{site_builder.site_name} and removed {len(removed_keys)}"
+        )
+
+    # -- 4. Render index page from the manifest if the site changed, and save the
+    # -- manifest
+    if site_changed or manifest.get("index_page_size") != index_page_size:
+        if index_page_size:
+            render_sharded_index(site_builder, manifest, index_page_size)
+        else:
+            render_index_page(site_builder, manifest)
+        manifest["index_page_size"] = index_page_size
+        save_data_docs_manifest(manifest_store_backend, manifest)
+    else:
+        logger.info(
+            f"Data Docs site {site_builder.site_name} did not change, not rendering "
+            "its index again"
+        )
+
+    return {site_builder.site_name: site_builder.get_resource_url(only_if_exists=False)}
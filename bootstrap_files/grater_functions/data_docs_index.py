@@ -0,0 +1,343 @@
+"""Functions for building a sharded Data Docs index"""
+
+# -- Imports
+import hashlib
+import heapq
+import json
+import logging
+import re
+from great_expectations.render.types import (
+    RenderedBootstrapTableContent,
+    RenderedHeaderContent,
+    RenderedSectionContent,
+    RenderedStringTemplateContent,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for building a sharded Data Docs index
+# NOTE: with a long history of validation results, the single index page of Great
+# Expectations becomes too large to build and to load in a browser. Instead, the
+# index can be sharded by data asset and month into paginated pages, which are placed
+# next to index.html (so that their links to static assets and validation results
+# remain valid), together with a JSON search index. Only shards with new or removed
+# validation results are rendered again
+def get_index_shard_id(validation_link: dict) -> str:
+    """Helper function to get the shard of the index of a Data Docs site that a
+    validation result belongs to, made up of its data asset and the month it ran in"""
+    asset_name = validation_link.get("asset_name") or "unknown_asset"
+    return f"{asset_name}|{validation_link['run_time'][:7]}"
+
+
+def get_index_shard_filename(shard_id: str, page: int = None) -> str:
+    """Helper function to get the filename of a page of a shard of the index (or of
+    its JSON search index if no page is given), which is safe to use in a URL"""
+    asset_name, month = shard_id.rsplit("|", 1)
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", asset_name).strip("-")[:50]
+    digest = hashlib.md5(asset_name.encode("utf-8")).hexdigest()[:6]
+    if page is None:
+        return f"index_{slug}_{digest}_{month}.json"
+
+    return f"index_{slug}_{digest}_{month}_{page}.html"
+
+
+def write_site_file(site_builder, filename: str, content: str, content_type: str):
+    """Helper function to write a file to the root of a Data Docs site"""
+    site_builder.target_store.store_backends["static_assets"].set(
+        (filename,), content, content_encoding="utf-8", content_type=content_type
+    )
+
+
+def render_index_document(
+    site_builder, index_links_dict: dict, extra_sections: list = ()
+) -> str:
+    """Function to render a page of the index of a Data Docs site with the renderer
+    and view of its site index builder, adding extra sections below the tables of
+    expectation suites and validation results
+
+    Parameters
+    ----------
+    site_builder : SiteBuilder
+        SiteBuilder of the Data Docs site, as returned by get_site_builder
+    index_links_dict : dict
+        Links to expectation suites and validation results to render, in the format
+        of DefaultSiteIndexBuilder
+    extra_sections : list, optional
+        List of RenderedSectionContent to add to the page, by default ()
+
+    Returns
+    -------
+    str
+        The rendered HTML page
+    """
+    index_builder = site_builder.site_index_builder
+    rendered_content = index_builder.renderer_class.render(index_links_dict)
+    rendered_content.sections.extend(extra_sections)
+
+    return index_builder.view_class.render(
+        rendered_content,
+        data_context_id=site_builder.data_context_id,
+        show_how_to_buttons=site_builder.show_how_to_buttons,
+    )
+
+
+def render_link_block(text: str, href: str) -> RenderedStringTemplateContent:
+    """Helper function to render a link for a page of a Data Docs site"""
+    return RenderedStringTemplateContent(
+        **{
+            "content_block_type": "string_template",
+            "string_template": {
+                "template": "$link_text",
+                "params": {"link_text": text},
+                "tag": "a",
+                "styling": {
+                    "attributes": {"href": href},
+                    "classes": ["btn", "btn-sm", "btn-outline-secondary", "mr-2"],
+                },
+            },
+        }
+    )
+
+
+def render_shard_table_section(dict_shards: dict) -> RenderedSectionContent:
+    """Function to render the section of the main index page that lists the shards of
+    the index, linking to the first page of each shard"""
+    table_data = [
+        {
+            "asset_name": shard["asset_name"],
+            "month": shard["month"],
+            "n_results": shard["n_results"],
+            "n_failed": shard["n_failed"],
+            "n_pages": shard["n_pages"],
+            "_table_row_link_path": get_index_shard_filename(shard_id, 1),
+        }
+        for shard_id, shard in dict_shards.items()
+    ]
+    table_columns = [
+        {"field": "asset_name", "title": "Asset Name", "sortable": "true"},
+        {"field": "month", "title": "Month", "sortable": "true"},
+        {"field": "n_results", "title": "Validations", "sortable": "true"},
+        {"field": "n_failed", "title": "Failed", "sortable": "true"},
+        {"field": "n_pages", "title": "Pages"},
+    ]
+    table_options = {
+        "search": "true",
+        "trimOnSearch": "false",
+        "visibleSearch": "true",
+        "rowStyle": "rowStyleLinks",
+        "rowAttributes": "rowAttributesLinks",
+        "sortName": "month",
+        "sortOrder": "desc",
+        "pagination": "true",
+        "iconSize": "sm",
+        "toolbarAlign": "right",
+    }
+
+    return RenderedSectionContent(
+        **{
+            "section_name": "Validation history",
+            "content_blocks": [
+                RenderedHeaderContent(
+                    **{
+                        "content_block_type": "header",
+                        "header": "Validation history by data asset and month",
+                        "styling": {"classes": ["col-12", "mt-4"]},
+                    }
+                ),
+                RenderedBootstrapTableContent(
+                    **{
+                        "table_columns": table_columns,
+                        "table_data": table_data,
+                        "table_options": table_options,
+                        "styling": {
+                            "classes": ["col-12", "ge-index-page-table-container"],
+                            "body": {"classes": ["table-sm"]},
+                        },
+                    }
+                ),
+            ],
+        }
+    )
+
+
+def render_sharded_index(site_builder, manifest: dict, page_size: int = 500) -> str:
+    """Function to render the index of a Data Docs site from its manifest, sharded by
+    data asset and month into pages of at most page_size validation results. The main
+    index page lists the expectation suites, the most recent validation results and
+    the shards of the index. Next to the pages, a JSON search index is written:
+    search_index.json lists the shards, and each shard has a JSON file with its
+    validation results. Only shards that changed since the last build are rendered
+
+    Parameters
+    ----------
+    site_builder : SiteBuilder
+        SiteBuilder of the Data Docs site, as returned by get_site_builder
+    manifest : dict
+        Manifest of the pages rendered for the site, which is updated with the shards
+        of the index
+    page_size : int, optional
+        Maximum number of validation results on a page, by default 500
+
+    Returns
+    -------
+    str
+        Location of the main index page that was written
+    """
+    # -- 1. Group validation results by shard
+    dict_shard_keys = {}
+    for key_string, link in manifest["validations"].items():
+        dict_shard_keys.setdefault(get_index_shard_id(link), []).append(key_string)
+
+    # -- 2. Render pages and search index of shards that changed
+    dict_shards = {}
+    previous_shards = manifest.get("index_shards", {})
+    n_rendered = 0
+    for shard_id, key_strings in sorted(dict_shard_keys.items()):
+        digest = hashlib.md5("\n".join(sorted(key_strings)).encode("utf-8")).hexdigest()
+        previous_shard = previous_shards.get(shard_id, {})
+        links = sorted(
+            (manifest["validations"][key_string] for key_string in key_strings),
+            key=lambda link: link["run_time"],
+            reverse=True,
+        )
+        n_pages = -(-len(links) // page_size)
+        dict_shards[shard_id] = {
+            "asset_name": shard_id.rsplit("|", 1)[0],
+            "month": shard_id.rsplit("|", 1)[1],
+            "n_results": len(links),
+            "n_failed": sum(not link["validation_success"] for link in links),
+            "n_pages": n_pages,
+            "page_size": page_size,
+            "digest": digest,
+        }
+        if previous_shard.get("digest") == digest and (
+            previous_shard.get("page_size") == page_size
+        ):
+            continue
+
+        shard = dict_shards[shard_id]
+        for page in range(1, n_pages + 1):
+            navigation = [render_link_block("Index", "index.html")]
+            if page > 1:
+                navigation.append(
+                    render_link_block(
+                        "Previous page", get_index_shard_filename(shard_id, page - 1)
+                    )
+                )
+            if page < n_pages:
+                navigation.append(
+                    render_link_block(
+                        "Next page", get_index_shard_filename(shard_id, page + 1)
+                    )
+                )
+            page_content = render_index_document(
+                site_builder,
+                {
+                    "site_name": f"{site_builder.site_name} | {shard['asset_name']} | "
+                    f"{shard['month']} | page {page} of {n_pages}",
+                    "validations_links": links[
+                        (page - 1) * page_size : page * page_size
+                    ],
+                },
+                [
+                    RenderedSectionContent(
+                        **{"section_name": "Navigation", "content_blocks": navigation}
+                    )
+                ],
+            )
+            write_site_file(
+                site_builder,
+                get_index_shard_filename(shard_id, page),
+                page_content,
+                "text/html; charset=utf-8",
+            )
+        for page in range(n_pages + 1, previous_shard.get("n_pages", 0) + 1):
+            site_builder.target_store.store_backends["static_assets"].remove_key(
+                (get_index_shard_filename(shard_id, page),)
+            )
+
+        write_site_file(
+            site_builder,
+            get_index_shard_filename(shard_id),
+            json.dumps(
+                [
+                    {
+                        field: link[field]
+                        for field in [
+                            "expectation_suite_name",
+                            "run_name",
+                            "run_time",
+                            "batch_identifier",
+                            "validation_success",
+                            "filepath",
+                        ]
+                    }
+                    for link in links
+                ]
+            ),
+            "application/json",
+        )
+        n_rendered += 1
+
+    # -- 3. Remove pages of shards without validation results
+    for shard_id in set(previous_shards) - set(dict_shards):
+        static_assets_backend = site_builder.target_store.store_backends[
+            "static_assets"
+        ]
+        for page in range(1, previous_shards[shard_id]["n_pages"] + 1):
+            static_assets_backend.remove_key(
+                (get_index_shard_filename(shard_id, page),)
+            )
+        static_assets_backend.remove_key((get_index_shard_filename(shard_id),))
+    manifest["index_shards"] = dict_shards
+    logger.info(
+        f"Rendered {n_rendered} of {len(dict_shards)} shards of the Data Docs index"
+    )
+
+    # -- 4. Write search index and main index page
+    write_site_file(
+        site_builder,
+        "search_index.json",
+        json.dumps(
+            [
+                {
+                    "asset_name": shard["asset_name"],
+                    "month": shard["month"],
+                    "n_results": shard["n_results"],
+                    "n_failed": shard["n_failed"],
+                    "results": get_index_shard_filename(shard_id),
+                    "pages": [
+                        get_index_shard_filename(shard_id, page)
+                        for page in range(1, shard["n_pages"] + 1)
+                    ],
+                }
+                for shard_id, shard in dict_shards.items()
+            ]
+        ),
+        "application/json",
+    )
+
+    index_links_dict = {"site_name": site_builder.site_name}
+    if site_builder.show_how_to_buttons:
+        index_links_dict["cta_object"] = (
+            site_builder.site_index_builder.get_calls_to_action()
+        )
+    for expectation_suite_name in sorted(manifest["expectation_suites"]):
+        site_builder.site_index_builder.add_resource_info_to_index_links_dict(
+            index_links_dict=index_links_dict,
+            expectation_suite_name=expectation_suite_name,
+            section_name="expectations",
+        )
+    index_links_dict["validations_links"] = heapq.nlargest(
+        page_size,
+        manifest["validations"].values(),
+        key=lambda link: link["run_time"],
+    )
+
+    return site_builder.target_store.write_index_page(
+        render_index_document(
+            site_builder, index_links_dict, [render_shard_table_section(dict_shards)]
+        )
+    )
@@ -0,0 +1,380 @@
+"""Functions for rendering and uploading Data Docs in parallel"""
+
+# -- Imports
+import hashlib
+import logging
+import mimetypes
+import multiprocessing
+import os
+import re
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import great_expectations as ge
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.render.util import resource_key_passes_run_name_filter
+
+from store_backend_io import get_site_uploader
+from grater_functions.data_docs import (
+    get_site_builder,
+    get_validation_link,
+    load_data_docs_manifest,
+    new_data_docs_manifest,
+    render_index_page,
+    render_site_page_content,
+    save_data_docs_manifest,
+)
+from grater_functions.data_docs_index import render_sharded_index
+from grater_functions.parallel import collect_forked_processes, start_forked_processes
+from grater_functions.tiers import register_skipped_status_icon_renderer
+from grater_functions.validation import hash_expectation_suite
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for rendering and uploading Data Docs in parallel
+# NOTE: rebuilding a whole Data Docs site (e.g. after upgrading Great Expectations or
+# changing the configuration of the site) renders and uploads every page. Pages are
+# rendered in forked worker processes (see start_forked_processes) and uploaded by a
+# pool of threads that share a single client (see get_site_uploader). Files whose MD5
+# hash matches the file that is already on the site are not uploaded again. For this,
+# the parts of pages that Great Expectations generates anew on every render are made
+# deterministic (see normalize_site_page)
+RENDER_TIME_PATTERN = re.compile(r"(logo-long\.png\?d=)\d{8}T\d{6}\.\d{6}Z")
+ELEMENT_ID_PATTERN = re.compile(
+    r"(-collapse-body-)([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})"
+)
+
+
+def normalize_site_page(content: str) -> str:
+    """Helper function to make the HTML of a rendered page identical between builds,
+    by replacing the time of rendering in the URL of the logo with the version of
+    Great Expectations, and the random identifiers of collapsible elements with
+    identifiers numbered in order of appearance"""
+    content = RENDER_TIME_PATTERN.sub(rf"\g<1>{ge.__version__}", content)
+    dict_ids = {}
+
+    return ELEMENT_ID_PATTERN.sub(
+        lambda match: match.group(1)
+        + dict_ids.setdefault(match.group(2), str(uuid.UUID(int=len(dict_ids)))),
+        content,
+    )
+
+
+def hash_site_file(content) -> str:
+    """Helper function to compute the MD5 hash of the content of a file on a Data Docs
+    site, as used for S3 ETags and the Content-MD5 of Azure blobs"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    return hashlib.md5(content).hexdigest()
+
+
+def get_site_page_path(site_builder, resource_key) -> str:
+    """Helper function to get the path of the page of an expectation suite or
+    validation result, relative to the root of a Data Docs site"""
+    store_backend = site_builder.target_store.store_backends[type(resource_key)]
+    filepath = store_backend._convert_key_to_filepath(resource_key.to_tuple())
+
+    return filepath.replace(os.sep, "/")
+
+
+def list_static_asset_files() -> dict:
+    """Function to list the static assets of Data Docs sites (e.g. stylesheets, scripts
+    and images) that are shipped with Great Expectations, in the same way as
+    HtmlSiteStore.copy_static_assets
+
+    Returns
+    -------
+    dict
+        A dictionary with the path of each file relative to the root of a site as key
+        and a tuple with its content and content type as value
+    """
+    static_directory = os.path.join(
+        os.path.dirname(ge.__file__), "render", "view", "static"
+    )
+
+    dict_files = {}
+    for directory, _, filenames in os.walk(static_directory):
+        for filename in filenames:
+            if filename == ".DS_Store":
+                continue
+            content_type = mimetypes.guess_type(filename, strict=False)[0]
+            if content_type is None:
+                content_type = (
+                    "font/opentype"
+                    if filename.endswith(".otf")
+                    else "text/html; charset=utf8"
+                )
+            file_path = os.path.join(directory, filename)
+            site_path = os.path.relpath(
+                file_path, os.path.dirname(static_directory)
+            ).replace(os.sep, "/")
+            with open(file_path, "rb") as f:
+                dict_files[site_path] = (f.read(), content_type)
+
+    return dict_files
+
+
+def upload_site_files(
+    site_uploader, dict_files: dict, dict_hashes: dict, n_threads: int = 8
+) -> int:
+    """Function to upload files to a Data Docs site concurrently, skipping files whose
+    MD5 hash matches the hash of the file that is already on the site
+
+    Parameters
+    ----------
+    site_uploader : object
+        Uploader for the files of the site, as returned by get_site_uploader
+    dict_files : dict
+        Dictionary with the path of each file relative to the root of the site as key
+        and a tuple with its content and content type as value
+    dict_hashes : dict
+        Dictionary with the MD5 hashes of the files on the site by their path, as
+        returned by the list_hashes method of the uploader. Updated with the hashes of
+        the uploaded files
+    n_threads : int, optional
+        Number of threads to upload files with, by default 8
+
+    Returns
+    -------
+    int
+        Number of files that were uploaded
+    """
+    dict_changed = {}
+    for path, (content, content_type) in dict_files.items():
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        content_hash = hash_site_file(content)
+        if dict_hashes.get(path) != content_hash:
+            dict_changed[path] = (content, content_type, content_hash)
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        dict_futures = {
+            path: executor.submit(site_uploader.upload, path, content, content_type)
+            for path, (content, content_type, _) in dict_changed.items()
+        }
+        # -- Raise the first error that occurred while uploading, if any
+        for path, future in dict_futures.items():
+            future.result()
+            dict_hashes[path] = dict_changed[path][2]
+
+    return len(dict_changed)
+
+
+def _render_site_pages_in_worker(
+    site_builder, section_name: str, resource_keys: list
+) -> dict:
+    """Helper function that runs in a forked worker process and renders the pages of
+    a list of expectation suites or validation results. Rendering errors are logged
+    and the page is skipped, like in render_site_page
+
+    Returns
+    -------
+    dict
+        A dictionary with the key of each rendered resource as string (see
+        build_data_docs_incrementally) as key and a tuple with the path of its page,
+        the HTML of its page and its entry in the manifest of the site as value
+    """
+    source_store = site_builder.site_section_builders[section_name].source_store
+
+    dict_pages = {}
+    for resource_key in resource_keys:
+        try:
+            resource = source_store.get(resource_key)
+            if section_name == "expectations":
+                key_string = resource_key.expectation_suite_name
+                manifest_entry = hash_expectation_suite(resource)
+                resource = ExpectationSuite(
+                    **resource, data_context=site_builder.data_context
+                )
+            else:
+                key_string = "/".join(resource_key.to_tuple())
+                manifest_entry = get_validation_link(
+                    site_builder, resource_key, resource
+                )
+            content = normalize_site_page(
+                render_site_page_content(site_builder, section_name, resource)
+            )
+        except Exception:
+            logger.error(
+                f"Rendering the Data Docs page for {resource_key.to_tuple()} failed, "
+                f"skipping it: {traceback.format_exc()}"
+            )
+            continue
+        dict_pages[key_string] = (
+            get_site_page_path(site_builder, resource_key),
+            content,
+            manifest_entry,
+        )
+
+    return dict_pages
+
+
+def render_site_pages_in_parallel(
+    site_builder, section_name: str, resource_keys: list, n_workers: int
+) -> dict:
+    """Function to render the pages of a list of expectation suites or validation
+    results, spread over forked worker processes
+
+    Parameters
+    ----------
+    site_builder : SiteBuilder
+        SiteBuilder of the Data Docs site, as returned by get_site_builder
+    section_name : str
+        Name of the section of the site to render the pages for, i.e. "expectations"
+        or "validations"
+    resource_keys : list
+        Keys of the resources in the source store of the section
+    n_workers : int
+        Number of processes to spread rendering over
+
+    Returns
+    -------
+    dict
+        The rendered pages, as returned by _render_site_pages_in_worker
+    """
+    n_workers = max(min(n_workers, len(resource_keys)), 1)
+    if n_workers == 1:
+        return _render_site_pages_in_worker(site_builder, section_name, resource_keys)
+
+    list_workers = start_forked_processes(
+        None,
+        _render_site_pages_in_worker,
+        [
+            (site_builder, section_name, resource_keys[i::n_workers])
+            for i in range(n_workers)
+        ],
+    )
+    dict_pages = {}
+    for worker_pages in collect_forked_processes(list_workers):
+        dict_pages.update(worker_pages)
+
+    return dict_pages
+
+
+def build_data_docs_in_parallel(
+    context: ge.data_context.DataContext,
+    manifest_store_backend=None,
+    site_name: str = None,
+    n_workers: int = None,
+    n_upload_threads: int = 8,
+    index_page_size: int = None,
+    pages_per_round: int = 1000,
+) -> dict:
+    """Function to rebuild a whole Data Docs site like context.build_data_docs, but
+    rendering pages in parallel processes and uploading them concurrently (see
+    get_site_uploader). Pages and static assets whose content did not change are not
+    uploaded again, by comparing their MD5 hash to the files on the site, which are
+    listed once at the start of the build. If a manifest store backend is given, the
+    manifest of the site is updated, so that the site can be updated with
+    build_data_docs_incrementally afterwards
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    manifest_store_backend : TupleStoreBackend, optional
+        Store backend to keep the manifest of the site in, as returned by
+        get_grater_store_backend, by default None
+    site_name : str, optional
+        Name of the Data Docs site to build, by default the first site configured in
+        the DataContext
+    n_workers : int, optional
+        Number of processes to render pages with, by default the number of CPUs
+    n_upload_threads : int, optional
+        Number of threads to upload pages with, by default 8
+    index_page_size : int, optional
+        If given, the index is sharded by data asset and month into pages with at most
+        this number of validation results (see render_sharded_index), by default None
+    pages_per_round : int, optional
+        Number of pages to render before uploading them, which limits the number of
+        pages kept in memory, by default 1000
+
+    Returns
+    -------
+    dict
+        A dictionary with the name of the site as key and the URL of its index page as
+        value, like the output of context.build_data_docs
+    """
+    register_skipped_status_icon_renderer()
+    site_builder = get_site_builder(context, site_name)
+    site_uploader = get_site_uploader(site_builder, n_upload_threads)
+    n_workers = n_workers or multiprocessing.cpu_count()
+    if manifest_store_backend:
+        manifest = load_data_docs_manifest(
+            manifest_store_backend, site_builder.site_name
+        )
+    else:
+        manifest = new_data_docs_manifest(site_builder.site_name)
+
+    # -- 1. List hashes of the files on the site and upload changed static assets
+    dict_hashes = site_uploader.list_hashes()
+    n_uploaded = upload_site_files(
+        site_uploader, list_static_asset_files(), dict_hashes, n_upload_threads
+    )
+    manifest["static_assets_version"] = ge.__version__
+
+    # -- 2. Render pages of all expectation suites and validation results in rounds,
+    # uploading the pages of each round that changed
+    n_rendered = 0
+    for section_name in ("expectations", "validations"):
+        if section_name not in site_builder.site_section_builders:
+            continue
+        section_builder = site_builder.site_section_builders[section_name]
+        resource_keys = section_builder.source_store.list_keys()
+        if section_name == "validations":
+            resource_keys = sorted(
+                (
+                    key
+                    for key in resource_keys
+                    if resource_key_passes_run_name_filter(
+                        key, section_builder.run_name_filter
+                    )
+                ),
+                key=lambda key: key.run_id.run_time,
+                reverse=True,
+            )
+
+        manifest_entries = {}
+        for i in range(0, len(resource_keys), pages_per_round):
+            dict_pages = render_site_pages_in_parallel(
+                site_builder,
+                section_name,
+                resource_keys[i : i + pages_per_round],
+                n_workers,
+            )
+            n_uploaded += upload_site_files(
+                site_uploader,
+                {
+                    path: (content, "text/html; charset=utf-8")
+                    for path, content, _ in dict_pages.values()
+                },
+                dict_hashes,
+                n_upload_threads,
+            )
+            manifest_entries.update(
+                {key_string: entry for key_string, (_, _, entry) in dict_pages.items()}
+            )
+            n_rendered += len(dict_pages)
+
+        manifest[
+            "expectation_suites" if section_name == "expectations" else section_name
+        ] = manifest_entries
+
+    logger.info(
+        f"Rendered {n_rendered} pages for Data Docs site {site_builder.site_name} and "
+        f"uploaded {n_uploaded} pages and static assets that changed"
+    )
+
+    # -- 3. Render index page from the manifest and save the manifest
+    if index_page_size:
+        render_sharded_index(site_builder, manifest, index_page_size)
+    else:
+        render_index_page(site_builder, manifest)
+    manifest["index_page_size"] = index_page_size
+    if manifest_store_backend:
+        save_data_docs_manifest(manifest_store_backend, manifest)
+
+    return {site_builder.site_name: site_builder.get_resource_url(only_if_exists=False)}
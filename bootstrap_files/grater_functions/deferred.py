@@ -0,0 +1,266 @@
+"""Deferred evaluation for authoring expectation suites"""
+
+# -- Imports
+import copy
+import logging
+import pandas as pd
+from IPython.display import display
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_configuration import ExpectationConfiguration
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+    ExpectationValidationResult,
+)
+from great_expectations.exceptions import InvalidExpectationConfigurationError
+from great_expectations.expectations.registry import get_expectation_impl
+from great_expectations.core.util import convert_to_json_serializable
+from great_expectations.validator.validator import Validator
+
+from grater_functions.backfill import get_comparable_expectation
+from grater_functions.parallel import ParallelValidator
+from grater_functions.validation import get_expectation_columns, get_partial_suite
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Deferred evaluation for authoring expectation suites
+# NOTE: in expectation_suite.ipynb, every validator.expect_* call evaluates the
+# expectation against the full batch, which makes authoring a large suite on a
+# realistic batch slow. DeferredValidator only records expectations in the suite when
+# they are called (checking their arguments and that the columns they refer to exist),
+# or evaluates them on a small sample of the batch that is drawn once and kept for the
+# session. When the suite is saved, all its expectations are evaluated against the full
+# batch in a single call of Validator.validate, which resolves the metrics they share
+# only once, and a report of the results is shown
+class DeferredValidator:
+    """Wrapper around a Great Expectations Validator for authoring expectation suites,
+    which defers the evaluation of expectations against the full batch until
+    save_expectation_suite is called. Expectations are only recorded when they are
+    called, or evaluated on a sample of sample_rows rows of the batch if given. All
+    other attributes are passed through to the wrapped validator
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data and the expectation suite to author,
+        generally obtained by calling context.get_validator
+    sample_rows : int, optional
+        Number of rows of the sample to evaluate expectations on when they are called,
+        by default None to only record them
+    seed : int, optional
+        Random seed for drawing the sample, by default 42
+    """
+
+    def __init__(self, validator: Validator, sample_rows: int = None, seed: int = 42):
+        self.validator = validator
+        self.sample_rows = sample_rows
+        self.sample_validator = (
+            self.get_sample_validator(sample_rows, seed) if sample_rows else None
+        )
+        self.sample_results = {}
+        self.report = None
+
+    def __getattr__(self, name):
+        if name.startswith("expect_"):
+            return self.get_deferred_expectation(name)
+        return getattr(self.validator, name)
+
+    def get_sample_validator(self, sample_rows: int, seed: int) -> Validator:
+        """Function to create a validator for a sample of the batch of the wrapped
+        validator, with its own batch identifier (so that both batches remain loaded)
+        and an empty copy of the expectation suite"""
+        df = self.validator.active_batch.data.dataframe
+        if len(df) > sample_rows:
+            df = df.sample(n=sample_rows, random_state=seed).sort_index()
+        batch_definition = self.validator.active_batch_definition
+        batch_identifier = batch_definition.batch_identifiers.get(
+            "batch_identifier", ""
+        )
+        batch_request = RuntimeBatchRequest(
+            datasource_name=batch_definition.datasource_name,
+            data_connector_name=batch_definition.data_connector_name,
+            data_asset_name=batch_definition.data_asset_name,
+            runtime_parameters={"batch_data": df},
+            batch_identifiers={"batch_identifier": f"{batch_identifier}__sample"},
+        )
+        logger.info(f"Evaluating expectations on a sample of {len(df)} rows")
+        return self.validator.data_context.get_validator(
+            batch_request=batch_request,
+            expectation_suite=get_partial_suite(self.validator.expectation_suite, []),
+        )
+
+    def record_expectation(
+        self, name: str, args: tuple, kwargs: dict
+    ) -> ExpectationConfiguration:
+        """Function to add an expectation to the expectation suite of the wrapped
+        validator without evaluating it, after checking its configuration with the
+        evaluation parameters of the suite substituted, like the validator would"""
+        # -- 1. Build the configuration from the arguments, like Validator does
+        expectation_impl = get_expectation_impl(name)
+        args_keys = expectation_impl.args_keys or tuple()
+        if len(args) > len(args_keys):
+            raise InvalidExpectationConfigurationError(
+                f"Invalid positional arguments for {name}: {args[len(args_keys):]}"
+            )
+        expectation_kwargs = {
+            key: value
+            for key, value in {**dict(zip(args_keys, args)), **kwargs}.items()
+            if key not in Validator.RUNTIME_KEYS
+        }
+        meta = expectation_kwargs.pop("meta", None)
+        expectation_config = ExpectationConfiguration(
+            expectation_type=name,
+            kwargs=convert_to_json_serializable(expectation_kwargs),
+            meta=meta,
+        )
+
+        # -- 2. Check the configuration, then add it to the suite
+        evaluated_config = copy.deepcopy(expectation_config)
+        evaluated_config.process_evaluation_parameters(
+            self.validator.expectation_suite.evaluation_parameters,
+            True,
+            self.validator.data_context,
+        )
+        expectation_impl(evaluated_config)
+        return self.validator.expectation_suite.add_expectation(expectation_config)
+
+    def get_deferred_expectation(self, name: str):
+        """Function to get an expectation method that records the expectation in the
+        expectation suite of the wrapped validator, and evaluates it on the sample if
+        there is one"""
+
+        def deferred_expectation(*args, **kwargs):
+            # -- Evaluate on the sample first (if any), so that expectations that
+            #    raise an error are not recorded, like with a regular validator
+            result = None
+            if self.sample_validator is not None:
+                result = getattr(self.sample_validator, name)(*args, **kwargs)
+            expectation_config = self.record_expectation(name, args, kwargs)
+
+            # -- Keep the result on the sample, or check the columns it uses
+            if result is not None:
+                result.meta = {**(result.meta or {}), "sample_rows": self.sample_rows}
+                self.sample_results[
+                    get_comparable_expectation(
+                        expectation_config,
+                        self.validator.expectation_suite.evaluation_parameters,
+                    )
+                ] = result
+                return result
+
+            columns = self.validator.active_batch.data.dataframe.columns
+            missing_columns = [
+                column
+                for column in get_expectation_columns(expectation_config)
+                if column not in columns
+            ]
+            if missing_columns:
+                logger.warning(
+                    f"{name} refers to columns that are not in the batch: "
+                    f"{missing_columns}"
+                )
+            return ExpectationValidationResult(expectation_config=expectation_config)
+
+        deferred_expectation.__name__ = name
+        deferred_expectation.__doc__ = get_expectation_impl(name).__doc__
+        return deferred_expectation
+
+    def get_report(
+        self, validation_result: ExpectationSuiteValidationResult
+    ) -> pd.DataFrame:
+        """Function to summarize the results of the expectations of the suite against
+        the full batch, with their result on the sample if they were evaluated on it"""
+        rows = []
+        for result in validation_result.results:
+            expectation_config = result.expectation_config
+            row = {
+                "expectation_type": expectation_config.expectation_type,
+                "column": ", ".join(
+                    str(column)
+                    for column in get_expectation_columns(expectation_config)
+                ),
+                "success": result.success,
+                "observed_value": result.result.get("observed_value"),
+                "unexpected_percent": result.result.get("unexpected_percent"),
+                "exception": (
+                    result.exception_info.get("exception_message")
+                    if result.exception_info
+                    else None
+                ),
+            }
+            if self.sample_validator is not None:
+                sample_result = self.sample_results.get(
+                    get_comparable_expectation(expectation_config)
+                )
+                row["sample_success"] = (
+                    sample_result.success if sample_result is not None else None
+                )
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
+    def save_expectation_suite(
+        self,
+        discard_failed_expectations: bool = True,
+        evaluation_parameters: dict = None,
+        n_workers: int = None,
+        **kwargs,
+    ):
+        """Function to evaluate all expectations of the suite against the full batch in
+        a single pass, show a report of their results and save the suite, like
+        Validator.save_expectation_suite
+
+        Parameters
+        ----------
+        discard_failed_expectations : bool, optional
+            Whether to leave out expectations that failed on the full batch, by default
+            True
+        evaluation_parameters : dict, optional
+            Values for the dynamic evaluation parameters of the expectation suite, by
+            default None
+        n_workers : int, optional
+            Number of processes to spread the evaluation over (see
+            ParallelValidator), by default None for a single process
+        **kwargs
+            Other keyword arguments of Validator.save_expectation_suite
+        """
+        # -- 1. Evaluate all expectations against the full batch in a single pass
+        validator = (
+            ParallelValidator(self.validator, n_workers)
+            if n_workers and n_workers > 1
+            else self.validator
+        )
+        validation_result = validator.validate(
+            evaluation_parameters=evaluation_parameters,
+            result_format={"result_format": "SUMMARY"},
+            catch_exceptions=True,
+        )
+
+        # -- 2. Mark the expectations of the suite with their result, so that failed
+        #       expectations can be discarded
+        results_by_key = {
+            get_comparable_expectation(result.expectation_config): result
+            for result in validation_result.results
+        }
+        for expectation in self.validator.expectation_suite.expectations:
+            result = results_by_key.get(
+                get_comparable_expectation(
+                    expectation, validation_result.evaluation_parameters
+                )
+            )
+            if result is not None:
+                expectation.success_on_last_run = result.success
+
+        # -- 3. Report the results and save the expectation suite
+        self.report = self.get_report(validation_result)
+        statistics = validation_result.statistics
+        logger.info(
+            f"{statistics['successful_expectations']} of "
+            f"{statistics['evaluated_expectations']} expectations succeeded on the "
+            "full batch"
+        )
+        display(self.report)
+        self.validator.save_expectation_suite(
+            discard_failed_expectations=discard_failed_expectations, **kwargs
+        )
@@ -0,0 +1,290 @@
+"""Memory-efficient uniqueness checks"""
+
+# -- Imports
+import logging
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from great_expectations.execution_engine import PandasExecutionEngine
+from great_expectations.expectations.metrics.map_metric_provider import (
+    ColumnMapMetricProvider,
+    column_condition_partial,
+)
+
+from grater_functions.sketches import get_value_digests
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Memory-efficient uniqueness checks
+# NOTE: for expect_column_values_to_be_unique, pandas builds a hash table of the values
+# of the column, which takes several times the memory of the column itself for keys
+# that are strings. The digest engine below hashes values to 64-bit digests in a NumPy
+# array instead, and finds repeated digests by sorting them. If sorting all digests at
+# once would exceed the memory budget, digests are written to files in a temporary
+# directory (/tmp on AWS Lambda) first, radix-partitioned by their leading bits, after
+# which each partition is sorted separately. Rows with a repeated digest are confirmed
+# to be duplicates by comparing their values, so that hash collisions do not lead to
+# unexpected values. The engine replaces the pandas implementation of the metric of
+# expect_column_values_to_be_unique once register_digest_uniqueness_engine is called
+# (see enable_digest_uniqueness)
+DIGEST_UNIQUENESS_MEMORY_BUDGET_MB = 512
+
+# Estimated memory needed per row to sort digests: the digest, its sorted copy and the
+# position of its row
+DIGEST_SORT_BYTES_PER_ROW = 26
+
+DIGEST_RECORD_DTYPE = np.dtype([("digest", "<u8"), ("position", "<i8")])
+
+# Settings of the digest engine, set by register_digest_uniqueness_engine
+_DIGEST_UNIQUENESS_SETTINGS = {}
+
+
+def find_repeated_digests(digests: np.ndarray, positions: np.ndarray = None) -> tuple:
+    """Function that finds digests occurring more than once by sorting them
+
+    Parameters
+    ----------
+    digests : np.ndarray
+        Digests of the values of a column (or partition of them)
+    positions : np.ndarray, optional
+        Positions of the rows of the digests, by default their index in digests
+
+    Returns
+    -------
+    tuple
+        A tuple with the positions of the rows with a repeated digest and their digests,
+        ordered by digest
+    """
+    order = np.argsort(digests)
+    sorted_digests = digests[order]
+    is_repeat = sorted_digests[1:] == sorted_digests[:-1]
+    is_repeated = np.zeros(len(digests), dtype=bool)
+    is_repeated[1:] |= is_repeat
+    is_repeated[:-1] |= is_repeat
+    repeated_positions = order[is_repeated]
+    if positions is not None:
+        repeated_positions = positions[repeated_positions]
+
+    return repeated_positions, sorted_digests[is_repeated]
+
+
+def spill_digest_partitions(
+    values, directory: str, n_bits: int, block_size: int = 100_000
+) -> list:
+    """Function that computes the digests of values in blocks and writes them, with the
+    positions of their rows, to a file per partition of their n_bits leading bits
+
+    Returns
+    -------
+    list
+        Paths to the file of each partition
+    """
+    n_partitions = 2**n_bits
+    list_paths = [
+        os.path.join(directory, f"partition_{partition:05d}.bin")
+        for partition in range(n_partitions)
+    ]
+    list_files = [open(path, "wb") for path in list_paths]
+    try:
+        for start in range(0, len(values), block_size):
+            digests = get_value_digests(values.iloc[start : start + block_size])
+            records = np.empty(len(digests), dtype=DIGEST_RECORD_DTYPE)
+            records["digest"] = digests
+            records["position"] = np.arange(start, start + len(digests))
+            partitions = (digests >> np.uint64(64 - n_bits)).astype(np.int64)
+            order = np.argsort(partitions, kind="stable")
+            bounds = np.searchsorted(partitions[order], np.arange(n_partitions + 1))
+            for partition, file in enumerate(list_files):
+                if bounds[partition + 1] > bounds[partition]:
+                    records[order[bounds[partition] : bounds[partition + 1]]].tofile(
+                        file
+                    )
+    finally:
+        for file in list_files:
+            file.close()
+
+    return list_paths
+
+
+def find_duplicate_candidates(
+    values,
+    memory_budget_bytes: int = DIGEST_UNIQUENESS_MEMORY_BUDGET_MB * 2**20,
+    spill_directory: str = None,
+) -> tuple:
+    """Function that finds the rows of which the digest occurs more than once, by
+    sorting all digests in memory or, if that exceeds the memory budget, by sorting
+    radix partitions of the digests that are spilled to disk
+
+    Parameters
+    ----------
+    values : pd.Series or pd.DataFrame
+        Values to check, or rows of values for keys of multiple columns
+    memory_budget_bytes : int, optional
+        Memory that sorting may use, by default 512 MB
+    spill_directory : str, optional
+        Directory to spill partitions to, by default the temporary directory of the
+        system (/tmp)
+
+    Returns
+    -------
+    tuple
+        A tuple with the positions of the rows with a repeated digest and their digests,
+        ordered by digest
+    """
+    # -- 1. Sort all digests at once if that fits in the memory budget
+    n_bits = int(
+        np.ceil(
+            np.log2(
+                max(1, len(values) * DIGEST_SORT_BYTES_PER_ROW / memory_budget_bytes)
+            )
+        )
+    )
+    if n_bits == 0:
+        return find_repeated_digests(get_value_digests(values))
+
+    # -- 2. Otherwise spill radix partitions of the digests and sort them one by one
+    logger.info(
+        f"Spilling digests of {len(values)} rows to {2 ** n_bits} partitions to check "
+        "uniqueness within the memory budget"
+    )
+    directory = tempfile.mkdtemp(prefix="grater_digests_", dir=spill_directory)
+    try:
+        list_positions, list_digests = [], []
+        for path in spill_digest_partitions(values, directory, n_bits):
+            records = np.fromfile(path, dtype=DIGEST_RECORD_DTYPE)
+            os.remove(path)
+            positions, digests = find_repeated_digests(
+                records["digest"], records["position"]
+            )
+            list_positions.append(positions)
+            list_digests.append(digests)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return np.concatenate(list_positions), np.concatenate(list_digests)
+
+
+def confirm_duplicates(
+    values, positions: np.ndarray, digests: np.ndarray
+) -> np.ndarray:
+    """Function that confirms which rows with a repeated digest are duplicates, by
+    comparing the values of rows that share a digest
+
+    Returns
+    -------
+    np.ndarray
+        Sorted positions of the rows that have a duplicate
+    """
+    if len(positions) == 0:
+        return positions
+    df_candidates = values.iloc[positions]
+    if isinstance(df_candidates, pd.Series):
+        df_candidates = df_candidates.to_frame()
+    df_candidates = df_candidates.reset_index(drop=True)
+    df_candidates.columns = range(df_candidates.shape[1])
+    df_candidates["digest"] = digests
+    is_duplicate = df_candidates.duplicated(keep=False).to_numpy()
+    if not is_duplicate.all():
+        logger.info(
+            f"Digests of {int((~is_duplicate).sum())} rows collided with those of rows "
+            "with different values"
+        )
+
+    return np.sort(positions[is_duplicate])
+
+
+def find_duplicate_positions(
+    values,
+    memory_budget_bytes: int = DIGEST_UNIQUENESS_MEMORY_BUDGET_MB * 2**20,
+    spill_directory: str = None,
+) -> np.ndarray:
+    """Function that finds the positions of rows of which the value occurs more than
+    once, using 64-bit digests of the values (see find_duplicate_candidates) and
+    confirming duplicates by their values (see confirm_duplicates)
+
+    Parameters
+    ----------
+    values : pd.Series or pd.DataFrame
+        Non-null values to check, or rows of values for keys of multiple columns
+    memory_budget_bytes : int, optional
+        Memory that sorting digests may use, by default 512 MB
+    spill_directory : str, optional
+        Directory to spill partitions of digests to, by default the temporary
+        directory of the system (/tmp)
+
+    Returns
+    -------
+    np.ndarray
+        Sorted positions of the rows that have a duplicate
+    """
+    positions, digests = find_duplicate_candidates(
+        values, memory_budget_bytes, spill_directory
+    )
+    return confirm_duplicates(values, positions, digests)
+
+
+def register_digest_uniqueness_engine(
+    memory_budget_bytes: int = DIGEST_UNIQUENESS_MEMORY_BUDGET_MB * 2**20,
+    spill_directory: str = None,
+):
+    """Function that replaces the pandas implementation of the column_values.unique
+    metric, on which expect_column_values_to_be_unique depends, by the digest engine
+    (see find_duplicate_positions). Calling it again only updates its settings
+
+    Parameters
+    ----------
+    memory_budget_bytes : int, optional
+        Memory that sorting digests may use, by default 512 MB
+    spill_directory : str, optional
+        Directory to spill partitions of digests to, by default the temporary
+        directory of the system (/tmp)
+    """
+    is_registered = bool(_DIGEST_UNIQUENESS_SETTINGS)
+    _DIGEST_UNIQUENESS_SETTINGS.update(
+        {"memory_budget_bytes": memory_budget_bytes, "spill_directory": spill_directory}
+    )
+    if is_registered:
+        return
+
+    # -- Defining the metric provider registers it, overwriting the pandas provider
+    registry_logger = logging.getLogger("great_expectations.expectations.registry")
+    level = registry_logger.level
+    registry_logger.setLevel(logging.ERROR)
+    try:
+
+        class DigestColumnValuesUnique(ColumnMapMetricProvider):
+            condition_metric_name = "column_values.unique"
+
+            @column_condition_partial(engine=PandasExecutionEngine)
+            def _pandas(cls, column, **kwargs):
+                is_unique = np.ones(len(column), dtype=bool)
+                is_unique[
+                    find_duplicate_positions(column, **_DIGEST_UNIQUENESS_SETTINGS)
+                ] = False
+                return pd.Series(is_unique, index=column.index)
+
+    finally:
+        registry_logger.setLevel(level)
+    logger.info("Registered digest engine for expect_column_values_to_be_unique")
+
+
+def enable_digest_uniqueness(test_config):
+    """Helper function to register the digest engine for uniqueness checks if
+    digest_uniqueness is enabled in the project configuration, with a memory budget of
+    uniqueness_memory_budget_mb (default 512)"""
+    if not getattr(test_config, "digest_uniqueness", False):
+        return
+    register_digest_uniqueness_engine(
+        int(
+            getattr(
+                test_config,
+                "uniqueness_memory_budget_mb",
+                DIGEST_UNIQUENESS_MEMORY_BUDGET_MB,
+            )
+        )
+        * 2**20
+    )
@@ -0,0 +1,285 @@
+"""Scheduler for coalescing Data Docs rebuilds"""
+
+# -- Imports
+import datetime
+import json
+import logging
+import os
+import time
+import uuid
+import great_expectations as ge
+from great_expectations.data_context.store import TupleFilesystemStoreBackend
+from great_expectations.checkpoint.types.checkpoint_result import CheckpointResult
+
+from grater_functions.data_docs import build_data_docs_incrementally
+from grater_functions.data_docs_parallel import build_data_docs_in_parallel
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Scheduler for coalescing Data Docs rebuilds
+# NOTE: the validation handler notifies the scheduler of each stored validation result
+# by writing a small notification to a Grater store backend. The scheduler itself runs
+# separately (from the command line with rebuild_data_docs.py, or on a schedule as its
+# own Lambda or Azure function) and updates the Data Docs site incrementally once
+# enough notifications are pending, or once the oldest one has waited long enough
+NOTIFICATION_TIME_FORMAT = "%Y%m%dT%H%M%S.%fZ"
+
+
+class DataDocsRebuildScheduler:
+    """Class that collects notifications of stored validation results and coalesces
+    them into a single incremental rebuild of the Data Docs site (see
+    build_data_docs_incrementally), which is triggered after max_pending notifications
+    or max_wait_seconds after the oldest notification, whichever comes first. A lock is
+    taken in the store backend so that rebuilds never overlap
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    store_backend : TupleStoreBackend
+        Store backend to keep notifications and the lock in, as returned by
+        get_grater_store_backend
+    manifest_store_backend : TupleStoreBackend
+        Store backend with the manifest of the Data Docs site, as returned by
+        get_grater_store_backend
+    site_name : str, optional
+        Name of the Data Docs site to rebuild, by default the first site configured in
+        the DataContext
+    max_pending : int, optional
+        Number of pending notifications that triggers a rebuild, by default 100
+    max_wait_seconds : float, optional
+        Number of seconds after the oldest pending notification that triggers a
+        rebuild, by default 900
+    lock_timeout_seconds : float, optional
+        Number of seconds after which the lock of a rebuild is considered stale (e.g.
+        because the process running it was killed) and can be taken over, by default
+        900
+    index_page_size : int, optional
+        If given, the index of the site is sharded into pages with at most this number
+        of validation results (see render_sharded_index), by default None
+    """
+
+    def __init__(
+        self,
+        context: ge.data_context.DataContext,
+        store_backend,
+        manifest_store_backend,
+        site_name: str = None,
+        max_pending: int = 100,
+        max_wait_seconds: float = 900,
+        lock_timeout_seconds: float = 900,
+        index_page_size: int = None,
+    ):
+        self.context = context
+        self.store_backend = store_backend
+        self.manifest_store_backend = manifest_store_backend
+        self.site_name = site_name
+        self.max_pending = max_pending
+        self.max_wait_seconds = max_wait_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.index_page_size = index_page_size
+        self.lock_owner = None
+
+    def notify(self, checkpoint_result: CheckpointResult) -> int:
+        """Function to notify the scheduler of the validation results that were stored
+        by running a checkpoint. Returns the number of notifications written"""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        identifiers = checkpoint_result.list_validation_result_identifiers()
+        for identifier in identifiers:
+            self.store_backend.set(
+                (
+                    "pending",
+                    f"{now.strftime(NOTIFICATION_TIME_FORMAT)}-{uuid.uuid4().hex[:8]}",
+                ),
+                json.dumps(
+                    {
+                        "resource_key": list(identifier.to_tuple()),
+                        "notified_at": now.isoformat(),
+                    }
+                ),
+            )
+
+        return len(identifiers)
+
+    def list_pending(self) -> list:
+        """Function to list the keys of pending notifications, oldest first"""
+        return sorted(
+            key
+            for key in self.store_backend.list_keys()
+            if len(key) == 2 and key[0] == "pending"
+        )
+
+    def get_pending_resource_keys(self, pending_keys: list) -> list:
+        """Function to get the keys of the validation results that the given pending
+        notifications were written for"""
+        return [
+            tuple(json.loads(self.store_backend.get(key))["resource_key"])
+            for key in pending_keys
+        ]
+
+    def get_rebuild_reason(self, pending_keys: list) -> str:
+        """Function to check whether the pending notifications should trigger a rebuild,
+        returning the reason to rebuild, or None if it is not due yet"""
+        if not pending_keys:
+            return None
+        if len(pending_keys) >= self.max_pending:
+            return f"{len(pending_keys)} validation results are pending"
+
+        oldest = datetime.datetime.strptime(
+            pending_keys[0][1].rsplit("-", 1)[0], NOTIFICATION_TIME_FORMAT
+        ).replace(tzinfo=datetime.timezone.utc)
+        waited = (datetime.datetime.now(datetime.timezone.utc) - oldest).total_seconds()
+        if waited >= self.max_wait_seconds:
+            return f"the oldest pending validation result waited {waited:.0f} seconds"
+
+        return None
+
+    def acquire_lock(self) -> bool:
+        """Function to take the rebuild lock, returning False if another rebuild holds
+        it. On a local filesystem the lock file is created atomically. Object stores
+        (S3, Azure Blob Storage) offer no atomic create in Great Expectations, so
+        there the lock is verified by reading it back after writing it. Deploy the
+        scheduler with a concurrency of 1 to rule out races there entirely"""
+        owner = uuid.uuid4().hex
+        lock = json.dumps(
+            {
+                "owner": owner,
+                "acquired_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+        )
+
+        # -- 1. Remove a stale lock left behind by a rebuild that did not finish
+        if self.store_backend.has_key(("lock",)):
+            acquired_at = datetime.datetime.fromisoformat(
+                json.loads(self.store_backend.get(("lock",)))["acquired_at"]
+            )
+            age = (
+                datetime.datetime.now(datetime.timezone.utc) - acquired_at
+            ).total_seconds()
+            if age < self.lock_timeout_seconds:
+                return False
+            logger.warning(f"Taking over stale Data Docs rebuild lock ({age:.0f}s old)")
+            self.store_backend.remove_key(("lock",))
+
+        # -- 2. Create the lock
+        if isinstance(self.store_backend, TupleFilesystemStoreBackend):
+            path_lock = os.path.join(
+                self.store_backend.full_base_directory,
+                "lock" + (self.store_backend.filepath_suffix or ""),
+            )
+            os.makedirs(os.path.dirname(path_lock), exist_ok=True)
+            try:
+                file_descriptor = os.open(
+                    path_lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                )
+            except FileExistsError:
+                return False
+            with os.fdopen(file_descriptor, "w") as f:
+                f.write(lock)
+        else:
+            self.store_backend.set(("lock",), lock)
+            if json.loads(self.store_backend.get(("lock",)))["owner"] != owner:
+                return False
+
+        self.lock_owner = owner
+        return True
+
+    def release_lock(self):
+        """Function to release the rebuild lock, if it is still held by this scheduler"""
+        if self.lock_owner and self.store_backend.has_key(("lock",)):
+            if (
+                json.loads(self.store_backend.get(("lock",)))["owner"]
+                == self.lock_owner
+            ):
+                self.store_backend.remove_key(("lock",))
+        self.lock_owner = None
+
+    def run(self, force: bool = False, rebuild_all: bool = False) -> dict:
+        """Function to rebuild the Data Docs site if the pending notifications are due
+        (or if force is True) and no other rebuild is running. A due rebuild only
+        renders the validation results of the pending notifications, while a forced
+        rebuild lists the validations store to find all changes. Notifications that
+        were pending when the rebuild started are removed after it finished
+
+        Parameters
+        ----------
+        force : bool, optional
+            Whether to rebuild regardless of the pending notifications, by default
+            False
+        rebuild_all : bool, optional
+            Whether to render every page of the site again in parallel (see
+            build_data_docs_in_parallel) instead of only new pages, e.g. after
+            upgrading Great Expectations. Implies force, by default False
+
+        Returns
+        -------
+        dict
+            A dictionary with whether the site was rebuilt, the number of pending
+            notifications that were processed, the reason to rebuild (or to skip the
+            rebuild) and the URLs of the site if it was rebuilt
+        """
+        # -- 1. Check if a rebuild is due
+        pending_keys = self.list_pending()
+        if rebuild_all:
+            reason = "a rebuild of all pages was requested"
+        elif force:
+            reason = "forced"
+        else:
+            reason = self.get_rebuild_reason(pending_keys)
+        if reason is None:
+            logger.info(
+                f"Data Docs rebuild not due yet, {len(pending_keys)} validation "
+                "results pending"
+            )
+            return {"rebuilt": False, "pending": len(pending_keys), "reason": None}
+
+        if not self.acquire_lock():
+            logger.info("Another Data Docs rebuild is running, skipping this one")
+            return {
+                "rebuilt": False,
+                "pending": len(pending_keys),
+                "reason": "another rebuild is running",
+            }
+
+        # -- 2. Rebuild the site and remove processed notifications
+        logger.info(f"Rebuilding Data Docs, because {reason}")
+        build_kwargs = {"index_page_size": self.index_page_size}
+        if rebuild_all:
+            build_function = build_data_docs_in_parallel
+        else:
+            build_function = build_data_docs_incrementally
+            if not force:
+                build_kwargs["validation_result_keys"] = self.get_pending_resource_keys(
+                    pending_keys
+                )
+        try:
+            site_urls = build_function(
+                self.context,
+                self.manifest_store_backend,
+                self.site_name,
+                **build_kwargs,
+            )
+            for key in pending_keys:
+                self.store_backend.remove_key(key)
+        finally:
+            self.release_lock()
+
+        return {
+            "rebuilt": True,
+            "pending": len(pending_keys),
+            "reason": reason,
+            "site": site_urls,
+        }
+
+    def watch(self, poll_seconds: float = 30, max_runs: int = None):
+        """Function to keep running the scheduler, checking the pending notifications
+        every poll_seconds, e.g. from the command line. Stops after max_runs checks if
+        given"""
+        n_runs = 0
+        while max_runs is None or n_runs < max_runs:
+            self.run()
+            n_runs += 1
+            if max_runs is None or n_runs < max_runs:
+                time.sleep(poll_seconds)
@@ -0,0 +1,575 @@
+"""Incremental validation of append-only datasets"""
+
+# -- Imports
+import datetime
+import json
+import logging
+import pandas as pd
+import great_expectations as ge
+import numpy as np
+from great_expectations.checkpoint.types.checkpoint_result import CheckpointResult
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+)
+from great_expectations.exceptions import InvalidKeyError
+from great_expectations.core.run_identifier import RunIdentifier
+from great_expectations.validator.validator import Validator
+
+from grater_functions.multiple_suites import get_asset_checkpoint_names
+from grater_functions.parallel import (
+    AGGREGATE_EXPECTATIONS,
+    compute_partial_aggregates,
+    evaluate_aggregate_expectation,
+    get_fast_path,
+    get_row_partition_validator,
+    merge_partial_aggregates,
+    merge_row_partition_results,
+)
+from grater_functions.sketches import SKETCH_TYPES, get_sketch_key
+from grater_functions.store_writes import flush_store_writes
+from grater_functions.validation import (
+    build_suite_validation_result,
+    get_checkpoint_validator,
+    get_expectation_column,
+    get_partial_suite,
+    get_result_key,
+    hash_expectation_suite,
+    run_checkpoint_with_validator,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Incremental validation of append-only datasets
+# NOTE: for sources that only append to the same object or prefix, each run would
+# validate the full history again. An IncrementalValidator validates only the rows
+# that were appended since the previous run instead, as recorded by a watermark per
+# data asset in a Grater store backend. The watermark holds the number of validated
+# rows ("row_offset"), the maximum value of a timestamp column ("timestamp") or the
+# validated objects under a prefix ("objects"), together with the partial aggregates
+# of all validated rows (see compute_partial_aggregates). Row-wise expectations are
+# validated on the new rows only, so their unexpected counts refer to the new rows.
+# Aggregate expectations (see AGGREGATE_EXPECTATIONS) are evaluated on the stored
+# aggregates merged with those of the new rows, so that they hold for the full
+# dataset. Other expectations are validated on the batch as given, which is the full
+# dataset for "row_offset" and "timestamp", and only the new objects for "objects".
+# When the expectation suite changes, the watermark is reset and the full dataset is
+# validated again
+WATERMARK_MODES = ("row_offset", "timestamp", "objects")
+
+
+def to_watermark_value(value):
+    """Helper function to convert a metric of a column to a JSON value"""
+    if isinstance(value, pd.Timestamp):
+        return {"timestamp": value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def from_watermark_value(value):
+    """Helper function to convert a JSON value back to a metric of a column"""
+    if isinstance(value, dict) and "timestamp" in value:
+        return pd.Timestamp(value["timestamp"])
+    return value
+
+
+def serialize_partial_aggregates(aggregates: dict) -> dict:
+    """Function to convert partial aggregates (see compute_partial_aggregates) to a
+    JSON-serializable dictionary, which deserialize_partial_aggregates converts back"""
+    return {
+        "row_count": int(aggregates["row_count"]),
+        "columns": {
+            column: {
+                metric: to_watermark_value(value) for metric, value in metrics.items()
+            }
+            for column, metrics in aggregates["columns"].items()
+        },
+        "sketches": {
+            key: sketch.to_dict() for key, sketch in aggregates["sketches"].items()
+        },
+    }
+
+
+def deserialize_partial_aggregates(aggregates_dict: dict) -> dict:
+    """Function to convert partial aggregates that were serialized with
+    serialize_partial_aggregates back, including their column sketches"""
+    return {
+        "row_count": aggregates_dict["row_count"],
+        "columns": {
+            column: {
+                metric: from_watermark_value(value) for metric, value in metrics.items()
+            }
+            for column, metrics in aggregates_dict["columns"].items()
+        },
+        "sketches": {
+            key: SKETCH_TYPES[key.split("/", 1)[0]].from_dict(sketch_dict)
+            for key, sketch_dict in aggregates_dict["sketches"].items()
+        },
+    }
+
+
+def load_watermark(
+    store_backend,
+    asset_name: str,
+    mode: str,
+    column: str = None,
+    expectation_suite: ExpectationSuite = None,
+) -> dict:
+    """Function to load the watermark of a data asset. A new watermark is returned if
+    none was stored yet, or if the stored one is no longer valid because its mode,
+    column or expectation suite changed
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for watermarks, generally obtained by calling
+        get_grater_store_backend with name "watermarks"
+    asset_name : str
+        Name of the data asset
+    mode : str
+        Mode of the watermark, one of WATERMARK_MODES
+    column : str, optional
+        Timestamp column, for mode "timestamp", by default None
+    expectation_suite : ExpectationSuite, optional
+        Expectation suite the asset is validated with, by default None
+
+    Returns
+    -------
+    dict
+        The watermark of the data asset
+    """
+    suite_hash = (
+        hash_expectation_suite(expectation_suite.to_json_dict())
+        if expectation_suite is not None
+        else None
+    )
+    new_watermark = {
+        "asset_name": asset_name,
+        "mode": mode,
+        "column": column,
+        "suite_hash": suite_hash,
+        "row_offset": 0,
+        "max_timestamp": None,
+        "objects": [],
+        "aggregates": None,
+    }
+    try:
+        watermark = json.loads(store_backend.get((asset_name,)))
+    except InvalidKeyError:
+        logger.info(f"No watermark found for {asset_name}, validating all rows")
+        return new_watermark
+
+    if (watermark["mode"], watermark["column"]) != (mode, column):
+        logger.warning(f"Watermark mode of {asset_name} changed, validating all rows")
+        return new_watermark
+    if suite_hash is not None and watermark["suite_hash"] != suite_hash:
+        logger.info(f"Expectation suite of {asset_name} changed, validating all rows")
+        return new_watermark
+    return watermark
+
+
+def get_new_object_keys(watermark: dict, object_keys: list) -> list:
+    """Function to get the keys of objects under the prefix of a data asset that were
+    not validated yet according to its watermark, e.g. to only load those"""
+    validated_keys = set(watermark["objects"])
+    return [key for key in object_keys if key not in validated_keys]
+
+
+def select_new_rows(df: pd.DataFrame, watermark: dict) -> pd.DataFrame:
+    """Function to select the rows of a batch that were appended after the watermark
+    of its data asset. In mode "objects", all rows of the batch are new, as only new
+    objects should have been loaded (see get_new_object_keys)
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Batch of data of the data asset
+    watermark : dict
+        Watermark of the data asset, as loaded by load_watermark
+
+    Returns
+    -------
+    pd.DataFrame
+        The new rows of the batch
+
+    Raises
+    ------
+    ValueError
+        A ValueError is raised if the batch has fewer rows than were validated before,
+        in which case the dataset is not append-only
+    """
+    if watermark["mode"] == "row_offset":
+        if len(df) < watermark["row_offset"]:
+            raise ValueError(
+                f"Batch of {watermark['asset_name']} has {len(df)} rows, while "
+                f"{watermark['row_offset']} rows were validated before"
+            )
+        return df.iloc[watermark["row_offset"] :]
+    if watermark["mode"] == "timestamp" and watermark["max_timestamp"] is not None:
+        return df[
+            pd.to_datetime(df[watermark["column"]])
+            > pd.Timestamp(watermark["max_timestamp"])
+        ]
+    return df
+
+
+def advance_watermark(
+    watermark: dict,
+    df: pd.DataFrame,
+    df_new: pd.DataFrame,
+    aggregates: dict,
+    object_keys: list = None,
+) -> dict:
+    """Function that returns the watermark of a data asset after validating the new
+    rows of a batch, with the merged partial aggregates of all validated rows"""
+    new_watermark = {
+        **watermark,
+        "aggregates": serialize_partial_aggregates(aggregates),
+        "updated_at": datetime.datetime.utcnow().isoformat(),
+    }
+    if watermark["mode"] == "row_offset":
+        new_watermark["row_offset"] = len(df)
+    elif watermark["mode"] == "timestamp" and len(df_new) > 0:
+        max_timestamp = pd.to_datetime(df_new[watermark["column"]]).max()
+        if watermark["max_timestamp"] is not None:
+            max_timestamp = max(max_timestamp, pd.Timestamp(watermark["max_timestamp"]))
+        new_watermark["max_timestamp"] = max_timestamp.isoformat()
+    elif watermark["mode"] == "objects":
+        new_watermark["objects"] = sorted(set(watermark["objects"]) | set(object_keys))
+    return new_watermark
+
+
+def validate_new_rows(
+    validator: Validator,
+    expectation_suite: ExpectationSuite,
+    df_new: pd.DataFrame,
+    stored_aggregates: dict,
+    validate_kwargs: dict,
+) -> tuple:
+    """Function that validates an expectation suite incrementally: row-wise
+    expectations on the new rows of the batch of a validator, aggregate expectations
+    on the stored aggregates merged with those of the new rows, and all other
+    expectations on the batch of the validator
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate
+    expectation_suite : ExpectationSuite
+        Expectation suite to validate
+    df_new : pd.DataFrame
+        Rows of the batch that were not validated before
+    stored_aggregates : dict
+        Partial aggregates of the rows that were validated before, or None
+    validate_kwargs : dict
+        Keyword arguments that were passed to IncrementalValidator.validate
+
+    Returns
+    -------
+    tuple
+        A tuple with the list of ExpectationValidationResult objects, the evaluation
+        parameters that were used, the run identifier and the merged aggregates
+    """
+    # -- 1. Classify expectations by how they can be validated incrementally
+    expectations = expectation_suite.expectations
+    list_categories = [get_fast_path(expectation) for expectation in expectations]
+    dict_expectations = {"row_wise": [], "aggregate": [], "full_batch": []}
+    for expectation, category in zip(expectations, list_categories):
+        dict_expectations[category].append(expectation)
+    aggregate_columns = sorted(
+        {
+            expectation.kwargs["column"]
+            for expectation in dict_expectations["aggregate"]
+            if "column" in expectation.kwargs
+            and AGGREGATE_EXPECTATIONS[expectation.expectation_type] not in SKETCH_TYPES
+        }
+    )
+    sketch_keys = sorted(
+        {
+            get_sketch_key(expectation)
+            for expectation in dict_expectations["aggregate"]
+            if AGGREGATE_EXPECTATIONS[expectation.expectation_type] in SKETCH_TYPES
+        }
+    )
+
+    # -- 2. Validate row-wise expectations on the new rows, the rest on the batch
+    #       The validator of the new rows has the same batch identifiers, so that it
+    #       replaces the batch of data in the shared execution engine, which is
+    #       restored afterwards
+    row_wise_results = []
+    if dict_expectations["row_wise"]:
+        try:
+            row_wise_results = (
+                get_row_partition_validator(
+                    validator,
+                    df_new,
+                    get_partial_suite(expectation_suite, dict_expectations["row_wise"]),
+                )
+                .validate(**validate_kwargs)
+                .results
+            )
+        finally:
+            validator.execution_engine.load_batch_data(
+                validator.active_batch_id, validator.active_batch.data
+            )
+    full_batch_result = validator.validate(
+        expectation_suite=get_partial_suite(
+            expectation_suite, dict_expectations["full_batch"]
+        ),
+        **validate_kwargs,
+    )
+    evaluation_parameters = full_batch_result.evaluation_parameters
+
+    # -- 3. Merge aggregates of the new rows with the stored aggregates
+    list_partials = [compute_partial_aggregates(df_new, aggregate_columns, sketch_keys)]
+    if stored_aggregates is not None:
+        list_partials.insert(0, deserialize_partial_aggregates(stored_aggregates))
+    aggregates = merge_partial_aggregates(list_partials)
+
+    # -- 4. Combine results, in the order of the expectations in the expectation suite
+    dict_full_batch_results = {}
+    for result in full_batch_result.results:
+        column = get_expectation_column(result.expectation_config)
+        dict_full_batch_results.setdefault(column, []).append(result)
+    dict_row_wise_results = {}
+    for result in row_wise_results:
+        dict_row_wise_results.setdefault(get_result_key(result), []).append(result)
+    result_format = (
+        validate_kwargs["result_format"]
+        or validator.default_expectation_args["result_format"]
+    )
+
+    list_results = []
+    for expectation, category in zip(expectations, list_categories):
+        if category == "row_wise":
+            result = merge_row_partition_results(
+                [dict_row_wise_results[get_result_key(expectation)].pop(0)],
+                validator.active_batch_id,
+                result_format,
+            )
+        elif category == "aggregate":
+            result = evaluate_aggregate_expectation(
+                validator, expectation, aggregates, evaluation_parameters
+            )
+        else:
+            column = get_expectation_column(expectation)
+            result = dict_full_batch_results[column].pop(0)
+        list_results.append(result)
+
+    return (
+        list_results,
+        evaluation_parameters,
+        full_batch_result.meta["run_id"],
+        aggregates,
+    )
+
+
+class IncrementalValidator:
+    """Wrapper around a Great Expectations Validator that only validates the rows of
+    an append-only dataset that were appended since the previous run, according to
+    the watermark of its data asset (see validate_new_rows). The advanced watermark is
+    stored when commit is called, after the validation results have been stored. All
+    other attributes are passed through to the wrapped validator, so that it can be
+    run by the actions of a checkpoint as if it were a regular validator
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate: the full dataset for modes
+        "row_offset" and "timestamp", or the new objects for mode "objects"
+    watermark_store : TupleStoreBackend
+        Store backend for watermarks, generally obtained by calling
+        get_grater_store_backend with name "watermarks"
+    mode : str, optional
+        How new rows are recognized, by default "row_offset": by their position in
+        the dataset ("row_offset"), by a timestamp column that is greater than the
+        maximum validated timestamp ("timestamp") or by the objects they were loaded
+        from ("objects")
+    column : str, optional
+        Timestamp column, required for mode "timestamp", by default None
+    object_keys : list, optional
+        Keys of the objects the batch was loaded from, required for mode "objects",
+        by default None
+    """
+
+    def __init__(
+        self,
+        validator: Validator,
+        watermark_store,
+        mode: str = "row_offset",
+        column: str = None,
+        object_keys: list = None,
+    ):
+        if mode not in WATERMARK_MODES:
+            raise ValueError(f"mode should be one of {WATERMARK_MODES}, got '{mode}'")
+        if mode == "timestamp" and column is None:
+            raise ValueError("mode 'timestamp' requires a timestamp column")
+        if mode == "objects" and object_keys is None:
+            raise ValueError("mode 'objects' requires the keys of the loaded objects")
+        self.validator = validator
+        self.watermark_store = watermark_store
+        self.mode = mode
+        self.column = column
+        self.object_keys = object_keys
+        self.pending_watermark = None
+
+    def __getattr__(self, name):
+        return getattr(self.validator, name)
+
+    def validate(
+        self,
+        expectation_suite: ExpectationSuite = None,
+        run_id: RunIdentifier = None,
+        evaluation_parameters: dict = None,
+        catch_exceptions: bool = True,
+        result_format: dict = None,
+        **kwargs,
+    ) -> ExpectationSuiteValidationResult:
+        """Function to validate the expectation suite of the wrapped validator (or the
+        given expectation suite) incrementally, using the same arguments as
+        Validator.validate"""
+        expectation_suite = expectation_suite or self.validator.expectation_suite
+        validate_kwargs = {
+            "run_id": run_id,
+            "evaluation_parameters": evaluation_parameters,
+            "catch_exceptions": catch_exceptions,
+            "result_format": result_format,
+        }
+
+        # -- 1. Select the rows after the watermark of the data asset
+        asset_name = self.validator.active_batch_definition.data_asset_name
+        watermark = load_watermark(
+            self.watermark_store,
+            asset_name,
+            self.mode,
+            self.column,
+            expectation_suite,
+        )
+        df = self.validator.active_batch.data.dataframe
+        df_new = select_new_rows(df, watermark)
+        logger.info(f"Validating {len(df_new)} new rows of {asset_name}")
+
+        # -- 2. Validate incrementally and advance the watermark
+        results, evaluation_parameters, run_id, aggregates = validate_new_rows(
+            self.validator,
+            expectation_suite,
+            df_new,
+            watermark["aggregates"],
+            validate_kwargs,
+        )
+        self.pending_watermark = advance_watermark(
+            watermark, df, df_new, aggregates, self.object_keys
+        )
+
+        validation_result = build_suite_validation_result(
+            self.validator, results, evaluation_parameters, run_id
+        )
+        validation_result.meta["incremental"] = {
+            "mode": self.mode,
+            "new_rows": len(df_new),
+            "total_rows": aggregates["row_count"],
+        }
+        return validation_result
+
+    def commit(self):
+        """Function to store the watermark that was advanced by the last validation,
+        so that the next run starts after the rows that were validated"""
+        if self.pending_watermark is None:
+            return
+        self.watermark_store.set(
+            (self.pending_watermark["asset_name"],),
+            json.dumps(self.pending_watermark),
+        )
+        self.pending_watermark = None
+
+
+def get_incremental_asset_config(test_config, asset_name: str) -> dict:
+    """Helper function to get the mode (and timestamp column) with which a data asset
+    is validated incrementally, as set by incremental_assets in the project
+    configuration. Returns None for assets that are not listed
+
+    Raises
+    ------
+    ValueError
+        A ValueError is raised if asset_checkpoints lists several checkpoints for the
+        data asset, as its watermark only keeps track of a single expectation suite
+    """
+    incremental_assets = getattr(test_config, "incremental_assets", None) or {}
+    if asset_name not in incremental_assets:
+        return None
+    checkpoint_names = get_asset_checkpoint_names(test_config, asset_name)
+    if len(checkpoint_names) > 1:
+        raise ValueError(
+            f"Data asset '{asset_name}' is listed under incremental_assets, but "
+            f"asset_checkpoints lists several checkpoints for it ({checkpoint_names}). "
+            "Incremental assets can only be validated with a single checkpoint"
+        )
+    asset_config = incremental_assets[asset_name] or {}
+    return {
+        "mode": asset_config.get("mode", "row_offset"),
+        "column": asset_config.get("column"),
+    }
+
+
+def run_incremental_checkpoint(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    batch_request: RuntimeBatchRequest,
+    watermark_store,
+    mode: str = "row_offset",
+    column: str = None,
+    object_keys: list = None,
+    evaluation_parameters: dict = None,
+) -> CheckpointResult:
+    """Function to run a checkpoint like context.run_checkpoint, but only validating
+    the rows of an append-only dataset that were appended since the previous run (see
+    IncrementalValidator). The watermark of the data asset is only advanced after the
+    validation result was written to its store, which means that validation results
+    buffered by the checkpoint are flushed first. If flushing fails, the watermark is
+    kept, so that the next run validates the same rows again
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run
+    batch_request : RuntimeBatchRequest
+        Batch request containing the batch of data to validate
+    watermark_store : TupleStoreBackend
+        Store backend for watermarks, generally obtained by calling
+        get_grater_store_backend with name "watermarks"
+    mode : str, optional
+        How new rows are recognized, by default "row_offset" (see
+        IncrementalValidator)
+    column : str, optional
+        Timestamp column, for mode "timestamp", by default None
+    object_keys : list, optional
+        Keys of the objects the batch was loaded from, for mode "objects", by default
+        None
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+
+    Returns
+    -------
+    CheckpointResult
+        The results of running the checkpoint, as returned by context.run_checkpoint
+    """
+    validator = IncrementalValidator(
+        get_checkpoint_validator(context, checkpoint_name, batch_request),
+        watermark_store,
+        mode,
+        column,
+        object_keys,
+    )
+    checkpoint_result = run_checkpoint_with_validator(
+        context, checkpoint_name, validator, evaluation_parameters
+    )
+    flush_store_writes()
+    validator.commit()
+    return checkpoint_result
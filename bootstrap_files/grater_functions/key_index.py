@@ -0,0 +1,776 @@
+"""Persistent key index for cross-batch uniqueness"""
+
+# -- Imports
+import datetime
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import numpy as np
+from great_expectations.exceptions import StoreBackendError
+from great_expectations.execution_engine import PandasExecutionEngine
+from great_expectations.expectations.expectation import ColumnMapExpectation
+from great_expectations.expectations.metrics.map_metric_provider import (
+    ColumnMapMetricProvider,
+    column_condition_partial,
+)
+from great_expectations.expectations.util import render_evaluation_parameter_string
+from great_expectations.render.types import RenderedStringTemplateContent
+from great_expectations.render.renderer.renderer import renderer
+from great_expectations.render.util import num_to_str, substitute_none_for_missing
+
+from store_backend_io import (
+    read_store_backend_bytes,
+    read_store_backend_versioned,
+    write_store_backend_conditionally,
+)
+from grater_functions.sketches import get_value_digests
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Persistent key index for cross-batch uniqueness
+# NOTE: expect_column_values_to_be_unique only checks a single batch, while keys of a
+# dataset (e.g. trip identifiers in monthly files) should not repeat across batches
+# either. expect_column_values_to_be_unique_across_batches checks the 64-bit digests of
+# the values of a column (see get_value_digests) against a key index in a Grater store
+# backend, which holds one segment per batch of which the keys were committed. Each
+# segment is a binary file with a Bloom filter of its digests, followed by its sorted
+# digests, radix-partitioned by their leading KEY_INDEX_PARTITION_BITS bits, with the
+# offsets of the partitions. Digests that the Bloom filter of a segment may contain are
+# confirmed by reading only their partitions with ranged reads and comparing digests
+# exactly, which for integer keys is the same as comparing their values. If those
+# partitions take fewer bytes than the Bloom filter, as for small batches checked
+# against large segments, the Bloom filter is not read at all. The
+# digests of a validated batch are kept in memory until commit_key_index_updates adds
+# them to the index, as a new segment, after all validations of the run succeeded. A
+# segment only becomes visible once the manifest of the index (manifest.json), which
+# lists its segments, is replaced by a single conditional write, which fails if another
+# writer replaced the manifest since it was read. Segments of the batch being
+# validated are skipped, so that validating a batch again does not flag its own keys.
+# As segments are immutable, their Bloom filters and partitions are cached for the
+# lifetime of a warm container. After a batch is committed, its segment is merged with
+# the newest segments that together hold no more keys than it does, like a binary
+# counter, so that an index of n batches has about log2(n) segments and a check reads
+# a bounded number of them. All segments can be merged with compact_key_index
+KEY_INDEX_PARTITION_BITS = 12
+KEY_INDEX_BLOOM_BITS_PER_KEY = 16
+KEY_INDEX_BLOOM_HASHES = 11
+KEY_INDEX_ORDINAL_DTYPE = np.dtype("<u4")
+
+# Store backend of the key index, set by register_key_index_store, digests of validated
+# batches that await commit_key_index_updates and immutable parts of segments
+_KEY_INDEX_SETTINGS = {}
+_PENDING_KEY_INDEX_UPDATES = {}
+_KEY_INDEX_CACHE = {}
+
+
+def get_bloom_positions(digests: np.ndarray, n_bits: int, i: int) -> np.ndarray:
+    """Function to get the positions of the i-th hash function of a Bloom filter with
+    n_bits bits (a power of two) for 64-bit digests, by double hashing with both
+    halves of the digests"""
+    low = digests & np.uint64(0xFFFFFFFF)
+    high = (digests >> np.uint64(32)) | np.uint64(1)
+    return (low + np.uint64(i) * high) & np.uint64(n_bits - 1)
+
+
+def build_bloom_filter(digests: np.ndarray, n_hashes: int) -> np.ndarray:
+    """Function to build a Bloom filter of a set of 64-bit digests, with about
+    KEY_INDEX_BLOOM_BITS_PER_KEY bits per digest (rounded up to a power of two), which
+    gives a false positive rate of about 1 in 2000
+
+    Parameters
+    ----------
+    digests : np.ndarray
+        Digests to add to the filter
+    n_hashes : int
+        Number of hash functions of the filter
+
+    Returns
+    -------
+    np.ndarray
+        The bits of the filter, as an array of bytes
+    """
+    n_bits = 2 ** max(
+        int(np.ceil(np.log2(max(len(digests), 1) * KEY_INDEX_BLOOM_BITS_PER_KEY))), 6
+    )
+    # -- Setting flags in a boolean array and packing them is faster than setting bits
+    flags = np.zeros(n_bits, dtype=bool)
+    for i in range(n_hashes):
+        flags[get_bloom_positions(digests, n_bits, i).astype(np.int64)] = True
+    return np.packbits(flags, bitorder="little")
+
+
+def bloom_filter_contains(
+    bits: np.ndarray, digests: np.ndarray, n_hashes: int
+) -> np.ndarray:
+    """Function that tests which digests a Bloom filter may contain. Digests for which
+    False is returned are definitely not in the filter"""
+    n_bits = len(bits) * 8
+    may_contain = np.ones(len(digests), dtype=bool)
+    for i in range(n_hashes):
+        positions = get_bloom_positions(digests, n_bits, i)
+        may_contain &= (
+            bits[(positions >> np.uint64(3)).astype(np.int64)]
+            >> (positions & np.uint64(7)).astype(np.uint8)
+        ) & 1 == 1
+    return may_contain
+
+
+def build_key_index_segment(digests: np.ndarray, ordinals: np.ndarray = None) -> tuple:
+    """Function to build a segment of a key index: the bytes of a Bloom filter of the
+    digests, the offsets of the partitions of the sorted digests, the sorted digests
+    and the ordinal of the batch of each digest in the batch_ids of the segment
+
+    Parameters
+    ----------
+    digests : np.ndarray
+        64-bit digests of the keys of the segment
+    ordinals : np.ndarray, optional
+        Ordinals of the batch of each digest, by default None for a segment of a single
+        batch
+
+    Returns
+    -------
+    tuple
+        The bytes of the segment and its description for the manifest of the index,
+        without its file and batch_ids
+    """
+    # -- 1. Sort digests by value, which partitions them by their leading bits as well
+    order = np.argsort(digests, kind="stable")
+    digests = digests[order]
+    ordinals = (
+        np.zeros(len(digests), dtype=KEY_INDEX_ORDINAL_DTYPE)
+        if ordinals is None
+        else ordinals[order].astype(KEY_INDEX_ORDINAL_DTYPE)
+    )
+    offsets = np.searchsorted(
+        digests >> np.uint64(64 - KEY_INDEX_PARTITION_BITS),
+        np.arange(2**KEY_INDEX_PARTITION_BITS + 1, dtype=np.uint64),
+    ).astype("<u8")
+
+    # -- 2. Concatenate Bloom filter, offsets, digests and ordinals
+    bloom_filter = build_bloom_filter(digests, KEY_INDEX_BLOOM_HASHES)
+    segment_bytes = b"".join(
+        [
+            bloom_filter.tobytes(),
+            offsets.tobytes(),
+            digests.astype("<u8").tobytes(),
+            ordinals.tobytes(),
+        ]
+    )
+    return segment_bytes, {
+        "n_keys": int(len(digests)),
+        "bloom_bytes": int(len(bloom_filter)),
+        "n_hashes": KEY_INDEX_BLOOM_HASHES,
+        "partition_bits": KEY_INDEX_PARTITION_BITS,
+    }
+
+
+def load_key_index_manifest(
+    store_backend, index_name: str, return_version: bool = False
+):
+    """Function to load the manifest of a key index, which lists its segments. Returns
+    an empty manifest if the index does not exist yet. If return_version is True, the
+    version of the manifest object is returned as well, with which it can be replaced
+    by write_store_backend_conditionally"""
+    manifest_bytes, version = read_store_backend_versioned(
+        store_backend, (index_name, "manifest.json")
+    )
+    manifest = (
+        json.loads(manifest_bytes)
+        if manifest_bytes is not None
+        else {"index_name": index_name, "version": 0, "segments": []}
+    )
+    return (manifest, version) if return_version else manifest
+
+
+def read_key_index_segment_part(
+    store_backend, index_name: str, segment: dict, part: str, partition: int = None
+) -> np.ndarray:
+    """Function to read a part of a segment of a key index with a ranged read: its
+    Bloom filter ("bloom"), the offsets of its partitions ("offsets"), or the digests
+    and batch ordinals of a partition ("partition"). As segments are immutable, parts
+    are cached by the file of their segment
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend of the key index
+    index_name : str
+        Name of the key index
+    segment : dict
+        Description of the segment in the manifest of the index
+    part : str
+        Part of the segment to read: "bloom", "offsets" or "partition"
+    partition : int, optional
+        Partition to read the digests and ordinals of, by default None
+
+    Returns
+    -------
+    np.ndarray or tuple
+        The Bloom filter or offsets, or a tuple with the digests and ordinals of the
+        partition
+    """
+    cache_key = (index_name, segment["file"], part, partition)
+    if cache_key in _KEY_INDEX_CACHE:
+        return _KEY_INDEX_CACHE[cache_key]
+
+    key = (index_name, "segments", segment["file"])
+    n_offsets = 2 ** segment["partition_bits"] + 1
+    offsets_start = segment["bloom_bytes"]
+    digests_start = offsets_start + n_offsets * 8
+    if part == "bloom":
+        value = np.frombuffer(
+            read_store_backend_bytes(store_backend, key, 0, segment["bloom_bytes"]),
+            dtype=np.uint8,
+        )
+    elif part == "offsets":
+        value = np.frombuffer(
+            read_store_backend_bytes(store_backend, key, offsets_start, n_offsets * 8),
+            dtype="<u8",
+        ).astype(np.int64)
+    else:
+        offsets = read_key_index_segment_part(
+            store_backend, index_name, segment, "offsets"
+        )
+        start, stop = offsets[partition], offsets[partition + 1]
+        if start == stop:
+            value = (np.array([], dtype=np.uint64), np.array([], dtype=np.uint32))
+        else:
+            ordinals_start = digests_start + segment["n_keys"] * 8
+            value = (
+                np.frombuffer(
+                    read_store_backend_bytes(
+                        store_backend,
+                        key,
+                        digests_start + start * 8,
+                        (stop - start) * 8,
+                    ),
+                    dtype="<u8",
+                ).astype(np.uint64),
+                np.frombuffer(
+                    read_store_backend_bytes(
+                        store_backend,
+                        key,
+                        ordinals_start + start * KEY_INDEX_ORDINAL_DTYPE.itemsize,
+                        (stop - start) * KEY_INDEX_ORDINAL_DTYPE.itemsize,
+                    ),
+                    dtype=KEY_INDEX_ORDINAL_DTYPE,
+                ),
+            )
+    _KEY_INDEX_CACHE[cache_key] = value
+    return value
+
+
+def find_digests_in_key_index_segment(
+    store_backend,
+    index_name: str,
+    segment: dict,
+    digests: np.ndarray,
+    exclude_batch_id: str = None,
+) -> np.ndarray:
+    """Function that tests which of a set of unique digests occur in a segment of a key
+    index, ignoring keys of the batch exclude_batch_id. Only partitions of digests that
+    the Bloom filter of the segment may contain are read, in which the digests are
+    compared exactly
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend of the key index
+    index_name : str
+        Name of the key index
+    segment : dict
+        Description of the segment in the manifest of the index
+    digests : np.ndarray
+        Unique digests to look up
+    exclude_batch_id : str, optional
+        Batch of which keys in the segment are ignored, by default None
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array that is True for digests that occur in the segment
+    """
+    found = np.zeros(len(digests), dtype=bool)
+    partitions = digests >> np.uint64(64 - segment["partition_bits"])
+    excluded_ordinals = [
+        ordinal
+        for ordinal, batch_id in enumerate(segment["batch_ids"])
+        if batch_id == exclude_batch_id
+    ]
+    if len(excluded_ordinals) == len(segment["batch_ids"]):
+        return found
+
+    # -- 1. Test digests against the Bloom filter of the segment, unless it takes more
+    #       bytes than the partitions of all digests (and is not cached already)
+    partition_bytes = (
+        len(np.unique(partitions))
+        / 2 ** segment["partition_bits"]
+        * segment["n_keys"]
+        * (8 + KEY_INDEX_ORDINAL_DTYPE.itemsize)
+    )
+    if (
+        partition_bytes < segment["bloom_bytes"]
+        and (index_name, segment["file"], "bloom", None) not in _KEY_INDEX_CACHE
+    ):
+        candidates = np.arange(len(digests))
+    else:
+        bloom_filter = read_key_index_segment_part(
+            store_backend, index_name, segment, "bloom"
+        )
+        candidates = np.flatnonzero(
+            bloom_filter_contains(bloom_filter, digests, segment["n_hashes"])
+        )
+        if len(candidates) == 0:
+            return found
+
+    # -- 2. Confirm candidates against the digests of their partitions, which are read
+    #       concurrently
+    partitions = partitions[candidates]
+    unique_partitions = np.unique(partitions).tolist()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        partition_values = executor.map(
+            lambda partition: read_key_index_segment_part(
+                store_backend, index_name, segment, "partition", partition
+            ),
+            unique_partitions,
+        )
+        for partition, (partition_digests, ordinals) in zip(
+            unique_partitions, partition_values
+        ):
+            if excluded_ordinals:
+                partition_digests = partition_digests[
+                    ~np.isin(ordinals, excluded_ordinals)
+                ]
+            positions = candidates[partitions == partition]
+            if len(partition_digests) == 0:
+                continue
+            indices = np.minimum(
+                np.searchsorted(partition_digests, digests[positions]),
+                len(partition_digests) - 1,
+            )
+            found[positions] = partition_digests[indices] == digests[positions]
+    return found
+
+
+def find_digests_in_key_index(
+    store_backend,
+    index_name: str,
+    digests: np.ndarray,
+    exclude_batch_id: str = None,
+    manifest: dict = None,
+) -> np.ndarray:
+    """Function that tests which of a set of unique digests occur in the segments of a
+    key index, ignoring keys of the batch exclude_batch_id
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend of the key index
+    index_name : str
+        Name of the key index
+    digests : np.ndarray
+        Unique digests to look up
+    exclude_batch_id : str, optional
+        Batch of which keys in the index are ignored, by default None
+    manifest : dict, optional
+        Manifest of the index, or only the segments to search, by default None to load
+        the current manifest of the index
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array that is True for digests that occur in the index
+    """
+    if manifest is None:
+        manifest = load_key_index_manifest(store_backend, index_name)
+    found = np.zeros(len(digests), dtype=bool)
+    for segment in manifest["segments"]:
+        remaining = np.flatnonzero(~found)
+        if len(remaining) == 0:
+            break
+        found[remaining] = find_digests_in_key_index_segment(
+            store_backend, index_name, segment, digests[remaining], exclude_batch_id
+        )
+    return found
+
+
+def check_keys_against_key_index(
+    column: pd.Series, index_name: str, batch_id: str = None
+) -> pd.Series:
+    """Function that checks which values of a column do not occur in earlier batches,
+    according to the key index registered with register_key_index_store. The digests
+    of the values are kept until commit_key_index_updates is called
+
+    Parameters
+    ----------
+    column : pd.Series
+        Values of the key column of the batch
+    index_name : str
+        Name of the key index
+    batch_id : str, optional
+        Identifier of the batch, of which keys in the index are ignored, by default None
+
+    Returns
+    -------
+    pd.Series
+        Boolean Series that is True for values that do not occur in earlier batches
+
+    Raises
+    ------
+    StoreBackendError
+        A StoreBackendError is raised if no key index store is registered
+    """
+    if "store_backend" not in _KEY_INDEX_SETTINGS:
+        raise StoreBackendError(
+            "No key index store is registered, use register_key_index_store or set "
+            "key_index to true in the project configuration"
+        )
+    store_backend = _KEY_INDEX_SETTINGS["store_backend"]
+    digests = get_value_digests(column)
+    unique_digests, inverse = np.unique(digests, return_inverse=True)
+    found = find_digests_in_key_index(
+        store_backend, index_name, unique_digests, batch_id
+    )
+    _PENDING_KEY_INDEX_UPDATES[(index_name, batch_id)] = unique_digests
+    return pd.Series(~found[inverse], index=column.index)
+
+
+def add_batch_to_key_index(
+    store_backend,
+    index_name: str,
+    batch_id: str,
+    digests: np.ndarray,
+    max_attempts: int = 3,
+) -> dict:
+    """Function to add the unique digests of the keys of a batch to a key index, as a
+    new segment. The segment is written first, after which the manifest is replaced
+    with a single conditional write, so that readers see either the old or the new
+    index. A segment of the same batch that was added before is replaced. If the
+    manifest was replaced by another writer in the meantime, the write fails and the
+    digests are checked against the segments it added before trying again
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend of the key index
+    index_name : str
+        Name of the key index
+    batch_id : str
+        Identifier of the batch
+    digests : np.ndarray
+        Unique digests of the keys of the batch
+    max_attempts : int, optional
+        Number of attempts to replace the manifest, by default 3
+
+    Returns
+    -------
+    dict
+        The new manifest of the index
+
+    Raises
+    ------
+    StoreBackendError
+        A StoreBackendError is raised if keys of the batch were added by another batch
+        in the meantime, or if the manifest kept changing
+    """
+    # -- 1. Write the segment, which is not visible until the manifest lists it
+    segment_bytes, segment = build_key_index_segment(digests)
+    segment.update({"file": f"{uuid.uuid4().hex}.bin", "batch_ids": [batch_id]})
+    store_backend.set(
+        (index_name, "segments", segment["file"]),
+        segment_bytes,
+        content_type="application/octet-stream",
+    )
+
+    manifest, version = load_key_index_manifest(
+        store_backend, index_name, return_version=True
+    )
+    for _ in range(max_attempts):
+        # -- 2. Replace the manifest with one that lists the new segment, unless it
+        #       was replaced by another writer since it was read
+        replaced_segments = [
+            s for s in manifest["segments"] if s["batch_ids"] == [batch_id]
+        ]
+        new_manifest = {
+            "index_name": index_name,
+            "version": manifest["version"] + 1,
+            "segments": [s for s in manifest["segments"] if s not in replaced_segments]
+            + [segment],
+            "updated_at": datetime.datetime.utcnow().isoformat(),
+        }
+        if write_store_backend_conditionally(
+            store_backend,
+            (index_name, "manifest.json"),
+            json.dumps(new_manifest),
+            version,
+        ):
+            for replaced_segment in replaced_segments:
+                store_backend.remove_key(
+                    (index_name, "segments", replaced_segment["file"])
+                )
+            logger.info(
+                f"Added {len(digests)} keys of batch {batch_id} to key index "
+                f"{index_name} (version {new_manifest['version']})"
+            )
+            return new_manifest
+
+        # -- 3. Check digests against segments added by another writer and try again
+        current_manifest, version = load_key_index_manifest(
+            store_backend, index_name, return_version=True
+        )
+        known_files = {s["file"] for s in manifest["segments"]}
+        added_segments = [
+            s for s in current_manifest["segments"] if s["file"] not in known_files
+        ]
+        if find_digests_in_key_index(
+            store_backend,
+            index_name,
+            digests,
+            batch_id,
+            manifest={"segments": added_segments},
+        ).any():
+            store_backend.remove_key((index_name, "segments", segment["file"]))
+            raise StoreBackendError(
+                f"Keys of batch {batch_id} were added to key index {index_name} by "
+                "another batch in the meantime"
+            )
+        manifest = current_manifest
+
+    store_backend.remove_key((index_name, "segments", segment["file"]))
+    raise StoreBackendError(
+        f"Unable to update key index {index_name}, its manifest kept changing"
+    )
+
+
+def get_segments_to_compact(segments: list) -> int:
+    """Helper function to get the number of newest segments of a key index to merge
+    after a batch was added: the newest segment together with the segments before it
+    that hold no more keys than the segments after them. Like carrying in a binary
+    counter, this keeps about log2(n) segments for n batches, while each key is
+    rewritten about log2(n) times. Returns 0 if no segments need to be merged"""
+    n_segments, n_keys = 1, segments[-1]["n_keys"] if segments else 0
+    while n_segments < len(segments) and segments[-n_segments - 1]["n_keys"] <= n_keys:
+        n_keys += segments[-n_segments - 1]["n_keys"]
+        n_segments += 1
+    return n_segments if n_segments > 1 else 0
+
+
+def compact_key_index(
+    store_backend, index_name: str, max_attempts: int = 3, tiered: bool = False
+) -> dict:
+    """Function to merge the segments of a key index into a single segment, which
+    keeps the batch of each key. Merging all segments takes time proportional to the
+    size of the index, which is why commit_key_index_updates only merges the newest
+    segments (tiered), as selected by get_segments_to_compact. The manifest is
+    replaced with a conditional write, so if a batch was added during compaction,
+    compaction starts over
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend of the key index
+    index_name : str
+        Name of the key index
+    max_attempts : int, optional
+        Number of attempts to compact the index, by default 3
+    tiered : bool, optional
+        Whether to only merge the newest segments selected by get_segments_to_compact,
+        by default False to merge all segments
+
+    Returns
+    -------
+    dict
+        The new manifest of the index
+
+    Raises
+    ------
+    StoreBackendError
+        A StoreBackendError is raised if the manifest kept changing during compaction
+    """
+    for _ in range(max_attempts):
+        manifest, version = load_key_index_manifest(
+            store_backend, index_name, return_version=True
+        )
+        n_segments = (
+            get_segments_to_compact(manifest["segments"])
+            if tiered
+            else len(manifest["segments"])
+        )
+        if n_segments < 2:
+            return manifest
+        kept_segments = manifest["segments"][:-n_segments]
+        merged_segments = manifest["segments"][-n_segments:]
+
+        # -- 1. Read the segments, mapping ordinals to the batch_ids of the new segment
+        batch_ids, list_digests, list_ordinals = [], [], []
+        for segment in merged_segments:
+            segment_bytes = read_store_backend_bytes(
+                store_backend, (index_name, "segments", segment["file"])
+            )
+            digests_start = (
+                segment["bloom_bytes"] + (2 ** segment["partition_bits"] + 1) * 8
+            )
+            ordinals_start = digests_start + segment["n_keys"] * 8
+            list_digests.append(
+                np.frombuffer(
+                    segment_bytes[digests_start:ordinals_start], dtype="<u8"
+                ).astype(np.uint64)
+            )
+            ordinals = np.frombuffer(
+                segment_bytes[ordinals_start:], dtype=KEY_INDEX_ORDINAL_DTYPE
+            )
+            list_ordinals.append(ordinals + len(batch_ids))
+            batch_ids.extend(segment["batch_ids"])
+
+        # -- 2. Write the merged segment and replace the manifest, unless it was
+        #       replaced by another writer since it was read
+        segment_bytes, segment = build_key_index_segment(
+            np.concatenate(list_digests), np.concatenate(list_ordinals)
+        )
+        segment.update({"file": f"{uuid.uuid4().hex}.bin", "batch_ids": batch_ids})
+        store_backend.set(
+            (index_name, "segments", segment["file"]),
+            segment_bytes,
+            content_type="application/octet-stream",
+        )
+        new_manifest = {
+            "index_name": index_name,
+            "version": manifest["version"] + 1,
+            "segments": kept_segments + [segment],
+            "updated_at": datetime.datetime.utcnow().isoformat(),
+        }
+        if not write_store_backend_conditionally(
+            store_backend,
+            (index_name, "manifest.json"),
+            json.dumps(new_manifest),
+            version,
+        ):
+            logger.info(
+                f"Key index {index_name} was updated during compaction, starting over"
+            )
+            store_backend.remove_key((index_name, "segments", segment["file"]))
+            continue
+
+        for old_segment in merged_segments:
+            store_backend.remove_key((index_name, "segments", old_segment["file"]))
+        logger.info(f"Compacted {n_segments} segments of key index {index_name}")
+        return new_manifest
+
+    raise StoreBackendError(
+        f"Unable to compact key index {index_name}, its manifest kept changing"
+    )
+
+
+def register_key_index_store(store_backend):
+    """Function to register the store backend of the key index that
+    expect_column_values_to_be_unique_across_batches checks keys against"""
+    _KEY_INDEX_SETTINGS["store_backend"] = store_backend
+
+
+def commit_key_index_updates(list_results: list = None) -> int:
+    """Function to add the keys of the batches that were checked by
+    expect_column_values_to_be_unique_across_batches to their key index. Keys are only
+    added if all results of the run succeeded, so that a failed batch can be corrected
+    and validated again. Pending keys are discarded either way. After a batch is
+    added, the newest segments of its index are merged (see get_segments_to_compact),
+    which is retried by the next commit if the manifest kept changing
+
+    Parameters
+    ----------
+    list_results : list, optional
+        Results of the validations of the run (e.g. CheckpointResults), by default None
+
+    Returns
+    -------
+    int
+        Number of batches of which the keys were added
+    """
+    pending_updates = dict(_PENDING_KEY_INDEX_UPDATES)
+    _PENDING_KEY_INDEX_UPDATES.clear()
+    if not pending_updates:
+        return 0
+    if not all(results.success for results in list_results or []):
+        logger.info("Validation failed, keys are not added to the key index")
+        return 0
+
+    store_backend = _KEY_INDEX_SETTINGS["store_backend"]
+    for (index_name, batch_id), digests in pending_updates.items():
+        add_batch_to_key_index(store_backend, index_name, batch_id, digests)
+        try:
+            compact_key_index(store_backend, index_name, tiered=True)
+        except StoreBackendError as error:
+            logger.warning(f"Key index {index_name} was not compacted: {error}")
+    return len(pending_updates)
+
+
+class ColumnValuesUniqueAcrossBatches(ColumnMapMetricProvider):
+    condition_metric_name = "column_values.unique_across_batches"
+    condition_value_keys = ("index_name", "batch_id")
+
+    @column_condition_partial(engine=PandasExecutionEngine)
+    def _pandas(cls, column, index_name=None, batch_id=None, **kwargs):
+        return check_keys_against_key_index(column, index_name or column.name, batch_id)
+
+
+class ExpectColumnValuesToBeUniqueAcrossBatches(ColumnMapExpectation):
+    """Expect the values of a column not to occur in earlier batches of the dataset,
+    according to a persistent key index (see register_key_index_store). The keys of a
+    batch are added to the index by commit_key_index_updates. By default, the index is
+    named after the column"""
+
+    map_metric = "column_values.unique_across_batches"
+    success_keys = ("index_name", "mostly")
+    default_kwarg_values = {
+        "index_name": None,
+        "mostly": 1,
+        "result_format": "BASIC",
+        "include_config": True,
+        "catch_exceptions": True,
+    }
+    args_keys = ("column", "index_name")
+
+    @classmethod
+    @renderer(renderer_type="renderer.prescriptive")
+    @render_evaluation_parameter_string
+    def _prescriptive_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        runtime_configuration = runtime_configuration or {}
+        params = substitute_none_for_missing(
+            configuration.kwargs, ["column", "index_name", "mostly"]
+        )
+        template_str = "values must not occur in earlier batches"
+        if params["index_name"] is not None:
+            template_str += " (key index $index_name)"
+        if params["mostly"] is not None and params["mostly"] < 1:
+            params["mostly_pct"] = num_to_str(
+                params["mostly"] * 100, precision=15, no_scientific=True
+            )
+            template_str += ", at least $mostly_pct % of the time."
+        else:
+            template_str += "."
+        if runtime_configuration.get("include_column_name", True) is not False:
+            template_str = f"$column {template_str}"
+
+        return [
+            RenderedStringTemplateContent(
+                **{
+                    "content_block_type": "string_template",
+                    "string_template": {
+                        "template": template_str,
+                        "params": params,
+                        "styling": runtime_configuration.get("styling"),
+                    },
+                }
+            )
+        ]
@@ -0,0 +1,291 @@
+"""Micro-batching of small files"""
+
+# -- Imports
+import copy
+from collections import Counter
+import pandas as pd
+import great_expectations as ge
+import numpy as np
+from great_expectations.checkpoint.types.checkpoint_result import CheckpointResult
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+)
+from great_expectations.expectations.expectation import (
+    ColumnMapExpectation,
+    ColumnPairMapExpectation,
+    MulticolumnMapExpectation,
+)
+from great_expectations.expectations.registry import get_expectation_impl
+from great_expectations.validator.validator import Validator
+
+from grater_functions.validation import (
+    get_checkpoint_validator,
+    is_skipped_result,
+    run_checkpoint_with_validator,
+)
+
+# Micro-batching of small files
+# NOTE: when many small files arrive under a prefix (e.g. thousands of files of 100 KB
+# per hour), validating each file as its own batch is dominated by the overhead per
+# validation. Instead, files can be grouped into micro-batches by the time window in
+# which they were last modified and/or by their total size (see group_micro_batches),
+# downloaded concurrently and concatenated into a single DataFrame with a column that
+# holds the file each row came from (see concatenate_micro_batch). The micro-batch is
+# validated as one batch without that column, after which the unexpected rows of
+# failed map expectations are attributed to their files, in the meta of their result
+# (see MicroBatchValidator)
+SOURCE_FILE_COLUMN = "_source_file"
+
+
+def group_micro_batches(
+    objects: list,
+    window_minutes: int = None,
+    max_bytes: int = None,
+    max_files: int = None,
+) -> list:
+    """Function to group files into micro-batches, in order of the time they were last
+    modified. A new micro-batch is started when a file falls into another time window
+    than the previous one, or when adding it would exceed max_bytes or max_files
+
+    Parameters
+    ----------
+    objects : list
+        Dictionaries with the key, size (in bytes) and last_modified (datetime) of each
+        file, e.g. as listed by list_objects_with_metadata or list_blobs_with_metadata
+    window_minutes : int, optional
+        Length of the time windows in minutes, counted from midnight, by default None
+        to not group by time
+    max_bytes : int, optional
+        Maximum total size of the files of a micro-batch, by default None
+    max_files : int, optional
+        Maximum number of files of a micro-batch, by default None
+
+    Returns
+    -------
+    list
+        Micro-batches, each a dictionary with its batch_identifier (the start of its
+        time window, or the time its first file was last modified) and its objects.
+        If a time window is split by max_bytes or max_files, the identifiers of its
+        later micro-batches get a sequence number as suffix (e.g. "-1")
+    """
+    micro_batches = []
+    current_window, current_bytes = None, 0
+    n_window_pieces = Counter()
+    for obj in sorted(objects, key=lambda obj: (obj["last_modified"], obj["key"])):
+        last_modified = pd.Timestamp(obj["last_modified"])
+        window = last_modified.floor(f"{window_minutes}min") if window_minutes else None
+        if (
+            not micro_batches
+            or window != current_window
+            or (max_bytes and current_bytes + obj["size"] > max_bytes)
+            or (max_files and len(micro_batches[-1]["objects"]) >= max_files)
+        ):
+            window_start = (window or last_modified).isoformat()
+            n_pieces = n_window_pieces[window_start]
+            n_window_pieces[window_start] += 1
+            micro_batches.append(
+                {
+                    "batch_identifier": (
+                        f"{window_start}-{n_pieces}" if n_pieces else window_start
+                    ),
+                    "objects": [],
+                }
+            )
+            current_window, current_bytes = window, 0
+        micro_batches[-1]["objects"].append(obj)
+        current_bytes += obj["size"]
+
+    return micro_batches
+
+
+def get_micro_batching_config(test_config) -> dict:
+    """Helper function to get the arguments for group_micro_batches (window_minutes,
+    max_bytes and max_files), as set by micro_batching in the project configuration"""
+    micro_batching = getattr(test_config, "micro_batching", None) or {}
+    return {
+        key: micro_batching.get(key)
+        for key in ("window_minutes", "max_bytes", "max_files")
+    }
+
+
+def concatenate_micro_batch(dict_frames: dict) -> pd.DataFrame:
+    """Function to concatenate the DataFrames of the files of a micro-batch into a
+    single DataFrame, with the key of the file of each row in SOURCE_FILE_COLUMN (as a
+    categorical column) and a fresh index, by which rows are attributed to their files
+
+    Parameters
+    ----------
+    dict_frames : dict
+        DataFrame of each file, by the key of the file
+
+    Returns
+    -------
+    pd.DataFrame
+        The DataFrame of the micro-batch
+    """
+    keys = list(dict_frames)
+    df_micro_batch = pd.concat(
+        [dict_frames[key] for key in keys], ignore_index=True, copy=False
+    )
+    df_micro_batch[SOURCE_FILE_COLUMN] = pd.Categorical.from_codes(
+        np.repeat(np.arange(len(keys)), [len(dict_frames[key]) for key in keys]),
+        categories=keys,
+    )
+    return df_micro_batch
+
+
+def is_map_expectation(expectation_config) -> bool:
+    """Helper function to check whether an expectation is a map expectation, of which
+    the unexpected rows can be identified by their index"""
+    try:
+        expectation_impl = get_expectation_impl(expectation_config.expectation_type)
+    except Exception:
+        return False
+
+    return issubclass(
+        expectation_impl,
+        (ColumnMapExpectation, ColumnPairMapExpectation, MulticolumnMapExpectation),
+    )
+
+
+def attribute_unexpected_rows(
+    validator: Validator, results: list, source_files: pd.Series
+) -> list:
+    """Function that attributes the unexpected rows of failed map expectations to the
+    files of a micro-batch. The indexes of all unexpected rows are collected by
+    validating the failed expectations again with the COMPLETE result format, after
+    which the number of unexpected rows per file is added to the meta of their results
+    (unexpected_source_files)
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator of the micro-batch
+    results : list
+        ExpectationValidationResult objects of the micro-batch
+    source_files : pd.Series
+        File of each row of the micro-batch, with the same index
+
+    Returns
+    -------
+    list
+        The results, of which failed map expectations have unexpected_source_files in
+        their meta
+    """
+    failed_results = [
+        result
+        for result in results
+        if not result.success
+        and not is_skipped_result(result)
+        and is_map_expectation(result.expectation_config)
+    ]
+    if not failed_results:
+        return results
+
+    complete_results = validator.graph_validate(
+        configurations=[
+            copy.deepcopy(result.expectation_config) for result in failed_results
+        ],
+        runtime_configuration={
+            "result_format": {"result_format": "COMPLETE"},
+            "catch_exceptions": True,
+        },
+    )
+    for result, complete_result in zip(failed_results, complete_results):
+        unexpected_index_list = complete_result.result.get("unexpected_index_list")
+        if not unexpected_index_list:
+            continue
+        counts = source_files.loc[unexpected_index_list].value_counts(sort=True)
+        result.meta = result.meta or {}
+        result.meta["unexpected_source_files"] = {
+            str(source_file): int(count)
+            for source_file, count in counts.items()
+            if count > 0
+        }
+    return results
+
+
+class MicroBatchValidator:
+    """Wrapper around a Great Expectations Validator of a micro-batch, which adds the
+    number of unexpected rows per file to the results of failed map expectations
+    when validate is called (see attribute_unexpected_rows). All other attributes are
+    passed through to the wrapped validator, so that it can be run by the actions of a
+    checkpoint as if it were a regular validator
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the micro-batch without its SOURCE_FILE_COLUMN
+    source_files : pd.Series
+        File of each row of the micro-batch, with the same index
+    """
+
+    def __init__(self, validator: Validator, source_files: pd.Series):
+        self.validator = validator
+        self.source_files = source_files
+
+    def __getattr__(self, name):
+        return getattr(self.validator, name)
+
+    def validate(self, *args, **kwargs) -> ExpectationSuiteValidationResult:
+        """Function to validate the micro-batch, using the same arguments as
+        Validator.validate"""
+        validation_result = self.validator.validate(*args, **kwargs)
+        attribute_unexpected_rows(
+            self.validator, validation_result.results, self.source_files
+        )
+        validation_result.meta["source_files"] = len(self.source_files.cat.categories)
+        return validation_result
+
+
+def run_micro_batch_checkpoint(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    df_micro_batch: pd.DataFrame,
+    asset_name: str,
+    batch_identifier: str,
+    evaluation_parameters: dict = None,
+) -> CheckpointResult:
+    """Function to run a checkpoint against a micro-batch of files, as concatenated by
+    concatenate_micro_batch. The micro-batch is validated without SOURCE_FILE_COLUMN,
+    and unexpected rows of failed map expectations are attributed to their files in
+    the meta of their results (see MicroBatchValidator)
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run
+    df_micro_batch : pd.DataFrame
+        DataFrame of the micro-batch, with the file of each row in SOURCE_FILE_COLUMN
+    asset_name : str
+        Name of the data asset the files belong to
+    batch_identifier : str
+        Identifier of the micro-batch, e.g. the start of its time window
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+
+    Returns
+    -------
+    CheckpointResult
+        The results of running the checkpoint, as returned by context.run_checkpoint
+    """
+    batch_request = RuntimeBatchRequest(
+        datasource_name="runtime_data",
+        data_connector_name="runtime_data_connector",
+        data_asset_name=asset_name,
+        runtime_parameters={
+            "batch_data": df_micro_batch.drop(columns=[SOURCE_FILE_COLUMN])
+        },
+        batch_identifiers={"batch_identifier": batch_identifier},
+    )
+    validator = MicroBatchValidator(
+        get_checkpoint_validator(context, checkpoint_name, batch_request),
+        df_micro_batch[SOURCE_FILE_COLUMN],
+    )
+    return run_checkpoint_with_validator(
+        context, checkpoint_name, validator, evaluation_parameters
+    )
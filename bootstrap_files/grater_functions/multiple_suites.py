@@ -0,0 +1,402 @@
+"""Functions for validating multiple expectation suites against a single batch"""
+
+# -- Imports
+import copy
+import datetime
+import json
+import logging
+import great_expectations as ge
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+)
+from great_expectations.core.run_identifier import RunIdentifier
+from great_expectations.core.util import convert_to_json_serializable
+
+from grater_functions.parallel import ParallelValidator
+from grater_functions.result_format import get_adaptive_validator
+from grater_functions.tiers import (
+    build_skipped_result,
+    register_skipped_status_icon_renderer,
+)
+from grater_functions.validation import (
+    EXPECTATION_TIERS,
+    build_suite_validation_result,
+    get_expectation_tier,
+    run_checkpoint_with_validator,
+    sort_results_by_column,
+)
+from grater_functions.validation_plans import (
+    get_plan_result_formats,
+    get_planned_validator,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for validating multiple expectation suites against a single batch
+# NOTE: expectations of different suites are validated together in one pass per tier,
+# so that Great Expectations computes metrics they share (e.g. column min/max or null
+# counts) only once. Expectations are tagged with their suite through their meta.
+# Evaluation parameters are set per validate call, so suites that assign different
+# values to the same parameter are validated in separate calls
+SUITE_META_KEY = "grater_expectation_suite_name"
+
+
+def group_suites_by_evaluation_parameters(expectation_suites: list) -> list:
+    """Function that groups expectation suites so that the suites in a group do not
+    assign different values to the same evaluation parameter, keeping the order of the
+    suites. Suites without conflicting evaluation parameters end up in the same group
+
+    Parameters
+    ----------
+    expectation_suites : list
+        List of expectation suites to group
+
+    Returns
+    -------
+    list
+        List of tuples with the list of expectation suites in each group and their
+        combined evaluation parameters
+    """
+    list_groups = []
+    for suite in expectation_suites:
+        suite_parameters = suite.evaluation_parameters or {}
+        for group_suites, group_parameters in list_groups:
+            if all(
+                group_parameters.get(name, value) == value
+                for name, value in suite_parameters.items()
+            ):
+                group_suites.append(suite)
+                group_parameters.update(suite_parameters)
+                break
+        else:
+            list_groups.append(([suite], dict(suite_parameters)))
+
+    return list_groups
+
+
+def validate_suites_on_batch(
+    validator, expectation_suites: list, validate_kwargs: dict
+) -> dict:
+    """Function that validates several expectation suites against the batch of a
+    single validator. For each priority tier (see EXPECTATION_TIERS), the expectations
+    of all suites are validated in a single call to validate. If an expectation in the
+    blocking tier of a suite fails, the remaining expectations of that suite are
+    skipped, while validation of the other suites continues. Suites that assign
+    different values to the same evaluation parameter are validated in separate calls
+    (see group_suites_by_evaluation_parameters), so that each suite is validated with
+    its own values
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate, or a ParallelValidator wrapped
+        around one
+    expectation_suites : list
+        List of expectation suites to validate
+    validate_kwargs : dict
+        Keyword arguments to pass to Validator.validate
+
+    Returns
+    -------
+    dict
+        A dictionary with the name of each expectation suite as key and a tuple with
+        the list of ExpectationValidationResult objects for that suite and the
+        evaluation parameters that were used as value
+    """
+    validate_kwargs = dict(validate_kwargs)
+    dict_results = {suite.expectation_suite_name: [] for suite in expectation_suites}
+    list_groups = group_suites_by_evaluation_parameters(expectation_suites)
+    if len(list_groups) > 1:
+        logger.info(
+            f"Expectation suites assign different values to evaluation parameters, "
+            f"validating them in {len(list_groups)} groups"
+        )
+    used_parameters = {}
+    blocked_suites = set()
+
+    for tier in EXPECTATION_TIERS:
+        for group_suites, evaluation_parameters in list_groups:
+            # -- 1. Combine expectations of the tier for all suites of the group that
+            # -- are not blocked
+            combined_expectations = []
+            for suite in group_suites:
+                suite_name = suite.expectation_suite_name
+                tier_expectations = [
+                    expectation
+                    for expectation in suite.expectations
+                    if get_expectation_tier(expectation) == tier
+                ]
+                if suite_name in blocked_suites:
+                    dict_results[suite_name].extend(
+                        build_skipped_result(
+                            expectation,
+                            validator.active_batch_id,
+                            "Skipped because an expectation in the blocking tier "
+                            "failed",
+                        )
+                        for expectation in tier_expectations
+                    )
+                    continue
+
+                for expectation in copy.deepcopy(tier_expectations):
+                    expectation.meta[SUITE_META_KEY] = suite_name
+                    combined_expectations.append(expectation)
+
+            if not combined_expectations:
+                continue
+
+            # -- 2. Validate combined expectations and split the results by suite
+            combined_result = validator.validate(
+                expectation_suite=ExpectationSuite(
+                    expectation_suite_name=validator.expectation_suite_name,
+                    expectations=combined_expectations,
+                    evaluation_parameters=evaluation_parameters,
+                ),
+                **validate_kwargs,
+            )
+            validate_kwargs["run_id"] = combined_result.meta["run_id"]
+            for suite in group_suites:
+                used_parameters[suite.expectation_suite_name] = (
+                    combined_result.evaluation_parameters
+                )
+
+            for result in combined_result.results:
+                suite_name = result.expectation_config.meta.pop(SUITE_META_KEY)
+                dict_results[suite_name].append(result)
+                if tier == "blocking" and not result.success:
+                    blocked_suites.add(suite_name)
+
+    for suite_name in blocked_suites:
+        logger.warning(
+            f"Expectations in the blocking tier of {suite_name} failed, skipped "
+            "validation of its remaining expectations"
+        )
+
+    return {
+        suite.expectation_suite_name: (
+            sort_results_by_column(
+                suite.expectations, dict_results[suite.expectation_suite_name]
+            ),
+            used_parameters.get(suite.expectation_suite_name, {}),
+        )
+        for suite in expectation_suites
+    }
+
+
+class SharedBatchValidation:
+    """Class that validates several expectation suites against the batch of a single
+    validator, so that the batch is loaded only once and metrics that are shared
+    between suites are computed only once (see validate_suites_on_batch). The results
+    for each suite are obtained through validators returned by get_suite_validator,
+    which can be run by the actions of a checkpoint. Suites are validated on the first
+    request for results and again only if a later request uses different arguments
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate, or a ParallelValidator wrapped
+        around one
+    expectation_suites : list
+        List of expectation suites to validate
+    """
+
+    def __init__(self, validator, expectation_suites: list):
+        self.validator = validator
+        self.expectation_suites = {
+            suite.expectation_suite_name: suite for suite in expectation_suites
+        }
+        self._dict_cache = {}
+
+    def get_suite_validator(self, expectation_suite_name: str):
+        """Function to get a validator for one of the expectation suites, which
+        returns the result of that suite from the shared validation when validate is
+        called"""
+        return SharedBatchSuiteValidator(
+            self, self.expectation_suites[expectation_suite_name]
+        )
+
+    def validate_suites(
+        self,
+        evaluation_parameters: dict = None,
+        catch_exceptions: bool = True,
+        result_format: dict = None,
+    ) -> dict:
+        """Function to validate all expectation suites, or return the results of an
+        earlier validation with the same arguments (see validate_suites_on_batch)"""
+        cache_key = json.dumps(
+            convert_to_json_serializable(
+                [evaluation_parameters, catch_exceptions, result_format]
+            ),
+            sort_keys=True,
+        )
+        if cache_key not in self._dict_cache:
+            logger.info(
+                f"Validating {len(self.expectation_suites)} expectation suites against "
+                "a single batch"
+            )
+            self._dict_cache[cache_key] = validate_suites_on_batch(
+                self.validator,
+                list(self.expectation_suites.values()),
+                {
+                    "run_id": None,
+                    "evaluation_parameters": evaluation_parameters,
+                    "catch_exceptions": catch_exceptions,
+                    "result_format": result_format,
+                },
+            )
+
+        return self._dict_cache[cache_key]
+
+
+class SharedBatchSuiteValidator:
+    """Validator for one of the expectation suites of a SharedBatchValidation, which
+    offers the interface of a Great Expectations Validator to the actions of a
+    checkpoint. All other attributes are passed through to the shared validator
+
+    Parameters
+    ----------
+    shared_validation : SharedBatchValidation
+        Shared validation of all expectation suites against the batch
+    expectation_suite : ExpectationSuite
+        Expectation suite to return the results for
+    """
+
+    def __init__(
+        self,
+        shared_validation: SharedBatchValidation,
+        expectation_suite: ExpectationSuite,
+    ):
+        self.shared_validation = shared_validation
+        self.expectation_suite = expectation_suite
+        self.expectation_suite_name = expectation_suite.expectation_suite_name
+        self._expectation_suite = expectation_suite
+
+    def __getattr__(self, name):
+        return getattr(self.shared_validation.validator, name)
+
+    def validate(
+        self,
+        expectation_suite: ExpectationSuite = None,
+        run_id: RunIdentifier = None,
+        evaluation_parameters: dict = None,
+        catch_exceptions: bool = True,
+        result_format: dict = None,
+        **kwargs,
+    ) -> ExpectationSuiteValidationResult:
+        """Function to get the validation result of the expectation suite from the
+        shared validation, using the same arguments as Validator.validate"""
+        dict_suite_results = self.shared_validation.validate_suites(
+            evaluation_parameters, catch_exceptions, result_format
+        )
+        results, used_parameters = dict_suite_results[self.expectation_suite_name]
+
+        return build_suite_validation_result(
+            self.shared_validation.validator,
+            results,
+            used_parameters,
+            run_id
+            or RunIdentifier(run_time=datetime.datetime.now(datetime.timezone.utc)),
+            expectation_suite_name=self.expectation_suite_name,
+        )
+
+
+def run_checkpoints_on_batch(
+    context: ge.data_context.DataContext,
+    checkpoint_names: list,
+    batch_request: RuntimeBatchRequest,
+    evaluation_parameters: dict = None,
+    n_workers: int = 1,
+    partition_by: str = "columns",
+    initial_result_format=None,
+    validation_plan_store=None,
+) -> dict:
+    """Function to run several checkpoints against a single batch of data, which is
+    loaded only once. The expectation suites of all checkpoints are validated together
+    (see SharedBatchValidation), after which the actions of each checkpoint are run
+    for the result of its own suite. Expectations are validated in order of their
+    priority tier per suite, but not ordered by cost
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_names : list
+        Names of the checkpoints to run
+    batch_request : RuntimeBatchRequest
+        Batch request containing the batch of data to validate
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suites, by
+        default None
+    n_workers : int, optional
+        Number of processes to spread validation over, by default 1
+    partition_by : str, optional
+        Whether to partition validation by "columns" or by "rows" when n_workers is
+        larger than 1, by default "columns"
+    initial_result_format : str or dict, optional
+        If passed, expectations are validated with this result format first and only
+        failed expectations again with the result format of the checkpoint (see
+        AdaptiveResultFormatValidator), by default None
+    validation_plan_store : TupleStoreBackend, optional
+        Store backend for validation plans (see get_grater_store_backend), by default
+        None. If passed, metric graphs are built from the validation plans of the
+        expectation suites (see PlannedValidator), which are compiled if needed
+
+    Returns
+    -------
+    dict
+        A dictionary with the name of each checkpoint as key and the results of
+        running it as value, as returned by context.run_checkpoint
+    """
+    register_skipped_status_icon_renderer()
+
+    # -- 1. Load the batch once, and the expectation suites of all checkpoints
+    suite_names = [
+        context.get_checkpoint(checkpoint_name).get_substituted_config()[
+            "expectation_suite_name"
+        ]
+        for checkpoint_name in checkpoint_names
+    ]
+    validator = context.get_validator(
+        batch_request=batch_request, expectation_suite_name=suite_names[0]
+    )
+    expectation_suites = [
+        context.get_expectation_suite(suite_name)
+        for suite_name in dict.fromkeys(suite_names)
+    ]
+    if validation_plan_store is not None:
+        validator = get_planned_validator(
+            validator,
+            validation_plan_store,
+            expectation_suites,
+            get_plan_result_formats(context, checkpoint_names, initial_result_format),
+        )
+    shared_validation = SharedBatchValidation(
+        get_adaptive_validator(
+            ParallelValidator(validator, n_workers, partition_by),
+            initial_result_format,
+        ),
+        expectation_suites,
+    )
+
+    # -- 2. Run each checkpoint with the results for its expectation suite
+    return {
+        checkpoint_name: run_checkpoint_with_validator(
+            context,
+            checkpoint_name,
+            shared_validation.get_suite_validator(suite_name),
+            evaluation_parameters,
+        )
+        for checkpoint_name, suite_name in zip(checkpoint_names, suite_names)
+    }
+
+
+def get_asset_checkpoint_names(test_config, asset_name: str) -> list:
+    """Helper function to get the names of the checkpoints to run against a batch of
+    the given data asset, as set by asset_checkpoints in the project configuration.
+    Defaults to the checkpoint_name of the project for assets that are not listed"""
+    asset_checkpoints = getattr(test_config, "asset_checkpoints", None) or {}
+    return asset_checkpoints.get(asset_name, [test_config.checkpoint_name])
@@ -0,0 +1,970 @@
+"""Functions for validating expectations in parallel, by column or by row partition"""
+
+# -- Imports
+import copy
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from collections import Counter
+import pandas as pd
+import great_expectations as ge
+from great_expectations.checkpoint.types.checkpoint_result import CheckpointResult
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+    ExpectationValidationResult,
+)
+from great_expectations.data_asset.util import parse_result_format
+from great_expectations.expectations.expectation import (
+    ColumnMapExpectation,
+    ColumnPairMapExpectation,
+    MulticolumnMapExpectation,
+)
+from great_expectations.expectations.registry import get_expectation_impl
+from great_expectations.core.run_identifier import RunIdentifier
+from great_expectations.validator.validator import Validator
+
+from grater_functions.sketches import (
+    SKETCH_EXPECTATIONS,
+    SKETCH_TYPES,
+    build_sketch_validation_result,
+    compute_column_sketches,
+    get_sketch_key,
+    is_within_bounds,
+)
+from grater_functions.validation import (
+    build_suite_validation_result,
+    get_checkpoint_validator,
+    get_expectation_column,
+    get_partial_suite,
+    get_result_key,
+    run_checkpoint_with_validator,
+    sort_results_by_column,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for running expectations in parallel
+# NOTE: the validator is shared with worker processes through a module level variable.
+# Worker processes are forked, so they inherit the batch of data that was loaded by the
+# validator (copy-on-write) instead of receiving a pickled copy of it. This also works
+# on AWS Lambda, which does not support multiprocessing.Pool due to a missing /dev/shm
+_SHARED_VALIDATOR = None
+
+# Map expectations whose outcome for a row depends on other rows, which can therefore
+# not be validated on separate row partitions
+NON_ROW_WISE_EXPECTATIONS = (
+    "expect_column_values_to_be_unique",
+    "expect_column_values_to_be_increasing",
+    "expect_column_values_to_be_decreasing",
+    "expect_column_value_z_scores_to_be_less_than",
+    "expect_compound_columns_to_be_unique",
+    "expect_multicolumn_values_to_be_unique",
+    "expect_select_column_values_to_be_unique_within_record",
+    "expect_column_values_to_be_unique_across_batches",
+)
+
+# Aggregate expectations that can be evaluated from partial metrics of row partitions,
+# mapped to the metric they check. Approximate expectations check a mergeable sketch
+# of their column (see SKETCH_EXPECTATIONS)
+AGGREGATE_EXPECTATIONS = {
+    "expect_table_row_count_to_be_between": "row_count",
+    "expect_table_row_count_to_equal": "row_count",
+    "expect_column_min_to_be_between": "min",
+    "expect_column_max_to_be_between": "max",
+    "expect_column_sum_to_be_between": "sum",
+    "expect_column_mean_to_be_between": "mean",
+    **SKETCH_EXPECTATIONS,
+}
+
+
+class ParallelValidator:
+    """Wrapper around a Great Expectations Validator that spreads validation of its
+    expectation suite over multiple processes when validate is called. All other
+    attributes are passed through to the wrapped validator, so that it can be run by
+    the actions of a checkpoint as if it were a regular validator
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate and the expectation suite to
+        validate it with, generally obtained by calling context.get_validator
+    n_workers : int, optional
+        Number of processes to spread validation over, by default the number of CPU
+        cores available
+    partition_by : str, optional
+        How to divide the work over processes, by default "columns". With "columns",
+        each process validates the expectations of a subset of columns against the
+        full batch. With "rows", each process validates a slice of the rows of the
+        batch, after which the results are merged (see validate_row_partitions)
+    """
+
+    def __init__(
+        self, validator: Validator, n_workers: int = None, partition_by: str = "columns"
+    ):
+        if partition_by not in ("columns", "rows"):
+            raise ValueError(
+                f"partition_by should be 'columns' or 'rows', got '{partition_by}'"
+            )
+        self.validator = validator
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.partition_by = partition_by
+
+    def __getattr__(self, name):
+        return getattr(self.validator, name)
+
+    def validate(
+        self,
+        expectation_suite: ExpectationSuite = None,
+        run_id: RunIdentifier = None,
+        evaluation_parameters: dict = None,
+        catch_exceptions: bool = True,
+        result_format: dict = None,
+        **kwargs,
+    ) -> ExpectationSuiteValidationResult:
+        """Function to validate the expectation suite of the wrapped validator (or the
+        given expectation suite), using the same arguments as Validator.validate"""
+        expectation_suite = expectation_suite or self.validator.expectation_suite
+        validate_kwargs = {
+            "run_id": run_id,
+            "evaluation_parameters": evaluation_parameters,
+            "catch_exceptions": catch_exceptions,
+            "result_format": result_format,
+        }
+        expectations = expectation_suite.expectations
+        if self.partition_by == "rows":
+            n_partitions = min(
+                self.n_workers, len(self.validator.active_batch.data.dataframe)
+            )
+        else:
+            partitions = partition_expectations_by_column(expectations, self.n_workers)
+            n_partitions = len(partitions)
+
+        if n_partitions < 2 or "fork" not in multiprocessing.get_all_start_methods():
+            logger.info("Validating expectations in a single process")
+            return self.validator.validate(
+                expectation_suite=get_partial_suite(expectation_suite, expectations),
+                **validate_kwargs,
+            )
+
+        logger.info(
+            f"Validating expectations in {n_partitions} processes, partitioned by "
+            f"{self.partition_by}"
+        )
+        if self.partition_by == "rows":
+            results, evaluation_parameters, run_id = validate_row_partitions(
+                self.validator, expectation_suite, n_partitions, validate_kwargs
+            )
+        else:
+            list_partial_results = validate_partitions_in_parallel(
+                self.validator, expectation_suite, partitions, validate_kwargs
+            )
+            results = [
+                result for partial in list_partial_results for result in partial.results
+            ]
+            evaluation_parameters = list_partial_results[0].evaluation_parameters
+            run_id = list_partial_results[0].meta["run_id"]
+
+        return build_suite_validation_result(
+            self.validator,
+            sort_results_by_column(expectations, results),
+            evaluation_parameters,
+            run_id,
+        )
+
+
+def partition_expectations_by_column(expectations: list, n_partitions: int) -> list:
+    """Function that divides a list of expectations over a number of partitions, in
+    such a way that all expectations for the same column end up in the same partition.
+    This way, metrics that are shared by expectations on the same column are only
+    computed once
+
+    Parameters
+    ----------
+    expectations : list
+        List of expectation configurations, e.g. taken from an expectation suite
+    n_partitions : int
+        Maximum number of partitions to divide the expectations over
+
+    Returns
+    -------
+    list
+        A list of partitions, each being a list of expectation configurations. Empty
+        partitions are dropped
+    """
+    # -- 1. Group expectations by column
+    dict_columns = {}
+    for expectation in expectations:
+        column = get_expectation_column(expectation)
+        dict_columns.setdefault(column, []).append(expectation)
+
+    # -- 2. Assign largest groups first to the partition with least expectations
+    partitions = [[] for _ in range(max(n_partitions, 1))]
+    for group in sorted(dict_columns.values(), key=len, reverse=True):
+        min(partitions, key=len).extend(group)
+
+    return [partition for partition in partitions if partition]
+
+
+def _run_in_worker(connection, worker_function, args: tuple):
+    """Helper function that runs in a forked worker process and sends the output of
+    worker_function back to the parent process"""
+    try:
+        connection.send(("ok", worker_function(*args)))
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def start_forked_processes(
+    validator: Validator, worker_function, list_args: list
+) -> list:
+    """Function that forks a worker process for each set of arguments in list_args,
+    which calls worker_function with those arguments. The validator is shared with the
+    worker processes through _SHARED_VALIDATOR, until collect_forked_processes is
+    called
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to share with the worker processes
+    worker_function : callable
+        Module level function to call in each worker process
+    list_args : list
+        List of argument tuples, one for each worker process
+
+    Returns
+    -------
+    list
+        A list of (process, connection) tuples, to pass to collect_forked_processes
+    """
+    global _SHARED_VALIDATOR
+    _SHARED_VALIDATOR = validator
+    fork_context = multiprocessing.get_context("fork")
+
+    list_workers = []
+    for args in list_args:
+        receiver, sender = fork_context.Pipe(duplex=False)
+        process = fork_context.Process(
+            target=_run_in_worker, args=(sender, worker_function, args)
+        )
+        process.start()
+        sender.close()
+        list_workers.append((process, receiver))
+
+    return list_workers
+
+
+def collect_forked_processes(list_workers: list) -> list:
+    """Function that collects the outputs of worker processes started with
+    start_forked_processes, in the order in which they were started
+
+    Parameters
+    ----------
+    list_workers : list
+        List of (process, connection) tuples, as returned by start_forked_processes
+
+    Returns
+    -------
+    list
+        A list with the output of each worker process
+
+    Raises
+    ------
+    RuntimeError
+        A RuntimeError is raised if an error occurred in one of the worker processes
+    """
+    global _SHARED_VALIDATOR
+
+    # -- Receive outputs before joining, so that workers never block on a full pipe
+    list_outputs = []
+    try:
+        for process, receiver in list_workers:
+            status, output = receiver.recv()
+            if status == "error":
+                raise RuntimeError(f"Running a worker process failed:\n{output}")
+            list_outputs.append(output)
+    finally:
+        for process, receiver in list_workers:
+            receiver.close()
+            process.join()
+        _SHARED_VALIDATOR = None
+
+    return list_outputs
+
+
+def _validate_partition_in_worker(
+    expectation_suite: ExpectationSuite, expectations: list, validate_kwargs: dict
+) -> tuple:
+    """Helper function that runs in a forked worker process to validate a partition of
+    an expectation suite against the batch of the shared validator"""
+    validation_result = _SHARED_VALIDATOR.validate(
+        expectation_suite=get_partial_suite(expectation_suite, expectations),
+        **validate_kwargs,
+    )
+    return (
+        validation_result.results,
+        validation_result.evaluation_parameters,
+        validation_result.meta["run_id"],
+    )
+
+
+def validate_partitions_in_parallel(
+    validator: Validator,
+    expectation_suite: ExpectationSuite,
+    partitions: list,
+    validate_kwargs: dict,
+) -> list:
+    """Function that validates partitions of an expectation suite in parallel, by
+    forking a worker process for each partition
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate
+    expectation_suite : ExpectationSuite
+        Expectation suite that is validated
+    partitions : list
+        List of partitions, each being a list of expectation configurations (can be
+        generated using partition_expectations_by_column)
+    validate_kwargs : dict
+        Keyword arguments to pass to Validator.validate in each worker process
+
+    Returns
+    -------
+    list
+        A list of ExpectationSuiteValidationResult objects, one for each partition
+
+    Raises
+    ------
+    RuntimeError
+        A RuntimeError is raised if validation failed in one of the worker processes
+    """
+    list_workers = start_forked_processes(
+        validator,
+        _validate_partition_in_worker,
+        [(expectation_suite, partition, validate_kwargs) for partition in partitions],
+    )
+
+    return [
+        build_suite_validation_result(validator, results, evaluation_parameters, run_id)
+        for results, evaluation_parameters, run_id in collect_forked_processes(
+            list_workers
+        )
+    ]
+
+
+def is_row_wise_expectation(expectation_config) -> bool:
+    """Helper function to check whether an expectation is a map expectation that is
+    evaluated row by row, so that it can be validated on separate row partitions"""
+    if expectation_config.expectation_type in NON_ROW_WISE_EXPECTATIONS:
+        return False
+    try:
+        expectation_impl = get_expectation_impl(expectation_config.expectation_type)
+    except Exception:
+        return False
+
+    return issubclass(
+        expectation_impl,
+        (ColumnMapExpectation, ColumnPairMapExpectation, MulticolumnMapExpectation),
+    )
+
+
+def is_aggregate_expectation(expectation_config) -> bool:
+    """Helper function to check whether an expectation can be evaluated from partial
+    metrics of row partitions (see AGGREGATE_EXPECTATIONS)"""
+    return (
+        expectation_config.expectation_type in AGGREGATE_EXPECTATIONS
+        and not expectation_config.kwargs.get("row_condition")
+        and not expectation_config.kwargs.get("parse_strings_as_datetimes")
+    )
+
+
+def get_fast_path(expectation_config) -> str:
+    """Helper function to get how an expectation can be combined over row partitions:
+    "row_wise", "aggregate" or "full_batch" (see validate_row_partitions)"""
+    if is_row_wise_expectation(expectation_config):
+        return "row_wise"
+    if is_aggregate_expectation(expectation_config):
+        return "aggregate"
+
+    return "full_batch"
+
+
+def get_row_partition_validator(
+    validator: Validator, df_rows: pd.DataFrame, expectation_suite: ExpectationSuite
+) -> Validator:
+    """Helper function to get a validator for a subset of the rows of the batch of a
+    validator, using the same datasource and batch identifiers"""
+    batch_definition = validator.active_batch_definition
+    return validator.data_context.get_validator(
+        batch_request=RuntimeBatchRequest(
+            datasource_name=batch_definition.datasource_name,
+            data_connector_name=batch_definition.data_connector_name,
+            data_asset_name=batch_definition.data_asset_name,
+            runtime_parameters={"batch_data": df_rows},
+            batch_identifiers=dict(batch_definition.batch_identifiers),
+        ),
+        expectation_suite=expectation_suite,
+    )
+
+
+def compute_partial_aggregates(
+    df: pd.DataFrame, columns: list, sketch_keys: list = None
+) -> dict:
+    """Function that computes metrics for a partition of the rows of a batch, which
+    can be merged with those of other partitions using merge_partial_aggregates
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with the rows of the partition
+    columns : list
+        Columns to compute the metrics for
+    sketch_keys : list, optional
+        Keys of the column sketches to build for approximate expectations (see
+        get_sketch_key), by default None
+
+    Returns
+    -------
+    dict
+        A dictionary with the row count of the partition, for each column, the count,
+        null count, min, max and sum (None if not applicable to the column) and the
+        column sketches by key
+    """
+    dict_columns = {}
+    for column in columns:
+        series = df[column].dropna()
+        dict_metrics = {
+            "count": len(df),
+            "null_count": len(df) - len(series),
+            "min": None,
+            "max": None,
+            "sum": series.sum() if pd.api.types.is_numeric_dtype(series) else None,
+        }
+        if len(series) > 0:
+            try:
+                dict_metrics["min"] = series.min()
+                dict_metrics["max"] = series.max()
+            except TypeError:
+                logger.warning(f"Unable to compute min and max for column {column}")
+        dict_columns[column] = dict_metrics
+
+    return {
+        "row_count": len(df),
+        "columns": dict_columns,
+        "sketches": compute_column_sketches([df], sketch_keys or []),
+    }
+
+
+def merge_partial_aggregates(list_partials: list) -> dict:
+    """Function that merges the partial metrics of row partitions, as computed by
+    compute_partial_aggregates, into metrics for the full batch"""
+    dict_columns = {}
+    for column in list_partials[0]["columns"]:
+        list_metrics = [partial["columns"][column] for partial in list_partials]
+        list_min = [
+            metrics["min"] for metrics in list_metrics if metrics["min"] is not None
+        ]
+        list_max = [
+            metrics["max"] for metrics in list_metrics if metrics["max"] is not None
+        ]
+        list_sum = [metrics["sum"] for metrics in list_metrics]
+        dict_columns[column] = {
+            "count": sum(metrics["count"] for metrics in list_metrics),
+            "null_count": sum(metrics["null_count"] for metrics in list_metrics),
+            "min": min(list_min) if list_min else None,
+            "max": max(list_max) if list_max else None,
+            "sum": None if None in list_sum else sum(list_sum),
+        }
+
+    dict_sketches = {}
+    for partial in list_partials:
+        for key, sketch in partial.get("sketches", {}).items():
+            if key in dict_sketches:
+                dict_sketches[key].merge(sketch)
+            else:
+                dict_sketches[key] = copy.deepcopy(sketch)
+
+    return {
+        "row_count": sum(partial["row_count"] for partial in list_partials),
+        "columns": dict_columns,
+        "sketches": dict_sketches,
+    }
+
+
+def get_aggregate_value(expectation_config, aggregates: dict):
+    """Helper function to get the observed value of an aggregate expectation from the
+    merged metrics of a batch"""
+    metric = AGGREGATE_EXPECTATIONS[expectation_config.expectation_type]
+    if metric == "row_count":
+        return aggregates["row_count"]
+
+    dict_metrics = aggregates["columns"][expectation_config.kwargs["column"]]
+    if metric == "mean":
+        nonnull_count = dict_metrics["count"] - dict_metrics["null_count"]
+        if dict_metrics["sum"] is None or nonnull_count == 0:
+            return None
+        return dict_metrics["sum"] / nonnull_count
+
+    return dict_metrics[metric]
+
+
+def evaluate_aggregate_expectation(
+    validator: Validator,
+    expectation_config,
+    aggregates: dict,
+    evaluation_parameters: dict,
+) -> ExpectationValidationResult:
+    """Function that evaluates an aggregate expectation using the merged metrics of
+    the row partitions of a batch, with the same semantics as the expectation itself
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator for the full batch of data
+    expectation_config : ExpectationConfiguration
+        Configuration of the expectation to evaluate
+    aggregates : dict
+        Merged metrics of the batch, as returned by merge_partial_aggregates
+    evaluation_parameters : dict
+        Evaluation parameters to substitute in the expectation configuration
+
+    Returns
+    -------
+    ExpectationValidationResult
+        The validation result of the expectation
+    """
+    # -- 1. Substitute evaluation parameters in a copy of the configuration
+    configuration = copy.deepcopy(expectation_config)
+    configuration.process_evaluation_parameters(
+        evaluation_parameters, True, validator.data_context
+    )
+    configuration.kwargs.update({"batch_id": validator.active_batch_id})
+    kwargs = configuration.kwargs
+
+    # -- 2. Compare the observed value against the configured value or bounds
+    if AGGREGATE_EXPECTATIONS[configuration.expectation_type] in SKETCH_TYPES:
+        return build_sketch_validation_result(
+            configuration, aggregates["sketches"][get_sketch_key(configuration)]
+        )
+
+    observed_value = get_aggregate_value(configuration, aggregates)
+    if observed_value is None:
+        success = False
+    elif configuration.expectation_type == "expect_table_row_count_to_equal":
+        success = observed_value == kwargs["value"]
+    else:
+        success = is_within_bounds(observed_value, kwargs)
+
+    return ExpectationValidationResult(
+        success=bool(success),
+        expectation_config=configuration,
+        result={"observed_value": observed_value},
+        exception_info={
+            "raised_exception": False,
+            "exception_message": None,
+            "exception_traceback": None,
+        },
+    )
+
+
+def merge_row_partition_results(
+    list_results: list, batch_id: str, result_format: dict
+) -> ExpectationValidationResult:
+    """Function that merges the results of a map expectation for each row partition of
+    a batch into the result for the full batch, similar to how a map expectation
+    computes its result from its unexpected values
+
+    Parameters
+    ----------
+    list_results : list
+        List of ExpectationValidationResult objects for the same expectation, one for
+        each row partition
+    batch_id : str
+        Identifier of the full batch of data
+    result_format : dict
+        Result format that was used to validate the row partitions
+
+    Returns
+    -------
+    ExpectationValidationResult
+        The validation result of the expectation for the full batch
+    """
+    first_result = list_results[0]
+    configuration = copy.deepcopy(first_result.expectation_config)
+    configuration.kwargs.update({"batch_id": batch_id})
+
+    # -- 1. Return the first failure if an exception was raised in any partition
+    for result in list_results:
+        if result.exception_info and result.exception_info.get("raised_exception"):
+            return ExpectationValidationResult(
+                success=False,
+                expectation_config=configuration,
+                result=result.result,
+                meta=result.meta,
+                exception_info=result.exception_info,
+            )
+
+    # -- 2. Fall back on overall success if results are not in map format
+    if any("element_count" not in result.result for result in list_results):
+        return ExpectationValidationResult(
+            success=all(result.success for result in list_results),
+            expectation_config=configuration,
+            result=first_result.result,
+            meta=first_result.meta,
+            exception_info=first_result.exception_info,
+        )
+
+    # -- 3. Sum counts over partitions and recompute percentages
+    element_count = sum(partial.result["element_count"] for partial in list_results)
+    unexpected_count = sum(
+        partial.result.get("unexpected_count", 0) for partial in list_results
+    )
+    merged_result = {
+        "element_count": element_count,
+        "unexpected_count": unexpected_count,
+    }
+    if "missing_count" in first_result.result:
+        missing_count = sum(partial.result["missing_count"] for partial in list_results)
+        nonnull_count = element_count - missing_count
+        merged_result["missing_count"] = missing_count
+        merged_result["missing_percent"] = (
+            missing_count / element_count * 100 if element_count else None
+        )
+    else:
+        nonnull_count = element_count
+
+    unexpected_percent = (
+        unexpected_count / nonnull_count * 100 if nonnull_count else None
+    )
+    for key in ("unexpected_percent", "unexpected_percent_nonmissing"):
+        if key in first_result.result:
+            merged_result[key] = unexpected_percent
+    if "unexpected_percent_total" in first_result.result:
+        merged_result["unexpected_percent_total"] = (
+            unexpected_count / element_count * 100 if element_count else None
+        )
+
+    # -- 4. Combine lists of (partial) unexpected values
+    partial_length = parse_result_format(result_format)["partial_unexpected_count"]
+    for key in (
+        "partial_unexpected_list",
+        "partial_unexpected_index_list",
+        "unexpected_list",
+        "unexpected_index_list",
+    ):
+        if key in first_result.result:
+            merged_result[key] = (
+                [
+                    value
+                    for partial in list_results
+                    for value in partial.result[key] or []
+                ]
+                if first_result.result[key] is not None
+                else None
+            )
+            if key.startswith("partial_") and merged_result[key] is not None:
+                merged_result[key] = merged_result[key][:partial_length]
+    if "partial_unexpected_counts" in first_result.result:
+        unexpected_values = merged_result.get(
+            "unexpected_list", merged_result.get("partial_unexpected_list") or []
+        )
+        unexpected_values = [
+            tuple(value.values()) if isinstance(value, dict) else value
+            for value in unexpected_values
+        ]
+        try:
+            merged_result["partial_unexpected_counts"] = [
+                {"value": value, "count": count}
+                for value, count in sorted(
+                    Counter(unexpected_values).most_common(partial_length),
+                    key=lambda value_count: (-value_count[1], value_count[0]),
+                )
+            ]
+        except TypeError:
+            merged_result["partial_unexpected_counts"] = first_result.result[
+                "partial_unexpected_counts"
+            ]
+
+    # -- 5. Determine success using the mostly threshold of the expectation
+    mostly = configuration.kwargs.get("mostly") or 1
+    success = (
+        nonnull_count == 0
+        or (nonnull_count - unexpected_count) / nonnull_count >= mostly
+    )
+
+    return ExpectationValidationResult(
+        success=success,
+        expectation_config=configuration,
+        result=merged_result,
+        meta=first_result.meta,
+        exception_info=first_result.exception_info,
+    )
+
+
+def _validate_row_partition_in_worker(
+    start: int,
+    stop: int,
+    expectation_suite: ExpectationSuite,
+    expectations: list,
+    columns: list,
+    sketch_keys: list,
+    validate_kwargs: dict,
+) -> tuple:
+    """Helper function that runs in a forked worker process to validate a slice of the
+    rows of the batch of the shared validator"""
+    df_rows = _SHARED_VALIDATOR.active_batch.data.dataframe.iloc[start:stop]
+    partial_suite = get_partial_suite(expectation_suite, expectations)
+    validation_result = get_row_partition_validator(
+        _SHARED_VALIDATOR, df_rows, partial_suite
+    ).validate(**validate_kwargs)
+
+    return validation_result.results, compute_partial_aggregates(
+        df_rows, columns, sketch_keys
+    )
+
+
+def validate_row_partitions(
+    validator: Validator,
+    expectation_suite: ExpectationSuite,
+    n_partitions: int,
+    validate_kwargs: dict,
+) -> tuple:
+    """Function that validates an expectation suite by dividing the rows of the batch
+    of a validator over forked worker processes. Expectations are handled as
+    follows:
+
+    - Row-wise map expectations (e.g. expect_column_values_to_be_between) are validated
+      on each slice of rows, after which counts and unexpected values are merged
+    - Aggregate expectations listed in AGGREGATE_EXPECTATIONS are evaluated from
+      partial metrics (count, min, max, sum) and column sketches that each worker
+      computes for its slice
+    - All other expectations (e.g. medians, uniqueness) cannot be decomposed and are
+      validated on the full batch in the parent process, while the workers run
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate
+    expectation_suite : ExpectationSuite
+        Expectation suite to validate
+    n_partitions : int
+        Number of row partitions (and worker processes)
+    validate_kwargs : dict
+        Keyword arguments that were passed to ParallelValidator.validate
+
+    Returns
+    -------
+    tuple
+        A tuple with the list of ExpectationValidationResult objects, the evaluation
+        parameters that were used and the run identifier
+
+    Raises
+    ------
+    RuntimeError
+        A RuntimeError is raised if validation failed in one of the worker processes
+    """
+    # -- 1. Classify expectations by how they can be combined over row partitions
+    expectations = expectation_suite.expectations
+    list_categories = [get_fast_path(expectation) for expectation in expectations]
+    dict_expectations = {"row_wise": [], "aggregate": [], "full_batch": []}
+    for expectation, category in zip(expectations, list_categories):
+        dict_expectations[category].append(expectation)
+    aggregate_columns = sorted(
+        {
+            expectation.kwargs["column"]
+            for expectation in dict_expectations["aggregate"]
+            if "column" in expectation.kwargs
+            and AGGREGATE_EXPECTATIONS[expectation.expectation_type] not in SKETCH_TYPES
+        }
+    )
+    sketch_keys = sorted(
+        {
+            get_sketch_key(expectation)
+            for expectation in dict_expectations["aggregate"]
+            if AGGREGATE_EXPECTATIONS[expectation.expectation_type] in SKETCH_TYPES
+        }
+    )
+
+    # -- 2. Start a worker process per slice of rows
+    n_rows = len(validator.active_batch.data.dataframe)
+    bounds = [n_rows * i // n_partitions for i in range(n_partitions + 1)]
+    list_workers = start_forked_processes(
+        validator,
+        _validate_row_partition_in_worker,
+        [
+            (
+                start,
+                stop,
+                expectation_suite,
+                dict_expectations["row_wise"],
+                aggregate_columns,
+                sketch_keys,
+                validate_kwargs,
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ],
+    )
+
+    # -- 3. Validate the remaining expectations against the full batch meanwhile
+    try:
+        full_batch_result = validator.validate(
+            expectation_suite=get_partial_suite(
+                expectation_suite, dict_expectations["full_batch"]
+            ),
+            **validate_kwargs,
+        )
+    finally:
+        list_outputs = collect_forked_processes(list_workers)
+    evaluation_parameters = full_batch_result.evaluation_parameters
+
+    # -- 4. Merge results, in the order of the expectations in the expectation suite
+    dict_full_batch_results = {}
+    for result in full_batch_result.results:
+        column = get_expectation_column(result.expectation_config)
+        dict_full_batch_results.setdefault(column, []).append(result)
+    # -- Workers return results grouped by column, so they are matched to their
+    # -- expectation by key (identical expectations keep the order of the suite)
+    list_row_wise_results = []
+    for results, _ in list_outputs:
+        dict_partition_results = {}
+        for result in results:
+            dict_partition_results.setdefault(get_result_key(result), []).append(result)
+        list_row_wise_results.append(dict_partition_results)
+    result_format = (
+        validate_kwargs["result_format"]
+        or validator.default_expectation_args["result_format"]
+    )
+    aggregates = merge_partial_aggregates([partial for _, partial in list_outputs])
+
+    list_results = []
+    for expectation, category in zip(expectations, list_categories):
+        if category == "row_wise":
+            result = merge_row_partition_results(
+                [
+                    dict_partition_results[get_result_key(expectation)].pop(0)
+                    for dict_partition_results in list_row_wise_results
+                ],
+                validator.active_batch_id,
+                result_format,
+            )
+        elif category == "aggregate":
+            result = evaluate_aggregate_expectation(
+                validator,
+                expectation,
+                aggregates,
+                evaluation_parameters,
+            )
+        else:
+            column = get_expectation_column(expectation)
+            result = dict_full_batch_results[column].pop(0)
+        list_results.append(result)
+
+    return list_results, evaluation_parameters, full_batch_result.meta["run_id"]
+
+
+def run_checkpoint_in_parallel(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    batch_request: RuntimeBatchRequest,
+    evaluation_parameters: dict = None,
+    n_workers: int = None,
+    partition_by: str = "columns",
+) -> CheckpointResult:
+    """Function to run a checkpoint like context.run_checkpoint, but with validation
+    of its expectation suite partitioned by column or by row and spread over multiple
+    CPU cores
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run
+    batch_request : RuntimeBatchRequest
+        Batch request containing the batch of data to validate
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    n_workers : int, optional
+        Number of processes to use, by default the number of CPU cores available
+    partition_by : str, optional
+        Whether to partition validation by "columns" or by "rows", by default
+        "columns". Partitioning by rows is useful for large batches with few columns
+
+    Returns
+    -------
+    CheckpointResult
+        The results of running the checkpoint, as returned by context.run_checkpoint
+    """
+    validator = get_checkpoint_validator(context, checkpoint_name, batch_request)
+    return run_checkpoint_with_validator(
+        context,
+        checkpoint_name,
+        ParallelValidator(validator, n_workers, partition_by),
+        evaluation_parameters,
+    )
+
+
+def benchmark_parallel_validation(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    batch_request: RuntimeBatchRequest,
+    evaluation_parameters: dict = None,
+    list_n_workers: tuple = (1, 2, 4),
+    repeats: int = 3,
+    partition_by: str = "columns",
+) -> pd.DataFrame:
+    """Function to benchmark how validation of the expectation suite of a checkpoint
+    scales with the number of processes used. Only validation itself is timed, the
+    actions of the checkpoint are not run
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to benchmark
+    batch_request : RuntimeBatchRequest
+        Batch request containing the batch of data to validate
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    list_n_workers : tuple, optional
+        Numbers of processes to benchmark, by default (1, 2, 4)
+    repeats : int, optional
+        Number of times each setting is timed, of which the fastest is kept, by
+        default 3
+    partition_by : str, optional
+        Whether to partition validation by "columns" or by "rows", by default
+        "columns"
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame with the number of processes, validation time in seconds and the
+        speedup compared to the first setting in list_n_workers
+    """
+    validator = get_checkpoint_validator(context, checkpoint_name, batch_request)
+
+    list_timings = []
+    for n_workers in list_n_workers:
+        parallel_validator = ParallelValidator(validator, n_workers, partition_by)
+        durations = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            parallel_validator.validate(evaluation_parameters=evaluation_parameters)
+            durations.append(time.perf_counter() - start)
+        list_timings.append({"n_workers": n_workers, "seconds": min(durations)})
+
+    df_timings = pd.DataFrame(list_timings)
+    df_timings["speedup"] = df_timings["seconds"].iloc[0] / df_timings["seconds"]
+
+    return df_timings
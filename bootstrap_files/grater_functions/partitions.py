@@ -0,0 +1,390 @@
+"""Validation of Hive-partitioned assets"""
+
+# -- Imports
+import json
+import logging
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import great_expectations as ge
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.exceptions import InvalidKeyError
+from great_expectations.core.util import convert_to_json_serializable
+
+from grater_functions.validation import (
+    get_checkpoint_validator,
+    hash_expectation_suite,
+    release_validator_batches,
+    run_checkpoint_with_validator,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Validation of Hive-partitioned assets
+# NOTE: data assets that are laid out in Hive-style partitions under a prefix (e.g.
+# prefix_data/year=2024/month=01/day=15/) can be validated one batch per partition.
+# Partitions are discovered level by level (see discover_partitions) and validated
+# concurrently by a bounded pool of worker threads, which overlaps the downloads of
+# partitions with the validation of others. For each partition, a record with the hash
+# of the expectation suite it was validated against is stored, by which partitions
+# that were already validated against the current version of the suite are skipped on
+# later runs (see validate_partitioned_asset)
+def parse_partition_values(partition_id: str) -> dict:
+    """Helper function to parse the values of a Hive-style partition from its path,
+    e.g. {"year": "2024", "month": "01"} for "year=2024/month=01/\" """
+    return dict(
+        segment.split("=", 1) for segment in partition_id.split("/") if "=" in segment
+    )
+
+
+def get_partition_id(partition_prefix: str, prefix: str = "") -> str:
+    """Helper function to get the identifier of a partition from its prefix, being
+    its path relative to the prefix of the data asset, e.g. "year=2024/month=01\" """
+    return partition_prefix[len(prefix) :].strip("/")
+
+
+def discover_partitions(
+    list_prefixes, prefix: str = "", partition_keys: list = None, n_threads: int = 16
+) -> list:
+    """Function to discover the Hive-style partitions of a data asset, by listing the
+    prefixes under each level of partitions concurrently
+
+    Parameters
+    ----------
+    list_prefixes : callable
+        Function that takes a prefix and returns the prefixes directly below it, e.g.
+        get_common_prefixes with a client and bucket bound to it
+    prefix : str, optional
+        Prefix of the data asset, by default ""
+    partition_keys : list, optional
+        Names of the partition keys, in order of their levels (e.g. ["year", "month",
+        "day"]), by default None to descend as long as prefixes are named key=value
+    n_threads : int, optional
+        Number of prefixes to list concurrently, by default 16
+
+    Returns
+    -------
+    list
+        Sorted prefixes of the partitions at the deepest level
+    """
+    partitions = [prefix]
+    level = 0
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        while partition_keys is None or level < len(partition_keys):
+            key = partition_keys[level] if partition_keys else None
+            children = [
+                child
+                for list_children in executor.map(list_prefixes, partitions)
+                for child in list_children
+                if "=" in child.rstrip("/").rsplit("/", 1)[-1]
+                and (
+                    key is None
+                    or child.rstrip("/").rsplit("/", 1)[-1].split("=", 1)[0] == key
+                )
+            ]
+            if not children:
+                break
+            partitions = children
+            level += 1
+
+    if partition_keys and level < len(partition_keys):
+        logger.warning(
+            f"No partitions found for {partition_keys[level]} under {prefix}, "
+            f"validating partitions by {partition_keys[:level]}"
+        )
+    if level == 0:
+        return []
+    return sorted(partitions)
+
+
+def get_partition_record(partition_store, asset_name: str, partition_id: str) -> dict:
+    """Helper function to get the record of the last validation of a partition, or
+    None if it was not validated yet"""
+    try:
+        return json.loads(partition_store.get((asset_name, *partition_id.split("/"))))
+    except InvalidKeyError:
+        return None
+
+
+def validate_partition(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    asset_name: str,
+    partition_prefix: str,
+    partition_id: str,
+    load_partition,
+    partition_store,
+    suite_hash: str,
+    evaluation_parameters: dict = None,
+    force: bool = False,
+) -> dict:
+    """Function to validate a single partition of a data asset with a checkpoint, unless
+    it was already validated against the current version of the expectation suite. On
+    success, a record of the validation is stored in the partition store
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run
+    asset_name : str
+        Name of the data asset
+    partition_prefix : str
+        Prefix of the partition, as passed to load_partition
+    partition_id : str
+        Identifier of the partition, used as batch identifier
+    load_partition : callable
+        Function that takes the prefix of a partition and returns its data as a pandas
+        DataFrame
+    partition_store : TupleStoreBackend
+        Store backend for records of validated partitions, generally obtained by
+        calling get_grater_store_backend with name "partitions"
+    suite_hash : str
+        Hash of the current version of the expectation suite of the checkpoint
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    force : bool, optional
+        Whether to validate the partition even if it was already validated against the
+        current version of the expectation suite, by default False
+
+    Returns
+    -------
+    dict
+        Status ("validated", "skipped" or "error"), success and statistics of the
+        partition, and the CheckpointResult if it was validated
+    """
+    # -- 1. Skip partitions that were validated against the current suite already
+    record = get_partition_record(partition_store, asset_name, partition_id)
+    if record is not None and record["suite_hash"] == suite_hash and not force:
+        return {**record, "status": "skipped", "checkpoint_result": None}
+
+    # -- 2. Load and validate the partition, after which its batch is released
+    validator = None
+    try:
+        df_partition = load_partition(partition_prefix)
+        batch_request = RuntimeBatchRequest(
+            datasource_name="runtime_data",
+            data_connector_name="runtime_data_connector",
+            data_asset_name=asset_name,
+            runtime_parameters={"batch_data": df_partition},
+            batch_identifiers={"batch_identifier": partition_id},
+        )
+        validator = get_checkpoint_validator(context, checkpoint_name, batch_request)
+        checkpoint_result = run_checkpoint_with_validator(
+            context, checkpoint_name, validator, evaluation_parameters
+        )
+    except Exception:
+        logger.error(
+            f"Validating partition {partition_id} of {asset_name} failed:\n"
+            f"{traceback.format_exc()}"
+        )
+        return {
+            "partition_id": partition_id,
+            "status": "error",
+            "success": False,
+            "statistics": {},
+            "checkpoint_result": None,
+        }
+    finally:
+        if validator is not None:
+            release_validator_batches(validator)
+
+    # -- 3. Record the validation, so that the partition is skipped on later runs
+    validation_result = checkpoint_result.list_validation_results()[0]
+    record = {
+        "partition_id": partition_id,
+        "partition_values": parse_partition_values(partition_id),
+        "suite_hash": suite_hash,
+        "success": bool(validation_result.success),
+        "statistics": convert_to_json_serializable(validation_result.statistics),
+        "run_id": checkpoint_result.run_id.to_json_dict(),
+    }
+    partition_store.set(
+        (asset_name, *partition_id.split("/")), json.dumps(record, indent=2)
+    )
+    return {**record, "status": "validated", "checkpoint_result": checkpoint_result}
+
+
+def aggregate_partition_results(asset_name: str, partition_results: dict) -> dict:
+    """Function to aggregate the results of the partitions of a data asset into a
+    result for the asset as a whole, which succeeds if all its partitions succeeded
+    (including the last validation of skipped partitions)
+
+    Parameters
+    ----------
+    asset_name : str
+        Name of the data asset
+    partition_results : dict
+        Results by partition identifier, as returned by validate_partition
+
+    Returns
+    -------
+    dict
+        The result of the data asset, with its success, statistics and the results of
+        its partitions
+    """
+    counts = Counter(result["status"] for result in partition_results.values())
+    expectation_counts = Counter()
+    for result in partition_results.values():
+        expectation_counts.update(
+            {
+                key: result["statistics"].get(key, 0)
+                for key in (
+                    "evaluated_expectations",
+                    "successful_expectations",
+                    "unsuccessful_expectations",
+                )
+            }
+        )
+
+    return {
+        "asset_name": asset_name,
+        "success": all(result["success"] for result in partition_results.values()),
+        "statistics": {
+            "partitions": len(partition_results),
+            "validated_partitions": counts["validated"],
+            "skipped_partitions": counts["skipped"],
+            "error_partitions": counts["error"],
+            "unsuccessful_partitions": sum(
+                not result["success"] for result in partition_results.values()
+            ),
+            **{
+                key: expectation_counts[key]
+                for key in (
+                    "evaluated_expectations",
+                    "successful_expectations",
+                    "unsuccessful_expectations",
+                )
+            },
+        },
+        "partitions": partition_results,
+    }
+
+
+def validate_partitioned_asset(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    asset_name: str,
+    partition_prefixes: list,
+    load_partition,
+    partition_store,
+    prefix: str = "",
+    n_workers: int = 4,
+    evaluation_parameters: dict = None,
+    force: bool = False,
+) -> dict:
+    """Function to validate the Hive-style partitions of a data asset as separate
+    batches, concurrently in a bounded pool of worker threads. Partitions that were
+    already validated against the current version of the expectation suite of the
+    checkpoint are skipped
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run against each partition. To avoid rendering Data
+        Docs for every partition, use a checkpoint without automatic Data Docs
+        updates (see checkpoint_without_datadocs_update)
+    asset_name : str
+        Name of the data asset
+    partition_prefixes : list
+        Prefixes of the partitions to validate, e.g. as returned by
+        discover_partitions
+    load_partition : callable
+        Function that takes the prefix of a partition and returns its data as a pandas
+        DataFrame
+    partition_store : TupleStoreBackend
+        Store backend for records of validated partitions, generally obtained by
+        calling get_grater_store_backend with name "partitions"
+    prefix : str, optional
+        Prefix of the data asset, stripped from the prefixes of partitions to get their
+        identifiers, by default ""
+    n_workers : int, optional
+        Maximum number of partitions to validate at the same time, by default 4
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    force : bool, optional
+        Whether to validate all partitions, including those that were already
+        validated against the current version of the expectation suite, by default
+        False
+
+    Returns
+    -------
+    dict
+        The result of the data asset (see aggregate_partition_results), with the
+        CheckpointResult of each validated partition under checkpoint_results
+    """
+    # -- 1. Hash the current version of the expectation suite of the checkpoint
+    checkpoint_config = context.get_checkpoint(checkpoint_name).get_substituted_config()
+    expectation_suite = context.get_expectation_suite(
+        checkpoint_config["expectation_suite_name"]
+    )
+    suite_hash = hash_expectation_suite(expectation_suite.to_json_dict())
+
+    # -- 2. Validate partitions in a bounded pool of worker threads
+    partition_ids = [
+        get_partition_id(partition_prefix, prefix)
+        for partition_prefix in partition_prefixes
+    ]
+    logger.info(
+        f"Validating {len(partition_ids)} partitions of {asset_name} with "
+        f"{n_workers} workers"
+    )
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        list_results = list(
+            executor.map(
+                lambda args: validate_partition(
+                    context,
+                    checkpoint_name,
+                    asset_name,
+                    *args,
+                    load_partition=load_partition,
+                    partition_store=partition_store,
+                    suite_hash=suite_hash,
+                    evaluation_parameters=evaluation_parameters,
+                    force=force,
+                ),
+                zip(partition_prefixes, partition_ids),
+            )
+        )
+
+    # -- 3. Aggregate the results of the partitions into a result for the asset
+    asset_result = aggregate_partition_results(
+        asset_name,
+        {
+            partition_id: {
+                key: value
+                for key, value in result.items()
+                if key != "checkpoint_result"
+            }
+            for partition_id, result in zip(partition_ids, list_results)
+        },
+    )
+    asset_result["checkpoint_results"] = [
+        result["checkpoint_result"]
+        for result in list_results
+        if result["checkpoint_result"] is not None
+    ]
+    logger.info(f"Validated partitions of {asset_name}: {asset_result['statistics']}")
+    return asset_result
+
+
+def get_partitioned_asset_config(test_config, asset_name: str) -> dict:
+    """Helper function to get the prefix, partition keys and number of workers with
+    which a data asset is validated by partition, as set by partitioned_assets in the
+    project configuration. Returns None for assets that are not listed"""
+    partitioned_assets = getattr(test_config, "partitioned_assets", None) or {}
+    if asset_name not in partitioned_assets:
+        return None
+    asset_config = partitioned_assets[asset_name] or {}
+    return {
+        "prefix": asset_config.get("prefix", getattr(test_config, "prefix_data", "")),
+        "partition_keys": asset_config.get("partition_keys"),
+        "n_workers": asset_config.get("n_workers", 4),
+    }
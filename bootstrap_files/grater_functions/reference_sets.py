@@ -0,0 +1,306 @@
+"""Cached reference sets for referential integrity"""
+
+# -- Imports
+import io
+import json
+import logging
+import os
+import time
+import pandas as pd
+import numpy as np
+from great_expectations.exceptions import InvalidExpectationConfigurationError
+from great_expectations.execution_engine import PandasExecutionEngine
+from great_expectations.expectations.expectation import ColumnMapExpectation
+from great_expectations.expectations.metrics.map_metric_provider import (
+    ColumnMapMetricProvider,
+    column_condition_partial,
+)
+from great_expectations.expectations.util import render_evaluation_parameter_string
+from great_expectations.render.types import RenderedStringTemplateContent
+from great_expectations.render.renderer.renderer import renderer
+from great_expectations.render.util import num_to_str, substitute_none_for_missing
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Cached reference sets for referential integrity
+# NOTE: expect_column_values_to_be_in_reference_set checks the values of a column (e.g.
+# VendorID or PULocationID) against a reference set, which is loaded from a dimension
+# table (a CSV or JSON file) in the cloud. Reference sets are kept in _REFERENCE_SETS,
+# which lives as long as the module, so that they are only loaded once per warm
+# container. Numeric reference sets are kept as sorted NumPy arrays, which are searched
+# with np.searchsorted, and others as a pandas Index, of which the hash table is built
+# once. After ttl_seconds, the next check requests the file again on condition that its
+# ETag changed, so that an unchanged file is not downloaded again
+REFERENCE_SET_TTL_SECONDS = 300
+
+
+def parse_reference_set(content: bytes, key: str, column: str = None) -> pd.Series:
+    """Function to parse the values of a reference set from the content of a file: a
+    JSON list, or a column of a CSV file (by default its first column)"""
+    if key.endswith(".json"):
+        return pd.Series(json.loads(content))
+    df = pd.read_csv(io.BytesIO(content), usecols=[column] if column else None)
+    return df[column] if column else df.iloc[:, 0]
+
+
+def build_reference_set(values: pd.Series):
+    """Function to build a compact reference set from a Series of values: a sorted
+    array of unique values for numeric values, or a pandas Index of unique values
+    otherwise. Missing values are dropped
+
+    Parameters
+    ----------
+    values : pd.Series
+        Values of the reference set
+
+    Returns
+    -------
+    np.ndarray or pd.Index
+        The reference set
+    """
+    values = values.dropna()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return np.unique(values.to_numpy())
+    return pd.Index(values.astype(str).unique())
+
+
+def is_in_reference_set(column: pd.Series, reference_set) -> np.ndarray:
+    """Function that tests which values of a column are in a reference set (see
+    build_reference_set) with vectorized lookups. Values of a column that is not
+    numeric are converted to numbers to look them up in a numeric reference set, and
+    numbers to strings to look them up in other reference sets
+
+    Parameters
+    ----------
+    column : pd.Series
+        Values to look up
+    reference_set : np.ndarray or pd.Index
+        The reference set
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array that is True for values that are in the reference set
+    """
+    if isinstance(reference_set, pd.Index):
+        if not pd.api.types.is_object_dtype(column):
+            column = column.astype(str)
+        return reference_set.get_indexer(column) >= 0
+
+    if len(reference_set) == 0:
+        return np.zeros(len(column), dtype=bool)
+    if not pd.api.types.is_numeric_dtype(column):
+        column = pd.to_numeric(column, errors="coerce")
+    if pd.api.types.is_extension_array_dtype(column) or column.isna().any():
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        values = column.to_numpy()
+    positions = np.minimum(
+        np.searchsorted(reference_set, values), len(reference_set) - 1
+    )
+    return reference_set[positions] == values
+
+
+def get_file_fetcher(path: str):
+    """Function to get a fetcher for a reference set in a local file, e.g. for testing,
+    with the modification time and size of the file as ETag (see ReferenceSetCache)"""
+
+    def fetch(etag: str = None):
+        stat = os.stat(path)
+        file_etag = f"{stat.st_mtime_ns}-{stat.st_size}"
+        if file_etag == etag:
+            return None
+        with open(path, "rb") as f:
+            return f.read(), file_etag
+
+    return fetch
+
+
+class ReferenceSetCache:
+    """Cache of reference sets, which are loaded when first used and kept for the
+    lifetime of the container. Each reference set is registered with a fetcher: a
+    function that takes the ETag of the cached file (or None) and returns a tuple with
+    the content and ETag of the file, or None if its ETag did not change (e.g. by a
+    conditional request). A reference set is checked for changes when it is used more
+    than ttl_seconds after its last check"""
+
+    def __init__(self):
+        self.sources = {}
+        self.entries = {}
+
+    def register(
+        self,
+        name: str,
+        fetch,
+        key: str,
+        column: str = None,
+        ttl_seconds: float = REFERENCE_SET_TTL_SECONDS,
+        location: str = None,
+    ):
+        """Method to register the source of a reference set. If a reference set is
+        registered again with the same key, column and location (e.g. in the next
+        invocation of a warm container), its cached values are kept
+
+        Parameters
+        ----------
+        name : str
+            Name of the reference set, as used by expectations
+        fetch : function
+            Fetcher of the file of the reference set
+        key : str
+            Key of the file of the reference set, ending with .csv or .json
+        column : str, optional
+            Column of a CSV file with the values of the reference set, by default None
+            for its first column
+        ttl_seconds : float, optional
+            Seconds after which the file is checked for changes, by default 300
+        location : str, optional
+            Bucket or container of the file, by default None
+        """
+        source = {"key": key, "column": column, "location": location}
+        previous_source = self.sources.get(name)
+        if previous_source is None or any(
+            previous_source[field] != value for field, value in source.items()
+        ):
+            self.entries.pop(name, None)
+        self.sources[name] = {**source, "fetch": fetch, "ttl_seconds": ttl_seconds}
+
+    def get(self, name: str):
+        """Method to get a reference set, which is loaded if it is not cached yet or
+        if its file changed since it was last checked more than ttl_seconds ago
+
+        Parameters
+        ----------
+        name : str
+            Name of the reference set
+
+        Returns
+        -------
+        np.ndarray or pd.Index
+            The reference set (see build_reference_set)
+
+        Raises
+        ------
+        KeyError
+            A KeyError is raised if no reference set is registered with the name
+        """
+        if name not in self.sources:
+            raise KeyError(
+                f"No reference set named {name} is registered, add it to "
+                "reference_sets in the project configuration"
+            )
+        source = self.sources[name]
+        entry = self.entries.get(name)
+        now = time.monotonic()
+        if entry is not None and now - entry["checked_at"] < source["ttl_seconds"]:
+            return entry["values"]
+
+        fetched = source["fetch"](entry["etag"] if entry is not None else None)
+        if fetched is None:
+            entry["checked_at"] = now
+            return entry["values"]
+
+        content, etag = fetched
+        values = build_reference_set(
+            parse_reference_set(content, source["key"], source["column"])
+        )
+        self.entries[name] = {"values": values, "etag": etag, "checked_at": now}
+        logger.info(f"Loaded reference set {name} with {len(values)} values")
+        return values
+
+
+_REFERENCE_SETS = ReferenceSetCache()
+
+
+def register_reference_set(
+    name: str,
+    fetch,
+    key: str,
+    column: str = None,
+    ttl_seconds: float = REFERENCE_SET_TTL_SECONDS,
+    location: str = None,
+):
+    """Function to register the source of a reference set that
+    expect_column_values_to_be_in_reference_set checks values against (see
+    ReferenceSetCache.register)"""
+    _REFERENCE_SETS.register(
+        name, fetch, key, column=column, ttl_seconds=ttl_seconds, location=location
+    )
+
+
+class ColumnValuesInReferenceSet(ColumnMapMetricProvider):
+    condition_metric_name = "column_values.in_reference_set"
+    condition_value_keys = ("reference_set",)
+
+    @column_condition_partial(engine=PandasExecutionEngine)
+    def _pandas(cls, column, reference_set=None, **kwargs):
+        return pd.Series(
+            is_in_reference_set(column, _REFERENCE_SETS.get(reference_set)),
+            index=column.index,
+        )
+
+
+class ExpectColumnValuesToBeInReferenceSet(ColumnMapExpectation):
+    """Expect the values of a column to be in a reference set, e.g. the identifiers of
+    a dimension table, as registered in _REFERENCE_SETS (see reference_sets in the
+    project configuration)"""
+
+    map_metric = "column_values.in_reference_set"
+    success_keys = ("reference_set", "mostly")
+    default_kwarg_values = {
+        "reference_set": None,
+        "mostly": 1,
+        "result_format": "BASIC",
+        "include_config": True,
+        "catch_exceptions": True,
+    }
+    args_keys = ("column", "reference_set")
+
+    def validate_configuration(self, configuration) -> bool:
+        super().validate_configuration(configuration)
+        if not configuration.kwargs.get("reference_set"):
+            raise InvalidExpectationConfigurationError(
+                "expect_column_values_to_be_in_reference_set requires a reference_set"
+            )
+        return True
+
+    @classmethod
+    @renderer(renderer_type="renderer.prescriptive")
+    @render_evaluation_parameter_string
+    def _prescriptive_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        runtime_configuration = runtime_configuration or {}
+        params = substitute_none_for_missing(
+            configuration.kwargs, ["column", "reference_set", "mostly"]
+        )
+        template_str = "values must be in reference set $reference_set"
+        if params["mostly"] is not None and params["mostly"] < 1:
+            params["mostly_pct"] = num_to_str(
+                params["mostly"] * 100, precision=15, no_scientific=True
+            )
+            template_str += ", at least $mostly_pct % of the time."
+        else:
+            template_str += "."
+        if runtime_configuration.get("include_column_name", True) is not False:
+            template_str = f"$column {template_str}"
+
+        return [
+            RenderedStringTemplateContent(
+                **{
+                    "content_block_type": "string_template",
+                    "string_template": {
+                        "template": template_str,
+                        "params": params,
+                        "styling": runtime_configuration.get("styling"),
+                    },
+                }
+            )
+        ]
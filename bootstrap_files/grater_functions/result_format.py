@@ -0,0 +1,153 @@
+"""Functions for validating with an adaptive result format"""
+
+# -- Imports
+import logging
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+)
+from great_expectations.data_asset.util import parse_result_format
+from great_expectations.core.run_identifier import RunIdentifier
+
+from grater_functions.validation import (
+    build_suite_validation_result,
+    get_partial_suite,
+    get_result_key,
+    is_skipped_result,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for validating with an adaptive result format
+# NOTE: collecting unexpected values (and their indexes) for the result of a map
+# expectation requires additional metrics, which are only useful when the expectation
+# fails. Expectations are therefore validated with a minimal result format first, after
+# which only failed expectations are validated again with the result format of the
+# checkpoint. The default is BASIC without partial unexpected values, which keeps the
+# observed values and unexpected counts of passing expectations that Data Docs and the
+# validation summary index show. BOOLEAN_ONLY also skips counting unexpected values,
+# which is faster, but leaves passing expectations with an empty result
+DEFAULT_INITIAL_RESULT_FORMAT = {
+    "result_format": "BASIC",
+    "partial_unexpected_count": 0,
+}
+
+
+def get_initial_result_format(test_config):
+    """Helper function to get the result format to validate expectations with before
+    failed expectations are validated again in full detail, as set by
+    initial_result_format in the project configuration. Defaults to
+    DEFAULT_INITIAL_RESULT_FORMAT, while setting it to null disables the adaptive
+    result format"""
+    return getattr(test_config, "initial_result_format", DEFAULT_INITIAL_RESULT_FORMAT)
+
+
+class AdaptiveResultFormatValidator:
+    """Wrapper around a Great Expectations Validator (or a ParallelValidator) that
+    validates expectations with a minimal result format first, after which only the
+    expectations that failed are validated again with the requested result format.
+    The results of passing expectations therefore only contain what the minimal result
+    format includes (e.g. no partial unexpected values with the default, or no
+    observed values and unexpected counts at all with BOOLEAN_ONLY). All other attributes are passed through to the wrapped validator, so
+    that it can be run by the actions of a checkpoint or by a TieredValidator
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate and the expectation suite to
+        validate it with, or a ParallelValidator wrapped around one
+    initial_result_format : str or dict, optional
+        Result format to validate all expectations with first, by default
+        DEFAULT_INITIAL_RESULT_FORMAT (BASIC without partial unexpected values)
+    """
+
+    def __init__(self, validator, initial_result_format=DEFAULT_INITIAL_RESULT_FORMAT):
+        self.validator = validator
+        self.initial_result_format = parse_result_format(initial_result_format)
+
+    def __getattr__(self, name):
+        return getattr(self.validator, name)
+
+    def validate(
+        self,
+        expectation_suite: ExpectationSuite = None,
+        run_id: RunIdentifier = None,
+        evaluation_parameters: dict = None,
+        catch_exceptions: bool = True,
+        result_format: dict = None,
+        **kwargs,
+    ) -> ExpectationSuiteValidationResult:
+        """Function to validate the expectation suite of the wrapped validator (or the
+        given expectation suite) with the initial result format, and failed
+        expectations again with the given result format, using the same arguments as
+        Validator.validate"""
+        expectation_suite = expectation_suite or self.validator.expectation_suite
+        result_format = parse_result_format(result_format or "SUMMARY")
+
+        # -- 1. Validate all expectations with the initial result format
+        initial_result = self.validator.validate(
+            expectation_suite=get_partial_suite(
+                expectation_suite, expectation_suite.expectations
+            ),
+            run_id=run_id,
+            evaluation_parameters=evaluation_parameters,
+            catch_exceptions=catch_exceptions,
+            result_format=self.initial_result_format,
+        )
+        failed_keys = {
+            get_result_key(result)
+            for result in initial_result.results
+            if not result.success
+            and not is_skipped_result(result)
+            and not (result.exception_info or {}).get("raised_exception")
+        }
+        if not failed_keys or result_format == self.initial_result_format:
+            return initial_result
+
+        # -- 2. Validate failed expectations again with the requested result format
+        logger.info(
+            f"Validating {len(failed_keys)} failed expectations again with result "
+            f"format {result_format['result_format']}"
+        )
+        detailed_result = self.validator.validate(
+            expectation_suite=get_partial_suite(
+                expectation_suite,
+                [
+                    expectation
+                    for expectation in expectation_suite.expectations
+                    if get_result_key(expectation) in failed_keys
+                ],
+            ),
+            run_id=initial_result.meta["run_id"],
+            evaluation_parameters=evaluation_parameters,
+            catch_exceptions=catch_exceptions,
+            result_format=result_format,
+        )
+        dict_detailed = {
+            get_result_key(result): result for result in detailed_result.results
+        }
+
+        # -- 3. Replace the results of failed expectations by their detailed results
+        results = [
+            dict_detailed.get(get_result_key(result), result)
+            for result in initial_result.results
+        ]
+
+        return build_suite_validation_result(
+            self.validator,
+            results,
+            initial_result.evaluation_parameters,
+            initial_result.meta["run_id"],
+            expectation_suite_name=initial_result.meta.get("expectation_suite_name"),
+        )
+
+
+def get_adaptive_validator(validator, initial_result_format=None):
+    """Helper function to wrap a validator in an AdaptiveResultFormatValidator if an
+    initial result format is given. Otherwise, the validator is returned as is"""
+    if initial_result_format is None:
+        return validator
+
+    return AdaptiveResultFormatValidator(validator, initial_result_format)
@@ -0,0 +1,811 @@
+"""Sketch-based approximate expectations"""
+
+# -- Imports
+import base64
+import copy
+import pandas as pd
+import numpy as np
+from great_expectations.core.expectation_validation_result import (
+    ExpectationValidationResult,
+)
+from great_expectations.exceptions import InvalidExpectationConfigurationError
+from great_expectations.execution_engine import PandasExecutionEngine
+from great_expectations.expectations.expectation import ColumnExpectation
+from great_expectations.expectations.metrics.column_aggregate_metric_provider import (
+    ColumnAggregateMetricProvider,
+    column_aggregate_value,
+)
+from great_expectations.expectations.util import render_evaluation_parameter_string
+from great_expectations.render.types import RenderedStringTemplateContent
+from great_expectations.render.renderer.renderer import renderer
+from great_expectations.render.util import (
+    handle_strict_min_max,
+    num_to_str,
+    substitute_none_for_missing,
+)
+
+# Sketch-based approximate expectations
+# NOTE: exact quantile, median and unique value count expectations need the full column
+# in memory, to sort it or to build a set of its values. Their approximate counterparts
+# below are backed by mergeable sketches with a fixed memory footprint: a KLL sketch
+# for quantiles and a HyperLogLog sketch for distinct counts. Sketches of row partitions
+# (see validate_row_partitions) or of chunks of a file (see
+# validate_approximate_expectations_on_chunks) are merged into a sketch of the full
+# batch. The result of each expectation states the error bound of its sketch, with the
+# range of values in which the exact value lies with a confidence of SKETCH_CONFIDENCE
+SKETCH_CONFIDENCE = 0.99
+
+
+class KllSketch:
+    """Mergeable quantile sketch (Karnin, Lang and Liberty) of the non-null values of a
+    numeric column. Values are kept in levels, in which each value represents 2 ** level
+    values of the column. Once a level exceeds its capacity, it is compacted by sorting
+    it and promoting every other value (starting at a random offset) to the next level.
+    As long as no level has been compacted, quantiles are exact. Each compaction at a
+    level shifts the rank of a value by at most 2 ** level, in either direction, from
+    which a bound on the rank error of the sketch follows (Hoeffding's inequality)
+
+    Parameters
+    ----------
+    k : int, optional
+        Capacity of the highest level, which determines the accuracy and size of the
+        sketch, by default 200 (a normalized rank error of about 1-2%)
+    """
+
+    parameter_name = "k"
+    default_parameter = 200
+    min_level_capacity = 8
+    block_factor = 16
+
+    def __init__(self, k: int = 200):
+        if k < self.min_level_capacity:
+            raise ValueError(f"k should be at least {self.min_level_capacity}, got {k}")
+        self.k = int(k)
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.compaction_variance = 0.0
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self.levels) == 1
+
+    @property
+    def rank_error(self) -> float:
+        """Normalized rank error of quantiles with a confidence of SKETCH_CONFIDENCE"""
+        if self.n == 0:
+            return 0.0
+        scale = np.sqrt(2 * np.log(2 / (1 - SKETCH_CONFIDENCE)))
+        return float(min(1.0, scale * np.sqrt(self.compaction_variance) / self.n))
+
+    def _get_level_capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(self.min_level_capacity, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _insert(self, level: int, values: np.ndarray):
+        """Helper function to add sorted values to a level, compacting levels that
+        exceed their capacity"""
+        while len(values) > 0:
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            merged = np.sort(
+                np.concatenate([self.levels[level], values]), kind="stable"
+            )
+            if len(merged) <= self._get_level_capacity(level):
+                self.levels[level] = merged
+                return
+            n_kept = len(merged) % 2
+            offset = np.random.default_rng([level, self.n]).integers(2)
+            self.levels[level] = merged[:n_kept]
+            self.compaction_variance += 4.0**level
+            values = merged[n_kept + offset :: 2]
+            level += 1
+
+    def update(self, values) -> "KllSketch":
+        """Function to add the non-null values of a column (or chunk of it). Values are
+        added in blocks of block_factor * k values, so that only a block is converted
+        and sorted at a time and the memory used besides the column is bounded by k
+        rather than by the length of the column"""
+        values = pd.Series(values)
+        block_size = self.block_factor * self.k
+        for start in range(0, len(values), block_size):
+            block = values.iloc[start : start + block_size].dropna()
+            self.n += len(block)
+            self._insert(0, np.sort(block.to_numpy(dtype="float64")))
+        return self
+
+    def merge(self, other: "KllSketch") -> "KllSketch":
+        """Function to merge the sketch of another partition of the column into this
+        sketch"""
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge KLL sketches with k={self.k} and {other.k}")
+        self.n += other.n
+        self.compaction_variance += other.compaction_variance
+        for level, values in enumerate(other.levels):
+            self._insert(level, values)
+        return self
+
+    def quantiles(self, quantiles: list) -> np.ndarray:
+        """Function to estimate the values of the column at the given quantiles"""
+        values = np.concatenate(self.levels)
+        if self.is_exact:
+            return np.quantile(values, quantiles)
+        weights = np.concatenate(
+            [np.full(len(items), 2**level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        cumulative_weights = np.cumsum(weights[order])
+        positions = np.searchsorted(
+            cumulative_weights, np.asarray(quantiles) * cumulative_weights[-1]
+        )
+        return values[order][np.minimum(positions, len(values) - 1)]
+
+    def get_value_bounds(self, quantile: float) -> list:
+        """Function to get the range of values in which the exact value of the column
+        at a quantile lies, given the rank error of the sketch"""
+        bounds = np.clip([quantile - self.rank_error, quantile + self.rank_error], 0, 1)
+        return [float(value) for value in self.quantiles(bounds)]
+
+    def describe_error(self) -> dict:
+        return {
+            "sketch": "kll",
+            "k": self.k,
+            "element_count": self.n,
+            "exact": self.is_exact,
+            "normalized_rank_error": self.rank_error,
+            "confidence": SKETCH_CONFIDENCE,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "levels": [items.tolist() for items in self.levels],
+            "compaction_variance": self.compaction_variance,
+        }
+
+    @classmethod
+    def from_dict(cls, sketch_dict: dict) -> "KllSketch":
+        sketch = cls(sketch_dict["k"])
+        sketch.n = sketch_dict["n"]
+        sketch.compaction_variance = sketch_dict["compaction_variance"]
+        sketch.levels = [
+            np.array(items, dtype="float64") for items in sketch_dict["levels"]
+        ]
+        return sketch
+
+
+def get_value_digests(values, block_size: int = 100_000) -> np.ndarray:
+    """Function that hashes values to 64-bit digests, or rows of values if a DataFrame
+    is passed. Integers are hashed by their own value, as are floats with an integral
+    value, as chunks of a file (or batches of a data asset) may be read with integers
+    in one chunk and floats (due to missing values) in another. As 64-bit values are
+    hashed with a bijection, distinct integers never share a digest. Values are hashed
+    in blocks, which avoids the intermediate copies pandas makes of a full column of
+    strings"""
+    if not isinstance(values, pd.DataFrame):
+        values = pd.Series(values)
+    digests = np.empty(len(values), dtype=np.uint64)
+    for start in range(0, len(values), block_size):
+        block = values.iloc[start : start + block_size]
+        if isinstance(block, pd.DataFrame):
+            block = block.apply(normalize_digest_values)
+        else:
+            block = normalize_digest_values(block)
+        digests[start : start + len(block)] = pd.util.hash_pandas_object(
+            block, index=False, categorize=False
+        ).to_numpy()
+
+    return digests
+
+
+def normalize_digest_values(series: pd.Series) -> pd.Series:
+    """Helper function to represent numbers by 64 bits before hashing them: integers
+    and floats with an integral value by their value as a 64-bit integer, other floats
+    by their bits (with -0.0 as 0.0) and missing values as NaN"""
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series
+    isna = series.isna().to_numpy()
+    if pd.api.types.is_integer_dtype(series):
+        values = series.fillna(0).to_numpy(dtype="int64")
+    else:
+        floats = series.to_numpy(dtype="float64", na_value=np.nan) + 0.0
+        values = floats.view(np.int64).copy()
+        integral = (np.floor(floats) == floats) & (np.abs(floats) < 2.0**63)
+        values[integral] = floats[integral].astype(np.int64)
+    values[isna] = np.array(np.nan).view(np.int64)
+
+    return pd.Series(values.view(np.uint64), index=series.index)
+
+
+class HyperLogLog:
+    """Mergeable sketch of the number of distinct non-null values of a column. Values
+    are hashed to 64 bits, of which the first bits select a register, which keeps the
+    maximum position of the first set bit in the remaining bits
+
+    Parameters
+    ----------
+    precision : int, optional
+        Number of bits that select a register, which determines the accuracy and size
+        of the sketch (2 ** precision registers of one byte), by default 14 (a relative
+        standard error of about 0.8%)
+    """
+
+    parameter_name = "precision"
+    default_parameter = 14
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision should be between 4 and 18, got {precision}")
+        self.precision = int(precision)
+        self.n = 0
+        self.registers = np.zeros(2**self.precision, dtype=np.uint8)
+
+    @property
+    def relative_standard_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values) -> "HyperLogLog":
+        """Function to add the non-null values of a column (or chunk of it)"""
+        # -- 1. Hash values to 64-bit digests
+        hashes = get_value_digests(pd.Series(values).dropna())
+        self.n += len(hashes)
+
+        # -- 2. Compute the register and the position of the first set bit of each hash
+        n_bits = 64 - self.precision
+        registers = (hashes >> np.uint64(n_bits)).astype(np.int64)
+        remainder = hashes & np.uint64(2**n_bits - 1)
+        high = (remainder >> np.uint64(32)).astype("float64")
+        low = (remainder & np.uint64(2**32 - 1)).astype("float64")
+        bit_length = np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+        positions = n_bits - bit_length + 1
+
+        # -- 3. Keep the maximum position per register
+        present = np.zeros((len(self.registers), 64), dtype=bool)
+        present[registers, positions] = True
+        max_positions = np.where(
+            present.any(axis=1), 63 - np.argmax(present[:, ::-1], axis=1), 0
+        )
+        self.registers = np.maximum(self.registers, max_positions.astype(np.uint8))
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Function to merge the sketch of another partition of the column into this
+        sketch"""
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge HyperLogLog sketches with precision={self.precision} "
+                f"and {other.precision}"
+            )
+        self.n += other.n
+        self.registers = np.maximum(self.registers, other.registers)
+        return self
+
+    def estimate(self) -> float:
+        """Function to estimate the number of distinct values, using linear counting
+        for small numbers of distinct values"""
+        n_registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / n_registers)
+        estimate = (
+            alpha
+            * n_registers**2
+            / np.sum(np.power(2.0, -self.registers.astype("float64")))
+        )
+        n_zeros = int(np.sum(self.registers == 0))
+        if estimate <= 2.5 * n_registers and n_zeros > 0:
+            estimate = n_registers * np.log(n_registers / n_zeros)
+        return float(min(estimate, self.n))
+
+    def get_value_bounds(self) -> list:
+        """Function to get the range in which the exact number of distinct values lies,
+        given the relative standard error of the sketch"""
+        # -- Two-sided z-score for SKETCH_CONFIDENCE (99%)
+        margin = 2.576 * self.relative_standard_error
+        estimate = self.estimate()
+        return [
+            int(np.floor(estimate * (1 - margin))),
+            int(min(np.ceil(estimate * (1 + margin)), self.n)),
+        ]
+
+    def describe_error(self) -> dict:
+        return {
+            "sketch": "hyperloglog",
+            "precision": self.precision,
+            "element_count": self.n,
+            "relative_standard_error": self.relative_standard_error,
+            "confidence": SKETCH_CONFIDENCE,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "precision": self.precision,
+            "n": self.n,
+            "registers": base64.b64encode(self.registers.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, sketch_dict: dict) -> "HyperLogLog":
+        sketch = cls(sketch_dict["precision"])
+        sketch.n = sketch_dict["n"]
+        sketch.registers = np.frombuffer(
+            base64.b64decode(sketch_dict["registers"]), dtype=np.uint8
+        ).copy()
+        return sketch
+
+
+# Sketch classes by their type, and the type of sketch that each approximate
+# expectation checks
+SKETCH_TYPES = {"kll": KllSketch, "hll": HyperLogLog}
+SKETCH_EXPECTATIONS = {
+    "expect_column_approx_quantile_values_to_be_between": "kll",
+    "expect_column_approx_median_to_be_between": "kll",
+    "expect_column_approx_unique_value_count_to_be_between": "hll",
+}
+
+
+def get_sketch_key(expectation_config) -> str:
+    """Helper function to get the key of the column sketch that an approximate
+    expectation checks, e.g. kll/200/trip_distance"""
+    sketch_type = SKETCH_EXPECTATIONS[expectation_config.expectation_type]
+    sketch_class = SKETCH_TYPES[sketch_type]
+    parameter = (
+        expectation_config.kwargs.get(sketch_class.parameter_name)
+        or sketch_class.default_parameter
+    )
+    return f"{sketch_type}/{parameter}/{expectation_config.kwargs['column']}"
+
+
+def compute_column_sketches(chunks, sketch_keys: list) -> dict:
+    """Function that builds column sketches over chunks of a batch of data
+
+    Parameters
+    ----------
+    chunks : iterable
+        DataFrames with the rows of each chunk, e.g. [df] for a single DataFrame or
+        pd.read_csv(..., chunksize=100000) to read a file in chunks
+    sketch_keys : list
+        Keys of the sketches to build, as returned by get_sketch_key
+
+    Returns
+    -------
+    dict
+        A dictionary with the sketch for each key
+    """
+    dict_sketches = {}
+    for key in sketch_keys:
+        sketch_type, parameter, _ = key.split("/", 2)
+        dict_sketches[key] = SKETCH_TYPES[sketch_type](int(parameter))
+    if not dict_sketches:
+        return dict_sketches
+
+    for df_chunk in chunks:
+        for key, sketch in dict_sketches.items():
+            sketch.update(df_chunk[key.split("/", 2)[2]])
+
+    return dict_sketches
+
+
+def is_within_bounds(value, kwargs: dict) -> bool:
+    """Helper function to check whether a value lies between the min_value and
+    max_value (and strict_min and strict_max) of the kwargs of an expectation"""
+    min_value, max_value = kwargs.get("min_value"), kwargs.get("max_value")
+    above_min = min_value is None or (
+        value > min_value if kwargs.get("strict_min") else value >= min_value
+    )
+    below_max = max_value is None or (
+        value < max_value if kwargs.get("strict_max") else value <= max_value
+    )
+    return above_min and below_max
+
+
+def evaluate_sketch_expectation(expectation_config, sketch) -> dict:
+    """Function that evaluates an approximate expectation using the sketch of its
+    column, for the full batch or merged over its row partitions or chunks
+
+    Parameters
+    ----------
+    expectation_config : ExpectationConfiguration
+        Configuration of the approximate expectation, with evaluation parameters
+        substituted
+    sketch : KllSketch or HyperLogLog
+        Sketch of the column of the expectation
+
+    Returns
+    -------
+    dict
+        A dictionary with the success of the expectation and its result, of which the
+        details hold the error bound of the sketch and the bounds of the observed value
+    """
+    kwargs = expectation_config.kwargs
+    if sketch.n == 0:
+        return {"success": False, "result": {"observed_value": None}}
+
+    if expectation_config.expectation_type == (
+        "expect_column_approx_quantile_values_to_be_between"
+    ):
+        quantiles = kwargs["quantile_ranges"]["quantiles"]
+        value_ranges = kwargs["quantile_ranges"]["value_ranges"]
+        values = [float(value) for value in sketch.quantiles(quantiles)]
+        success = all(
+            is_within_bounds(value, {"min_value": min_value, "max_value": max_value})
+            for value, (min_value, max_value) in zip(values, value_ranges)
+        )
+        observed_value = {"quantiles": list(quantiles), "values": values}
+        value_bounds = [sketch.get_value_bounds(quantile) for quantile in quantiles]
+    elif expectation_config.expectation_type == (
+        "expect_column_approx_median_to_be_between"
+    ):
+        observed_value = float(sketch.quantiles([0.5])[0])
+        success = is_within_bounds(observed_value, kwargs)
+        value_bounds = sketch.get_value_bounds(0.5)
+    else:
+        observed_value = int(round(sketch.estimate()))
+        success = is_within_bounds(observed_value, kwargs)
+        value_bounds = sketch.get_value_bounds()
+
+    return {
+        "success": bool(success),
+        "result": {
+            "observed_value": observed_value,
+            "details": {**sketch.describe_error(), "value_bounds": value_bounds},
+        },
+    }
+
+
+def build_sketch_validation_result(
+    expectation_config, sketch
+) -> ExpectationValidationResult:
+    """Helper function to build the validation result of an approximate expectation
+    from the sketch of its column (see evaluate_sketch_expectation)"""
+    outcome = evaluate_sketch_expectation(expectation_config, sketch)
+    return ExpectationValidationResult(
+        success=outcome["success"],
+        expectation_config=expectation_config,
+        result=outcome["result"],
+        exception_info={
+            "raised_exception": False,
+            "exception_message": None,
+            "exception_traceback": None,
+        },
+    )
+
+
+def validate_approximate_expectations_on_chunks(
+    expectations: list, chunks, evaluation_parameters: dict = None
+) -> list:
+    """Function that validates approximate expectations against a batch of data that is
+    read in chunks, e.g. a file that is too large to load at once, in a single pass
+
+    Parameters
+    ----------
+    expectations : list
+        Configurations of approximate expectations, e.g. a subset of the expectations of
+        an expectation suite
+    chunks : iterable
+        DataFrames with the rows of each chunk, e.g. pd.read_csv(..., chunksize=100000)
+    evaluation_parameters : dict, optional
+        Evaluation parameters to substitute in the expectation configurations, by
+        default None
+
+    Returns
+    -------
+    list
+        ExpectationValidationResult objects, in the order of the expectations
+    """
+    list_configurations = []
+    for expectation in expectations:
+        configuration = copy.deepcopy(expectation)
+        configuration.process_evaluation_parameters(evaluation_parameters or {}, True)
+        list_configurations.append(configuration)
+    dict_sketches = compute_column_sketches(
+        chunks, sorted({get_sketch_key(config) for config in list_configurations})
+    )
+
+    return [
+        build_sketch_validation_result(config, dict_sketches[get_sketch_key(config)])
+        for config in list_configurations
+    ]
+
+
+def render_approximate_expectation(
+    configuration, runtime_configuration: dict, subject: str
+) -> list:
+    """Helper function to render an approximate expectation with a minimum and maximum
+    value in Data Docs"""
+    runtime_configuration = runtime_configuration or {}
+    params = substitute_none_for_missing(
+        configuration.kwargs,
+        ["column", "min_value", "max_value", "strict_min", "strict_max"],
+    )
+    if params["min_value"] is None and params["max_value"] is None:
+        template_str = f"{subject} may have any value."
+    else:
+        at_least_str, at_most_str = handle_strict_min_max(params)
+        if params["min_value"] is not None and params["max_value"] is not None:
+            template_str = (
+                f"{subject} must be {at_least_str} $min_value and {at_most_str} "
+                "$max_value."
+            )
+        elif params["min_value"] is None:
+            template_str = f"{subject} must be {at_most_str} $max_value."
+        else:
+            template_str = f"{subject} must be {at_least_str} $min_value."
+    if runtime_configuration.get("include_column_name", True) is not False:
+        template_str = f"$column {template_str}"
+
+    return [
+        RenderedStringTemplateContent(
+            **{
+                "content_block_type": "string_template",
+                "string_template": {
+                    "template": template_str,
+                    "params": params,
+                    "styling": runtime_configuration.get("styling"),
+                },
+            }
+        )
+    ]
+
+
+def render_sketch_observed_value(result: ExpectationValidationResult) -> str:
+    """Helper function to render the observed value of an approximate expectation in
+    Data Docs, together with the range in which the exact value lies"""
+    if result is None or not result.result:
+        return "--"
+    observed_value = result.result.get("observed_value")
+    value_bounds = result.result.get("details", {}).get("value_bounds")
+    if observed_value is None:
+        return "--"
+    if isinstance(observed_value, dict):
+        return ", ".join(
+            f"{quantile}: ≈{num_to_str(value, use_locale=True)} "
+            f"[{num_to_str(bounds[0], use_locale=True)}, "
+            f"{num_to_str(bounds[1], use_locale=True)}]"
+            for quantile, value, bounds in zip(
+                observed_value["quantiles"], observed_value["values"], value_bounds
+            )
+        )
+
+    return (
+        f"≈{num_to_str(observed_value, use_locale=True)} "
+        f"[{num_to_str(value_bounds[0], use_locale=True)}, "
+        f"{num_to_str(value_bounds[1], use_locale=True)}]"
+    )
+
+
+class ColumnKllSketch(ColumnAggregateMetricProvider):
+    """Metric with a KLL sketch of the non-null values of a column"""
+
+    metric_name = "column.kll_sketch"
+    value_keys = ("k",)
+    default_kwarg_values = {"k": KllSketch.default_parameter}
+
+    @column_aggregate_value(engine=PandasExecutionEngine)
+    def _pandas(cls, column, k=KllSketch.default_parameter, **kwargs):
+        return KllSketch(k).update(column)
+
+
+class ColumnHllSketch(ColumnAggregateMetricProvider):
+    """Metric with a HyperLogLog sketch of the non-null values of a column"""
+
+    metric_name = "column.hll_sketch"
+    value_keys = ("precision",)
+    default_kwarg_values = {"precision": HyperLogLog.default_parameter}
+
+    @column_aggregate_value(engine=PandasExecutionEngine)
+    def _pandas(cls, column, precision=HyperLogLog.default_parameter, **kwargs):
+        return HyperLogLog(precision).update(column)
+
+
+class ExpectColumnApproxQuantileValuesToBeBetween(ColumnExpectation):
+    """Expect the approximate values of a column at given quantiles to be between a
+    minimum and maximum value, e.g. quantile_ranges={"quantiles": [0.05, 0.95],
+    "value_ranges": [[0, 1], [10, 20]]}. Quantiles are estimated from a KLL sketch of
+    the column with capacity k (see KllSketch)"""
+
+    metric_dependencies = ("column.kll_sketch",)
+    success_keys = ("quantile_ranges", "k")
+    default_kwarg_values = {
+        "k": KllSketch.default_parameter,
+        "result_format": "BASIC",
+        "include_config": True,
+        "catch_exceptions": False,
+    }
+    args_keys = ("column", "quantile_ranges")
+
+    def validate_configuration(self, configuration) -> bool:
+        super().validate_configuration(configuration)
+        quantile_ranges = configuration.kwargs.get("quantile_ranges") or {}
+        quantiles = quantile_ranges.get("quantiles", [])
+        if not quantiles or len(quantiles) != len(
+            quantile_ranges.get("value_ranges", [])
+        ):
+            raise InvalidExpectationConfigurationError(
+                "quantile_ranges should hold a value range for each of its quantiles"
+            )
+        return True
+
+    @classmethod
+    @renderer(renderer_type="renderer.prescriptive")
+    @render_evaluation_parameter_string
+    def _prescriptive_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        quantile_ranges = configuration.kwargs["quantile_ranges"]
+        params = {"column": configuration.kwargs["column"]}
+        list_ranges = []
+        for i, (quantile, (min_value, max_value)) in enumerate(
+            zip(quantile_ranges["quantiles"], quantile_ranges["value_ranges"])
+        ):
+            params.update(
+                {
+                    f"quantile_{i}": quantile,
+                    f"min_{i}": min_value,
+                    f"max_{i}": max_value,
+                }
+            )
+            list_ranges.append(f"$quantile_{i}: [$min_{i}, $max_{i}]")
+
+        return [
+            RenderedStringTemplateContent(
+                **{
+                    "content_block_type": "string_template",
+                    "string_template": {
+                        "template": "$column approximate quantiles must be within "
+                        + ", ".join(list_ranges)
+                        + ".",
+                        "params": params,
+                        "styling": (runtime_configuration or {}).get("styling"),
+                    },
+                }
+            )
+        ]
+
+    @classmethod
+    @renderer(renderer_type="renderer.diagnostic.observed_value")
+    def _diagnostic_observed_value_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        return render_sketch_observed_value(result)
+
+    def _validate(
+        self,
+        configuration,
+        metrics: dict,
+        runtime_configuration: dict = None,
+        execution_engine=None,
+    ):
+        return evaluate_sketch_expectation(configuration, metrics["column.kll_sketch"])
+
+
+class ExpectColumnApproxMedianToBeBetween(ColumnExpectation):
+    """Expect the approximate median of a column to be between a minimum and maximum
+    value. The median is estimated from a KLL sketch of the column with capacity k (see
+    KllSketch)"""
+
+    metric_dependencies = ("column.kll_sketch",)
+    success_keys = ("min_value", "strict_min", "max_value", "strict_max", "k")
+    default_kwarg_values = {
+        "min_value": None,
+        "max_value": None,
+        "strict_min": None,
+        "strict_max": None,
+        "k": KllSketch.default_parameter,
+        "result_format": "BASIC",
+        "include_config": True,
+        "catch_exceptions": False,
+    }
+    args_keys = ("column", "min_value", "max_value", "strict_min", "strict_max")
+
+    def validate_configuration(self, configuration) -> bool:
+        super().validate_configuration(configuration)
+        self.validate_metric_value_between_configuration(configuration=configuration)
+        return True
+
+    @classmethod
+    @renderer(renderer_type="renderer.prescriptive")
+    @render_evaluation_parameter_string
+    def _prescriptive_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        return render_approximate_expectation(
+            configuration, runtime_configuration, "approximate median"
+        )
+
+    @classmethod
+    @renderer(renderer_type="renderer.diagnostic.observed_value")
+    def _diagnostic_observed_value_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        return render_sketch_observed_value(result)
+
+    def _validate(
+        self,
+        configuration,
+        metrics: dict,
+        runtime_configuration: dict = None,
+        execution_engine=None,
+    ):
+        return evaluate_sketch_expectation(configuration, metrics["column.kll_sketch"])
+
+
+class ExpectColumnApproxUniqueValueCountToBeBetween(ColumnExpectation):
+    """Expect the approximate number of distinct values of a column to be between a
+    minimum and maximum value. The number is estimated from a HyperLogLog sketch of the
+    column with 2 ** precision registers (see HyperLogLog)"""
+
+    metric_dependencies = ("column.hll_sketch",)
+    success_keys = ("min_value", "strict_min", "max_value", "strict_max", "precision")
+    default_kwarg_values = {
+        "min_value": None,
+        "max_value": None,
+        "strict_min": None,
+        "strict_max": None,
+        "precision": HyperLogLog.default_parameter,
+        "result_format": "BASIC",
+        "include_config": True,
+        "catch_exceptions": False,
+    }
+    args_keys = ("column", "min_value", "max_value", "strict_min", "strict_max")
+
+    def validate_configuration(self, configuration) -> bool:
+        super().validate_configuration(configuration)
+        self.validate_metric_value_between_configuration(configuration=configuration)
+        return True
+
+    @classmethod
+    @renderer(renderer_type="renderer.prescriptive")
+    @render_evaluation_parameter_string
+    def _prescriptive_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        return render_approximate_expectation(
+            configuration,
+            runtime_configuration,
+            "approximate number of unique values",
+        )
+
+    @classmethod
+    @renderer(renderer_type="renderer.diagnostic.observed_value")
+    def _diagnostic_observed_value_renderer(
+        cls,
+        configuration=None,
+        result=None,
+        language=None,
+        runtime_configuration=None,
+        **kwargs,
+    ):
+        return render_sketch_observed_value(result)
+
+    def _validate(
+        self,
+        configuration,
+        metrics: dict,
+        runtime_configuration: dict = None,
+        execution_engine=None,
+    ):
+        return evaluate_sketch_expectation(configuration, metrics["column.hll_sketch"])
@@ -0,0 +1,272 @@
+"""Read-only snapshot of expectation suites and checkpoints"""
+
+# -- Imports
+import logging
+import os
+import shutil
+import great_expectations as ge
+from great_expectations.data_context.store import (
+    StoreBackend,
+    TupleFilesystemStoreBackend,
+)
+from great_expectations.data_context.util import instantiate_class_from_config
+from great_expectations.exceptions import StoreBackendError
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Read-only snapshot of expectation suites and checkpoints
+# NOTE: expectation suites and checkpoints only change when they are edited in the
+# notebook, after which the Docker image is built again. If store_snapshot is enabled
+# in the project configuration, their stores use a SnapshotStoreBackend, and the build
+# script bakes a copy of both stores into store_snapshot/ (see bake_store_snapshot.py),
+# which the Dockerfile places in the great_expectations directory of the image. At
+# runtime, suites and checkpoints are then read from local files. Locally, no snapshot
+# exists in the great_expectations directory, so the remote stores are used as usual
+class SnapshotStoreBackend(StoreBackend):
+    """Store backend that reads from a read-only snapshot on the local filesystem if
+    it exists, and otherwise reads from and writes to another store backend (e.g. a
+    TupleS3StoreBackend). The snapshot is baked from the other store backend with
+    bake, and check compares it with the other store backend to detect whether it
+    is stale
+
+    Parameters
+    ----------
+    store_backend : dict
+        Configuration of the remote store backend, e.g. {"class_name":
+        "TupleS3StoreBackend", "bucket": ..., "prefix": ..., "filepath_suffix": ".json"}
+    snapshot_directory : str
+        Directory of the snapshot, relative to the root directory of the DataContext
+    root_directory : str, optional
+        Root directory of the DataContext, by default None
+    suppress_store_backend_id : bool, optional
+        Whether to skip construction of a store_backend_id, by default False
+    manually_initialize_store_backend_id : str, optional
+        UUID to use as store_backend_id if none exists yet, by default ""
+    store_name : str, optional
+        Name of the store, passed by Great Expectations, by default None
+    """
+
+    def __init__(
+        self,
+        store_backend: dict,
+        snapshot_directory: str,
+        root_directory: str = None,
+        suppress_store_backend_id: bool = False,
+        manually_initialize_store_backend_id: str = "",
+        store_name: str = None,
+    ):
+        super().__init__(
+            suppress_store_backend_id=suppress_store_backend_id,
+            manually_initialize_store_backend_id=manually_initialize_store_backend_id,
+            store_name=store_name,
+        )
+        self.root_directory = root_directory
+        self.filepath_suffix = store_backend.get("filepath_suffix")
+        self.snapshot_directory = os.path.join(root_directory or "", snapshot_directory)
+        self.remote_store_backend = instantiate_class_from_config(
+            config=store_backend,
+            runtime_environment={"root_directory": root_directory},
+            config_defaults={
+                "module_name": "great_expectations.data_context.store",
+                "suppress_store_backend_id": True,
+            },
+        )
+        self.snapshot_store_backend = None
+        if os.path.isdir(self.snapshot_directory):
+            logger.info(f"Reading {store_name} from snapshot {snapshot_directory}")
+            self.snapshot_store_backend = self._get_snapshot_backend(
+                self.snapshot_directory
+            )
+        self._config = {
+            "store_backend": store_backend,
+            "snapshot_directory": snapshot_directory,
+            "suppress_store_backend_id": suppress_store_backend_id,
+            "manually_initialize_store_backend_id": manually_initialize_store_backend_id,
+            "store_name": store_name,
+            "module_name": self.__class__.__module__,
+            "class_name": self.__class__.__name__,
+        }
+
+    @property
+    def config(self) -> dict:
+        return self._config
+
+    @property
+    def active_store_backend(self):
+        """The snapshot if it exists, otherwise the remote store backend"""
+        return self.snapshot_store_backend or self.remote_store_backend
+
+    def _get_snapshot_backend(self, snapshot_directory: str):
+        """Helper function to get a store backend for the files of a snapshot"""
+        return TupleFilesystemStoreBackend(
+            base_directory=os.path.abspath(snapshot_directory),
+            filepath_suffix=self.filepath_suffix,
+            suppress_store_backend_id=True,
+        )
+
+    def _check_writable(self):
+        """Helper function to raise an error when writing to a snapshot"""
+        if self.snapshot_store_backend is not None:
+            raise StoreBackendError(
+                f"Unable to write to the read-only snapshot in "
+                f"{self.snapshot_directory}. Edit expectation suites and checkpoints "
+                "in the notebook and build the Docker image again instead"
+            )
+
+    def _get(self, key):
+        return self.active_store_backend.get(key)
+
+    def _set(self, key, value, **kwargs):
+        self._check_writable()
+        return self.remote_store_backend.set(key, value, **kwargs)
+
+    def _move(self, source_key, dest_key, **kwargs):
+        self._check_writable()
+        return self.remote_store_backend.move(source_key, dest_key, **kwargs)
+
+    def _has_key(self, key):
+        return self.active_store_backend.has_key(key)
+
+    def list_keys(self, prefix: tuple = ()) -> list:
+        return [
+            key
+            for key in self.active_store_backend.list_keys(prefix)
+            if key != self.STORE_BACKEND_ID_KEY
+        ]
+
+    def remove_key(self, key):
+        self._check_writable()
+        return self.remote_store_backend.remove_key(key)
+
+    def bake(self, snapshot_directory: str) -> int:
+        """Function to copy all objects of the remote store backend into a new
+        snapshot in snapshot_directory, replacing an existing one. Returns the number
+        of objects in the snapshot"""
+        if os.path.isdir(snapshot_directory):
+            shutil.rmtree(snapshot_directory)
+        os.makedirs(snapshot_directory)
+
+        snapshot_store_backend = self._get_snapshot_backend(snapshot_directory)
+        keys = [
+            key
+            for key in self.remote_store_backend.list_keys()
+            if key != self.STORE_BACKEND_ID_KEY
+        ]
+        for key in keys:
+            snapshot_store_backend.set(key, self.remote_store_backend.get(key))
+
+        return len(keys)
+
+    def check(self, snapshot_directory: str = None) -> dict:
+        """Function to compare a snapshot (by default the one in use) with the remote
+        store backend
+
+        Parameters
+        ----------
+        snapshot_directory : str, optional
+            Directory of the snapshot to check, by default the configured one
+
+        Returns
+        -------
+        dict
+            A dictionary with the keys of objects that changed, that were added and
+            that were removed since the snapshot was baked, as lists of strings
+        """
+        snapshot_directory = snapshot_directory or self.snapshot_directory
+        if not os.path.isdir(snapshot_directory):
+            raise FileNotFoundError(f"No snapshot found in {snapshot_directory}")
+
+        snapshot_store_backend = self._get_snapshot_backend(snapshot_directory)
+        snapshot_keys = set(snapshot_store_backend.list_keys())
+        remote_keys = {
+            key
+            for key in self.remote_store_backend.list_keys()
+            if key != self.STORE_BACKEND_ID_KEY
+        }
+
+        return {
+            "changed": sorted(
+                "/".join(key)
+                for key in snapshot_keys & remote_keys
+                if snapshot_store_backend.get(key) != self.remote_store_backend.get(key)
+            ),
+            "added": sorted("/".join(key) for key in remote_keys - snapshot_keys),
+            "removed": sorted("/".join(key) for key in snapshot_keys - remote_keys),
+        }
+
+
+def get_snapshot_store_backends(context: ge.data_context.DataContext) -> dict:
+    """Helper function to get the store backends of a DataContext that are a
+    SnapshotStoreBackend, by the directory name of their snapshot"""
+    return {
+        os.path.basename(
+            os.path.normpath(store.store_backend.config["snapshot_directory"])
+        ): (store.store_backend)
+        for store in context.stores.values()
+        if isinstance(getattr(store, "store_backend", None), SnapshotStoreBackend)
+    }
+
+
+def bake_store_snapshot(
+    context: ge.data_context.DataContext, output_directory: str = "store_snapshot"
+) -> dict:
+    """Function to bake a snapshot of every store of a DataContext that uses a
+    SnapshotStoreBackend (i.e. the expectations and checkpoint stores if
+    store_snapshot is enabled) into output_directory, in a subdirectory per store
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    output_directory : str, optional
+        Directory to bake the snapshot into, by default "store_snapshot"
+
+    Returns
+    -------
+    dict
+        A dictionary with the name of each snapshot directory as key and the number of
+        objects it contains as value
+    """
+    dict_counts = {}
+    for name, store_backend in get_snapshot_store_backends(context).items():
+        dict_counts[name] = store_backend.bake(os.path.join(output_directory, name))
+        logger.info(f"Baked {dict_counts[name]} objects into snapshot {name}")
+
+    return dict_counts
+
+
+def check_store_snapshot(
+    context: ge.data_context.DataContext, snapshot_root: str = None
+) -> dict:
+    """Function to check whether the snapshots of the stores of a DataContext are
+    stale compared with their remote stores (see SnapshotStoreBackend.check). A
+    warning is logged for every stale snapshot
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    snapshot_root : str, optional
+        Directory the snapshots were baked into (e.g. "store_snapshot"), by default
+        the snapshots that are configured for the DataContext
+
+    Returns
+    -------
+    dict
+        A dictionary with the name of each snapshot directory as key and the result
+        of SnapshotStoreBackend.check as value
+    """
+    dict_checks = {}
+    for name, store_backend in get_snapshot_store_backends(context).items():
+        dict_checks[name] = store_backend.check(
+            os.path.join(snapshot_root, name) if snapshot_root else None
+        )
+        if any(dict_checks[name].values()):
+            logger.warning(
+                f"Snapshot {name} is stale, build the Docker image again: "
+                f"{dict_checks[name]}"
+            )
+
+    return dict_checks
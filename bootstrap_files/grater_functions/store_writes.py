@@ -0,0 +1,194 @@
+"""Write-behind buffer for the stores of Great Expectations"""
+
+# -- Imports
+import logging
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+)
+from great_expectations.data_context.types.resource_identifiers import (
+    ValidationResultIdentifier,
+)
+from great_expectations.checkpoint.actions import (
+    StoreEvaluationParametersAction,
+    StoreValidationResultAction,
+)
+from great_expectations.data_context.store import InMemoryStoreBackend
+
+from store_backend_io import write_store_backend_values
+from grater_functions.compressed_store import (
+    CompressedValidationsStoreBackend,
+    compress_store_record,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Write-behind buffer for the stores of Great Expectations
+# NOTE: StoreValidationResultAction and StoreEvaluationParametersAction write to their
+# store synchronously, one request per object. Their buffered counterparts below add
+# the objects to _STORE_WRITE_BUFFER instead, which writes them concurrently once it
+# holds max_buffered objects or when flush_store_writes is called. Buffered objects
+# cannot be read from their store before they are flushed, so these actions should
+# only be used in checkpoints without UpdateDataDocsAction (see
+# checkpoint_without_datadocs_update)
+class StoreWriteBuffer:
+    """Buffer of objects to write to the stores of Great Expectations, which writes
+    them concurrently per store backend (see write_store_backend_values) once it
+    holds max_buffered objects or when flush is called. Objects for in-memory stores
+    are written directly. Validation results for a CompressedValidationsStoreBackend
+    are buffered as compressed records for its store backend of loose records
+
+    Parameters
+    ----------
+    max_buffered : int, optional
+        Number of buffered objects that triggers a flush, by default 100
+    n_threads : int, optional
+        Number of threads that write objects to each store backend, by default 8
+    """
+
+    def __init__(self, max_buffered: int = 100, n_threads: int = 8):
+        self.max_buffered = max_buffered
+        self.n_threads = n_threads
+        self._list_pending = []
+
+    def __len__(self):
+        return len(self._list_pending)
+
+    def add(self, store, key, value):
+        """Function to add an object to the buffer, serialized by its store as
+        Store.set would do"""
+        store._validate_key(key)
+        if isinstance(store.store_backend, InMemoryStoreBackend):
+            store.set(key, value)
+            return
+
+        store_backend = store.store_backend
+        key_tuple, serialized = store.key_to_tuple(key), store.serialize(key, value)
+        if isinstance(store_backend, CompressedValidationsStoreBackend):
+            key_tuple = store_backend._get_loose_keys(key_tuple)[0]
+            serialized = compress_store_record(serialized, store_backend.compression)
+            store_backend = store_backend.loose_store_backend
+
+        self._list_pending.append((store_backend, key_tuple, serialized))
+        if len(self._list_pending) >= self.max_buffered:
+            self.flush()
+
+    def flush(self) -> int:
+        """Function to write all buffered objects to their store backends. Returns the
+        number of objects that were written"""
+        list_pending, self._list_pending = self._list_pending, []
+        dict_backends = {}
+        for store_backend, key, value in list_pending:
+            dict_backends.setdefault(id(store_backend), (store_backend, {}))[1][
+                key
+            ] = value
+
+        for store_backend, dict_values in dict_backends.values():
+            write_store_backend_values(store_backend, dict_values, self.n_threads)
+        if list_pending:
+            logger.info(f"Flushed {len(list_pending)} buffered objects to stores")
+
+        return len(list_pending)
+
+
+_STORE_WRITE_BUFFER = StoreWriteBuffer()
+
+
+def flush_store_writes() -> int:
+    """Function to write all objects buffered by BufferedStoreValidationResultAction
+    and BufferedStoreEvaluationParametersAction to their stores. Must be called before
+    an invocation ends, so that no validation results are lost. Returns the number of
+    objects that were written"""
+    return _STORE_WRITE_BUFFER.flush()
+
+
+class BufferedStoreValidationResultAction(StoreValidationResultAction):
+    """Checkpoint action that stores validation results like
+    StoreValidationResultAction, but adds them to _STORE_WRITE_BUFFER instead of
+    writing them directly. Configured in the action list of a checkpoint with
+    module_name grater_functions.store_writes"""
+
+    def _run(
+        self,
+        validation_result_suite: ExpectationSuiteValidationResult,
+        validation_result_suite_identifier: ValidationResultIdentifier,
+        data_asset,
+        payload=None,
+        expectation_suite_identifier=None,
+        checkpoint_identifier=None,
+    ):
+        if validation_result_suite is None:
+            logger.warning(
+                f"No validation_result_suite was passed to {type(self).__name__} "
+                "action. Skipping action."
+            )
+            return
+
+        _STORE_WRITE_BUFFER.add(
+            self.target_store,
+            validation_result_suite_identifier,
+            validation_result_suite,
+        )
+
+
+class BufferedStore:
+    """Wrapper around a store of Great Expectations that adds objects to
+    _STORE_WRITE_BUFFER when set is called. All other attributes are passed through to
+    the wrapped store
+
+    Parameters
+    ----------
+    store : Store
+        Store to buffer writes to
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+    def set(self, key, value, **kwargs):
+        _STORE_WRITE_BUFFER.add(self.store, key, value)
+
+
+class BufferedStoreEvaluationParametersAction(StoreEvaluationParametersAction):
+    """Checkpoint action that stores the metrics of validation results that other
+    expectation suites depend on like StoreEvaluationParametersAction, but adds them
+    to _STORE_WRITE_BUFFER instead of writing them directly. Configured in the action
+    list of a checkpoint with module_name grater_functions.store_writes"""
+
+    def __init__(self, data_context, target_store_name: str = None):
+        super().__init__(data_context, target_store_name)
+        self.target_store_name = (
+            target_store_name or data_context.evaluation_parameter_store_name
+        )
+
+    def _run(
+        self,
+        validation_result_suite: ExpectationSuiteValidationResult,
+        validation_result_suite_identifier: ValidationResultIdentifier,
+        data_asset,
+        payload=None,
+        expectation_suite_identifier=None,
+        checkpoint_identifier=None,
+    ):
+        if validation_result_suite is None:
+            logger.warning(
+                f"No validation_result_suite was passed to {type(self).__name__} "
+                "action. Skipping action."
+            )
+            return
+
+        # -- 1. Temporarily buffer writes to the target store of the DataContext
+        stores = self.data_context.stores
+        stores[self.target_store_name] = BufferedStore(self.target_store)
+
+        # -- 2. Store the metrics, restoring the original store afterwards
+        try:
+            self.data_context.store_evaluation_parameters(
+                validation_result_suite, self.target_store_name
+            )
+        finally:
+            stores[self.target_store_name] = self.target_store
@@ -0,0 +1,305 @@
+"""Summary index of validation results"""
+
+# -- Imports
+import datetime
+import json
+import logging
+import sqlite3
+import uuid
+import pandas as pd
+from great_expectations.checkpoint.types.checkpoint_result import CheckpointResult
+from great_expectations.core.util import convert_to_json_serializable
+
+from grater_functions.compressed_store import get_validation_asset_name
+from grater_functions.docs_rebuild_scheduler import NOTIFICATION_TIME_FORMAT
+from grater_functions.validation import is_skipped_result
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Summary index of validation results
+# NOTE: as validation results are stored, a summary with one row per expectation is
+# written to a Grater store backend, partitioned by the date of the run (e.g.
+# date=2021-12-01/). Summaries are compacted into a single file per date daily. To
+# query them, ValidationSummaryIndex loads the summaries into a local SQLite database,
+# only downloading partitions it has not loaded before
+SUMMARY_COLUMNS = (
+    "run_name",
+    "run_time",
+    "expectation_suite_name",
+    "asset_name",
+    "batch_identifier",
+    "expectation_type",
+    "column_name",
+    "kwargs",
+    "success",
+    "observed_value",
+    "unexpected_percent",
+)
+
+
+def get_validation_summary_rows(
+    validation_result_identifier, validation_result
+) -> list:
+    """Function to summarize a validation result into one row per expectation, with
+    the values of SUMMARY_COLUMNS. Keyword arguments of expectations and observed values
+    are stored as JSON, as their type differs between expectations. The success of
+    expectations that were skipped (see TieredValidator) is None
+
+    Parameters
+    ----------
+    validation_result_identifier : ValidationResultIdentifier
+        Key of the validation result in the validations store
+    validation_result : ExpectationSuiteValidationResult
+        The validation result to summarize
+
+    Returns
+    -------
+    list
+        A list of rows, each a list with a value for every column in SUMMARY_COLUMNS
+    """
+    meta = convert_to_json_serializable(validation_result.meta)
+    batch_identifiers = (meta.get("active_batch_definition") or {}).get(
+        "batch_identifiers"
+    )
+    batch_identifier = (
+        "|".join(str(value) for value in batch_identifiers.values())
+        if batch_identifiers
+        else validation_result_identifier.batch_identifier
+    )
+    run_id = validation_result_identifier.run_id
+
+    rows = []
+    for result in validation_result.results:
+        kwargs = {
+            key: value
+            for key, value in result.expectation_config.kwargs.items()
+            if key not in ("batch_id", "result_format", "include_config")
+        }
+        result_dict = convert_to_json_serializable(result.result or {})
+        rows.append(
+            [
+                run_id.run_name,
+                run_id.run_time.isoformat(),
+                validation_result_identifier.expectation_suite_identifier.expectation_suite_name,
+                get_validation_asset_name(meta),
+                batch_identifier,
+                result.expectation_config.expectation_type,
+                kwargs.get("column"),
+                json.dumps(convert_to_json_serializable(kwargs), sort_keys=True),
+                None if is_skipped_result(result) else bool(result.success),
+                json.dumps(result_dict.get("observed_value")),
+                result_dict.get("unexpected_percent"),
+            ]
+        )
+
+    return rows
+
+
+def write_validation_summaries(
+    store_backend, checkpoint_result: CheckpointResult
+) -> int:
+    """Function to write the summary of the validation results stored by running a
+    checkpoint to a store backend, as returned by get_grater_store_backend, in the
+    partition of the date of the run. Returns the number of rows written"""
+    dict_partitions = {}
+    for identifier, run_result in checkpoint_result.run_results.items():
+        run_date = identifier.run_id.run_time.strftime("%Y-%m-%d")
+        dict_partitions.setdefault(run_date, []).extend(
+            get_validation_summary_rows(identifier, run_result["validation_result"])
+        )
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for run_date, rows in dict_partitions.items():
+        store_backend.set(
+            (
+                f"date={run_date}",
+                f"{now.strftime(NOTIFICATION_TIME_FORMAT)}-{uuid.uuid4().hex[:8]}",
+            ),
+            json.dumps({"columns": SUMMARY_COLUMNS, "rows": rows}),
+        )
+
+    return sum(len(rows) for rows in dict_partitions.values())
+
+
+def compact_validation_summaries(store_backend) -> dict:
+    """Function to compact the summaries of validation results in a store backend into
+    a single file per date. Summaries that are written during compaction are compacted
+    the next time
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend with the summaries, as returned by get_grater_store_backend
+
+    Returns
+    -------
+    dict
+        A dictionary with the number of summary files that were compacted and the
+        number of compacted files that were written
+    """
+    dict_partitions = {}
+    for key in store_backend.list_keys():
+        if len(key) == 2 and key[0].startswith("date="):
+            dict_partitions.setdefault(key[0], []).append(key)
+
+    n_compacted = 0
+    n_written = 0
+    for partition, keys in dict_partitions.items():
+        if len(keys) < 2:
+            continue
+        rows = []
+        for key in keys:
+            rows.extend(json.loads(store_backend.get(key))["rows"])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        store_backend.set(
+            (
+                partition,
+                f"{now.strftime(NOTIFICATION_TIME_FORMAT)}-{uuid.uuid4().hex[:8]}",
+            ),
+            json.dumps({"columns": SUMMARY_COLUMNS, "rows": rows}),
+        )
+        for key in keys:
+            store_backend.remove_key(key)
+        n_compacted += len(keys)
+        n_written += 1
+
+    logger.info(f"Compacted {n_compacted} validation summaries into {n_written} files")
+
+    return {"summaries_compacted": n_compacted, "summary_files": n_written}
+
+
+class ValidationSummaryIndex:
+    """Queryable index of the summaries of validation results (see
+    get_validation_summary_rows), kept in a local SQLite database. Calling sync loads
+    summary files that were not loaded before and removes rows of files that were
+    compacted, after which the validation_summaries table can be queried with SQL
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend with the summaries, as returned by get_grater_store_backend
+    database_path : str, optional
+        Path of the SQLite database, which is kept between runs so that only new
+        summaries are downloaded, by default "validation_summaries.sqlite". Use
+        ":memory:" for a database that is not kept
+    """
+
+    def __init__(
+        self, store_backend, database_path: str = "validation_summaries.sqlite"
+    ):
+        self.store_backend = store_backend
+        self.connection = sqlite3.connect(database_path)
+        self.connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS validation_summaries (
+                source_key TEXT, {", ".join(SUMMARY_COLUMNS)}
+            );
+            CREATE INDEX IF NOT EXISTS summaries_by_expectation
+                ON validation_summaries (expectation_type, run_time);
+            CREATE INDEX IF NOT EXISTS summaries_by_asset
+                ON validation_summaries (asset_name, run_time);
+            CREATE INDEX IF NOT EXISTS summaries_by_source
+                ON validation_summaries (source_key);
+            CREATE TABLE IF NOT EXISTS summary_files (source_key TEXT PRIMARY KEY);
+            """)
+
+    def sync(self, since: str = None) -> int:
+        """Function to load summary files that were not loaded before into the
+        database, and to remove rows of files that no longer exist (e.g. because they
+        were compacted). Partitions of dates before since (e.g. "2021-12-01") are
+        skipped if given. Returns the number of files that were loaded"""
+        # -- 1. Compare summary files in the store to the files that were loaded
+        source_keys = {
+            "/".join(key): key
+            for key in self.store_backend.list_keys()
+            if len(key) == 2
+            and key[0].startswith("date=")
+            and (since is None or key[0][len("date=") :] >= str(since)[:10])
+        }
+        loaded_keys = {
+            source_key
+            for (source_key,) in self.connection.execute(
+                "SELECT source_key FROM summary_files"
+            )
+            if since is None
+            or source_key[len("date=") : len("date=") + 10] >= str(since)[:10]
+        }
+
+        # -- 2. Remove rows of removed files and add rows of new files
+        with self.connection:
+            for source_key in loaded_keys - set(source_keys):
+                self.connection.execute(
+                    "DELETE FROM validation_summaries WHERE source_key = ?",
+                    (source_key,),
+                )
+                self.connection.execute(
+                    "DELETE FROM summary_files WHERE source_key = ?", (source_key,)
+                )
+            new_keys = set(source_keys) - loaded_keys
+            for source_key in new_keys:
+                summary = json.loads(self.store_backend.get(source_keys[source_key]))
+                columns = ", ".join(summary["columns"])
+                placeholders = ", ".join("?" * (len(summary["columns"]) + 1))
+                self.connection.executemany(
+                    f"INSERT INTO validation_summaries (source_key, {columns}) "
+                    f"VALUES ({placeholders})",
+                    [[source_key] + row for row in summary["rows"]],
+                )
+                self.connection.execute(
+                    "INSERT INTO summary_files VALUES (?)", (source_key,)
+                )
+
+        return len(new_keys)
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        """Function to run an SQL query against the validation_summaries table"""
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def get_failures(
+        self,
+        expectation_type: str = None,
+        asset_name: str = None,
+        since: str = None,
+    ) -> pd.DataFrame:
+        """Function to get the failed expectations, optionally of one expectation type
+        or data asset and since a date or time (e.g. "2021-12-01"), most recent first.
+        Skipped expectations, of which the success is NULL, are not included"""
+        conditions = ["success = 0"]
+        params = []
+        for column, operator, value in (
+            ("expectation_type", "=", expectation_type),
+            ("asset_name", "=", asset_name),
+            ("run_time", ">=", since),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(str(value))
+
+        return self.query(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM validation_summaries "
+            f"WHERE {' AND '.join(conditions)} ORDER BY run_time DESC",
+            tuple(params),
+        )
+
+    def get_trend(
+        self, expectation_type: str, asset_name: str = None, column_name: str = None
+    ) -> pd.DataFrame:
+        """Function to get the observed values and outcomes of an expectation over
+        time, optionally for one data asset or column, oldest first"""
+        conditions = ["expectation_type = ?"]
+        params = [expectation_type]
+        for column, value in (("asset_name", asset_name), ("column_name", column_name)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        df_trend = self.query(
+            "SELECT run_time, asset_name, batch_identifier, column_name, success, "
+            "observed_value, unexpected_percent FROM validation_summaries "
+            f"WHERE {' AND '.join(conditions)} ORDER BY run_time",
+            tuple(params),
+        )
+        df_trend["observed_value"] = df_trend["observed_value"].map(json.loads)
+
+        return df_trend
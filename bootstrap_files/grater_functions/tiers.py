@@ -0,0 +1,363 @@
+"""Functions for validating expectations in priority tiers"""
+
+# -- Imports
+import copy
+import logging
+import time
+import great_expectations as ge
+from great_expectations.checkpoint.types.checkpoint_result import CheckpointResult
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+    ExpectationValidationResult,
+)
+from great_expectations.expectations.expectation import Expectation
+from great_expectations.expectations.registry import _registered_renderers
+from great_expectations.core.run_identifier import RunIdentifier
+from great_expectations.render.types import RenderedStringTemplateContent
+from great_expectations.render.renderer.renderer import renderer
+
+from grater_functions.cost_profiles import (
+    PROFILED_TIER,
+    get_expectation_cost,
+    load_cost_profile,
+    save_cost_profile,
+    update_cost_profile,
+)
+from grater_functions.parallel import ParallelValidator
+from grater_functions.result_format import get_adaptive_validator
+from grater_functions.validation import (
+    EXPECTATION_TIERS,
+    build_suite_validation_result,
+    get_checkpoint_validator,
+    get_expectation_tier,
+    get_partial_suite,
+    is_skipped_result,
+    run_checkpoint_with_validator,
+    sort_results_by_column,
+)
+from grater_functions.validation_plans import (
+    get_plan_result_formats,
+    get_planned_validator,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for validating expectations in priority tiers
+# NOTE: tiers are assigned to expectations in the notebook through their meta, e.g.
+# validator.expect_table_columns_to_match_set(..., meta={"tier": "blocking"}).
+# Expectations without a tier are considered critical (see get_expectation_tier)
+def build_skipped_result(
+    expectation_config, batch_id: str, reason: str
+) -> ExpectationValidationResult:
+    """Function that generates a validation result for an expectation that was not
+    evaluated, marking it as skipped in its meta together with the reason why. As
+    Great Expectations requires a success, it is False, but skipped results are not
+    counted as failures (see get_validation_statistics), are stored without success in
+    the summary index and are rendered with their own icon in Data Docs
+
+    Parameters
+    ----------
+    expectation_config : ExpectationConfiguration
+        Configuration of the expectation that was skipped
+    batch_id : str
+        Identifier of the batch of data that was validated
+    reason : str
+        Reason why the expectation was skipped
+
+    Returns
+    -------
+    ExpectationValidationResult
+        An unsuccessful validation result without a result, marked as skipped
+    """
+    configuration = copy.deepcopy(expectation_config)
+    configuration.kwargs.update({"batch_id": batch_id})
+
+    return ExpectationValidationResult(
+        success=False,
+        expectation_config=configuration,
+        result={},
+        meta={"skipped": True, "skipped_reason": reason},
+        exception_info={
+            "raised_exception": False,
+            "exception_message": None,
+            "exception_traceback": None,
+        },
+    )
+
+
+def get_skipped_status_icon(
+    result: ExpectationValidationResult,
+) -> RenderedStringTemplateContent:
+    """Helper function to render the status icon of a skipped expectation in Data Docs,
+    with the reason why it was skipped as tooltip"""
+    return RenderedStringTemplateContent(
+        **{
+            "content_block_type": "string_template",
+            "string_template": {
+                "template": "$icon",
+                "params": {"icon": "", "markdown_status_icon": "⏭"},
+                "styling": {
+                    "params": {
+                        "icon": {
+                            "classes": ["fas", "fa-forward", "text-muted"],
+                            "attributes": {
+                                "title": result.meta.get("skipped_reason", "Skipped")
+                            },
+                            "tag": "i",
+                        }
+                    }
+                },
+            },
+        }
+    )
+
+
+def wrap_status_icon_renderer(renderer_fn):
+    """Helper function to wrap the status icon renderer of an expectation type, so that
+    skipped expectations are rendered with their own icon (see
+    get_skipped_status_icon) instead of the icon of a failed expectation"""
+
+    @renderer(renderer_type="renderer.diagnostic.status_icon")
+    def status_icon_renderer(*args, **kwargs):
+        result = kwargs.get("result")
+        if result is not None and is_skipped_result(result):
+            return get_skipped_status_icon(result)
+        return renderer_fn(*args, **kwargs)
+
+    status_icon_renderer.renders_skipped_results = True
+    return status_icon_renderer
+
+
+def register_skipped_status_icon_renderer():
+    """Function that wraps the status icon renderers of Data Docs with
+    wrap_status_icon_renderer, both of the expectation types that are registered
+    already and of Expectation, from which expectation types that are defined later
+    inherit it. It is not called on import, but by the functions that validate or
+    render skipped expectations (run_tiered_checkpoint, run_checkpoints_on_batch and
+    the Data Docs builders), and should be called before context.build_data_docs
+    renders skipped expectations. Calling it again has no effect"""
+    for renderers in _registered_renderers.values():
+        renderer_impl = renderers.get("renderer.diagnostic.status_icon")
+        if renderer_impl is not None and not getattr(
+            renderer_impl[1], "renders_skipped_results", False
+        ):
+            renderers["renderer.diagnostic.status_icon"] = (
+                renderer_impl[0],
+                wrap_status_icon_renderer(renderer_impl[1]),
+            )
+
+    base_renderer = Expectation.__dict__["_diagnostic_status_icon_renderer"].__func__
+    if not getattr(base_renderer, "renders_skipped_results", False):
+        Expectation._diagnostic_status_icon_renderer = classmethod(
+            wrap_status_icon_renderer(base_renderer)
+        )
+
+
+class TieredValidator:
+    """Wrapper around a Great Expectations Validator (or a ParallelValidator) that
+    validates the expectations of its expectation suite in order of their priority
+    tier, as defined in EXPECTATION_TIERS. If an expectation in the blocking tier
+    fails, expectations in later tiers are not evaluated but are included in the
+    validation result as skipped. All other attributes are passed through to the
+    wrapped validator, so that it can be run by the actions of a checkpoint
+
+    If a cost profile is passed, expectations in the blocking tier are validated one by
+    one, cheapest first according to the profile, so that validation stops at the
+    first expectation that fails. The time each of these calls takes is recorded in
+    the cost profile. Expectations in later tiers cannot end validation early, so they
+    are still validated together per tier and are not profiled (see PROFILED_TIER)
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate and the expectation suite to
+        validate it with, or a ParallelValidator wrapped around one
+    cost_profile : dict, optional
+        Cost profile of the expectation suite, as loaded with load_cost_profile, by
+        default None. It is updated in place with the recorded runtimes
+    """
+
+    def __init__(self, validator, cost_profile: dict = None):
+        self.validator = validator
+        self.cost_profile = cost_profile
+
+    def __getattr__(self, name):
+        return getattr(self.validator, name)
+
+    def validate(
+        self,
+        expectation_suite: ExpectationSuite = None,
+        run_id: RunIdentifier = None,
+        evaluation_parameters: dict = None,
+        catch_exceptions: bool = True,
+        result_format: dict = None,
+        **kwargs,
+    ) -> ExpectationSuiteValidationResult:
+        """Function to validate the expectation suite of the wrapped validator (or the
+        given expectation suite) tier by tier, using the same arguments as
+        Validator.validate"""
+        expectation_suite = expectation_suite or self.validator.expectation_suite
+        expectations = expectation_suite.expectations
+        validate_kwargs = {
+            "run_id": run_id,
+            "evaluation_parameters": evaluation_parameters,
+            "catch_exceptions": catch_exceptions,
+            "result_format": result_format,
+        }
+
+        # -- 1. Group expectations by tier
+        dict_tiers = {tier: [] for tier in EXPECTATION_TIERS}
+        for expectation in expectations:
+            dict_tiers[get_expectation_tier(expectation)].append(expectation)
+
+        # -- 2. Validate tiers in order, until an expectation in the blocking tier fails
+        results = []
+        skip_reason = None
+        partial_result = None
+        for tier in EXPECTATION_TIERS:
+            for group in self.get_tier_groups(tier, dict_tiers[tier]):
+                if skip_reason is not None:
+                    results.extend(
+                        build_skipped_result(
+                            expectation, self.validator.active_batch_id, skip_reason
+                        )
+                        for expectation in group
+                    )
+                    continue
+
+                start = time.perf_counter()
+                partial_result = self.validator.validate(
+                    expectation_suite=get_partial_suite(expectation_suite, group),
+                    **validate_kwargs,
+                )
+                if self.cost_profile is not None and tier == PROFILED_TIER:
+                    update_cost_profile(
+                        self.cost_profile, group[0], time.perf_counter() - start
+                    )
+                validate_kwargs["run_id"] = partial_result.meta["run_id"]
+                results.extend(partial_result.results)
+
+                if tier == "blocking" and not partial_result.success:
+                    logger.warning(
+                        "Expectations in the blocking tier failed, skipping validation "
+                        "of the remaining expectations"
+                    )
+                    skip_reason = (
+                        "Skipped because an expectation in the blocking tier failed"
+                    )
+
+        return build_suite_validation_result(
+            self.validator,
+            sort_results_by_column(expectations, results),
+            partial_result.evaluation_parameters if partial_result else {},
+            validate_kwargs["run_id"],
+        )
+
+    def get_tier_groups(self, tier: str, expectations: list) -> list:
+        """Function to split the expectations of a tier into the groups that are
+        validated together: one group per expectation (cheapest first) for the
+        blocking tier if a cost profile is known, and a single group otherwise"""
+        if not expectations:
+            return []
+        if self.cost_profile is None or tier != "blocking":
+            return [expectations]
+
+        return [
+            [expectation]
+            for expectation in sorted(
+                expectations,
+                key=lambda expectation: get_expectation_cost(
+                    self.cost_profile, expectation
+                ),
+            )
+        ]
+
+
+def run_tiered_checkpoint(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    batch_request: RuntimeBatchRequest,
+    evaluation_parameters: dict = None,
+    n_workers: int = 1,
+    partition_by: str = "columns",
+    cost_profile_store=None,
+    initial_result_format=None,
+    validation_plan_store=None,
+) -> CheckpointResult:
+    """Function to run a checkpoint like context.run_checkpoint, but validating the
+    expectations of its expectation suite in order of their priority tier (see
+    TieredValidator). Expectations that were skipped because the blocking tier failed
+    are included in the stored validation result, marked as skipped in their meta
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run
+    batch_request : RuntimeBatchRequest
+        Batch request containing the batch of data to validate
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    n_workers : int, optional
+        Number of processes to spread validation of each tier over, by default 1
+    partition_by : str, optional
+        Whether to partition validation by "columns" or by "rows" when n_workers is
+        larger than 1, by default "columns"
+    cost_profile_store : TupleStoreBackend, optional
+        Store backend for the cost profiles of expectation suites (see
+        get_cost_profile_store), by default None. If passed, expectations in the
+        blocking tier are validated cheapest first and the recorded runtimes are
+        stored afterwards
+    initial_result_format : str or dict, optional
+        If passed, expectations are validated with this result format first and only
+        failed expectations again with the result format of the checkpoint (see
+        AdaptiveResultFormatValidator), by default None
+    validation_plan_store : TupleStoreBackend, optional
+        Store backend for validation plans (see get_grater_store_backend), by default
+        None. If passed, metric graphs are built from the validation plan of the
+        expectation suite (see PlannedValidator), which is compiled if needed
+
+    Returns
+    -------
+    CheckpointResult
+        The results of running the checkpoint, as returned by context.run_checkpoint
+    """
+    register_skipped_status_icon_renderer()
+    validator = get_checkpoint_validator(context, checkpoint_name, batch_request)
+    if validation_plan_store is not None:
+        validator = get_planned_validator(
+            validator,
+            validation_plan_store,
+            result_formats=get_plan_result_formats(
+                context, [checkpoint_name], initial_result_format
+            ),
+        )
+    cost_profile = None
+    if cost_profile_store is not None:
+        cost_profile = load_cost_profile(
+            cost_profile_store, validator.expectation_suite_name
+        )
+
+    results = run_checkpoint_with_validator(
+        context,
+        checkpoint_name,
+        TieredValidator(
+            get_adaptive_validator(
+                ParallelValidator(validator, n_workers, partition_by),
+                initial_result_format,
+            ),
+            cost_profile,
+        ),
+        evaluation_parameters,
+    )
+
+    if cost_profile is not None:
+        save_cost_profile(cost_profile_store, cost_profile)
+
+    return results
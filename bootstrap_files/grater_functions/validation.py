@@ -0,0 +1,326 @@
+"""Helper functions for expectations and their validation results, shared by the
+validators of Grater Expectations"""
+
+# -- Imports
+import copy
+import datetime
+import hashlib
+import json
+from collections.abc import Hashable
+import great_expectations as ge
+from great_expectations.checkpoint.types.checkpoint_result import CheckpointResult
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.core.expectation_validation_result import (
+    ExpectationSuiteValidationResult,
+    ExpectationValidationResult,
+)
+from great_expectations.core.run_identifier import RunIdentifier
+from great_expectations.core.util import convert_to_json_serializable
+from great_expectations.validation_operators import ActionListValidationOperator
+from great_expectations.validator.validator import Validator
+
+# Priority tiers of expectations, assigned through their meta (see tiers.py)
+EXPECTATION_TIERS = ("blocking", "critical", "informational")
+DEFAULT_EXPECTATION_TIER = "critical"
+
+
+def get_expectation_tier(expectation_config) -> str:
+    """Helper function to get the priority tier of an expectation from its meta
+
+    Raises
+    ------
+    ValueError
+        A ValueError is raised if the tier is not one of EXPECTATION_TIERS
+    """
+    tier = (expectation_config.meta or {}).get("tier", DEFAULT_EXPECTATION_TIER)
+    if tier not in EXPECTATION_TIERS:
+        raise ValueError(
+            f"Unknown tier '{tier}' for {expectation_config.expectation_type}, "
+            f"tier should be one of {EXPECTATION_TIERS}"
+        )
+
+    return tier
+
+
+def is_skipped_result(result: ExpectationValidationResult) -> bool:
+    """Helper function to check whether a validation result marks an expectation
+    that was skipped"""
+    return bool((result.meta or {}).get("skipped"))
+
+
+# Helper functions for expectations and their validation results
+def get_expectation_column(expectation_config) -> str:
+    """Helper function to get the column an expectation applies to, which returns
+    "_nocolumn" for table level and multi-column expectations (like
+    Validator.validate)"""
+    column = expectation_config.kwargs.get("column")
+    if column is None or not isinstance(column, Hashable):
+        return "_nocolumn"
+
+    return column
+
+
+def get_expectation_columns(expectation_config) -> list:
+    """Helper function to get all columns an expectation depends on, including those
+    of multi-column expectations"""
+    kwargs = expectation_config.kwargs
+    columns = [
+        kwargs[key] for key in ("column", "column_A", "column_B") if kwargs.get(key)
+    ]
+    columns.extend(kwargs.get("column_list") or [])
+
+    return [column for column in columns if isinstance(column, Hashable)]
+
+
+def get_expectation_id(expectation_config) -> str:
+    """Helper function to get an identifier for an expectation that is stable over
+    runs, based on its type and its kwargs before evaluation parameters are
+    substituted"""
+    kwargs = {
+        key: value
+        for key, value in expectation_config.get_raw_configuration().kwargs.items()
+        if key != "batch_id"
+    }
+    kwargs_hash = hashlib.md5(
+        json.dumps(convert_to_json_serializable(kwargs), sort_keys=True).encode()
+    ).hexdigest()
+
+    return f"{expectation_config.expectation_type}-{kwargs_hash[:12]}"
+
+
+def get_result_key(result_or_expectation) -> tuple:
+    """Helper function to match the validation result of an expectation to the
+    expectation (or to its result in another run), based on its identifier and meta,
+    which distinguishes identical expectations of different expectation suites"""
+    expectation_config = getattr(
+        result_or_expectation, "expectation_config", result_or_expectation
+    )
+    return (
+        get_expectation_id(expectation_config),
+        json.dumps(
+            convert_to_json_serializable(expectation_config.meta or {}), sort_keys=True
+        ),
+    )
+
+
+def hash_expectation_suite(suite_dict: dict) -> str:
+    """Helper function to compute the MD5 hash of an expectation suite as stored in
+    the expectations store, to detect whether its page needs to be rendered again"""
+    return hashlib.md5(
+        json.dumps(convert_to_json_serializable(suite_dict), sort_keys=True).encode(
+            "utf-8"
+        )
+    ).hexdigest()
+
+
+def sort_results_by_column(expectations: list, results: list) -> list:
+    """Helper function to restore the order in which a single validator would return
+    the results of a list of expectations, i.e. grouped by column in order of first
+    appearance and in order of the list within each column"""
+    column_order = {}
+    expectation_order = {}
+    for position, expectation in enumerate(expectations):
+        column_order.setdefault(get_expectation_column(expectation), len(column_order))
+        expectation_order.setdefault(get_expectation_id(expectation), position)
+
+    return sorted(
+        results,
+        key=lambda result: (
+            column_order[get_expectation_column(result.expectation_config)],
+            expectation_order.get(get_expectation_id(result.expectation_config), 0),
+        ),
+    )
+
+
+def get_partial_suite(expectation_suite: ExpectationSuite, expectations: list):
+    """Helper function to create a copy of an expectation suite that only contains
+    (copies of) the given expectations. Copies are needed, as Validator.validate
+    substitutes evaluation parameters in the expectations it is given"""
+    return ExpectationSuite(
+        expectation_suite_name=expectation_suite.expectation_suite_name,
+        expectations=copy.deepcopy(expectations),
+        evaluation_parameters=expectation_suite.evaluation_parameters,
+        meta=expectation_suite.meta,
+    )
+
+
+def get_validation_statistics(results: list) -> tuple:
+    """Helper function to compute the success and statistics of a validation result
+    from the results of its expectations, like Validator.validate. Results of
+    expectations that were skipped (see TieredValidator) are not counted as evaluated
+    expectations"""
+    skipped_expectations = sum(is_skipped_result(result) for result in results)
+    evaluated_expectations = len(results) - skipped_expectations
+    successful_expectations = sum(
+        result.success for result in results if not is_skipped_result(result)
+    )
+    success_percent = (
+        successful_expectations / evaluated_expectations * 100
+        if evaluated_expectations
+        else None
+    )
+    statistics = {
+        "evaluated_expectations": evaluated_expectations,
+        "successful_expectations": successful_expectations,
+        "unsuccessful_expectations": evaluated_expectations - successful_expectations,
+        "success_percent": success_percent,
+    }
+    if skipped_expectations:
+        statistics["skipped_expectations"] = skipped_expectations
+
+    success = (
+        successful_expectations == evaluated_expectations and not skipped_expectations
+    )
+    return success, statistics
+
+
+def build_suite_validation_result(
+    validator: Validator,
+    results: list,
+    evaluation_parameters: dict,
+    run_id: RunIdentifier,
+    expectation_suite_name: str = None,
+) -> ExpectationSuiteValidationResult:
+    """Function that bundles the results of individual expectations into a validation
+    result for the expectation suite of a validator, with the same statistics and
+    metadata as Validator.validate would generate. Results of expectations that were
+    skipped (see TieredValidator) are not counted as evaluated expectations
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator that was used to validate the batch of data
+    results : list
+        List of ExpectationValidationResult objects
+    evaluation_parameters : dict
+        Evaluation parameters that were used at validation time
+    run_id : RunIdentifier
+        Identifier of the current validation run
+    expectation_suite_name : str, optional
+        Name of the expectation suite the results belong to, by default the name of
+        the expectation suite of the validator
+
+    Returns
+    -------
+    ExpectationSuiteValidationResult
+        The validation result for the expectation suite
+    """
+    success, statistics = get_validation_statistics(results)
+
+    return ExpectationSuiteValidationResult(
+        results=results,
+        success=success,
+        statistics=statistics,
+        evaluation_parameters=evaluation_parameters,
+        meta={
+            "great_expectations_version": ge.__version__,
+            "expectation_suite_name": expectation_suite_name
+            or validator.expectation_suite_name,
+            "run_id": run_id,
+            "batch_spec": validator.active_batch_spec,
+            "batch_markers": validator.active_batch_markers,
+            "active_batch_definition": validator.active_batch_definition,
+            "validation_time": datetime.datetime.now(datetime.timezone.utc).strftime(
+                "%Y%m%dT%H%M%S.%fZ"
+            ),
+        },
+    )
+
+
+# Helper functions for validating checkpoints with a Validator
+def get_checkpoint_result_format(checkpoint_config) -> dict:
+    """Helper function to get the result format of a checkpoint from its (substituted)
+    configuration, which defaults to SUMMARY like context.run_checkpoint"""
+    return checkpoint_config.get("runtime_configuration", {}).get("result_format") or {
+        "result_format": "SUMMARY"
+    }
+
+
+def get_checkpoint_validator(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    batch_request: RuntimeBatchRequest,
+) -> Validator:
+    """Helper function to get a validator for a batch request, using the expectation
+    suite that is configured for a checkpoint"""
+    checkpoint_config = context.get_checkpoint(checkpoint_name).get_substituted_config()
+    return context.get_validator(
+        batch_request=batch_request,
+        expectation_suite_name=checkpoint_config["expectation_suite_name"],
+    )
+
+
+def release_validator_batches(validator: Validator):
+    """Helper function to remove the batches of a validator from its execution engine.
+    The execution engine of a datasource is shared by all validators of a DataContext
+    and keeps every batch that was loaded into it, so this should be called after
+    validating each of many batches in a single process"""
+    execution_engine = validator.execution_engine
+    for batch_id in list(validator.batches):
+        execution_engine.loaded_batch_data_dict.pop(batch_id, None)
+        if execution_engine._active_batch_data_id == batch_id:
+            execution_engine._active_batch_data_id = None
+
+
+def run_checkpoint_with_validator(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    validator,
+    evaluation_parameters: dict = None,
+) -> CheckpointResult:
+    """Function that runs a checkpoint for a validator that was prepared beforehand
+    (e.g. a ParallelValidator), instead of the validator that context.run_checkpoint
+    creates internally. The actions configured for the checkpoint (storing the
+    validation result, updating Data Docs, etc.) are run as usual
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to run
+    validator : Validator
+        Validator to run, or a wrapper around one that offers the same interface
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+
+    Returns
+    -------
+    CheckpointResult
+        The results of running the checkpoint, as returned by context.run_checkpoint
+    """
+    # -- 1. Pull configuration of the checkpoint
+    checkpoint = context.get_checkpoint(checkpoint_name)
+    checkpoint_config = checkpoint.get_substituted_config()
+    result_format = get_checkpoint_result_format(checkpoint_config)
+
+    # -- 2. Generate run identifier from the run name template
+    run_time = datetime.datetime.now()
+    run_name_template = checkpoint_config.get("run_name_template")
+    run_name = run_time.strftime(run_name_template) if run_name_template else None
+    run_id = RunIdentifier(run_name=run_name, run_time=run_time)
+
+    # -- 3. Validate and run actions using the action list of the checkpoint
+    validation_operator = ActionListValidationOperator(
+        data_context=context,
+        action_list=checkpoint_config["action_list"],
+        name=f"{checkpoint_name}-checkpoint-validation",
+        result_format=result_format,
+    )
+    operator_result = validation_operator.run(
+        assets_to_validate=[validator],
+        run_id=run_id,
+        evaluation_parameters={
+            **checkpoint_config.get("evaluation_parameters", {}),
+            **(evaluation_parameters or {}),
+        },
+        result_format=result_format,
+    )
+
+    return CheckpointResult(
+        run_id=run_id,
+        run_results=operator_result.run_results,
+        checkpoint_config=checkpoint.config,
+    )
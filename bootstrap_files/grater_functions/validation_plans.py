@@ -0,0 +1,762 @@
+"""Functions for validating with precompiled validation plans"""
+
+# -- Imports
+import copy
+import datetime
+import json
+import logging
+import time
+import pandas as pd
+import great_expectations as ge
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.evaluation_parameters import (
+    find_evaluation_parameter_dependencies,
+)
+from great_expectations.core.expectation_configuration import ExpectationConfiguration
+from great_expectations.core.expectation_suite import ExpectationSuite
+from great_expectations.data_asset.util import parse_result_format
+from great_expectations.exceptions import EvaluationParameterError
+from great_expectations.expectations.registry import get_expectation_impl
+from great_expectations.core.util import convert_to_json_serializable
+from great_expectations.validator.metric_configuration import MetricConfiguration
+from great_expectations.validator.validation_graph import (
+    ExpectationValidationGraph,
+    MetricEdge,
+    ValidationGraph,
+)
+from great_expectations.validator.validator import Validator
+
+from grater_functions.parallel import get_fast_path
+from grater_functions.result_format import DEFAULT_INITIAL_RESULT_FORMAT
+from grater_functions.validation import (
+    get_checkpoint_result_format,
+    get_checkpoint_validator,
+    get_expectation_column,
+    get_expectation_columns,
+    get_expectation_id,
+    get_expectation_tier,
+    hash_expectation_suite,
+)
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Functions for validating with precompiled validation plans
+# NOTE: before validating, Great Expectations resolves the metrics that each expectation
+# depends on into a graph of metric configurations, which it does again on every run.
+# A validation plan is compiled once per version of an expectation suite instead (see
+# compile_validation_plan) and stored in a Grater store backend, keyed by the name and
+# content hash of the suite. Per expectation, it holds its metric graph for each
+# compiled result format, its columns, its evaluation parameter slots and its fast path
+# for validation on row partitions (see get_fast_path). At runtime, a PlannedValidator
+# builds the metric graph of planned expectations from the plan, and validates their
+# metrics with the metrics and result format from the plan, so that their validation
+# dependencies are not resolved at all. Expectations with evaluation parameters are
+# resolved as usual, as their metrics depend on the values that are passed for each
+# run
+VALIDATION_PLAN_VERSION = 2
+PLAN_BATCH_ID = "__validation_plan_batch_id__"
+DEFAULT_PLAN_RESULT_FORMATS = (DEFAULT_INITIAL_RESULT_FORMAT, "SUMMARY")
+
+# Validation plans that were loaded or compiled by this process (i.e. warm container),
+# by name and content hash of their expectation suite
+_VALIDATION_PLANS = {}
+
+
+def get_result_format_key(result_format) -> str:
+    """Helper function to get a key for a result format (e.g. "SUMMARY" or
+    {"result_format": "SUMMARY"}), under which metric graphs are stored in a plan"""
+    return json.dumps(parse_result_format(result_format), sort_keys=True)
+
+
+def get_evaluation_parameter_slots(expectation_config) -> list:
+    """Helper function to get the names of the evaluation parameters that the kwargs
+    of an expectation depend on, e.g. {"$PARAMETER": "max_passenger_count * 2"}"""
+    names = set()
+    for value in expectation_config.get_raw_configuration().kwargs.values():
+        if not (isinstance(value, dict) and "$PARAMETER" in value):
+            continue
+        try:
+            dependencies = find_evaluation_parameter_dependencies(value["$PARAMETER"])
+            names.update(dependencies["urns"] | dependencies["other"])
+        except EvaluationParameterError:
+            names.add(value["$PARAMETER"])
+
+    return sorted(names)
+
+
+def compile_metric_graph(
+    validator: Validator, expectation_config, runtime_configuration: dict
+):
+    """Function that resolves the metric dependencies of an expectation like
+    Validator.graph_validate does, and serializes the resulting graph of metric
+    configurations. The batch identifier is replaced by PLAN_BATCH_ID, which is filled
+    in again by build_metric_edges
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the execution engine to resolve metrics for
+    expectation_config : ExpectationConfiguration
+        Configuration of the expectation, without evaluation parameters
+    runtime_configuration : dict
+        Runtime configuration to resolve metrics with, including the result format
+
+    Returns
+    -------
+    tuple
+        A tuple with the serialized graph and the names of the metrics the expectation
+        checks, or None if the graph does not survive serialization unchanged (e.g.
+        because metric kwargs contain tuples or dates). Besides the metrics and their
+        edges, the graph holds the validation dependencies of the expectation (see
+        PlannedExpectationConfiguration): the index of each metric it checks and its
+        parsed result format
+    """
+    # -- 1. Resolve metric dependencies, with a placeholder for the batch identifier
+    evaluated_config = copy.deepcopy(expectation_config)
+    evaluated_config.kwargs.update({"batch_id": PLAN_BATCH_ID})
+    expectation_impl = get_expectation_impl(evaluated_config.expectation_type)
+    validation_dependencies = expectation_impl().get_validation_dependencies(
+        evaluated_config, validator.execution_engine, runtime_configuration
+    )
+    graph = ValidationGraph()
+    for metric_configuration in validation_dependencies["metrics"].values():
+        validator.build_metric_dependency_graph(
+            graph=graph,
+            execution_engine=validator.execution_engine,
+            metric_configuration=metric_configuration,
+            configuration=evaluated_config,
+            runtime_configuration=runtime_configuration,
+        )
+
+    # -- 2. Number metric configurations and serialize them with their dependencies
+    list_metrics = []
+    dict_indexes = {}
+
+    def get_metric_index(metric_configuration: MetricConfiguration) -> int:
+        if metric_configuration.id not in dict_indexes:
+            dict_indexes[metric_configuration.id] = len(list_metrics)
+            list_metrics.append(metric_configuration)
+        return dict_indexes[metric_configuration.id]
+
+    edges = [
+        [
+            get_metric_index(edge.left),
+            get_metric_index(edge.right) if edge.right is not None else None,
+        ]
+        for edge in graph.edges
+    ]
+    validated_metrics = {
+        name: get_metric_index(metric_configuration)
+        for name, metric_configuration in validation_dependencies["metrics"].items()
+    }
+    result_format = convert_to_json_serializable(
+        validation_dependencies["result_format"]
+    )
+    if json.loads(json.dumps(result_format)) != result_format:
+        return None
+    metrics = []
+    position = 0
+    while position < len(list_metrics):
+        metric_configuration = list_metrics[position]
+        domain_kwargs = dict(metric_configuration.metric_domain_kwargs)
+        value_kwargs = dict(metric_configuration.metric_value_kwargs)
+        serialized_kwargs = json.loads(
+            json.dumps(convert_to_json_serializable([domain_kwargs, value_kwargs]))
+        )
+        if serialized_kwargs != [domain_kwargs, value_kwargs]:
+            return None
+        domain_kwargs.pop("batch_id", None)
+        if PLAN_BATCH_ID in json.dumps([domain_kwargs, value_kwargs], default=str):
+            return None
+
+        metrics.append(
+            {
+                "metric_name": metric_configuration.metric_name,
+                "domain_kwargs": serialized_kwargs[0],
+                "value_kwargs": serialized_kwargs[1],
+                "dependencies": {
+                    key: get_metric_index(dependency)
+                    for key, dependency in (
+                        metric_configuration.metric_dependencies or {}
+                    ).items()
+                },
+            }
+        )
+        position += 1
+
+    return (
+        {
+            "metrics": metrics,
+            "edges": edges,
+            "validated_metrics": validated_metrics,
+            "result_format": result_format,
+        },
+        sorted(validated_metrics),
+    )
+
+
+def build_metric_edges(graph_plan: dict, batch_id: str) -> tuple:
+    """Function to build the edges of the metric graph of an expectation for a batch,
+    from a graph that was serialized by compile_metric_graph
+
+    Parameters
+    ----------
+    graph_plan : dict
+        Serialized metric graph, as stored in a validation plan
+    batch_id : str
+        Identifier of the batch of data to validate
+
+    Returns
+    -------
+    tuple
+        A tuple with a list of MetricEdge objects, to add to the validation graph of
+        the expectation, and a dictionary with the name of each metric the expectation
+        checks as key and the identifier of its metric configuration as value
+    """
+    list_metrics = []
+    for metric in graph_plan["metrics"]:
+        domain_kwargs = metric["domain_kwargs"]
+        if "batch_id" in domain_kwargs:
+            domain_kwargs = {**domain_kwargs, "batch_id": batch_id}
+        list_metrics.append(
+            MetricConfiguration(
+                metric["metric_name"], domain_kwargs, metric["value_kwargs"]
+            )
+        )
+    for metric_configuration, metric in zip(list_metrics, graph_plan["metrics"]):
+        if metric["dependencies"]:
+            metric_configuration.metric_dependencies = {
+                key: list_metrics[index]
+                for key, index in metric["dependencies"].items()
+            }
+
+    edges = [
+        MetricEdge(
+            left=list_metrics[left],
+            right=list_metrics[right] if right is not None else None,
+        )
+        for left, right in graph_plan["edges"]
+    ]
+    validated_metric_ids = {
+        name: list_metrics[index].id
+        for name, index in graph_plan["validated_metrics"].items()
+    }
+
+    return edges, validated_metric_ids
+
+
+def compile_validation_plan(
+    validator: Validator,
+    expectation_suite: ExpectationSuite = None,
+    result_formats: tuple = DEFAULT_PLAN_RESULT_FORMATS,
+) -> dict:
+    """Function that compiles an expectation suite into a validation plan, containing
+    what can be resolved before the batch of data and evaluation parameters of a run
+    are known. Metric graphs are resolved with the execution engine of the validator,
+    but not against its batch: expectations whose metrics depend on the batch (e.g.
+    expect_column_values_to_be_of_type for pandas) are left to be resolved at runtime
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the execution engine to compile the plan for, e.g. the
+        validator used to create the expectation suite in the notebook
+    expectation_suite : ExpectationSuite, optional
+        Expectation suite to compile, by default the suite of the validator
+    result_formats : tuple, optional
+        Result formats to compile metric graphs for, by default
+        DEFAULT_PLAN_RESULT_FORMATS. Graphs depend on the result format, as more
+        detailed formats require additional metrics (e.g. unexpected values)
+
+    Returns
+    -------
+    dict
+        The validation plan, with the content hash of the expectation suite, the
+        columns and evaluation parameters it depends on and an entry per expectation
+    """
+    expectation_suite = expectation_suite or validator.expectation_suite
+    dict_runtime_configurations = {
+        get_result_format_key(result_format): {
+            "include_config": True,
+            "catch_exceptions": True,
+            "result_format": result_format,
+        }
+        for result_format in result_formats
+    }
+
+    # -- 1. Resolve each expectation, including metric graphs for static expectations
+    list_entries = []
+    for expectation in expectation_suite.expectations:
+        entry = {
+            "id": get_expectation_id(expectation),
+            "expectation_type": expectation.expectation_type,
+            "column": get_expectation_column(expectation),
+            "columns": get_expectation_columns(expectation),
+            "tier": get_expectation_tier(expectation),
+            "fast_path": get_fast_path(expectation),
+            "evaluation_parameters": get_evaluation_parameter_slots(expectation),
+            "metrics": [],
+            "graphs": {},
+        }
+        if not entry["evaluation_parameters"]:
+            for key, runtime_configuration in dict_runtime_configurations.items():
+                try:
+                    compiled = compile_metric_graph(
+                        validator, expectation, runtime_configuration
+                    )
+                except Exception as err:
+                    logger.info(
+                        f"Metric graph of {entry['id']} depends on the batch of data, "
+                        f"resolving it at runtime ({err})"
+                    )
+                    break
+                if compiled is None:
+                    logger.info(f"Metric graph of {entry['id']} cannot be serialized")
+                    break
+                entry["graphs"][key], entry["metrics"] = compiled
+        list_entries.append(entry)
+
+    # -- 2. Collect columns and evaluation parameters of the suite
+    return {
+        "plan_version": VALIDATION_PLAN_VERSION,
+        "great_expectations_version": ge.__version__,
+        "expectation_suite_name": expectation_suite.expectation_suite_name,
+        "suite_hash": hash_expectation_suite(expectation_suite.to_json_dict()),
+        "compiled_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "result_formats": sorted(dict_runtime_configurations),
+        "columns": sorted(
+            {column for entry in list_entries for column in entry["columns"]}
+        ),
+        "evaluation_parameters": sorted(
+            {name for entry in list_entries for name in entry["evaluation_parameters"]}
+        ),
+        "expectations": list_entries,
+    }
+
+
+def save_validation_plan(store_backend, validation_plan: dict):
+    """Function to store a validation plan, keyed by the name and content hash of its
+    expectation suite
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for validation plans, generally obtained by calling
+        get_grater_store_backend with name "validation_plans"
+    validation_plan : dict
+        Validation plan to store, as compiled with compile_validation_plan
+    """
+    store_backend.set(
+        (validation_plan["expectation_suite_name"], validation_plan["suite_hash"]),
+        json.dumps(validation_plan),
+    )
+
+
+def is_validation_plan_usable(validation_plan: dict, result_formats: tuple) -> bool:
+    """Helper function to check whether a validation plan was compiled by the current
+    version of Great Expectations and contains graphs for the given result formats"""
+    return (
+        validation_plan.get("plan_version") == VALIDATION_PLAN_VERSION
+        and validation_plan.get("great_expectations_version") == ge.__version__
+        and {get_result_format_key(result_format) for result_format in result_formats}
+        <= set(validation_plan["result_formats"])
+    )
+
+
+def get_validation_plan(
+    store_backend,
+    validator: Validator,
+    expectation_suite: ExpectationSuite = None,
+    result_formats: tuple = DEFAULT_PLAN_RESULT_FORMATS,
+) -> dict:
+    """Function to get the validation plan of the current version of an expectation
+    suite. Plans are cached per process and otherwise loaded from the store. If no
+    usable plan was stored (e.g. because the suite changed), it is compiled and stored
+
+    Parameters
+    ----------
+    store_backend : TupleStoreBackend
+        Store backend for validation plans, generally obtained by calling
+        get_grater_store_backend with name "validation_plans"
+    validator : Validator
+        Validator to compile the plan with if needed (see compile_validation_plan)
+    expectation_suite : ExpectationSuite, optional
+        Expectation suite to get the plan for, by default the suite of the validator
+    result_formats : tuple, optional
+        Result formats the plan should contain metric graphs for, by default
+        DEFAULT_PLAN_RESULT_FORMATS
+
+    Returns
+    -------
+    dict
+        The validation plan of the expectation suite
+    """
+    expectation_suite = expectation_suite or validator.expectation_suite
+    key = (
+        expectation_suite.expectation_suite_name,
+        hash_expectation_suite(expectation_suite.to_json_dict()),
+    )
+
+    # -- 1. Use the plan of this process, or the stored plan
+    validation_plan = _VALIDATION_PLANS.get(key)
+    if validation_plan is None and store_backend.has_key(key):
+        validation_plan = json.loads(store_backend.get(key))
+
+    # -- 2. Compile (additional result formats of) the plan if needed
+    if validation_plan is None or not is_validation_plan_usable(
+        validation_plan, result_formats
+    ):
+        if validation_plan is not None and is_validation_plan_usable(
+            validation_plan, ()
+        ):
+            result_formats = [
+                json.loads(result_format_key)
+                for result_format_key in validation_plan["result_formats"]
+            ] + list(result_formats)
+        logger.info(f"Compiling validation plan for {key[0]}")
+        validation_plan = compile_validation_plan(
+            validator, expectation_suite, tuple(result_formats)
+        )
+        save_validation_plan(store_backend, validation_plan)
+
+    _VALIDATION_PLANS[key] = validation_plan
+
+    return validation_plan
+
+
+class PlannedExpectationConfiguration(ExpectationConfiguration):
+    """Great Expectations ExpectationConfiguration of an expectation that is validated
+    with a validation plan. Expectation.metrics_validate resolves the validation
+    dependencies of the expectation again to look up the metrics it checks, which is
+    replaced by the metrics and result format from the plan
+
+    Parameters
+    ----------
+    expectation_config : ExpectationConfiguration
+        Configuration of the expectation to validate
+    validated_metric_ids : dict
+        Dictionary with the name of each metric the expectation checks as key and the
+        identifier of its metric configuration as value (see build_metric_edges)
+    result_format : dict
+        Parsed result format to validate the expectation with, as stored in the plan
+    """
+
+    def __init__(
+        self, expectation_config, validated_metric_ids: dict, result_format: dict
+    ):
+        super().__init__(
+            expectation_type=expectation_config.expectation_type,
+            kwargs=expectation_config.kwargs,
+            meta=expectation_config.meta,
+        )
+        self.validated_metric_ids = validated_metric_ids
+        self.result_format = result_format
+
+    def metrics_validate(
+        self,
+        metrics: dict,
+        runtime_configuration: dict = None,
+        execution_engine=None,
+    ):
+        expectation = self._get_expectation_impl()(self)
+        runtime_configuration["result_format"] = copy.deepcopy(self.result_format)
+        expectation_validation_result = expectation._validate(
+            configuration=self,
+            metrics={
+                name: metrics[metric_id]
+                for name, metric_id in self.validated_metric_ids.items()
+            },
+            runtime_configuration=runtime_configuration,
+            execution_engine=execution_engine,
+        )
+        return expectation._build_evr(
+            raw_response=expectation_validation_result,
+            configuration=self.get_plain_configuration(),
+        )
+
+    def get_plain_configuration(self) -> ExpectationConfiguration:
+        """Method to get the configuration as a regular ExpectationConfiguration, to
+        include in its validation result"""
+        return ExpectationConfiguration(
+            expectation_type=self.expectation_type,
+            kwargs=self.kwargs,
+            meta=self.meta,
+        )
+
+
+class PlannedValidator(Validator):
+    """Great Expectations Validator that builds the metric graph of expectations from
+    validation plans (see compile_validation_plan) and validates their metrics with
+    the validation dependencies in the plans (see PlannedExpectationConfiguration),
+    instead of resolving these on every run. Expectations that are not in the plans,
+    that depend on evaluation parameters or that are validated with a result format
+    that was not compiled, are resolved as usual
+
+    Parameters
+    ----------
+    validation_plans : list
+        Validation plans of the expectation suites that will be validated
+    **kwargs
+        Keyword arguments of Validator
+    """
+
+    def __init__(self, validation_plans: list, **kwargs):
+        super().__init__(**kwargs)
+        self.validation_plans = validation_plans
+        self._dict_graphs = {
+            entry["id"]: entry["graphs"]
+            for validation_plan in validation_plans
+            for entry in validation_plan["expectations"]
+            if entry["graphs"]
+        }
+
+    def _generate_metric_dependency_subgraphs_for_each_expectation_configuration(
+        self,
+        expectation_configurations: list,
+        expectation_validation_graphs: list,
+        processed_configurations: list,
+        catch_exceptions: bool,
+        runtime_configuration: dict = None,
+    ) -> tuple:
+        result_format_key = get_result_format_key(
+            (runtime_configuration or {}).get("result_format")
+            or self.default_expectation_args["result_format"]
+        )
+        evrs = []
+        for configuration in expectation_configurations:
+            graph_plan = None
+            if self._dict_graphs:
+                graph_plan = self._dict_graphs.get(
+                    get_expectation_id(configuration), {}
+                ).get(result_format_key)
+
+            if graph_plan is None:
+                (
+                    partial_evrs,
+                    _,
+                ) = super()._generate_metric_dependency_subgraphs_for_each_expectation_configuration(
+                    [configuration],
+                    expectation_validation_graphs,
+                    processed_configurations,
+                    catch_exceptions,
+                    runtime_configuration,
+                )
+                evrs.extend(partial_evrs)
+                continue
+
+            edges, validated_metric_ids = build_metric_edges(
+                graph_plan, self.active_batch_id
+            )
+            evaluated_config = PlannedExpectationConfiguration(
+                copy.deepcopy(configuration),
+                validated_metric_ids,
+                graph_plan["result_format"],
+            )
+            evaluated_config.kwargs.update({"batch_id": self.active_batch_id})
+            expectation_validation_graph = ExpectationValidationGraph(
+                configuration=evaluated_config
+            )
+            for edge in edges:
+                expectation_validation_graph.graph.add(edge)
+            expectation_validation_graphs.append(expectation_validation_graph)
+            processed_configurations.append(evaluated_config)
+
+        return evrs, processed_configurations
+
+
+def get_planned_validator(
+    validator: Validator,
+    store_backend,
+    expectation_suites: list = None,
+    result_formats: tuple = DEFAULT_PLAN_RESULT_FORMATS,
+) -> PlannedValidator:
+    """Function to get a PlannedValidator for the batch of a validator, using the
+    validation plans of the given expectation suites (see get_validation_plan)
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator with the batch of data to validate and the expectation suite to
+        validate it with
+    store_backend : TupleStoreBackend
+        Store backend for validation plans, generally obtained by calling
+        get_grater_store_backend with name "validation_plans"
+    expectation_suites : list, optional
+        Expectation suites that will be validated against the batch, by default the
+        suite of the validator
+    result_formats : tuple, optional
+        Result formats that will be used for validation, by default
+        DEFAULT_PLAN_RESULT_FORMATS
+
+    Returns
+    -------
+    PlannedValidator
+        A validator for the same batch and expectation suite
+    """
+    validation_plans = [
+        get_validation_plan(store_backend, validator, suite, result_formats)
+        for suite in (expectation_suites or [validator.expectation_suite])
+    ]
+    planned_validator = PlannedValidator(
+        validation_plans,
+        execution_engine=validator.execution_engine,
+        interactive_evaluation=validator.interactive_evaluation,
+        expectation_suite=validator.expectation_suite,
+        data_context=validator.data_context,
+        batches=list(validator.batches.values()),
+    )
+    planned_validator.active_batch_id = validator.active_batch_id
+    for key, value in validator.default_expectation_args.items():
+        planned_validator.set_default_expectation_argument(key, value)
+
+    return planned_validator
+
+
+def get_plan_result_formats(
+    context: ge.data_context.DataContext,
+    checkpoint_names: list,
+    initial_result_format=None,
+) -> tuple:
+    """Helper function to get the result formats that running the given checkpoints
+    validates with, to compile validation plans for"""
+    result_formats = [
+        get_checkpoint_result_format(
+            context.get_checkpoint(checkpoint_name).get_substituted_config()
+        )
+        for checkpoint_name in checkpoint_names
+    ]
+    if initial_result_format is not None:
+        result_formats.insert(0, initial_result_format)
+
+    return tuple(result_formats)
+
+
+def benchmark_validation_plan(
+    context: ge.data_context.DataContext,
+    checkpoint_name: str,
+    batch_request: RuntimeBatchRequest,
+    store_backend,
+    evaluation_parameters: dict = None,
+    repeats: int = 3,
+) -> pd.DataFrame:
+    """Function to benchmark the time that Great Expectations spends on validating the
+    expectation suite of a checkpoint besides computing metrics, with and without a
+    validation plan. It times loading the plan from the store and getting a
+    PlannedValidator, building the metric graph of the expectations and validating
+    their computed metrics (see PlannedExpectationConfiguration). Metrics themselves
+    are computed once beforehand and not timed
+
+    Parameters
+    ----------
+    context : ge.data_context.DataContext
+        Initialized GE DataContext
+    checkpoint_name : str
+        Name of the checkpoint to benchmark
+    batch_request : RuntimeBatchRequest
+        Batch request containing the batch of data to validate
+    store_backend : TupleStoreBackend
+        Store backend for validation plans, generally obtained by calling
+        get_grater_store_backend with name "validation_plans". A plan is compiled
+        and stored if there is none for the current version of the suite
+    evaluation_parameters : dict, optional
+        Values for the dynamic evaluation parameters of the expectation suite, by
+        default None
+    repeats : int, optional
+        Number of times each setting is timed, of which the fastest is kept, by
+        default 3
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame with the time in seconds to load the plan, to build the metric
+        graph, to validate the metrics and in total, and the speedup compared to
+        validating without a plan
+    """
+    # -- 1. Prepare expectations like Validator.validate does before building graphs
+    validator = get_checkpoint_validator(context, checkpoint_name, batch_request)
+    result_formats = get_plan_result_formats(context, [checkpoint_name])
+    runtime_configuration = {
+        "include_config": True,
+        "catch_exceptions": True,
+        "result_format": result_formats[0],
+    }
+    expectations = copy.deepcopy(validator.expectation_suite.expectations)
+    for expectation in expectations:
+        expectation.process_evaluation_parameters(
+            evaluation_parameters={
+                **validator.expectation_suite.evaluation_parameters,
+                **(evaluation_parameters or {}),
+            },
+            interactive_evaluation=True,
+            data_context=context,
+        )
+    get_validation_plan(store_backend, validator, result_formats=result_formats)
+
+    # -- 2. Compute the metrics of the suite once, to validate them in each run
+    expectation_validation_graphs = []
+    validator._generate_metric_dependency_subgraphs_for_each_expectation_configuration(
+        copy.deepcopy(expectations),
+        expectation_validation_graphs,
+        [],
+        True,
+        dict(runtime_configuration),
+    )
+    metrics = {}
+    validator.resolve_validation_graph(
+        validator._generate_suite_level_graph_from_expectation_level_sub_graphs(
+            expectation_validation_graphs
+        ),
+        metrics,
+        dict(runtime_configuration),
+    )
+
+    # -- 3. Time validation without and with a plan, loading the plan from the store
+    list_timings = []
+    for mode in ("without plan", "with plan"):
+        dict_durations = {"load": [], "planning": [], "validate": []}
+        for _ in range(repeats):
+            start = time.perf_counter()
+            planning_validator = validator
+            if mode == "with plan":
+                _VALIDATION_PLANS.clear()
+                planning_validator = get_planned_validator(
+                    validator, store_backend, result_formats=result_formats
+                )
+            dict_durations["load"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            (
+                _,
+                processed_configurations,
+            ) = planning_validator._generate_metric_dependency_subgraphs_for_each_expectation_configuration(
+                copy.deepcopy(expectations), [], [], True, dict(runtime_configuration)
+            )
+            dict_durations["planning"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for configuration in processed_configurations:
+                configuration.metrics_validate(
+                    metrics,
+                    runtime_configuration=dict(runtime_configuration),
+                    execution_engine=validator.execution_engine,
+                )
+            dict_durations["validate"].append(time.perf_counter() - start)
+        list_timings.append(
+            {
+                "mode": mode,
+                **{
+                    f"{step}_seconds": min(durations)
+                    for step, durations in dict_durations.items()
+                },
+            }
+        )
+
+    df_timings = pd.DataFrame(list_timings)
+    df_timings["seconds"] = df_timings[
+        ["load_seconds", "planning_seconds", "validate_seconds"]
+    ].sum(axis=1)
+    df_timings["speedup"] = df_timings["seconds"].iloc[0] / df_timings["seconds"]
+
+    return df_timings
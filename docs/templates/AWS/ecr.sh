@@ -7,6 +7,9 @@ export AWS_DEFAULT_REGION="eu-west-1"
 chmod 644 $(find . -type f)
 chmod 755 $(find . -type d)
 
+# Bake snapshot of expectation suites and checkpoints, if enabled in project_config.yml
+python bake_store_snapshot.py
+
 # Build image
 docker build -t {{ docker_image }} . --platform=linux/amd64
 
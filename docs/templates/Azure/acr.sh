@@ -11,6 +11,9 @@ az acr create --resource-group {{cfg["resource_group_name"]}} --name {{cfg["cont
 # Login to Azure Container Registry
 az acr login --name {{cfg["container_registry_name"]}}
 
+# Bake snapshot of expectation suites and checkpoints, if enabled in project_config.yml
+python bake_store_snapshot.py
+
 # Build Docker image locally, pass Service Principal credentials
 docker build -t {{cfg["docker_image_name"]}} \
 --build-arg AZURE_CLIENT_SECRET=${ARM_CLIENT_SECRET} \
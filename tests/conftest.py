@@ -0,0 +1,131 @@
+"""Fixtures for testing the features of Grater Expectations in grater_functions, which
+are validated against an in-memory Great Expectations context"""
+
+# -- Imports
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from great_expectations.core.batch import RuntimeBatchRequest
+from great_expectations.core.expectation_configuration import ExpectationConfiguration
+from great_expectations.data_context import BaseDataContext
+from great_expectations.data_context.types.base import (
+    DataContextConfig,
+    InMemoryStoreBackendDefaults,
+)
+
+# -- grater_functions is copied next to supporting_functions and store_backend_io in
+# -- projects, so both directories are added to the path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [
+    os.path.join(ROOT_DIR, "bootstrap_files"),
+    os.path.join(ROOT_DIR, "bootstrap_files", "AWS"),
+]
+
+
+@pytest.fixture
+def context() -> BaseDataContext:
+    """In-memory context with a runtime pandas datasource"""
+    return BaseDataContext(
+        project_config=DataContextConfig(
+            datasources={
+                "runtime_data": {
+                    "class_name": "Datasource",
+                    "execution_engine": {"class_name": "PandasExecutionEngine"},
+                    "data_connectors": {
+                        "runtime_data_connector": {
+                            "class_name": "RuntimeDataConnector",
+                            "batch_identifiers": ["batch_id"],
+                        }
+                    },
+                }
+            },
+            store_backend_defaults=InMemoryStoreBackendDefaults(),
+            anonymous_usage_statistics={"enabled": False},
+        )
+    )
+
+
+@pytest.fixture
+def df_batch() -> pd.DataFrame:
+    """Batch of data with a few nulls and out of range values"""
+    rng = np.random.default_rng(42)
+    n_rows = 1000
+    df = pd.DataFrame(
+        {
+            "id": np.arange(n_rows),
+            "amount": rng.normal(50, 20, n_rows).round(2),
+            "category": rng.choice(["a", "b", "c", "d"], n_rows),
+            "quantity": rng.integers(0, 12, n_rows),
+        }
+    )
+    df.loc[::97, "amount"] = np.nan
+    df.loc[::131, "category"] = "unknown"
+
+    return df
+
+
+@pytest.fixture
+def interleaved_expectations() -> list:
+    """Expectations of which the columns are interleaved, so that results grouped by
+    column are in a different order than the expectation suite"""
+    list_expectations = [
+        ("expect_column_values_to_not_be_null", {"column": "amount"}),
+        (
+            "expect_column_values_to_be_in_set",
+            {"column": "category", "value_set": list("abcd")},
+        ),
+        (
+            "expect_column_values_to_be_between",
+            {"column": "amount", "min_value": 0, "max_value": 100},
+        ),
+        (
+            "expect_column_values_to_be_between",
+            {"column": "quantity", "min_value": 1, "max_value": 10},
+        ),
+        ("expect_column_values_to_be_unique", {"column": "id"}),
+        ("expect_column_values_to_not_be_null", {"column": "category"}),
+        (
+            "expect_column_values_to_be_between",
+            {"column": "quantity", "min_value": 0, "max_value": 11},
+        ),
+        (
+            "expect_column_mean_to_be_between",
+            {"column": "amount", "min_value": 40, "max_value": 60},
+        ),
+        (
+            "expect_column_max_to_be_between",
+            {"column": "quantity", "min_value": 0, "max_value": 10},
+        ),
+        ("expect_column_values_to_not_be_null", {"column": "quantity"}),
+    ]
+
+    return [
+        ExpectationConfiguration(expectation_type=expectation_type, kwargs=kwargs)
+        for expectation_type, kwargs in list_expectations
+    ]
+
+
+@pytest.fixture
+def get_validator(context):
+    """Factory of validators for a batch of data and a list of expectations"""
+
+    def _get_validator(df: pd.DataFrame, expectations: list, suite_name: str = "suite"):
+        suite = context.create_expectation_suite(suite_name, overwrite_existing=True)
+        for expectation in expectations:
+            suite.append_expectation(expectation)
+        context.save_expectation_suite(suite)
+        batch_request = RuntimeBatchRequest(
+            datasource_name="runtime_data",
+            data_connector_name="runtime_data_connector",
+            data_asset_name="batch",
+            runtime_parameters={"batch_data": df},
+            batch_identifiers={"batch_id": "test"},
+        )
+        return context.get_validator(
+            batch_request=batch_request, expectation_suite_name=suite_name
+        )
+
+    return _get_validator
@@ -0,0 +1,127 @@
+"""Tests for building Data Docs incrementally"""
+
+# -- Imports
+import datetime
+import json
+
+import pytest
+from great_expectations.core.run_identifier import RunIdentifier
+from great_expectations.data_context import BaseDataContext
+from great_expectations.data_context.store import (
+    HtmlSiteStore,
+    InMemoryStoreBackend,
+    ValidationsStore,
+)
+from great_expectations.data_context.types.base import (
+    DataContextConfig,
+    InMemoryStoreBackendDefaults,
+)
+from great_expectations.data_context.types.resource_identifiers import (
+    ExpectationSuiteIdentifier,
+    ValidationResultIdentifier,
+)
+
+from grater_functions.data_docs import build_data_docs_incrementally
+
+
+@pytest.fixture
+def context(tmp_path) -> BaseDataContext:
+    """In-memory context with a runtime pandas datasource and a Data Docs site on the
+    local filesystem"""
+    return BaseDataContext(
+        project_config=DataContextConfig(
+            datasources={
+                "runtime_data": {
+                    "class_name": "Datasource",
+                    "execution_engine": {"class_name": "PandasExecutionEngine"},
+                    "data_connectors": {
+                        "runtime_data_connector": {
+                            "class_name": "RuntimeDataConnector",
+                            "batch_identifiers": ["batch_id"],
+                        }
+                    },
+                }
+            },
+            store_backend_defaults=InMemoryStoreBackendDefaults(),
+            data_docs_sites={
+                "local_site": {
+                    "class_name": "SiteBuilder",
+                    "show_how_to_buttons": False,
+                    "store_backend": {
+                        "class_name": "TupleFilesystemStoreBackend",
+                        "base_directory": str(tmp_path / "site"),
+                    },
+                    "site_index_builder": {"class_name": "DefaultSiteIndexBuilder"},
+                }
+            },
+            anonymous_usage_statistics={"enabled": False},
+        )
+    )
+
+
+@pytest.fixture
+def index_writes(monkeypatch) -> list:
+    """List to which the location of every index page that is written is appended"""
+    list_writes = []
+    write_index_page = HtmlSiteStore.write_index_page
+
+    def count_index_page_writes(self, page):
+        list_writes.append(write_index_page(self, page))
+        return list_writes[-1]
+
+    monkeypatch.setattr(HtmlSiteStore, "write_index_page", count_index_page_writes)
+    return list_writes
+
+
+def store_validation_result(context, validator, day: int) -> ValidationResultIdentifier:
+    """Helper function to validate the batch of a validator and store the result"""
+    validation_result_key = ValidationResultIdentifier(
+        ExpectationSuiteIdentifier("suite"),
+        RunIdentifier(
+            run_name=f"run_{day}",
+            run_time=datetime.datetime(2024, 1, day, tzinfo=datetime.timezone.utc),
+        ),
+        "test",
+    )
+    context.validations_store.set(validation_result_key, validator.validate())
+    return validation_result_key
+
+
+def test_site_is_only_updated_with_changes(
+    monkeypatch,
+    context,
+    get_validator,
+    df_batch,
+    interleaved_expectations,
+    index_writes,
+):
+    validator = get_validator(df_batch, interleaved_expectations[:3])
+    manifest_store = InMemoryStoreBackend()
+    first_key = store_validation_result(context, validator, 1)
+    store_validation_result(context, validator, 2)
+
+    # -- 1. The first build renders everything, a build without changes nothing
+    build_data_docs_incrementally(context, manifest_store)
+    build_data_docs_incrementally(context, manifest_store)
+    assert len(index_writes) == 1
+
+    # -- 2. Given keys are rendered without listing the validations store, and keys
+    # -- that are no longer in the store are removed from the site
+    def list_keys(self):
+        raise AssertionError("Validations store should not be listed")
+
+    monkeypatch.setattr(ValidationsStore, "list_keys", list_keys)
+    new_key = store_validation_result(context, validator, 3)
+    context.validations_store.store_backend.remove_key(first_key.to_tuple())
+    build_data_docs_incrementally(
+        context,
+        manifest_store,
+        validation_result_keys=[new_key, first_key.to_tuple()],
+    )
+
+    manifest = json.loads(manifest_store.get(("local_site",)))
+    assert len(index_writes) == 2
+    assert sorted(link["run_name"] for link in manifest["validations"].values()) == [
+        "run_2",
+        "run_3",
+    ]
@@ -0,0 +1,73 @@
+"""Tests for incremental validation of append-only datasets"""
+
+# -- Imports
+import pytest
+from great_expectations.data_context.store import InMemoryStoreBackend
+
+from grater_functions import incremental
+from grater_functions.incremental import run_incremental_checkpoint, validate_new_rows
+from grater_functions.validation import get_result_key
+
+
+def test_new_rows_match_results_to_interleaved_expectations(
+    get_validator, df_batch, interleaved_expectations
+):
+    validator = get_validator(df_batch, interleaved_expectations)
+    df_new = df_batch.iloc[700:]
+    validate_kwargs = {
+        "run_id": None,
+        "evaluation_parameters": None,
+        "catch_exceptions": True,
+        "result_format": None,
+    }
+    results, _, _, _ = validate_new_rows(
+        validator, validator.expectation_suite, df_new, None, validate_kwargs
+    )
+
+    assert [get_result_key(result) for result in results] == [
+        get_result_key(expectation) for expectation in interleaved_expectations
+    ]
+    for result in results:
+        kwargs = result.expectation_config.kwargs
+        if (
+            result.expectation_config.expectation_type
+            == "expect_column_values_to_be_between"
+        ):
+            values = df_new[kwargs["column"]].dropna()
+            n_unexpected = int(
+                ((values < kwargs["min_value"]) | (values > kwargs["max_value"])).sum()
+            )
+            assert result.result["unexpected_count"] == n_unexpected
+
+
+@pytest.mark.parametrize("flush_fails", [False, True])
+def test_watermark_is_committed_after_store_writes_are_flushed(
+    monkeypatch, context, get_validator, df_batch, interleaved_expectations, flush_fails
+):
+    validator = get_validator(df_batch, interleaved_expectations)
+    watermark_store = InMemoryStoreBackend()
+
+    def flush_store_writes():
+        if flush_fails:
+            raise ConnectionError("Store is not available")
+        return 0
+
+    monkeypatch.setattr(
+        incremental, "get_checkpoint_validator", lambda *args: validator
+    )
+    monkeypatch.setattr(
+        incremental,
+        "run_checkpoint_with_validator",
+        lambda context, checkpoint_name, validator, evaluation_parameters: (
+            validator.validate()
+        ),
+    )
+    monkeypatch.setattr(incremental, "flush_store_writes", flush_store_writes)
+
+    if flush_fails:
+        with pytest.raises(ConnectionError):
+            run_incremental_checkpoint(context, "checkpoint", None, watermark_store)
+    else:
+        run_incremental_checkpoint(context, "checkpoint", None, watermark_store)
+
+    assert watermark_store.has_key(("batch",)) != flush_fails
@@ -0,0 +1,70 @@
+"""Tests for the persistent key index for cross-batch uniqueness"""
+
+# -- Imports
+import numpy as np
+import pandas as pd
+import pytest
+from great_expectations.data_context.store import TupleFilesystemStoreBackend
+
+from grater_functions import key_index
+from grater_functions.key_index import (
+    add_batch_to_key_index,
+    check_keys_against_key_index,
+    commit_key_index_updates,
+    find_digests_in_key_index,
+    get_segments_to_compact,
+    load_key_index_manifest,
+    register_key_index_store,
+)
+from grater_functions.sketches import get_value_digests
+
+
+@pytest.fixture
+def key_index_store(tmp_path, monkeypatch):
+    """Key index store on the local filesystem, without pending updates or cached
+    segments of other tests"""
+    monkeypatch.setattr(key_index, "_PENDING_KEY_INDEX_UPDATES", {})
+    monkeypatch.setattr(key_index, "_KEY_INDEX_CACHE", {})
+    store_backend = TupleFilesystemStoreBackend(
+        base_directory=str(tmp_path), filepath_suffix=""
+    )
+    register_key_index_store(store_backend)
+    return store_backend
+
+
+def test_large_integers_do_not_share_digests():
+    keys = np.array([2**53, 2**53 + 1, 2**62 + 1, 2**62 + 2], dtype=np.int64)
+
+    assert len(np.unique(get_value_digests(keys))) == len(keys)
+    assert np.array_equal(
+        get_value_digests(pd.Series([1, 2, None], dtype="Int64")),
+        get_value_digests(pd.Series([1.0, 2.0, np.nan])),
+    )
+
+
+def test_large_integer_keys_are_found_exactly(key_index_store):
+    keys = pd.Series(2**53 + 2 * np.arange(1000, dtype=np.int64))
+    add_batch_to_key_index(
+        key_index_store, "trips", "batch_1", np.unique(get_value_digests(keys))
+    )
+
+    new_keys = pd.concat([keys.iloc[:10], keys.iloc[:10] + 1], ignore_index=True)
+    is_new = check_keys_against_key_index(new_keys, "trips", "batch_2")
+
+    assert is_new.tolist() == [False] * 10 + [True] * 10
+
+
+def test_segments_are_compacted_like_a_binary_counter(key_index_store):
+    for i in range(11):
+        keys = pd.Series(np.arange(i * 100, (i + 1) * 100))
+        assert check_keys_against_key_index(keys, "trips", f"batch_{i}").all()
+        commit_key_index_updates([])
+
+    manifest = load_key_index_manifest(key_index_store, "trips")
+    # -- 11 batches of 100 keys are held by segments of 800, 200 and 100 keys
+    assert [segment["n_keys"] for segment in manifest["segments"]] == [800, 200, 100]
+    assert get_segments_to_compact(manifest["segments"]) == 0
+
+    digests = np.unique(get_value_digests(pd.Series(np.arange(1200))))
+    found = find_digests_in_key_index(key_index_store, "trips", digests)
+    assert found.sum() == 1100
@@ -0,0 +1,61 @@
+"""Tests for validating several expectation suites against a single batch"""
+
+# -- Imports
+from great_expectations.core.expectation_configuration import ExpectationConfiguration
+from great_expectations.core.expectation_suite import ExpectationSuite
+
+from grater_functions.multiple_suites import validate_suites_on_batch
+
+
+def get_suite(suite_name: str, evaluation_parameters: dict) -> ExpectationSuite:
+    """Suite with an expectation on the maximum quantity that depends on the
+    evaluation parameter max_quantity"""
+    return ExpectationSuite(
+        expectation_suite_name=suite_name,
+        expectations=[
+            ExpectationConfiguration(
+                "expect_column_max_to_be_between",
+                {
+                    "column": "quantity",
+                    "min_value": 0,
+                    "max_value": {"$PARAMETER": "max_quantity"},
+                },
+            ),
+            ExpectationConfiguration(
+                "expect_column_values_to_not_be_null", {"column": "quantity"}
+            ),
+        ],
+        evaluation_parameters=evaluation_parameters,
+    )
+
+
+def test_suites_are_validated_with_their_own_evaluation_parameters(
+    get_validator, df_batch
+):
+    validator = get_validator(df_batch, [])
+    expectation_suites = [
+        get_suite("strict", {"max_quantity": 5}),
+        get_suite("lenient", {"max_quantity": 20}),
+        get_suite("also_lenient", {"max_quantity": 20}),
+    ]
+    dict_results = validate_suites_on_batch(
+        validator,
+        expectation_suites,
+        {
+            "run_id": None,
+            "evaluation_parameters": None,
+            "catch_exceptions": True,
+            "result_format": None,
+        },
+    )
+
+    for suite_name, max_quantity, success in [
+        ("strict", 5, False),
+        ("lenient", 20, True),
+        ("also_lenient", 20, True),
+    ]:
+        results, evaluation_parameters = dict_results[suite_name]
+        assert evaluation_parameters["max_quantity"] == max_quantity
+        assert results[0].expectation_config.kwargs["max_value"] == max_quantity
+        assert results[0].success == success
+        assert results[1].success
@@ -0,0 +1,71 @@
+"""Tests for validating expectation suites in parallel"""
+
+# -- Imports
+import pytest
+
+from grater_functions.parallel import ParallelValidator, validate_row_partitions
+from grater_functions.validation import get_result_key
+
+
+def summarize_results(validation_result) -> list:
+    """Helper function to reduce validation results to the fields that are compared
+    between serial and parallel validation"""
+    return [
+        (
+            result.expectation_config.expectation_type,
+            result.expectation_config.kwargs.get("column"),
+            result.success,
+            result.result.get("element_count"),
+            result.result.get("unexpected_count"),
+            result.result.get("missing_count"),
+            result.result.get("observed_value"),
+            # -- repr, as missing values in the list are NaN, which is not equal to itself
+            repr(result.result.get("partial_unexpected_list")),
+        )
+        for result in validation_result.results
+    ]
+
+
+@pytest.mark.parametrize("partition_by", ["columns", "rows"])
+def test_parallel_validation_equals_serial(
+    get_validator, df_batch, interleaved_expectations, partition_by
+):
+    validator = get_validator(df_batch, interleaved_expectations)
+    serial_result = validator.validate()
+    parallel_result = ParallelValidator(
+        validator, n_workers=3, partition_by=partition_by
+    ).validate()
+
+    assert summarize_results(parallel_result) == summarize_results(serial_result)
+    assert parallel_result.success == serial_result.success
+    assert parallel_result.statistics == serial_result.statistics
+
+
+def test_row_partitions_match_results_to_interleaved_expectations(
+    get_validator, df_batch, interleaved_expectations
+):
+    validator = get_validator(df_batch, interleaved_expectations)
+    validate_kwargs = {
+        "run_id": None,
+        "evaluation_parameters": None,
+        "catch_exceptions": True,
+        "result_format": None,
+    }
+    results, _, _ = validate_row_partitions(
+        validator, validator.expectation_suite, 4, validate_kwargs
+    )
+
+    assert [get_result_key(result) for result in results] == [
+        get_result_key(expectation) for expectation in interleaved_expectations
+    ]
+    for result in results:
+        kwargs = result.expectation_config.kwargs
+        if (
+            result.expectation_config.expectation_type
+            == "expect_column_values_to_be_between"
+        ):
+            values = df_batch[kwargs["column"]].dropna()
+            n_unexpected = int(
+                ((values < kwargs["min_value"]) | (values > kwargs["max_value"])).sum()
+            )
+            assert result.result["unexpected_count"] == n_unexpected
@@ -0,0 +1,23 @@
+"""Tests for validating with an adaptive result format"""
+
+# -- Imports
+from grater_functions.result_format import AdaptiveResultFormatValidator
+
+
+def test_default_initial_result_format_keeps_observed_values(
+    get_validator, df_batch, interleaved_expectations
+):
+    validator = get_validator(df_batch, interleaved_expectations)
+    validation_result = AdaptiveResultFormatValidator(validator).validate(
+        result_format="SUMMARY"
+    )
+
+    for result in validation_result.results:
+        expectation_type = result.expectation_config.expectation_type
+        if expectation_type == "expect_column_mean_to_be_between":
+            assert result.success
+            assert result.result["observed_value"] == df_batch["amount"].mean()
+        elif expectation_type.startswith("expect_column_values"):
+            assert "unexpected_count" in result.result
+            # -- Only failed expectations are validated again with unexpected values
+            assert ("partial_unexpected_counts" in result.result) != result.success
@@ -0,0 +1,22 @@
+"""Tests for the sketches behind approximate expectations"""
+
+# -- Imports
+import numpy as np
+import pandas as pd
+
+from grater_functions.sketches import KllSketch
+
+
+def test_kll_sketch_is_bounded_and_within_rank_error():
+    values = pd.Series(np.random.default_rng(7).lognormal(size=200_000))
+    values[::50] = np.nan
+    sketch = KllSketch(200).update(values)
+
+    assert sketch.n == values.notna().sum()
+    assert sum(len(items) for items in sketch.levels) <= 3 * sketch.k
+    sorted_values = np.sort(values.dropna().to_numpy())
+    for quantile, estimate in zip(
+        [0.01, 0.25, 0.5, 0.75, 0.99], sketch.quantiles([0.01, 0.25, 0.5, 0.75, 0.99])
+    ):
+        rank = np.searchsorted(sorted_values, estimate) / len(sorted_values)
+        assert abs(rank - quantile) <= sketch.rank_error
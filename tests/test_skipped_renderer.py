@@ -0,0 +1,54 @@
+"""Tests for rendering expectations that were skipped by tiered validation"""
+
+# -- Imports
+import subprocess
+import sys
+import textwrap
+
+from conftest import ROOT_DIR
+
+
+def test_skipped_status_icon_renderer_is_only_registered_explicitly():
+    # -- The renderers of Great Expectations are global, so they are checked in a new
+    # -- process to not depend on other tests having registered them
+    script = textwrap.dedent("""
+        import sys
+        sys.path.insert(0, "bootstrap_files")
+
+        from great_expectations.core.expectation_configuration import (
+            ExpectationConfiguration,
+        )
+        from great_expectations.expectations.expectation import Expectation
+        from great_expectations.expectations.registry import get_renderer_impl
+
+        from grater_functions.tiers import (
+            build_skipped_result,
+            register_skipped_status_icon_renderer,
+        )
+
+        def get_status_icon_renderer():
+            return get_renderer_impl(
+                "expect_column_values_to_not_be_null",
+                "renderer.diagnostic.status_icon",
+            )[1]
+
+        assert not hasattr(get_status_icon_renderer(), "renders_skipped_results")
+        assert not hasattr(
+            Expectation._diagnostic_status_icon_renderer, "renders_skipped_results"
+        )
+
+        register_skipped_status_icon_renderer()
+        register_skipped_status_icon_renderer()
+        result = build_skipped_result(
+            ExpectationConfiguration(
+                "expect_column_values_to_not_be_null", {"column": "id"}
+            ),
+            "batch",
+            "Blocking tier failed",
+        )
+        icon = get_status_icon_renderer()(result=result).to_json_dict()
+        icon_styling = icon["string_template"]["styling"]["params"]["icon"]
+        assert "fa-forward" in icon_styling["classes"]
+        assert icon_styling["attributes"]["title"] == "Blocking tier failed"
+        """)
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT_DIR, check=True)
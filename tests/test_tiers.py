@@ -0,0 +1,25 @@
+"""Tests for validating expectations in priority tiers"""
+
+# -- Imports
+import copy
+
+from grater_functions.cost_profiles import get_cost_profile_report
+from grater_functions.tiers import TieredValidator
+
+
+def test_cost_profile_only_records_blocking_tier(
+    get_validator, df_batch, interleaved_expectations
+):
+    expectations = copy.deepcopy(interleaved_expectations)
+    # -- Blocking expectations that pass, so that the other tiers are validated too
+    for position in (4, 6, 9):
+        expectations[position].meta = {"tier": "blocking"}
+    validator = get_validator(df_batch, expectations)
+    cost_profile = {"expectation_suite_name": "suite", "expectations": {}}
+    TieredValidator(validator, cost_profile).validate()
+
+    df_report = get_cost_profile_report(cost_profile)
+    assert len(df_report) == 3
+    assert (df_report["tier"] == "blocking").all()
+    assert df_report["seconds"].nunique() == 3
+    assert abs(df_report["percent_of_tier"].sum() - 100) < 1e-6
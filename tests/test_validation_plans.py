@@ -0,0 +1,55 @@
+"""Tests for validating with precompiled validation plans"""
+
+# -- Imports
+from great_expectations.core.expectation_configuration import ExpectationConfiguration
+from great_expectations.data_context.store import InMemoryStoreBackend
+from great_expectations.expectations.expectation import Expectation
+
+from grater_functions.validation import get_result_key
+from grater_functions.validation_plans import get_planned_validator
+
+
+def get_comparable_results(validation_result) -> list:
+    """Helper function to get the parts of validation results to compare, sorted by
+    expectation"""
+    return sorted(
+        (
+            get_result_key(result),
+            type(result.expectation_config),
+            result.expectation_config.to_json_dict(),
+            result.success,
+            repr(result.result),
+        )
+        for result in validation_result.results
+    )
+
+
+def test_planned_validation_does_not_resolve_validation_dependencies(
+    monkeypatch, get_validator, df_batch, interleaved_expectations
+):
+    validator = get_validator(df_batch, interleaved_expectations)
+    planned_validator = get_planned_validator(
+        validator, InMemoryStoreBackend(), result_formats=("SUMMARY",)
+    )
+    expected_results = validator.validate(result_format="SUMMARY")
+
+    list_resolved = []
+    get_validation_dependencies = Expectation.get_validation_dependencies
+
+    def count_validation_dependencies(self, configuration, *args, **kwargs):
+        list_resolved.append(configuration.expectation_type)
+        return get_validation_dependencies(self, configuration, *args, **kwargs)
+
+    monkeypatch.setattr(
+        Expectation, "get_validation_dependencies", count_validation_dependencies
+    )
+    planned_results = planned_validator.validate(result_format="SUMMARY")
+
+    assert list_resolved == []
+    assert get_comparable_results(planned_results) == get_comparable_results(
+        expected_results
+    )
+    assert all(
+        type(result.expectation_config) is ExpectationConfiguration
+        for result in planned_results.results
+    )
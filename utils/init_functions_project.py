@@ -59,7 +59,14 @@ def generate_project_files(args, provider: str, package_root: str, project_root:
         ),
     )
 
-    # -- 2. If nonverbose, get nonverbose files
+    # -- 2. Copy features of Grater Expectations that are shared between providers
+    copy_and_overwrite_tree(
+        from_path=os.path.join(package_root, "bootstrap_files", "grater_functions"),
+        to_path=os.path.join(to_path, "grater_functions"),
+        ignore_pattern=shutil.ignore_patterns("__pycache__"),
+    )
+
+    # -- 3. If nonverbose, get nonverbose files
     if args.nonverbose:
         logging.info("Replacing generated files with non-verbose versions")
         path = os.path.join(